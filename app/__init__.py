@@ -1,2 +1,9 @@
 # paquete condatos-figs-app
-from .custom_legend import CustomImageLegend
+# Los submódulos se importan bajo demanda para no cargar matplotlib al arrancar la CLI.
+
+
+def __getattr__(name):
+    if name == "CustomImageLegend":
+        from .custom_legend import CustomImageLegend
+        return CustomImageLegend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
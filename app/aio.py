@@ -0,0 +1,292 @@
+# app/aio.py
+"""
+Interfaz asyncio para renderizar gráficos sin bloquear el event loop.
+
+El trabajo de matplotlib corre en un pool de procesos (``AsyncRenderer``)
+con la API de bytes de app/api.py, que usa el mismo camino que la CLI
+(``compile_config`` → ``BaseChart.render``). Desde el loop solo se espera.
+
+- **Concurrencia acotada**: a lo sumo ``workers`` renders en el pool a la
+  vez (por defecto, los CPUs); el resto espera su turno en el loop, sin
+  ocupar procesos ni encolarse en el pool.
+- **Contrapresión**: con ``max_waiting``, una llamada que encontraría más
+  de esa cantidad de renders esperando falla de inmediato con
+  ``RendererBusy`` (para responder 503 en lugar de acumular pedidos).
+  ``render_many`` solo toma el siguiente pedido cuando hay lugar: si quien
+  consume los resultados se atrasa, deja de leer pedidos.
+- **Cancelación**: cancelar una llamada que espera turno no envía nada al
+  pool. Un render que ya empezó no se puede interrumpir a mitad: su
+  resultado se descarta y su lugar se libera recién cuando el proceso
+  termina, para no pasarse de ``workers``.
+- **Procesos caídos**: si un proceso del pool muere (OOM, señal), los
+  renders en curso fallan con ``BrokenProcessPool``; el renderer descarta
+  ese pool y el pedido siguiente arranca uno nuevo.
+
+Uso::
+
+    from app.aio import render_async, render_many
+
+    images = await render_async(config, df)               # {"png": b"..."}
+
+    async for result in render_many(requests, concurrency=4):
+        ...   # {"index": 3, "key": ..., "status": "ok", "files": {...}, "ms": 812.4}
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class RendererBusy(RuntimeError):
+    """Demasiados renders esperando turno (``max_waiting``)."""
+
+
+def _warm_up() -> None:
+    """Importa los módulos de gráficos en cada proceso del pool antes del primer pedido."""
+    from app.plots.registry import CHART_TYPES, get_chart_class
+
+    for name in CHART_TYPES:
+        get_chart_class(name)
+
+
+class AsyncRenderer:
+    """
+    Pool de renders para usar desde asyncio (también como ``async with``).
+
+    Params:
+        workers: Renders simultáneos (por defecto, los CPUs disponibles)
+        max_waiting: Renders que pueden esperar turno antes de rechazar con
+            ``RendererBusy`` (``None``: sin límite)
+        executor: Executor propio (por defecto, un ``ProcessPoolExecutor``
+            de ``workers`` procesos creado con el primer pedido)
+    """
+
+    def __init__(self, workers: int | None = None, *, max_waiting: int | None = None,
+                 executor: Executor | None = None):
+        from app.batch import default_workers
+
+        self.workers = max(1, workers or default_workers())
+        self.max_waiting = max_waiting
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waiting = 0
+
+    def __repr__(self):
+        return f"AsyncRenderer(workers={self.workers})"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+        return False
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            # forkserver: no se hace fork de un proceso con hilos (el loop y los del pool)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_warm_up)
+        return self._executor
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots, self._loop = asyncio.Semaphore(self.workers), loop
+        return self._slots
+
+    def close(self, wait: bool = True) -> None:
+        """Cierra el pool (si lo creó este renderer)."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, config: Mapping[str, Any], data=None, *, chart: str | None = None,
+                     formats: Iterable[str] | None = None) -> dict[str, bytes]:
+        """
+        Renderiza un gráfico en el pool (ver ``app.api.render``).
+
+        Raises:
+            RendererBusy: Si ya hay ``max_waiting`` renders esperando turno
+            BrokenProcessPool: Si murió un proceso del pool durante el render
+                (el pedido siguiente usa un pool nuevo)
+        """
+        from app.api import render
+
+        slots = self._semaphore()
+        if self.max_waiting is not None and slots.locked() and self._waiting >= self.max_waiting:
+            raise RendererBusy(f"{self._waiting} renders esperando turno (máximo {self.max_waiting})")
+        self._waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        loop = self._loop
+        pool = self._pool()
+        try:
+            future = pool.submit(partial(render, config, data, chart=chart,
+                                         formats=list(formats) if formats is not None else None))
+        except BaseException as e:
+            slots.release()
+            if isinstance(e, BrokenProcessPool):
+                self._discard(pool)
+            raise
+
+        def release(_):
+            # El lugar se libera cuando el proceso termina, aunque la llamada se haya cancelado
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                pass  # El loop ya se cerró
+
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise
+
+    def _discard(self, pool: Executor) -> None:
+        """Descarta un pool roto (murió un proceso) para que el próximo pedido cree otro."""
+        if self._owns_executor and self._executor is pool:
+            logger.warning("⚠️ Un proceso del pool de renders terminó de forma abrupta; el próximo pedido usa un pool nuevo")
+            self._executor = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_DEFAULT: AsyncRenderer | None = None
+
+
+def default_renderer() -> AsyncRenderer:
+    """Renderer compartido de ``render_async`` y ``render_many`` (se crea con el primer uso)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = AsyncRenderer()
+    return _DEFAULT
+
+
+async def render_async(config: Mapping[str, Any], data=None, *, chart: str | None = None,
+                       formats: Iterable[str] | None = None,
+                       renderer: AsyncRenderer | None = None) -> dict[str, bytes]:
+    """
+    Renderiza un gráfico sin bloquear el loop.
+
+    Params:
+        config: Configuración (lo mismo que el YAML, ya cargado)
+        data: ``pandas.DataFrame`` o ``pyarrow.Table`` (por defecto, ``config["data"]``)
+        chart: Tipo de gráfico (por defecto ``chart.type``)
+        formats: Formatos a generar (por defecto ``formats`` de la configuración)
+        renderer: Pool a usar (por defecto, ``default_renderer()``)
+
+    Returns:
+        dict: Formato → bytes codificados
+    """
+    renderer = renderer or default_renderer()
+    return await renderer.render(config, data, chart=chart, formats=formats)
+
+
+def _request(request) -> dict[str, Any]:
+    """Pedido de ``render_many``: dict con ``config`` (y ``data``, ``chart``, ``formats``, ``key``) o par (config, data)."""
+    if isinstance(request, Mapping) and "config" in request:
+        return dict(request)
+    if isinstance(request, tuple) and len(request) == 2:
+        return {"config": request[0], "data": request[1]}
+    raise TypeError(f"Pedido no reconocido: {type(request).__name__} (se espera {{'config': ...}} o (config, data))")
+
+
+async def _render_one(renderer: AsyncRenderer, index: int, request) -> dict[str, Any]:
+    t0 = time.perf_counter()
+    result: dict[str, Any] = {"index": index}
+    try:
+        request = _request(request)
+        result["key"] = request.get("key")
+        result["files"] = await renderer.render(request["config"], request.get("data"),
+                                                chart=request.get("chart"), formats=request.get("formats"))
+        result["status"] = "ok"
+    except Exception as e:
+        logger.error("❌ Falló el pedido %s: %s", result.get("key") or index, e)
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    result["ms"] = (time.perf_counter() - t0) * 1000
+    return result
+
+
+async def _aiter(requests) -> AsyncIterator:
+    if isinstance(requests, AsyncIterable):
+        async for request in requests:
+            yield request
+    else:
+        for request in requests:
+            yield request
+
+
+async def render_many(requests: Iterable | AsyncIterable, *, concurrency: int | None = None,
+                      ordered: bool = False, renderer: AsyncRenderer | None = None) -> AsyncIterator[dict[str, Any]]:
+    """
+    Renderiza muchos pedidos y entrega cada resultado apenas está listo.
+
+    Un pedido que falla no corta el resto: su resultado trae ``status:
+    "error"`` y ``error``. Si se deja de iterar (``break``, cancelación), los
+    pedidos en curso se cancelan.
+
+    Params:
+        requests: Pedidos (iterable o async iterable) como dicts con
+            ``config`` y opcionalmente ``data``, ``chart``, ``formats`` y
+            ``key``, o pares ``(config, data)``; se leen de a uno, a medida
+            que hay lugar
+        concurrency: Pedidos en curso o listos sin entregar (por defecto,
+            los ``workers`` del renderer)
+        ordered: Entregar en el orden de los pedidos en lugar del de llegada
+        renderer: Pool a usar (por defecto, ``default_renderer()``)
+
+    Yields:
+        dict: ``index``, ``key``, ``status`` (``ok`` o ``error``), ``files``
+        (formato → bytes) o ``error``, y ``ms``
+    """
+    renderer = renderer or default_renderer()
+    limit = max(1, concurrency or renderer.workers)
+    source = _aiter(requests)
+    running: dict[asyncio.Task, int] = {}
+    finished: dict[int, dict[str, Any]] = {}
+    read = delivered = 0
+    exhausted = False
+    try:
+        while True:
+            # Contrapresión: los resultados sin entregar también ocupan lugar
+            while not exhausted and len(running) + len(finished) < limit:
+                try:
+                    request = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                running[asyncio.create_task(_render_one(renderer, read, request))] = read
+                read += 1
+            if ordered and delivered in finished:
+                yield finished.pop(delivered)
+                delivered += 1
+                continue
+            if not running:
+                return
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = running.pop(task)
+                if ordered:
+                    finished[index] = task.result()
+                else:
+                    yield task.result()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        await source.aclose()
@@ -0,0 +1,441 @@
+# app/animation.py
+"""
+Animaciones tipo "bar chart race" para ``stackedbarh`` y ``barv``.
+
+Los datos traen una columna de tiempo (``animation.time_col``): cada valor
+es una foto completa de la tabla (p. ej. el medallero al cierre de cada
+día). Entre dos fotos se interpolan los valores y los puestos de cada fila,
+así las barras crecen y se reordenan de forma continua.
+
+El gráfico se renderiza una sola vez (fuentes, título, leyenda, footer,
+branding y decorativos) y queda en memoria. Por cada cuadro:
+
+- ``chart.set_frame`` mueve y redimensiona los artistas existentes (barras,
+  etiquetas, banderas, ejes); no se reconstruye la figura;
+- el fondo estático se copia del buffer guardado (``restore_region``) y
+  solo se dibujan encima los artistas que cambian (blitting), más los fijos
+  que en el render estático quedan sobre ellos, como la leyenda;
+- el cuadro se entrega al codificador sin guardarlo en disco: Pillow (GIF,
+  WebP) o un pipe a ``ffmpeg`` si está instalado (GIF, WebP, MP4).
+
+Uso::
+
+    python main.py animate stackedbarh config/medallero.yml --format webp
+
+    from app.animation import render_animation
+    from app.plots.registry import get_chart_class
+    render_animation(get_chart_class("stackedbarh"), "config/medallero.yml")
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from app.chart_utils import load_chart_data
+from app.config_loader import load_config
+from app.config_schema import compile_config, thaw
+from app.io_utils import ensure_parent
+from app.log import ensure_logging, log_context
+from app.profiling import span
+from app.styling import render_context
+
+logger = logging.getLogger(__name__)
+
+ANIMATION_FORMATS = ("gif", "webp", "mp4")
+
+# Valores por defecto de la sección ``animation``
+DEFAULTS: dict[str, Any] = {
+    "time_col": None,
+    "steps": 10,
+    "fps": 20,
+    "hold": None,  # cuadros extra en la última foto (por defecto, 1 segundo)
+    "top_n": None,
+    "dpi": 100,
+    "format": "gif",
+    "encoder": "auto",
+    "quality": 90,
+    "outfile": None,
+    "period_label": {},
+}
+
+
+def snapshots(df: pd.DataFrame, time_col: str, cat_col: str) -> tuple[list, list[pd.DataFrame]]:
+    """
+    Separa los datos en una tabla por período, todas con las mismas categorías.
+
+    Las columnas numéricas se suman por categoría dentro de cada período y
+    valen 0 donde la categoría no aparece; las demás (banderas, códigos) se
+    toman de la última fila de cada categoría.
+
+    Returns:
+        tuple: (períodos ordenados, tablas en el mismo orden)
+    """
+    if time_col not in df.columns:
+        raise KeyError(f"La columna de tiempo '{time_col}' no existe en los datos. Columnas disponibles: {list(df.columns)}")
+    numeric = [c for c in df.columns
+               if c not in (time_col, cat_col) and pd.api.types.is_numeric_dtype(df[c])]
+    periods = list(df[time_col].drop_duplicates().sort_values())
+    base = df.drop_duplicates(cat_col, keep="last").set_index(cat_col).drop(columns=[time_col])
+    tables = []
+    for period in periods:
+        sums = df.loc[df[time_col] == period].groupby(cat_col, sort=False)[numeric].sum()
+        table = base.copy()
+        table[numeric] = sums.reindex(base.index).fillna(0)
+        tables.append(table.reset_index())
+    return periods, tables
+
+
+def _smoothstep(t: float) -> float:
+    """Aceleración suave para los cambios de puesto."""
+    return t * t * (3 - 2 * t)
+
+
+def timeline(keyframes: list[tuple[np.ndarray, np.ndarray]], steps: int, hold: int):
+    """
+    Cuadros interpolados entre fotos: genera (índice de foto, valores, posiciones).
+
+    Los valores se interpolan linealmente y las posiciones con aceleración
+    suave. El índice de foto es el del período más cercano (para la etiqueta).
+    """
+    for k in range(len(keyframes) - 1):
+        (v0, p0), (v1, p1) = keyframes[k], keyframes[k + 1]
+        for step in range(steps):
+            t = step / steps
+            e = _smoothstep(t)
+            yield (k if t < 0.5 else k + 1), v0 + (v1 - v0) * t, p0 + (p1 - p0) * e
+    last = len(keyframes) - 1
+    values, positions = keyframes[last]
+    for _ in range(1 + hold):
+        yield last, values, positions
+
+
+# ---------------------------------------------------------------------------
+# Codificadores
+# ---------------------------------------------------------------------------
+def prefetch(frames: Iterator[Image.Image], size: int = 8) -> Iterator[Image.Image]:
+    """
+    Genera los cuadros en un hilo aparte mientras el codificador consume los anteriores.
+
+    Agg y los codificadores de Pillow liberan el GIL en su trabajo pesado,
+    así que dibujar y codificar se solapan.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=size)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for frame in frames:
+                if stop.is_set():
+                    return
+                buffer.put(frame)
+            buffer.put(done)
+        except BaseException as e:  # se relanza en el hilo consumidor
+            buffer.put(e)
+
+    worker = threading.Thread(target=produce, name="animation-frames", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Liberar al productor si quedó bloqueado en put()
+        while worker.is_alive():
+            try:
+                buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        worker.join()
+
+
+def _save_with_pillow(frames: Iterator[Image.Image], out: Path, fmt: str, fps: float, quality: int) -> int:
+    """Escribe los cuadros con Pillow a medida que se generan; devuelve la cantidad."""
+    count = 0
+
+    def counted(images):
+        nonlocal count
+        for image in images:
+            count += 1
+            yield image
+
+    frames = counted(frames)
+    first = next(frames)
+    duration = int(round(1000 / fps))
+    if fmt == "gif":
+        # Paleta común tomada del primer cuadro: sin parpadeo entre cuadros y
+        # sin cuantizar desde cero cada vez
+        palette = first.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+        first_p = first.quantize(palette=palette, dither=Image.Dither.NONE)
+        rest = (frame.quantize(palette=palette, dither=Image.Dither.NONE) for frame in frames)
+        first_p.save(out, format="GIF", save_all=True, append_images=rest,
+                     duration=duration, loop=0, optimize=False)
+    else:
+        # method=2: la mitad de tiempo que el 4 por cuadro, con tamaño similar
+        first.save(out, format="WEBP", save_all=True, append_images=frames,
+                   duration=duration, loop=0, quality=quality, method=2)
+    return count
+
+
+def _ffmpeg_args(fmt: str, quality: int) -> list[str]:
+    """Argumentos de salida de ffmpeg para cada formato."""
+    if fmt == "gif":
+        return ["-filter_complex", "split[a][b];[a]palettegen[p];[b][p]paletteuse", "-loop", "0"]
+    if fmt == "webp":
+        return ["-c:v", "libwebp", "-quality", str(quality), "-loop", "0"]
+    # H.264 necesita dimensiones pares
+    return ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", "libx264", "-pix_fmt", "yuv420p",
+            "-crf", "18", "-movflags", "+faststart"]
+
+
+def _save_with_ffmpeg(frames: Iterator[Image.Image], out: Path, fmt: str, fps: float, quality: int,
+                      ffmpeg: str) -> int:
+    """Envía los cuadros RGB crudos por un pipe a ffmpeg; devuelve la cantidad."""
+    first = next(frames)
+    width, height = first.size
+    cmd = [ffmpeg, "-y", "-loglevel", "error",
+           "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", f"{fps:g}", "-i", "-",
+           *_ffmpeg_args(fmt, quality), str(out)]
+    logger.debug("🎞️ %s", " ".join(cmd))
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    count = 0
+    try:
+        for image in itertools.chain([first], frames):
+            proc.stdin.write(image.tobytes())
+            count += 1
+    finally:
+        proc.stdin.close()
+        code = proc.wait()
+    if code != 0:
+        raise RuntimeError(f"ffmpeg terminó con código {code} al escribir {out}")
+    return count
+
+
+# ---------------------------------------------------------------------------
+# Render
+# ---------------------------------------------------------------------------
+def _figure_order(fig) -> dict[int, int]:
+    """Posición de cada hijo de la figura en el orden en que matplotlib los dibuja."""
+    children = sorted((c for c in fig.get_children() if c is not fig.patch), key=lambda c: c.get_zorder())
+    return {id(child): i for i, child in enumerate(children)}
+
+
+def _overlays(fig, moving: list) -> list:
+    """
+    Artistas fijos que en el render estático quedan encima de alguno de
+    ``moving``: en sus ejes, los de zorder mayor que el menor de ellos
+    (leyenda, spines, textos); en la figura, los que se dibujan después
+    (leyendas de figura y ejes superpuestos, como la leyenda con íconos).
+    """
+    skip = {id(artist) for artist in moving}
+    rank = _figure_order(fig)
+    lowest: dict[Any, float] = {}
+    for artist in moving:
+        if artist.axes is not None:
+            lowest[artist.axes] = min(lowest.get(artist.axes, np.inf), artist.get_zorder())
+
+    found = []
+    for ax, zorder in lowest.items():
+        found += [child for child in ax.get_children()
+                  if id(child) not in skip and child is not ax.patch and child.get_visible()
+                  and child.get_zorder() > zorder]
+
+    owners = {id(ax) for ax in lowest} | {id(a) for a in moving if a.axes is None}
+    start = min((rank[key] for key in owners if key in rank), default=len(rank))
+    areas = [ax.get_position() for ax in lowest]
+    for child in fig.get_children():
+        if id(child) in skip or rank.get(id(child), -1) <= start or not child.get_visible():
+            continue
+        if child in fig.legends or (child in fig.axes
+                                    and any(child.get_position().overlaps(area) for area in areas)):
+            found.append(child)
+    return found
+
+
+def _draw_order(fig):
+    """Clave para dibujar artistas de la figura y de sus ejes en el orden del render estático."""
+    rank = _figure_order(fig)
+
+    def key(artist):
+        if id(artist) in rank:
+            return rank[id(artist)], 0.0
+        return rank.get(id(artist.axes), len(rank)), artist.get_zorder()
+
+    return key
+
+
+class BarRace:
+    """
+    Animación de un gráfico a partir de fotos con marca de tiempo.
+
+    Params:
+        chart_class: Clase del gráfico (debe implementar ``set_frame``)
+        config_path: Ruta al YAML; la sección ``animation`` define la animación
+        **options: Valores que reemplazan a los de ``animation`` (p. ej. ``format``)
+    """
+
+    def __init__(self, chart_class, config_path, **options):
+        if not hasattr(chart_class, "set_frame"):
+            raise ValueError(f"{chart_class.__name__} no soporta animación (falta set_frame)")
+        self.chart_class = chart_class
+        self.config_path = Path(config_path)
+        kind = getattr(chart_class, "config_kind", None)
+
+        raw = thaw(load_config(self.config_path))
+        # El render inicial no guarda archivos y dibuja la cromática como artistas
+        raw.update(formats=[], chrome_cache=False)
+        for key in ("output", "aspects", "editions"):
+            raw.pop(key, None)
+        self.params = compile_config(raw, kind, source=str(self.config_path))
+
+        config = {**DEFAULTS, **thaw(self.params.get("animation", {}) or {}),
+                  **{k: v for k, v in options.items() if v is not None}}
+        if not config["time_col"]:
+            raise ValueError("Falta animation.time_col: la columna con la fecha o período de cada foto")
+        config["format"] = str(config["format"]).lower()
+        if config["format"] not in ANIMATION_FORMATS:
+            raise ValueError(f"animation.format '{config['format']}' no soportado; opciones: {list(ANIMATION_FORMATS)}")
+        if config["hold"] is None:
+            config["hold"] = int(round(config["fps"]))
+        self.config = config
+        self.chart = None
+
+    def outfile(self) -> Path:
+        """Ruta de salida: ``animation.outfile`` o ``outfile`` con la extensión del formato."""
+        base = self.config["outfile"] or self.params.get("outfile", "out/figure")
+        return Path(base).with_suffix(f".{self.config['format']}")
+
+    def _encoder(self):
+        """Ruta de ffmpeg si corresponde usarlo, o None para Pillow."""
+        encoder = self.config["encoder"]
+        ffmpeg = shutil.which("ffmpeg") if encoder in ("auto", "ffmpeg") else None
+        if encoder == "ffmpeg" and ffmpeg is None:
+            raise RuntimeError("animation.encoder es 'ffmpeg' pero ffmpeg no está instalado")
+        if self.config["format"] == "mp4" and ffmpeg is None:
+            raise RuntimeError("El formato mp4 necesita ffmpeg instalado (o usar gif/webp)")
+        return ffmpeg
+
+    def _setup(self):
+        """Render inicial con la última foto y cuadros clave de todas las fotos."""
+        df = load_chart_data(self.params.get("data", {}))
+        cat_col = self.params.get("data", {}).get("category_col") or df.columns[0]
+        self.periods, tables = snapshots(df, self.config["time_col"], cat_col)
+        logger.info("🎬 %s períodos en '%s' (%s → %s)", len(self.periods), self.config["time_col"],
+                    self.periods[0], self.periods[-1])
+
+        # La última foto tiene los valores mayores: fija márgenes y nombres
+        chart = self.chart_class(self.params, tables[-1])
+        chart.keep_figure = True
+        with span("render", cat="render", chart=self.chart_class.__name__):
+            chart.render()
+        self.chart = chart
+        chart.start_frames(self.config["top_n"])
+
+        keyframes = []
+        for table in tables:
+            values = chart.frame_values(table)
+            keyframes.append((values, chart.frame_positions(values)))
+        self.keyframes = keyframes
+
+        label_cfg = self.config["period_label"]
+        self.period_text = None
+        if label_cfg is not False:
+            label_cfg = label_cfg if isinstance(label_cfg, dict) else {}
+            self.period_text = chart.ax.text(
+                float(label_cfg.get("x", 0.97)), float(label_cfg.get("y", 0.40)), "",
+                transform=chart.ax.transAxes, ha="right", va="bottom",
+                fontsize=float(label_cfg.get("size", 32)), fontweight=label_cfg.get("weight", "bold"),
+                color=label_cfg.get("color", "#BBBBBB"),
+            )
+            self.period_format = label_cfg.get("format", "{}")
+
+    def frames(self) -> Iterator[Image.Image]:
+        """Genera los cuadros como imágenes RGB."""
+        chart = self.chart
+        fig = chart.fig
+        fig.set_dpi(float(self.config["dpi"]))
+        canvas = fig.canvas
+
+        extra = [self.period_text] if self.period_text is not None else []
+        # Los fijos que quedan encima de los que cambian (leyendas, spines) tampoco
+        # van al fondo: se redibujan en cada cuadro, en su orden
+        extra += _overlays(fig, chart.animated_artists() + extra)
+        order = _draw_order(fig)
+
+        def artists():
+            return sorted(chart.animated_artists() + extra, key=order)
+
+        # Fondo estático: todo menos los artistas que se redibujan
+        for artist in artists():
+            artist.set_animated(True)
+        with span("animation.background", cat="draw"), render_context(self.params):
+            canvas.draw()
+            background = canvas.copy_from_bbox(fig.bbox)
+
+        for period_index, values, positions in timeline(self.keyframes, int(self.config["steps"]),
+                                                        int(self.config["hold"])):
+            # Cada cuadro se dibuja con los estilos del gráfico; el candado no se retiene entre cuadros
+            with render_context(self.params):
+                chart.set_frame(values, positions)
+                if self.period_text is not None:
+                    self.period_text.set_text(self.period_format.format(self.periods[period_index]))
+                canvas.restore_region(background)
+                for artist in artists():
+                    if artist.axes is not None:
+                        artist.axes.draw_artist(artist)
+                    else:
+                        fig.draw_artist(artist)
+                image = Image.frombuffer("RGBA", canvas.get_width_height(), canvas.buffer_rgba()).convert("RGB")
+            yield image
+
+    def save(self) -> Path:
+        """Renderiza y codifica la animación; devuelve la ruta del archivo."""
+        ensure_logging()
+        with log_context(config=self.config_path.name, chart_type=getattr(self.chart_class, "config_kind", None)):
+            out = self.outfile()
+            ensure_parent(out)
+            fmt, fps, quality = self.config["format"], float(self.config["fps"]), int(self.config["quality"])
+            ffmpeg = self._encoder()
+            t0 = time.perf_counter()
+            try:
+                self._setup()
+                setup_s = time.perf_counter() - t0
+                with span("animation.frames", cat="render", format=fmt):
+                    frames = prefetch(self.frames())
+                    if ffmpeg:
+                        count = _save_with_ffmpeg(frames, out, fmt, fps, quality, ffmpeg)
+                    else:
+                        count = _save_with_pillow(frames, out, fmt, fps, quality)
+            finally:
+                self.close()
+            frames_s = time.perf_counter() - t0 - setup_s
+            logger.info("🎞️ %s cuadros en %.1f s (%.1f ms/cuadro, render inicial %.2f s) → %s",
+                        count, frames_s, frames_s * 1000 / max(count, 1), setup_s, out)
+        return out
+
+    def close(self) -> None:
+        """Libera la figura retenida."""
+        if self.chart is not None:
+            self.chart.close()
+            self.chart = None
+
+
+def render_animation(chart_class, config_path, **options) -> Path:
+    """Atajo: ``BarRace(chart_class, config_path, **options).save()``."""
+    return BarRace(chart_class, config_path, **options).save()
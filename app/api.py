@@ -0,0 +1,124 @@
+# app/api.py
+"""
+API de biblioteca: renderiza un gráfico desde un dict de configuración y
+datos ya cargados, y devuelve los archivos codificados en memoria.
+
+No lee YAML ni CSV ni escribe en disco: ``save_fig_multi`` codifica cada
+formato en memoria (ver ``app.io_utils.capture_files``) y ``outfile`` solo
+se usa como nombre. Los templates (``template:``) sí se leen, con la misma
+memoria de app/config_loader.py que usa la CLI.
+
+Uso::
+
+    from app.api import render, render_to
+
+    images = render(config, df)                        # {"png": b"...", "svg": b"..."}
+    render_to(sys.stdout.buffer, config, df, "png")    # un formato a un archivo abierto
+
+``data`` puede ser un ``pandas.DataFrame`` o cualquier objeto con
+``to_pandas()`` (p. ej. ``pyarrow.Table``). Sin ``data`` se cargan los de
+``config["data"]``, como en la CLI.
+
+Las configuraciones con ``matrix``, ``aspects``, ``output.variants`` o
+``editions`` producen varios gráficos y se rechazan: para esas está
+``batch``.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Mapping
+
+from app.io_utils import capture_files
+from app.log import ensure_logging, log_context
+
+logger = logging.getLogger(__name__)
+
+# Secciones que producen más de un gráfico por configuración
+MULTI_OUTPUT_KEYS = ("matrix", "aspects", "output.variants", "editions")
+
+
+def _frame(data):
+    """DataFrame de ``data`` (``None``, DataFrame u objeto con ``to_pandas()``)."""
+    if data is None or hasattr(data, "columns") and hasattr(data, "iloc"):
+        return data
+    if hasattr(data, "to_pandas"):
+        return data.to_pandas()
+    raise TypeError(f"Datos no soportados: {type(data).__name__} (se espera un DataFrame o una tabla Arrow)")
+
+
+def _job(config: Mapping[str, Any], data, chart: str | None, formats: Iterable[str] | None):
+    """``RenderJob`` con la configuración ya compilada y los datos en memoria."""
+    from app.batch import RenderJob, chart_type_of
+    from app.config_loader import load_template, merge_params
+    from app.config_schema import compile_config, thaw
+    from app.plots.registry import get_chart_class
+
+    raw = thaw(config)
+    if raw.get("template"):
+        raw = merge_params(load_template(raw["template"]), raw)
+    for key in MULTI_OUTPUT_KEYS:
+        section, _, sub = key.partition(".")
+        value = raw.get(section)
+        if sub:
+            value = value.get(sub) if isinstance(value, Mapping) else None
+        if value:
+            raise ValueError(f"render() produce un solo gráfico: la configuración tiene '{key}' (usar batch)")
+    # Algunos gráficos solo exportan si hay outfile; aquí es solo un nombre
+    raw.setdefault("outfile", "out/figure")
+    if formats is not None:
+        raw["formats"] = [str(f).lower() for f in formats]
+    chart_type = chart_type_of(raw, chart)
+    chart_class = get_chart_class(chart_type)
+    params = compile_config(raw, getattr(chart_class, "config_kind", None), source="<dict>")
+    return RenderJob(chart_type, params=params, df=_frame(data), name=chart_type)
+
+
+def _draw(job) -> None:
+    ensure_logging()
+    with log_context(config="<dict>", chart_type=job.chart_type):
+        chart_class, params, df = job.load()
+        chart_class(params, df).render()
+
+
+def render(config: Mapping[str, Any], data=None, *, chart: str | None = None,
+           formats: Iterable[str] | None = None) -> dict[str, bytes]:
+    """
+    Renderiza un gráfico en memoria.
+
+    Params:
+        config: Configuración (lo mismo que el YAML, ya cargado)
+        data: ``pandas.DataFrame`` o ``pyarrow.Table`` (por defecto, ``config["data"]``)
+        chart: Tipo de gráfico (por defecto ``chart.type``)
+        formats: Formatos a generar (por defecto ``formats`` de la configuración)
+
+    Returns:
+        dict: Formato → bytes codificados (``png``, ``svg``, ``pdf``, ``jpg``,
+        ``webp``, ``avif``; un formato sin soporte, como AVIF sin plugin, no aparece)
+
+    Raises:
+        ValueError: Tipo de gráfico desconocido, configuración inválida o con varios gráficos
+    """
+    job = _job(config, data, chart, formats)
+    with capture_files() as files:
+        _draw(job)
+    return {Path(path).suffix.lstrip("."): data for path, data in files.items()}
+
+
+def render_to(stream: BinaryIO, config: Mapping[str, Any], data=None, format: str = "png", *,
+              chart: str | None = None) -> None:
+    """
+    Renderiza un gráfico en un solo formato y lo escribe en ``stream``
+    (un archivo abierto en modo binario, un socket, ``sys.stdout.buffer``)
+    sin pasar por el disco.
+
+    Params:
+        stream: Destino (con ``write`` y ``flush``)
+        config: Configuración (lo mismo que el YAML, ya cargado)
+        data: ``pandas.DataFrame`` o ``pyarrow.Table`` (por defecto, ``config["data"]``)
+        format: Formato a generar
+        chart: Tipo de gráfico (por defecto ``chart.type``)
+    """
+    job = _job(config, data, chart, [format])
+    with capture_files(stream):
+        _draw(job)
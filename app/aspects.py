@@ -0,0 +1,240 @@
+# app/aspects.py
+"""
+Variantes de tamaño y proporción de un mismo gráfico (cuadrado, 4:5, 16:9,
+historias) en una sola ejecución.
+
+Con ``aspects`` en la configuración, ``prepare_data`` corre una sola vez y
+cada variante repite solo las etapas de layout y dibujo (``setup_dimensions``,
+``create_figure``, márgenes, ajuste de títulos, ...) sobre una copia del
+gráfico preparado (``BaseChart.clone``). Las imágenes (banderas, íconos,
+logos) y las métricas de texto quedan en memoria del proceso y se comparten.
+
+.. code-block:: yaml
+
+    aspects:
+      - square                         # preset: 1:1
+      - {name: feed, aspect: "4:5"}
+      - {name: wide, width_in: 16, height_in: 9}
+      - name: story
+        aspect: "9:16"
+        params:                        # ajustes solo para esta variante
+          title_config: {fontsize: 36}
+    aspects_workers: 4                # procesos (por defecto, uno por variante)
+
+Cada variante se guarda como ``<outfile>-<name>`` en los ``formats`` de la
+configuración. El gráfico base se guarda como siempre.
+
+Con más de un proceso, las variantes se dibujan en procesos hijos creados
+con ``fork`` después de ``prepare_data``: heredan los datos, las imágenes
+y las fuentes ya cargadas sin copiarlos ni volver a leerlos, mientras el
+proceso principal dibuja el gráfico base. Donde no hay ``fork`` (Windows)
+las variantes se dibujan una tras otra.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Mapping
+
+from app.config_loader import merge_params
+from app.config_schema import compile_config, thaw
+from app.io_utils import collect_outputs, record_output
+from app.log import log_context
+from app.pool import fork_context
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Proporciones (ancho:alto) con nombre
+ASPECT_PRESETS = {
+    "square": "1:1",
+    "portrait": "4:5",
+    "landscape": "16:9",
+    "story": "9:16",
+}
+
+# Claves que cambian los datos preparados: no se pueden ajustar por variante
+DATA_KEYS = ("data", "data_source", "chart.filter_min_value", "sort_by_column", "sort_by_total",
+             "invert_order", "percent")
+
+_ASPECT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*[:x/]\s*(\d+(?:\.\d+)?)\s*$")
+
+# Estado heredado por los procesos hijos (fork): gráfico preparado y variantes
+_PREPARED: dict[str, Any] = {}
+
+
+def _ratio(aspect: str, name: str) -> float:
+    """Ancho/alto de una proporción ``"W:H"``."""
+    match = _ASPECT.match(str(aspect))
+    if not match or float(match.group(2)) == 0:
+        raise ValueError(f"aspects: '{name}' tiene una proporción inválida '{aspect}' (ej. '4:5')")
+    return float(match.group(1)) / float(match.group(2))
+
+
+def _has_path(mapping: Mapping[str, Any], path: str) -> bool:
+    """Indica si ``mapping`` tiene la clave con puntos ``path``."""
+    for part in path.split("."):
+        if not isinstance(mapping, Mapping) or part not in mapping:
+            return False
+        mapping = mapping[part]
+    return True
+
+
+def aspect_specs(params: Mapping[str, Any], base_size: tuple[float, float]) -> list[dict[str, Any]]:
+    """
+    Normaliza ``aspects`` a diccionarios con ``name``, ``width_in``,
+    ``height_in``, ``overrides`` y ``outfile``.
+
+    Con solo una proporción, el lado largo de la variante es el lado largo del
+    gráfico base (``base_size``), salvo que se indique ``size_in``.
+
+    Raises:
+        ValueError: si una variante no se puede interpretar
+    """
+    outfile = Path(params.get("outfile", "out/figure"))
+    long_side = max(base_size)
+    specs = []
+    for item in params.get("aspects") or []:
+        if isinstance(item, str):
+            name = item.strip()
+            item = {"name": name, "aspect": ASPECT_PRESETS.get(name, name)}
+        if not isinstance(item, Mapping) or not item.get("name"):
+            raise ValueError(f"aspects: cada variante necesita 'name' ({item!r})")
+        name = str(item["name"])
+        if "width_in" in item and "height_in" in item:
+            width_in, height_in = float(item["width_in"]), float(item["height_in"])
+        else:
+            aspect = item.get("aspect", ASPECT_PRESETS.get(name))
+            if aspect is None:
+                raise ValueError(f"aspects: '{name}' necesita 'aspect' o 'width_in' y 'height_in'")
+            ratio = _ratio(ASPECT_PRESETS.get(aspect, aspect), name)
+            side = float(item.get("size_in", long_side))
+            width_in, height_in = (side, side / ratio) if ratio >= 1 else (side * ratio, side)
+        if width_in <= 0 or height_in <= 0:
+            raise ValueError(f"aspects: '{name}' tiene un tamaño no positivo")
+
+        overrides = dict(item.get("params") or {})
+        fixed = [key for key in DATA_KEYS if _has_path(overrides, key)]
+        if fixed:
+            raise ValueError(f"aspects: '{name}' no puede cambiar {fixed}; los datos se preparan una sola vez")
+        specs.append({
+            "name": name,
+            "width_in": width_in,
+            "height_in": height_in,
+            "overrides": overrides,
+            "outfile": str(item.get("outfile") or outfile.with_name(f"{outfile.name}-{name}")),
+        })
+
+    names = [spec["name"] for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"aspects: nombres repetidos en {names}")
+    return specs
+
+
+def aspect_params(params: Mapping[str, Any], spec: Mapping[str, Any], kind: str | None = None,
+                   source: str | None = None):
+    """Parámetros compilados de una variante (los del gráfico base más sus ajustes)."""
+    raw = merge_params(thaw(params), spec["overrides"])
+    raw.pop("aspects", None)
+    raw.update(outfile=spec["outfile"], width_in=spec["width_in"], height_in=spec["height_in"])
+    return compile_config(raw, kind, source=source)
+
+
+def _run_stages(chart, size: tuple[float, float] | None = None) -> None:
+    """Etapas de render() posteriores a ``prepare_data``, con tamaño fijo opcional."""
+    chart.render_stages([stage for stage in chart.RENDER_STAGES if stage != "prepare_data"], size)
+
+
+def _draw_aspect(base, spec: Mapping[str, Any]) -> dict[str, Any]:
+    """Dibuja y guarda una variante a partir del gráfico preparado."""
+    t0 = time.perf_counter()
+    with log_context(variant=spec["name"]), span(f"variant:{spec['name']}", cat="render"), \
+            collect_outputs() as outputs:
+        chart = base.clone(spec["params"])
+        chart.keep_figure = False
+        _run_stages(chart, (spec["width_in"], spec["height_in"]))
+    ms = (time.perf_counter() - t0) * 1000
+    logger.info("📐 Variante '%s' (%.1f×%.1f in) en %.0f ms: %s",
+                spec["name"], spec["width_in"], spec["height_in"], ms, spec["outfile"])
+    return {"name": spec["name"], "outfile": spec["outfile"], "width_in": spec["width_in"],
+            "height_in": spec["height_in"], "ms": ms, "pid": os.getpid(),
+            "outputs": [str(path) for path in outputs]}
+
+
+def _draw_prepared(index: int) -> dict[str, Any]:
+    """Punto de entrada de los procesos hijos (el estado llega heredado por fork)."""
+    return _draw_aspect(_PREPARED["base"], _PREPARED["specs"][index])
+
+
+def render_aspects(chart_class, params, df, *, source: str | None = None, workers: int | None = None,
+                    **kwargs):
+    """
+    Renderiza el gráfico base y todas sus variantes de tamaño con una sola
+    preparación de datos.
+
+    Params:
+        chart_class: Clase del gráfico
+        params: Parámetros compilados (con ``aspects``)
+        df: DataFrame de datos
+        source: Ruta del YAML (para los mensajes de error)
+        workers: Procesos para las variantes (por defecto ``aspects_workers``
+            o uno por variante, hasta la cantidad de CPUs)
+
+    Returns:
+        El gráfico base renderizado; ``chart.aspects`` tiene el resultado de
+        cada variante (nombre, archivo, tamaño y tiempo)
+    """
+    kind = getattr(chart_class, "config_kind", None)
+    base = chart_class(params, df, **kwargs)
+    with span("prepare_data", chart=chart_class.__name__):
+        base.prepare_data()
+
+    # Tamaño del gráfico base (lado largo por defecto de las variantes)
+    probe = base.clone(params)
+    probe.setup_dimensions()
+    specs = aspect_specs(params, (probe.width_in, probe.height_in))
+    for spec in specs:
+        spec["params"] = aspect_params(params, spec, kind, source)
+
+    if workers is None:
+        workers = int(params.get("aspects_workers") or min(len(specs), os.cpu_count() or 1))
+    context = fork_context() if workers > 1 and len(specs) > 1 else None
+
+    t0 = time.perf_counter()
+    if context is None:
+        # Las variantes primero: clone() copia el estado preparado, no el ya dibujado
+        results = [_draw_aspect(base, spec) for spec in specs]
+        with span("render_base", cat="render"):
+            _run_stages(base)
+    else:
+        _PREPARED.update(base=base, specs=specs)
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(specs)), mp_context=context) as pool:
+                futures = [pool.submit(_draw_prepared, i) for i in range(len(specs))]
+                # Mientras los hijos dibujan las variantes, este proceso dibuja el base
+                with span("render_base", cat="render"):
+                    _run_stages(base)
+                results = []
+                for spec, future in zip(specs, futures):
+                    try:
+                        results.append(future.result())
+                        # Los archivos escritos en los hijos se informan en este proceso
+                        for path in results[-1]["outputs"]:
+                            record_output(path)
+                    except Exception as e:
+                        logger.error("❌ Falló la variante '%s': %s", spec["name"], e)
+                        results.append({"name": spec["name"], "outfile": spec["outfile"], "error": str(e)})
+        finally:
+            _PREPARED.clear()
+
+    failed = [r["name"] for r in results if "error" in r]
+    logger.info("📐 %s variantes en %.0f ms (%s)", len(specs), (time.perf_counter() - t0) * 1000,
+                f"{min(workers, len(specs))} procesos" if context else "secuencial")
+    if failed:
+        raise RuntimeError(f"Fallaron las variantes: {', '.join(failed)}")
+    base.aspects = results
+    return base
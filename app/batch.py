@@ -0,0 +1,394 @@
+# app/batch.py
+"""
+Lotes de renders: trabajos (``RenderJob``) repartidos entre procesos.
+
+Un trabajo es un gráfico a renderizar: el tipo y la ruta del YAML, o
+parámetros ya compilados con sus datos ya cargados (por ejemplo, cada
+partición de un ``matrix``; ver app/matrix.py). ``run_jobs`` los reparte
+entre procesos hijos creados con ``fork``, que heredan los datos ya
+cargados sin copiarlos. Un trabajo que falla queda registrado con su error
+y no detiene a los demás.
+
+Un lote grande se puede repartir entre máquinas con ``--shard i/N``: cada
+máquina calcula el mismo reparto a partir de la lista de trabajos, sin
+coordinarse (ver ``shard_jobs``), y escribe su manifiesto; luego
+``merge-manifests`` los une (ver app/manifest.py).
+
+Uso::
+
+    python main.py batch config/*.yml --workers 4
+    python main.py batch config/medallero-por-anio.yml --chart stackedbarh
+    python main.py batch config/ --shard 2/3 --manifest out/manifests
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+from app.cache import file_hash
+from app.io_utils import collect_outputs
+from app.log import log_context
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Motivos por los que un proceso supervisado se mata o se reemplaza (ver app/pool.py)
+KILL_REASONS = {"timeout": "tiempo", "memory": "memoria", "crash": "caída"}
+
+class RenderJob:
+    """
+    Un render de un lote.
+
+    Params:
+        chart_type: Tipo de gráfico registrado (stackedbarh, barv, linechart)
+        config: Ruta al YAML (si no se dan ``params``)
+        params: Parámetros ya compilados (opcional)
+        df: Datos ya cargados (opcional; si falta se cargan de ``params["data"]``)
+        name: Nombre para logs y reportes (por defecto, el nombre del YAML)
+        key: Identificador estable para repartir el lote y unir manifiestos
+            (por defecto, la ruta del YAML o el nombre)
+        error: Error al preparar el trabajo (p. ej. un YAML inválido): ``run``
+            lo informa como resultado con error, sin renderizar
+    """
+
+    def __init__(self, chart_type: str | None, config=None, params=None, df=None, name: str | None = None,
+                 key: str | None = None, error: str | None = None):
+        self.chart_type = chart_type
+        self.config = Path(config) if config is not None else None
+        self.params = params
+        self.df = df
+        self.name = name or (self.config.name if self.config else chart_type)
+        self.key = key or (self.config.as_posix() if self.config else self.name)
+        self.error = error
+
+    def __repr__(self):
+        return f"RenderJob({self.chart_type!r}, {self.name!r})"
+
+    def compiled(self):
+        """Clase del gráfico y parámetros compilados (sin cargar los datos)."""
+        from app.config_loader import load_config
+        from app.config_schema import compile_config
+        from app.plots.registry import get_chart_class
+
+        if self.error is not None:
+            raise ValueError(self.error)
+        chart_class = get_chart_class(self.chart_type)
+        params = self.params
+        if params is None:
+            params = compile_config(load_config(self.config), getattr(chart_class, "config_kind", None),
+                                    source=str(self.config))
+        return chart_class, params
+
+    def load(self):
+        """Parámetros compilados y datos del trabajo (cargándolos si hace falta)."""
+        from app.chart_utils import load_chart_data
+
+        chart_class, params = self.compiled()
+        df = self.df if self.df is not None else load_chart_data(params.get("data", {}))
+        return chart_class, params, df
+
+    def run(self) -> dict[str, Any]:
+        """
+        Renderiza el trabajo.
+
+        Returns:
+            dict: ``key``, ``name``, ``chart``, ``outfile``, ``status`` (``ok`` o
+            ``error``), ``error`` si falló, ``outputs`` (archivos escritos) y ``ms``
+        """
+        if self.error is not None:
+            return {**failure_result(self, "error", self.error), "pid": os.getpid(), "outputs": [], "ms": 0.0}
+        t0 = time.perf_counter()
+        result: dict[str, Any] = {"key": self.key, "name": self.name, "chart": self.chart_type,
+                                  "pid": os.getpid()}
+        with log_context(job=self.name), span(f"job:{self.name}", cat="render"), \
+                collect_outputs() as outputs:
+            try:
+                chart_class, params, df = self.load()
+                result["outfile"] = str(params.get("outfile", "out/figure"))
+                if params.get("matrix"):
+                    from app.matrix import render_matrix
+                    render_matrix(chart_class, params, df, source=str(self.config), workers=1)
+                else:
+                    chart_class(params, df).render()
+                result["status"] = "ok"
+            except MemoryError:
+                # El proceso puede quedar en mal estado: que decida quien lo ejecuta (ver run_jobs)
+                raise
+            except Exception as e:
+                logger.error("❌ Falló %s: %s", self.name, e)
+                result.update(status="error", error=f"{type(e).__name__}: {e}")
+        result["outputs"] = [{"path": path.as_posix(), "bytes": path.stat().st_size, "sha256": file_hash(path)}
+                             for path in dict.fromkeys(outputs) if path.exists()]
+        result["ms"] = (time.perf_counter() - t0) * 1000
+        return result
+
+
+def chart_type_of(params, default: str | None = None) -> str:
+    """
+    Tipo de gráfico de una configuración: ``default`` (p. ej. ``--chart``) o ``chart.type``.
+
+    Raises:
+        ValueError: si no se puede determinar o no está registrado
+    """
+    from app.plots.registry import CHART_TYPES
+
+    chart_type = default or (params.get("chart") or {}).get("type")
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f"No se pudo determinar el tipo de gráfico ({chart_type!r}); "
+                         f"use --chart o chart.type ({', '.join(CHART_TYPES)})")
+    return chart_type
+
+
+def collect_configs(paths: Iterable) -> list[Path]:
+    """Archivos YAML de ``paths`` (los directorios se recorren sin recursión, en orden)."""
+    configs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            configs += sorted(p for p in path.iterdir() if p.suffix in {".yml", ".yaml"})
+        else:
+            configs.append(path)
+    return configs
+
+
+def jobs_from_configs(paths: Iterable, chart_type: str | None = None) -> list[RenderJob]:
+    """
+    Trabajos para una lista de YAML. Los que tienen ``matrix`` se expanden
+    aquí (un trabajo por combinación, con los datos cargados una sola vez).
+    Un YAML que no se puede leer, o sin tipo de gráfico, da un trabajo con
+    ``error`` que falla sin renderizar; el resto del lote sigue.
+    """
+    from app.config_loader import load_config
+
+    jobs = []
+    for config in collect_configs(paths):
+        try:
+            raw = load_config(config)
+            kind = chart_type_of(raw, chart_type)
+            if raw.get("matrix"):
+                from app.matrix import matrix_jobs
+                jobs += matrix_jobs(kind, config)
+            else:
+                jobs.append(RenderJob(kind, config))
+        except Exception as e:
+            # Un YAML roto no corta el lote: queda como trabajo con error (diario y manifiesto)
+            logger.warning("⚠️ No se pudo preparar %s: %s", config, e)
+            jobs.append(RenderJob(chart_type, config, error=f"{type(e).__name__}: {e}"))
+    return jobs
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    Interpreta ``"i/N"`` (``i`` desde 1) y devuelve ``(i, N)``.
+
+    Raises:
+        ValueError: si el formato o los números no son válidos
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", str(spec))
+    if not match:
+        raise ValueError(f"se esperaba 'i/N' (ej. '2/4'), no {spec!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"{index}/{count} fuera de rango (1 <= i <= N)")
+    return index, count
+
+
+def _key_hash(key: str) -> int:
+    """Hash estable de una clave (igual en todas las máquinas y ejecuciones)."""
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big")
+
+
+def shard_of(jobs: list[RenderJob], count: int, costs: Mapping[str, float] | None = None) -> dict[str, int]:
+    """
+    Reparte los trabajos en ``count`` shards (desde 0) de forma determinista.
+
+    Los trabajos con costo conocido (ms de un manifiesto anterior) se asignan
+    del más caro al más barato al shard con menos carga acumulada (LPT). Los
+    que no tienen costo siguen, en el orden del hash de su clave, con el costo
+    promedio de los conocidos (o 1 si no hay historia): sin historia el
+    reparto queda parejo en cantidad. Los empates se resuelven por número de
+    shard, así que el resultado depende solo de las claves y los costos, no
+    del orden de ``jobs`` ni de la máquina.
+
+    Returns:
+        dict: Clave del trabajo → shard
+    """
+    costs = costs or {}
+    keys = sorted({job.key for job in jobs})
+    known = sorted((k for k in keys if costs.get(k) is not None), key=lambda k: (-float(costs[k]), k))
+    unknown = sorted((k for k in keys if costs.get(k) is None), key=lambda k: (_key_hash(k), k))
+    default = sum(float(costs[k]) for k in known) / len(known) if known else 1.0
+
+    assignment = {}
+    loads = [(0.0, shard) for shard in range(count)]
+    for key in known + unknown:
+        load, shard = heapq.heappop(loads)
+        assignment[key] = shard
+        heapq.heappush(loads, (load + (float(costs[key]) if costs.get(key) is not None else default), shard))
+    return assignment
+
+
+def shard_jobs(jobs: list[RenderJob], index: int, count: int,
+               costs: Mapping[str, float] | None = None) -> list[RenderJob]:
+    """
+    Trabajos del shard ``index`` (desde 1) de ``count`` (ver ``shard_of``).
+
+    Raises:
+        ValueError: si dos trabajos tienen la misma clave
+    """
+    seen = set()
+    for job in jobs:
+        if job.key in seen:
+            raise ValueError(f"Trabajo repetido en el lote: {job.key}")
+        seen.add(job.key)
+    assignment = shard_of(jobs, count, costs)
+    selected = [job for job in jobs if assignment[job.key] == index - 1]
+    with_cost = sum(1 for job in selected if (costs or {}).get(job.key) is not None)
+    logger.info("🧩 Shard %s/%s: %s de %s trabajos (%s con costo conocido)",
+                index, count, len(selected), len(jobs), with_cost)
+    return selected
+
+
+def default_workers() -> int:
+    """Procesos por defecto: los CPUs disponibles para este proceso."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def failure_result(job: RenderJob, reason: str, message: str) -> dict[str, Any]:
+    """Resultado de un trabajo cuyo proceso se mató, murió o falló fuera de ``RenderJob.run``."""
+    logger.error("❌ Falló %s: %s", job.name, message)
+    result = {"key": job.key, "name": job.name, "chart": job.chart_type, "status": "error", "error": message}
+    if reason != "error":
+        result["killed"] = reason
+    return result
+
+
+def run_jobs(jobs: list[RenderJob], workers: int | None = None,
+             on_result: Callable[[RenderJob, dict[str, Any]], None] | None = None,
+             timeout: float | None = None, memory_mb: float | None = None,
+             costs=None, memory_budget_mb: float | None = None) -> list[dict[str, Any]]:
+    """
+    Ejecuta los trabajos, en paralelo si hay más de un proceso.
+
+    Con más de un proceso, o con ``timeout`` o ``memory_mb``, cada trabajo
+    corre en un proceso supervisado (ver app/pool.py): el que se cuelga o
+    crece de más se mata y se reemplaza, y el trabajo queda con error sin
+    detener a los demás.
+
+    Params:
+        jobs: Trabajos a ejecutar
+        workers: Procesos (por defecto, los CPUs disponibles)
+        on_result: Función llamada en este proceso con cada trabajo y su
+            resultado apenas termina (p. ej. para el diario; ver app/journal.py)
+        timeout: Segundos de reloj por trabajo
+        memory_mb: RSS máximo por proceso en MB
+        costs: ``app.costs.CostModel``: con más de un proceso los trabajos
+            empiezan del más caro al más barato según el costo previsto, cada
+            tiempo se agrega a la historia y el resumen compara lo previsto
+            con lo real (``predicted_ms`` en cada resultado)
+        memory_budget_mb: Memoria total del lote en MB: un trabajo solo
+            arranca si lo que se estima que agrega (``estimated_mb``), más lo
+            de los que están corriendo y lo que ya ocupa este proceso, cabe
+            en el presupuesto. Lo medido (``job_rss_mb``) se agrega a la
+            historia de ``costs`` y afina las estimaciones siguientes
+
+    Returns:
+        list: Resultado de cada trabajo (ver ``RenderJob.run``), en el orden de ``jobs``
+    """
+    from app.pool import SupervisedPool
+
+    workers = min(workers or default_workers(), max(1, len(jobs)))
+    supervised = workers > 1 or bool(timeout) or bool(memory_mb) or bool(memory_budget_mb)
+
+    predicted, features, memory = {}, {}, {}
+    if costs is not None or memory_budget_mb:
+        from app.costs import estimate_memory_mb, job_features, longest_first
+
+        for job in jobs:
+            features[job.key] = job_features(job)
+            if costs is not None:
+                predicted[job.key] = costs.predict(job.key, features[job.key])[0]
+                memory[job.key] = costs.predict_memory(job.key, features[job.key])[0]
+            else:
+                memory[job.key] = estimate_memory_mb(features[job.key])
+    if costs is not None:
+        if workers > 1:
+            order = longest_first(jobs, predicted)
+            jobs = [jobs[i] for i in order]
+        callback = on_result
+
+        def on_result(job, result):
+            result["predicted_ms"] = round(predicted[job.key], 1)
+            if result.get("status") == "ok" and not result.get("skipped") and features[job.key] is not None:
+                costs.record(job.key, features[job.key], result["ms"], result.get("job_rss_mb"))
+            if callback is not None:
+                callback(job, result)
+
+    t0 = time.perf_counter()
+    if not supervised:
+        results = []
+        for job in jobs:
+            try:
+                results.append(job.run())
+            except MemoryError as e:
+                results.append(failure_result(job, "memory", f"MemoryError: {e}"))
+            if on_result is not None:
+                on_result(job, results[-1])
+        killed = {}
+    else:
+        budget = None
+        if memory_budget_mb:
+            from app.pool import rss_mb
+
+            # Los procesos hijos comparten con este lo que ya estaba cargado al crearlos
+            base = rss_mb(os.getpid()) or 0.0
+            budget = max(1.0, memory_budget_mb - base)
+        pool = SupervisedPool(workers, timeout=timeout, memory_mb=memory_mb, budget_mb=budget)
+        results = pool.map(RenderJob.run, jobs, on_failure=failure_result,
+                           on_result=(lambda i, result: on_result(jobs[i], result)) if on_result else None,
+                           memory_of=lambda job: memory[job.key])
+        killed = {reason: n for reason, n in pool.killed.items() if n}
+        if budget:
+            logger.info("🧠 Memoria: presupuesto %.0f MB (%.0f MB para renders), máximo reservado %.0f MB, "
+                        "%s espera(s) por memoria%s", memory_budget_mb, budget,
+                        pool.admission["max_reserved_mb"], pool.admission["waits"],
+                        f", {pool.admission['oversized']} trabajo(s) más grandes que el presupuesto (solos)"
+                        if pool.admission["oversized"] else "")
+
+    elapsed = time.perf_counter() - t0
+    failed = sum(r["status"] != "ok" for r in results)
+    logger.info("📦 Lote: %s gráficos en %.1f s con %s proceso(s) · %s ok, %s con error%s",
+                len(results), elapsed, workers, len(results) - failed, failed,
+                f" ({', '.join(f'{n} por {KILL_REASONS[reason]}' for reason, n in killed.items())})" if killed else "")
+    if costs is not None and jobs:
+        log_predictions(jobs, results, workers, elapsed)
+        if workers > 1:
+            # Resultados en el orden original de los trabajos
+            results = [results[i] for i in sorted(range(len(order)), key=order.__getitem__)]
+    return results
+
+
+def log_predictions(jobs: list[RenderJob], results: list[dict[str, Any]], workers: int, elapsed: float) -> None:
+    """Resumen de tiempos previstos contra reales (total, makespan y los peores errores)."""
+    from app.costs import lpt_makespan
+
+    pairs = [(job, r) for job, r in zip(jobs, results) if r.get("status") == "ok" and r.get("predicted_ms")]
+    if not pairs:
+        return
+    predicted = sum(r["predicted_ms"] for _, r in pairs) / 1000
+    actual = sum(r["ms"] for _, r in pairs) / 1000
+    makespan = lpt_makespan([r.get("predicted_ms", 0) for r in results], workers) / 1000
+    errors = sorted(pairs, key=lambda p: -abs(p[1]["ms"] - p[1]["predicted_ms"]))
+    mape = sum(abs(r["ms"] - r["predicted_ms"]) / max(r["ms"], 1) for _, r in pairs) / len(pairs)
+    logger.info("⏱️ Previsto: %.1f s de render, %.1f s de lote · real: %.1f s y %.1f s · error medio por gráfico %.0f%%",
+                predicted, makespan, actual, elapsed, mape * 100)
+    for job, r in errors[:3]:
+        logger.info("   %s: previsto %.0f ms, real %.0f ms", job.name, r["predicted_ms"], r["ms"])
@@ -2,9 +2,11 @@ from __future__ import annotations
 from pathlib import Path
 from datetime import date
 from typing import Mapping, Any
-import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 
+from .images import load_image
+
 def add_branding(fig, params: Mapping[str, Any] | None = None):
     """
     Pie de marca con iconos CC centrados y texto debajo:
@@ -52,7 +54,6 @@ def add_branding(fig, params: Mapping[str, Any] | None = None):
     logo_y = margin_bottom * float(b.get("logo_y", 0.60))
 
     # --------- Setup de footer ---------
-    import matplotlib.pyplot as plt
     from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 
     ax_footer = fig.add_axes([0.00, 0.00, 1.00, 0.0001], frameon=False)
@@ -61,7 +62,7 @@ def add_branding(fig, params: Mapping[str, Any] | None = None):
     # Línea separadora
     if sep:
         fig.lines.append(
-            plt.Line2D(
+            Line2D(
                 [margin_left, 1.0 - margin_right],
                 [pad * sep_y, pad * sep_y],
                 transform=fig.transFigure,
@@ -112,7 +113,7 @@ def add_branding(fig, params: Mapping[str, Any] | None = None):
             if not icon.exists():
                 continue
             try:
-                im = plt.imread(str(icon))
+                im = load_image(str(icon))
                 x_pos = start_x + (i * icons_gap)
                 
                 ab = AnnotationBbox(
@@ -132,7 +133,7 @@ def add_branding(fig, params: Mapping[str, Any] | None = None):
     # --------- Logo ---------
     if logo_path.exists():
         try:
-            im = plt.imread(str(logo_path))
+            im = load_image(str(logo_path))
             fig_w_in = fig.get_figwidth()
             dpi = fig.get_dpi()
             target_px = max(1.0, logo_width * fig_w_in * dpi)
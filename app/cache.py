@@ -0,0 +1,103 @@
+# app/cache.py
+"""
+Directorio de caché en disco compartido por los distintos módulos.
+
+Por defecto se usa ``.cache/condatos`` dentro del directorio de trabajo; se
+puede cambiar con la variable de entorno ``CONDATOS_CACHE_DIR`` y desactivar
+por completo con ``CONDATOS_NO_CACHE=1``.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Mapping
+
+DEFAULT_CACHE_DIR = Path(".cache") / "condatos"
+
+
+def cache_enabled() -> bool:
+    """Indica si la caché en disco está habilitada."""
+    return os.environ.get("CONDATOS_NO_CACHE", "").strip().lower() not in {"1", "true", "yes"}
+
+
+def cache_dir(*parts: str) -> Path:
+    """Devuelve (y crea) un subdirectorio de la caché."""
+    base = Path(os.environ.get("CONDATOS_CACHE_DIR") or DEFAULT_CACHE_DIR).expanduser()
+    path = base.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _canonical(obj: Any) -> Any:
+    """
+    Forma canónica para hashear: las claves de los mapeos pasan a texto con
+    su tipo (``int:2019``, ``str:oro``), así ``sort_keys`` puede ordenarlas
+    aunque un YAML mezcle claves numéricas y de texto (columnas por año).
+    """
+    if isinstance(obj, Mapping):
+        return {f"{type(k).__name__}:{k}": _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    return obj
+
+
+def content_hash(obj: Any, *salt: str) -> str:
+    """
+    Hash sha256 estable de una estructura tipo JSON.
+
+    Las claves se ordenan (ver ``_canonical``) y los tipos no serializables
+    (fechas, Path) se representan con ``repr`` para que el resultado no
+    dependa del orden de inserción ni del proceso.
+    """
+    h = hashlib.sha256()
+    for s in salt:
+        h.update(s.encode("utf-8"))
+        h.update(b"\0")
+    h.update(json.dumps(_canonical(obj), sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8"))
+    return h.hexdigest()
+
+
+def file_hash(path, chunk_size: int = 1 << 20) -> str:
+    """Hash sha256 del contenido de un archivo (leído por bloques)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_pickle(path: Path) -> Any | None:
+    """Lee un objeto cacheado; devuelve None si no existe o está corrupto."""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Entrada corrupta o de una versión incompatible: se ignora
+        return None
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Escribe un archivo de forma atómica (archivo temporal + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_pickle(path: Path, obj: Any) -> None:
+    """Guarda un objeto en la caché de forma atómica."""
+    write_atomic(path, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
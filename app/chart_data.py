@@ -0,0 +1,174 @@
+# app/chart_data.py
+"""
+Estructura compacta para los datos preparados de los gráficos.
+
+Todos los tipos de gráfico (barras apiladas, barras verticales y líneas)
+terminan su ``prepare_data`` con una instancia de :class:`ChartData`: arreglos
+NumPy contiguos con las categorías codificadas, la matriz de valores, los
+totales y el orden de dibujo. Al no depender del DataFrame original, el objeto
+es barato de cachear o de enviar a otro proceso (se serializa con pickle).
+"""
+from __future__ import annotations
+
+import sys
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class ChartData:
+    """
+    Datos de un gráfico listos para dibujar.
+
+    Attributes
+    ----------
+    categories : np.ndarray
+        Etiquetas únicas en orden de aparición (str internados si ``label_str``).
+    codes : np.ndarray
+        Código int32 de la categoría de cada fila, ya en orden de dibujo.
+    series : tuple[str, ...]
+        Nombres de las columnas de valores.
+    values : np.ndarray
+        Matriz float64 C-contigua de forma (n_series, n_rows), ya ordenada.
+    totals : np.ndarray
+        Suma por fila de los valores originales (float64), ya ordenada.
+    order : np.ndarray
+        Posición de cada fila dibujada dentro del DataFrame de origen.
+    """
+
+    __slots__ = ("categories", "codes", "series", "values", "totals", "order")
+
+    # Centinela para ordenar por la suma de las series
+    BY_TOTAL = "__total__"
+
+    def __init__(self, categories, codes, series, values, totals, order):
+        self.categories = categories
+        self.codes = codes
+        self.series = tuple(series)
+        self.values = values
+        self.totals = totals
+        self.order = order
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        category_col: str,
+        value_cols: Sequence[str],
+        *,
+        sort_by: str | None = None,
+        ascending: bool = False,
+        sort_kind: str = "quicksort",
+        min_total: float | None = None,
+        label_str: bool = True,
+    ) -> "ChartData":
+        """
+        Construye los arreglos a partir de un DataFrame sin copiarlo.
+
+        Params:
+            df: DataFrame de origen (no se modifica)
+            category_col: Columna con las etiquetas de cada fila
+            value_cols: Columnas numéricas que forman la matriz de valores
+            sort_by: ``ChartData.BY_TOTAL``, nombre de columna o None (sin ordenar)
+            ascending: Orden ascendente en lugar de descendente
+            sort_kind: Algoritmo de ``np.argsort`` ("stable" conserva empates)
+            min_total: Descarta filas cuyo total sea menor a este valor
+            label_str: Convierte las etiquetas a str internados
+        """
+        n_rows = len(df)
+
+        # Categorías codificadas: solo se recorren los valores únicos
+        codes, uniques = pd.factorize(df[category_col], sort=False, use_na_sentinel=False)
+        if label_str:
+            categories = np.array([sys.intern(str(u)) for u in uniques], dtype=object)
+        else:
+            categories = np.asarray(uniques)
+
+        # Matriz de valores llenada columna a columna (sin DataFrame intermedio)
+        values = np.empty((len(value_cols), n_rows), dtype=np.float64)
+        for i, col in enumerate(value_cols):
+            values[i] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        totals = values.sum(axis=0)
+
+        # Filtrado por total mínimo
+        if min_total is not None:
+            order = np.flatnonzero(totals >= min_total)
+        else:
+            order = np.arange(n_rows)
+
+        # Ordenamiento
+        if sort_by is not None:
+            if sort_by == cls.BY_TOTAL:
+                key = totals[order]
+            else:
+                key = df[sort_by].to_numpy()[order]
+                if key.dtype.kind in "biuf":
+                    key = key.astype(np.float64)
+            if ascending:
+                idx = np.argsort(key, kind=sort_kind)
+            elif key.dtype.kind == "f":
+                idx = np.argsort(-key, kind=sort_kind)
+            else:
+                idx = np.argsort(key, kind=sort_kind)[::-1]
+            order = order[idx]
+
+        return cls(
+            categories=categories,
+            codes=codes[order].astype(np.int32),
+            series=[str(c) for c in value_cols],
+            values=np.ascontiguousarray(values[:, order]),
+            totals=totals[order],
+            order=order,
+        )
+
+    # ------------------------------------------------------------------
+    # Accesos
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Etiqueta de cada fila en orden de dibujo."""
+        return self.categories[self.codes]
+
+    @property
+    def cats(self) -> list:
+        """Etiquetas como lista de Python (para ticks y textos)."""
+        return self.labels.tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arreglos."""
+        return sum(a.nbytes for a in (self.categories, self.codes, self.values, self.totals, self.order))
+
+    def series_index(self, name: str) -> int | None:
+        """Índice de una serie por nombre (insensible a mayúsculas) o None."""
+        lowered = name.lower()
+        for i, s in enumerate(self.series):
+            if s.lower() == lowered:
+                return i
+        return None
+
+    def column(self, df: pd.DataFrame, name: str) -> np.ndarray:
+        """Valores de una columna auxiliar del DataFrame alineados al orden de dibujo."""
+        return df[name].to_numpy()[self.order]
+
+    # ------------------------------------------------------------------
+    # Transformaciones en el lugar
+    # ------------------------------------------------------------------
+    def scale(self, factor: float) -> None:
+        """Divide valores y totales por ``factor``."""
+        self.values /= factor
+        self.totals /= factor
+
+    def to_percent(self) -> None:
+        """Convierte cada fila en porcentajes de su suma (los totales no cambian)."""
+        colsum = self.values.sum(axis=0)
+        colsum[colsum == 0] = 1.0
+        self.values /= colsum
+        self.values *= 100.0
+
+    def __repr__(self) -> str:
+        return f"ChartData(rows={len(self)}, series={list(self.series)}, nbytes={self.nbytes})"
@@ -1,20 +1,35 @@
-import seaborn as sns
+import logging
 import pandas as pd
 import numpy as np
-import yaml
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+# Carga de YAML y merge de templates (re-exportados por compatibilidad)
+from app.config_loader import load_yaml, merge_params, load_config  # noqa: F401
+from app.log import ensure_logging, log_context
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
 
 def set_style():
-    """Set default style for plots"""
-    sns.set_theme(style="whitegrid")
-    plt.rcParams['font.family'] = 'sans-serif'
-    plt.rcParams['font.sans-serif'] = ['Arial']
-    plt.rcParams['axes.labelsize'] = 12
-    plt.rcParams['axes.titlesize'] = 14
-    plt.rcParams['xtick.labelsize'] = 10
-    plt.rcParams['ytick.labelsize'] = 10
+    """
+    Set default style for plots.
+
+    Devuelve un ``rc_context`` (usar con ``with``): no cambia los rcParams
+    globales, así que se puede usar desde varios hilos (ver app/styling.py).
+    """
+    import matplotlib as mpl
+    import seaborn as sns  # importarlo al inicio cuesta ~1 s
+
+    rc = {**sns.axes_style("whitegrid"), **sns.plotting_context()}
+    rc.update({
+        'font.family': 'sans-serif',
+        'font.sans-serif': ['Arial'],
+        'axes.labelsize': 12,
+        'axes.titlesize': 14,
+        'xtick.labelsize': 10,
+        'ytick.labelsize': 10,
+    })
+    return mpl.rc_context(rc)
 
 def create_bar_chart(data, x, y, title="", xlabel="", ylabel="", color="steelblue", figsize=(10, 6)):
     """
@@ -33,14 +48,18 @@ def create_bar_chart(data, x, y, title="", xlabel="", ylabel="", color="steelblu
     Returns:
         matplotlib figure and axes
     """
-    fig, ax = plt.subplots(figsize=figsize)
+    import seaborn as sns
+    from app.figures import new_figure
+
+    fig = new_figure(figsize=figsize)
+    ax = fig.subplots()
     sns.barplot(data=data, x=x, y=y, color=color, ax=ax)
     
     ax.set_title(title)
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig, ax
 
 def create_line_chart(data, x, y, title="", xlabel="", ylabel="", color="blue", figsize=(10, 6)):
@@ -60,14 +79,18 @@ def create_line_chart(data, x, y, title="", xlabel="", ylabel="", color="blue",
     Returns:
         matplotlib figure and axes
     """
-    fig, ax = plt.subplots(figsize=figsize)
+    import seaborn as sns
+    from app.figures import new_figure
+
+    fig = new_figure(figsize=figsize)
+    ax = fig.subplots()
     sns.lineplot(data=data, x=x, y=y, color=color, ax=ax)
     
     ax.set_title(title)
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig, ax
 
 def save_figure(fig, filename, dpi=300, bbox_inches='tight'):
@@ -82,73 +105,91 @@ def save_figure(fig, filename, dpi=300, bbox_inches='tight'):
     """
     fig.savefig(filename, dpi=dpi, bbox_inches=bbox_inches)
     
-def load_yaml(path):
+def render_chart(chart_class, config_path, **kwargs):
     """
-    Carga un archivo YAML y devuelve su contenido como diccionario.
+    Función genérica para renderizar un gráfico a partir de un archivo de configuración.
     
     Args:
-        path: Ruta al archivo YAML
+        chart_class: Clase del gráfico a renderizar
+        config_path: Path al archivo YAML de configuración
+        **kwargs: Argumentos adicionales para pasar al constructor del gráfico
         
     Returns:
-        dict: Contenido del archivo YAML como diccionario
+        La instancia del gráfico renderizado (con ``matrix``, la lista de
+        resultados de cada combinación; ver app/matrix.py)
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    # Los mensajes del render llevan la config y el tipo de gráfico como contexto
+    ensure_logging()
+    chart_type = getattr(chart_class, "config_kind", None) or chart_class.__name__
+    with log_context(config=Path(config_path).name, chart_type=chart_type):
+        return _render_chart(chart_class, config_path, **kwargs)
 
-def merge_params(tpl, cfg):
-    """
-    Combina parámetros de template y config, dando prioridad a config.
+
+def _render_chart(chart_class, config_path, **kwargs):
+    import time
+    from app.config_schema import compile_config
     
-    Args:
-        tpl: Diccionario con parámetros del template
-        cfg: Diccionario con parámetros de la configuración
+    t_start = time.perf_counter()
+    timings = {}
+    
+    with span("config", cat="config", path=str(config_path)):
+        # Cargar configuración y su cadena de templates (memorizada)
+        params = load_config(config_path, timings)
         
-    Returns:
-        dict: Diccionario combinado con los parámetros
-    """
-    # Crear una copia del template para no modificar el original
-    result = tpl.copy()
-    
-    # Sobrescribir con los valores de config
-    for key, value in cfg.items():
-        if key == "template":  # Ignorar la referencia al template
-            continue
-        # Si es un diccionario, hacer merge recursivo
-        if isinstance(value, dict) and key in result and isinstance(result[key], dict):
-            result[key] = merge_params(result[key], value)
-        else:
-            result[key] = value
+        # Validar y congelar la configuración antes de cargar datos o crear figuras
+        t0 = time.perf_counter()
+        params = compile_config(params, getattr(chart_class, "config_kind", None), source=str(config_path))
+        timings["compile"] = time.perf_counter() - t0
+    timings["config"] = time.perf_counter() - t_start
     
-    return result
+    # Cargar datos
+    with span("load_data", cat="io"):
+        df = load_chart_data(params.get("data", {}))
+    
+    if params.get("matrix"):
+        # Un render por combinación de la matrix, con los datos ya cargados (ver app/matrix.py)
+        from app.matrix import render_matrix
+        return render_matrix(chart_class, params, df, source=str(config_path))
+    
+    # Crear y renderizar el gráfico (cada etapa de render() se mide aparte)
+    t0 = time.perf_counter()
+    with span("render", cat="render", chart=chart_class.__name__):
+        if params.get("aspects"):
+            # Variantes de tamaño: una sola preparación de datos (ver app/aspects.py)
+            from app.aspects import render_aspects
+            chart = render_aspects(chart_class, params, df, source=str(config_path), **kwargs)
+        else:
+            chart = chart_class(params, df, **kwargs)
+            chart.render()
+    timings["render"] = time.perf_counter() - t0
+    chart.timings = timings
+    
+    ms = {k: v * 1000 for k, v in timings.items()}
+    logger.info(
+        "⏱️ Resumen: configuración %.1f ms (yaml %.1f ms, templates %.1f ms, validación %.1f ms) · render %.0f ms",
+        ms["config"], ms["yaml"], ms["template"], ms["compile"], ms["render"],
+    )
+    
+    return chart
 
-def render_chart(chart_class, config_path, **kwargs):
+
+# Claves de ``data`` con la ruta del archivo, en el orden en que se buscan
+DATA_PATH_KEYS = ("csv", "source_file", "file", "path")
+
+
+def load_chart_data(data_config):
     """
-    Función genérica para renderizar un gráfico a partir de un archivo de configuración.
+    Carga el DataFrame descrito en la sección ``data`` de la configuración.
     
     Args:
-        chart_class: Clase del gráfico a renderizar
-        config_path: Path al archivo YAML de configuración
-        **kwargs: Argumentos adicionales para pasar al constructor del gráfico
+        data_config: Sección ``data`` (``csv``/``source_file``/``file``/``path`` o ``inline``)
         
     Returns:
-        La instancia del gráfico renderizado
+        pd.DataFrame: Datos cargados (vacío si el archivo no se pudo leer)
     """
-    # Cargar configuración
-    cfg = load_yaml(config_path)
-    
-    # Cargar template si existe
-    if "template" in cfg:
-        tpl = load_yaml(Path(cfg["template"]))
-        params = merge_params(tpl, cfg)
-    else:
-        params = cfg
-    
-    # Cargar datos
-    data_config = params.get("data", {})
-    
     # Buscar archivo de datos por diferentes nombres posibles
     csv_path = None
-    for key in ["csv", "source_file", "file", "path"]:
+    for key in DATA_PATH_KEYS:
         if key in data_config:
             csv_path = data_config[key]
             break
@@ -156,12 +197,12 @@ def render_chart(chart_class, config_path, **kwargs):
     if csv_path:
         # Intentar cargar el archivo CSV
         try:
-            print(f"📂 Cargando datos desde: {csv_path}")
+            logger.info("📂 Cargando datos desde: %s", csv_path)
             df = pd.read_csv(csv_path)
-            print(f"✅ Datos cargados correctamente. Filas: {len(df)}, Columnas: {len(df.columns)}")
-            print(f"   Columnas disponibles: {list(df.columns)}")
+            logger.info("✅ Datos cargados correctamente. Filas: %s, Columnas: %s", len(df), len(df.columns))
+            logger.debug("   Columnas disponibles: %s", list(df.columns))
         except Exception as e:
-            print(f"❌ Error al cargar el archivo {csv_path}: {e}")
+            logger.error("❌ Error al cargar el archivo %s: %s", csv_path, e)
             df = pd.DataFrame()  # DataFrame vacío en caso de error
     else:
         # Si no hay archivo CSV, intentar con datos inline
@@ -173,9 +214,4 @@ def render_chart(chart_class, config_path, **kwargs):
             # Formato de filas: [{col1: val1, col2: val2, ...}, {...}]
             rows = data_config.get("inline", {}).get("rows", [])
             df = pd.DataFrame(rows)
-    
-    # Crear y renderizar el gráfico
-    chart = chart_class(params, df, **kwargs)
-    chart.render()
-    
-    return chart
\ No newline at end of file
+    return df
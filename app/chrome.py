@@ -0,0 +1,215 @@
+# app/chrome.py
+"""
+Caché de la "cromática" de los gráficos: footer, branding (íconos CC, logo,
+texto de fuente), líneas separadoras y ``decorative_elements``.
+
+En un lote, la mayoría de los gráficos comparten template, así que estas capas
+son idénticas de un gráfico a otro. Con ``chrome_cache: true`` en la
+configuración, las funciones que las dibujan no se aplican a cada figura:
+
+- la primera vez se dibujan en una figura auxiliar transparente del mismo
+  tamaño, se rasterizan a la resolución de guardado y se guardan en memoria
+  (una capa bajo los datos y otra sobre ellos, recortadas a su contenido);
+- en cada gráfico, las capas se componen con ``figimage`` al guardar los
+  formatos raster (png, jpg, webp, avif);
+- los formatos vectoriales (svg, pdf) se guardan después con la cromática
+  dibujada como artistas, para no perder la calidad vectorial.
+
+La clave de la caché incluye las claves de configuración que usan las
+capas, el tamaño de la figura, el DPI de guardado y la fecha (el footer
+puede incluirla), así que un cambio en cualquiera genera capas nuevas.
+"""
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Iterable, Mapping
+
+import numpy as np
+
+from app.cache import content_hash
+from app.figures import new_figure, release_figure
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Claves de configuración que pueden afectar a la cromática
+CHROME_KEYS = ("footer", "branding", "layout", "decorative_elements", "style")
+
+RASTER_FORMATS = {"png", "jpg", "jpeg", "webp", "avif"}
+
+# Capas en memoria por proceso (clave -> (capa bajo los datos, capa sobre los datos))
+MAX_ENTRIES = 8
+_LAYERS: "OrderedDict[str, tuple]" = OrderedDict()
+
+# zorder de las capas compuestas: los ejes de datos tienen zorder 0
+UNDER_ZORDER = -1
+OVER_ZORDER = 10
+
+ChromeBuilder = Callable[[Any], None]
+
+
+def chrome_enabled(params: Mapping[str, Any]) -> bool:
+    """Indica si la configuración pide la caché de cromática."""
+    # Las ediciones (app/editions.py) traducen y recolorean la cromática: necesitan los artistas
+    return bool(params.get("chrome_cache", False)) and not params.get("editions")
+
+
+def clear_chrome_cache() -> None:
+    """Vacía las capas en memoria."""
+    _LAYERS.clear()
+
+
+def deferred(name: str, builder: ChromeBuilder, dpi: float) -> tuple[str, ChromeBuilder]:
+    """
+    Difiere una capa hasta el guardado conservando el DPI de la figura al pedirla.
+
+    Algunas capas calculan tamaños en píxeles con ``fig.dpi`` (p. ej. el zoom
+    del logo); como el guardado cambia el DPI antes de dibujarlas, se
+    restituye el valor original mientras se construyen.
+    """
+    def build(fig):
+        current = fig.dpi
+        fig.set_dpi(dpi)
+        try:
+            builder(fig)
+        finally:
+            fig.set_dpi(current)
+
+    return f"{name}@{float(dpi):g}", build
+
+
+def _save_dpi(fig) -> float:
+    """
+    DPI efectivo de ``savefig`` sin argumento ``dpi``.
+
+    Con ``savefig.dpi: figure`` matplotlib usa el DPI con que se creó la
+    figura (``_original_dpi``), no el que se fijó después con ``set_dpi``.
+    """
+    import matplotlib as mpl
+
+    dpi = mpl.rcParams["savefig.dpi"]
+    if dpi == "figure":
+        return float(getattr(fig, "_original_dpi", fig.dpi))
+    return float(dpi)
+
+
+def _crop(rgba: np.ndarray):
+    """Recorta la capa a los píxeles no transparentes; devuelve (imagen, xo, yo) o None."""
+    alpha = rgba[..., 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(alpha.any(axis=0))
+    r0, r1 = rows[0], rows[-1] + 1
+    c0, c1 = cols[0], cols[-1] + 1
+    # figimage mide el desplazamiento vertical desde abajo
+    return rgba[r0:r1, c0:c1].copy(), int(c0), int(rgba.shape[0] - r1)
+
+
+def _render_layers(builders: list[tuple[str, ChromeBuilder]], figsize, fig_dpi: float, save_dpi: float):
+    """Dibuja la cromática en una figura transparente y la rasteriza en dos capas."""
+    scratch = new_figure(figsize=figsize, dpi=fig_dpi)
+    try:
+        scratch.patch.set_visible(False)
+        for name, builder in builders:
+            builder(scratch)
+        artists = [a for a in scratch.get_children() if a is not scratch.patch]
+        layers = []
+        for under in (True, False):
+            for a in artists:
+                a.set_visible((a.get_zorder() < 0) == under)
+            # Igual que savefig: la figura se dibuja al DPI de guardado
+            scratch.set_dpi(save_dpi)
+            scratch.canvas.draw()
+            layers.append(_crop(np.asarray(scratch.canvas.buffer_rgba())))
+            scratch.set_dpi(fig_dpi)
+        return tuple(layers)
+    finally:
+        release_figure(scratch)
+
+
+def chrome_layers(fig, params: Mapping[str, Any], builders: list[tuple[str, ChromeBuilder]],
+                  save_dpi: float | None = None):
+    """Capas (bajo, sobre) de la cromática para ``fig``, desde la caché si ya existen."""
+    save_dpi = _save_dpi(fig) if save_dpi is None else float(save_dpi)
+    figsize = tuple(float(v) for v in fig.get_size_inches())
+    key = content_hash({
+        "builders": [name for name, _ in builders],
+        "params": {k: params.get(k) for k in CHROME_KEYS},
+        "figsize": figsize,
+        "fig_dpi": float(fig.dpi),
+        "save_dpi": save_dpi,
+        "date": date.today().isoformat(),
+    })
+    layers = _LAYERS.get(key)
+    if layers is not None:
+        _LAYERS.move_to_end(key)
+        logger.debug("🧩 Cromática desde caché (%s)", key[:12])
+        return layers
+    with span("chrome.render", cat="draw"):
+        layers = _render_layers(builders, figsize, float(fig.dpi), save_dpi)
+    _LAYERS[key] = layers
+    while len(_LAYERS) > MAX_ENTRIES:
+        _LAYERS.popitem(last=False)
+    logger.debug("🧩 Cromática rasterizada y guardada en caché (%s)", key[:12])
+    return layers
+
+
+def save_with_chrome(fig, params: Mapping[str, Any], builders: Iterable[tuple[str, ChromeBuilder]],
+                     save: Callable[[list[str]], None]) -> None:
+    """
+    Aplica la cromática y guarda la figura.
+
+    Params:
+        fig: Figura con los datos (sin la cromática)
+        params: Configuración del gráfico
+        builders: Pares (nombre, función(fig)) que dibujan la cromática, en orden
+        save: Función que guarda ``fig`` en la lista de formatos recibida
+    """
+    from app.variants import has_variants, save_variants, variants_dpi
+
+    builders = list(builders)
+    formats = list(params.get("formats", ["png", "svg", "pdf"]))
+    raster = [f for f in formats if f.lower() in RASTER_FORMATS]
+    variants = has_variants(params)
+
+    if not chrome_enabled(params) or not builders or not (raster or variants):
+        for name, builder in builders:
+            builder(fig)
+        save(formats)
+        if variants:
+            save_variants(fig, params)
+        return
+
+    save_dpi = _save_dpi(fig)
+    images = _compose(fig, params, builders, save_dpi)
+    if raster:
+        save(raster)
+    if variants:
+        # Las capas van en píxeles: se recomponen si el render de variantes usa otro DPI
+        dpi = variants_dpi(fig, params)
+        if dpi != save_dpi:
+            for im in images:
+                im.remove()
+            images = _compose(fig, params, builders, dpi)
+        save_variants(fig, params)
+
+    vector = [f for f in formats if f.lower() not in RASTER_FORMATS]
+    if vector:
+        for im in images:
+            im.remove()
+        for name, builder in builders:
+            builder(fig)
+        save(vector)
+
+
+def _compose(fig, params: Mapping[str, Any], builders: list[tuple[str, ChromeBuilder]], dpi: float) -> list:
+    """Agrega las capas de cromática a ``fig`` con ``figimage`` para un render a ``dpi``."""
+    images = []
+    for layer, zorder in zip(chrome_layers(fig, params, builders, dpi), (UNDER_ZORDER, OVER_ZORDER)):
+        if layer is not None:
+            img, xo, yo = layer
+            images.append(fig.figimage(img, xo=xo, yo=yo, origin="upper", zorder=zorder))
+    return images
@@ -0,0 +1,39 @@
+# app/cli.py
+"""
+Opciones globales de la CLI (se escriben antes del subcomando).
+
+- Logging: ``--quiet``, ``--log-level``, ``--log-json`` (ver ``app/log.py``).
+- Perfiles: ``--trace RUTA`` (tiempos por etapa, formato ``--trace-format``)
+  y ``--profile RUTA`` (pilas colapsadas de cProfile). Ver ``app/profiling.py``.
+
+Este módulo se importa al arrancar: solo usa typer y la librería estándar.
+"""
+from pathlib import Path
+
+import typer
+
+
+def add_global_options(app) -> None:
+    """Registra las opciones globales como callback de una app Typer."""
+
+    def callback(
+        ctx: typer.Context,
+        quiet: bool = typer.Option(False, "--quiet", "-q", help="Solo advertencias y errores"),
+        log_level: str = typer.Option(None, "--log-level", help="debug, info, warning o error",
+                                      envvar="CONDATOS_LOG_LEVEL"),
+        log_json: bool = typer.Option(False, "--log-json", help="Logs como líneas JSON (stderr)"),
+        trace: Path = typer.Option(None, "--trace", help="Guardar tiempos por etapa (pared y CPU) en este archivo"),
+        trace_format: str = typer.Option("chrome", "--trace-format", help="Formato de --trace: chrome o json"),
+        profile: Path = typer.Option(None, "--profile", help="Guardar pilas colapsadas de cProfile (flamegraph)"),
+    ):
+        from app.log import setup_logging
+
+        setup_logging(level=log_level, json_format=log_json or None, quiet=quiet)
+        if trace or profile:
+            from app.profiling import profiling_session
+
+            session = profiling_session(trace=trace, trace_format=trace_format, profile=profile)
+            session.__enter__()
+            ctx.call_on_close(lambda: session.__exit__(None, None, None))
+
+    app.callback()(callback)
@@ -4,12 +4,16 @@ Este módulo contiene funciones generalizadas que pueden ser utilizadas por dife
 para implementar funcionalidades comunes como footers, títulos, elementos decorativos, etc.
 """
 
+import logging
 from pathlib import Path
-import matplotlib.pyplot as plt
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import textwrap
 from typing import Any, Dict, List, Optional, Union, Tuple
 
+from app.images import load_image
+
+logger = logging.getLogger(__name__)
+
 def add_footer(fig, params: Dict[str, Any]):
     """
     Añade un footer con logo y texto en la parte inferior del gráfico.
@@ -89,12 +93,12 @@ def add_footer(fig, params: Dict[str, Any]):
     import textwrap
     wrapped_text = textwrap.fill(source_text, width=max_chars)
 
-    print("ℹ️ Configurando texto de fuente en footer:")
-    print(f"  - Texto: '{source_text}'")
-    print(f"  - Posición: x={source_x}, y={source_y}")
-    print(f"  - Tamaño de fuente: {source_fontsize}")
-    print(f"  - Wrapping: {max_chars} caracteres por línea (ancho disponible: {available_width})")
-    print(f"  - Alineación: {source_align}")
+    logger.debug("ℹ️ Configurando texto de fuente en footer:")
+    logger.debug("  - Texto: '%s'", source_text)
+    logger.debug("  - Posición: x=%s, y=%s", source_x, source_y)
+    logger.debug("  - Tamaño de fuente: %s", source_fontsize)
+    logger.debug("  - Wrapping: %s caracteres por línea (ancho disponible: %s)", max_chars, available_width)
+    logger.debug("  - Alineación: %s", source_align)
 
     fig.text(
         source_x,
@@ -123,10 +127,10 @@ def add_footer(fig, params: Dict[str, Any]):
         note_y = float(note_config.get("y_position", footer_y))
         note_align = note_config.get("alignment", "center")
         
-        print("ℹ️ Configurando texto de nota en footer:")
-        print(f"  - Texto: '{note_text}'")
-        print(f"  - Posición: x={note_x}, y={note_y}")
-        print(f"  - Tamaño de fuente: {note_fontsize}")
+        logger.debug("ℹ️ Configurando texto de nota en footer:")
+        logger.debug("  - Texto: '%s'", note_text)
+        logger.debug("  - Posición: x=%s, y=%s", note_x, note_y)
+        logger.debug("  - Tamaño de fuente: %s", note_fontsize)
         
         fig.text(
             note_x,       # Posición horizontal personalizable
@@ -152,10 +156,8 @@ def add_footer(fig, params: Dict[str, Any]):
         logo_path = logo_config.get("path", "")
         if logo_path and Path(logo_path).exists():
             try:
-                from matplotlib.image import imread
-                
                 # Cargar la imagen del logo
-                logo_img = imread(logo_path)
+                logo_img = load_image(logo_path)
                 
                 # Opciones para controlar el tamaño del logo
                 size_method = logo_config.get("size_method", "zoom")
@@ -237,11 +239,11 @@ def add_footer(fig, params: Dict[str, Any]):
                 # Posición vertical personalizada del logo
                 logo_y = float(logo_config.get("y_position", footer_y))
                 
-                print("ℹ️ Añadiendo logo en footer:")
-                print(f"  - Archivo: '{logo_path}'")
-                print(f"  - Método de tamaño: '{size_method}'")
-                print(f"  - Factor de zoom calculado: {logo_zoom:.4f}")
-                print(f"  - Posición: x={logo_x}, y={logo_y}")
+                logger.debug("ℹ️ Añadiendo logo en footer:")
+                logger.debug("  - Archivo: '%s'", logo_path)
+                logger.debug("  - Método de tamaño: '%s'", size_method)
+                logger.debug("  - Factor de zoom calculado: %.4f", logo_zoom)
+                logger.debug("  - Posición: x=%s, y=%s", logo_x, logo_y)
                 
                 # Crear un OffsetImage con la imagen del logo
                 imagebox = OffsetImage(logo_img, zoom=logo_zoom)
@@ -258,7 +260,7 @@ def add_footer(fig, params: Dict[str, Any]):
                 # Añadir el logo a la figura
                 fig.add_artist(ab)
             except Exception as e:
-                print(f"⚠️ Error al cargar el logo {logo_path}: {e}")
+                logger.warning("⚠️ Error al cargar el logo %s: %s", logo_path, e)
 
 
 def add_decorative_elements(fig, params: Dict[str, Any]):
@@ -281,10 +283,10 @@ def add_decorative_elements(fig, params: Dict[str, Any]):
     decorative_elements = params.get("decorative_elements", [])
     
     if not decorative_elements:
-        print("ℹ️ No hay elementos decorativos configurados.")
+        logger.debug("ℹ️ No hay elementos decorativos configurados.")
         return
         
-    print(f"🎨 Añadiendo {len(decorative_elements)} elementos decorativos...")
+    logger.debug("🎨 Añadiendo %s elementos decorativos...", len(decorative_elements))
     
     for i, element in enumerate(decorative_elements):
         element_type = element.get("type", "").lower()
@@ -315,7 +317,7 @@ def add_decorative_elements(fig, params: Dict[str, Any]):
                 
                 # Añadir el rectángulo a la figura
                 fig.add_artist(rect)
-                print(f"  ✓ Añadido rectángulo decorativo en ({x:.2f}, {y:.2f}) con color {color}")
+                logger.debug("  ✓ Añadido rectángulo decorativo en (%.2f, %.2f) con color %s", x, y, color)
                 
             # Elemento tipo línea (para separadores u otros elementos)
             elif element_type == "line":
@@ -344,7 +346,7 @@ def add_decorative_elements(fig, params: Dict[str, Any]):
                 
                 # Añadir la línea a la figura
                 fig.add_artist(line)
-                print(f"  ✓ Añadida línea decorativa de ({x1:.2f}, {y1:.2f}) a ({x2:.2f}, {y2:.2f})")
+                logger.debug("  ✓ Añadida línea decorativa de (%.2f, %.2f) a (%.2f, %.2f)", x1, y1, x2, y2)
                 
             # Texto decorativo (para etiquetas, notas o watermarks)
             elif element_type == "text":
@@ -372,16 +374,16 @@ def add_decorative_elements(fig, params: Dict[str, Any]):
                     rotation=rotation,
                     zorder=zorder
                 )
-                print(f"  ✓ Añadido texto decorativo '{text}' en ({x:.2f}, {y:.2f})")
+                logger.debug("  ✓ Añadido texto decorativo '%s' en (%.2f, %.2f)", text, x, y)
                 
             else:
-                print(f"  ⚠️ Tipo de elemento decorativo no soportado: '{element_type}'")
+                logger.warning("⚠️ Tipo de elemento decorativo no soportado: '%s'", element_type)
         
         except Exception as e:
-            print(f"  ⚠️ Error al añadir elemento decorativo #{i+1}: {e}")
+            logger.warning("⚠️ Error al añadir elemento decorativo #%s: %s", i + 1, e)
 
 
-def custom_save(fig, params: Dict[str, Any]):
+def custom_save(fig, params: Dict[str, Any], chrome=()):
     """
     Guarda la figura en múltiples formatos sin aplicar el sistema estándar de branding.
     
@@ -391,32 +393,39 @@ def custom_save(fig, params: Dict[str, Any]):
         La figura a guardar
     params : dict
         Diccionario de parámetros con la configuración de guardado
+    chrome : list
+        Capas pendientes (pares nombre, función(fig)); ver ``app/chrome.py``
         
     Returns:
     --------
     None
     """
+    from app.chrome import save_with_chrome
+    from app.io_utils import save_fig_multi
+
     # Configurar DPI
     dpi = float(params.get("dpi", 300))
     fig.set_dpi(dpi)
     
     # Guardar directamente sin aplicar branding estándar
-    from app.io_utils import save_fig_multi
     out = Path(params.get("outfile", "out/figure"))
-    formats = params.get("formats", ["png", "svg", "pdf"])
-    print(f"[DEBUG] Custom save without branding: formats: {formats}")
-    save_fig_multi(
-        fig,
-        out,
-        formats=formats,
-        jpg_quality=params.get("jpg_quality", 95),
-        webp_quality=params.get("webp_quality", 95), 
-        avif_quality=params.get("avif_quality", 80),
-        scour_svg=params.get("scour_svg", True)
-    )
+    logger.debug("Custom save without branding: formats: %s", params.get("formats"))
+
+    def save(formats):
+        save_fig_multi(
+            fig,
+            out,
+            formats=formats,
+            jpg_quality=params.get("jpg_quality", 95),
+            webp_quality=params.get("webp_quality", 95), 
+            avif_quality=params.get("avif_quality", 80),
+            scour_svg=params.get("scour_svg", True)
+        )
+
+    save_with_chrome(fig, params, chrome, save)
 
 
-def finalize(fig, params: Dict[str, Any]):
+def finalize(fig, params: Dict[str, Any], chrome=()):
     """
     Finaliza y guarda el gráfico, con opción de usar o no el branding estándar.
     
@@ -426,16 +435,19 @@ def finalize(fig, params: Dict[str, Any]):
         La figura a finalizar y guardar
     params : dict
         Diccionario de parámetros con la configuración
+    chrome : list
+        Capas pendientes (pares nombre, función(fig)), p. ej. el footer
+        cuando ``chrome_cache`` está activo; ver ``app/chrome.py``
         
     Returns:
     --------
     None
     """
-    # Añadir elementos decorativos antes de guardar
-    add_decorative_elements(fig, params)
+    # Elementos decorativos: se dibujan junto con el resto de la cromática
+    chrome = list(chrome) + [("components.decorative_elements", lambda f: add_decorative_elements(f, params))]
     
     # Debug the formats configuration
-    print(f"[DEBUG] Finalize: params formats: {params.get('formats', 'Not found')}")
+    logger.debug("Finalize: params formats: %s", params.get('formats', 'Not found'))
     
     # Verificar si debemos usar el sistema de branding estándar
     footer_config = params.get("footer", {}).get("config", {})
@@ -444,9 +456,9 @@ def finalize(fig, params: Dict[str, Any]):
     if use_default_branding:
         # Usar la función centralizada para finalizar y guardar el gráfico
         from app.layout import finish_and_save
-        finish_and_save(fig, params)
+        finish_and_save(fig, params, chrome)
     else:
         # Implementar nuestra propia versión sin llamar a add_branding
-        custom_save(fig, params)
+        custom_save(fig, params, chrome)
     
-    plt.close(fig)
\ No newline at end of file
+    # La figura la libera BaseChart.render (salvo keep_figure)
\ No newline at end of file
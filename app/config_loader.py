@@ -0,0 +1,144 @@
+# app/config_loader.py
+"""
+Carga de archivos YAML de configuración y de templates.
+
+- Usa ``yaml.CSafeLoader`` (libyaml) cuando está disponible; si PyYAML se
+  instaló sin la extensión en C se usa ``yaml.SafeLoader``.
+- Los templates se resuelven una sola vez por cadena de herencia
+  (``template:`` dentro de un template) y se memorizan por ruta + mtime,
+  así que un lote de configs que comparten template no vuelve a parsearlo.
+"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Mapping
+
+import yaml
+
+from app.config_schema import freeze
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# (ruta absoluta) -> (mtime_ns, size, dependencias, template resuelto)
+_TEMPLATE_CACHE: dict[str, tuple[int, int, tuple, Any]] = {}
+
+
+def load_yaml(path) -> Any:
+    """
+    Carga un archivo YAML y devuelve su contenido.
+
+    Args:
+        path: Ruta al archivo YAML
+
+    Returns:
+        dict: Contenido del archivo YAML como diccionario
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=YAML_LOADER)
+
+
+def merge_params(tpl: Mapping, cfg: Mapping) -> dict:
+    """
+    Combina parámetros de template y config, dando prioridad a config.
+
+    Args:
+        tpl: Diccionario con parámetros del template
+        cfg: Diccionario con parámetros de la configuración
+
+    Returns:
+        dict: Diccionario combinado con los parámetros
+    """
+    # Crear una copia del template para no modificar el original
+    result = dict(tpl)
+
+    # Sobrescribir con los valores de config
+    for key, value in cfg.items():
+        if key == "template":  # Ignorar la referencia al template
+            continue
+        # Si es un diccionario, hacer merge recursivo
+        if isinstance(value, Mapping) and key in result and isinstance(result[key], Mapping):
+            result[key] = merge_params(result[key], value)
+        else:
+            result[key] = value
+
+    return result
+
+
+def _stat_key(path: Path) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_template(path, _chain: tuple[str, ...] = ()) -> Any:
+    """
+    Carga un template con su cadena de herencia ya resuelta.
+
+    El resultado se memoriza y se devuelve congelado (``FrozenDict``): es
+    seguro compartirlo, y ``merge_params`` crea copias nuevas al combinarlo.
+    La entrada se invalida si cambia el mtime/tamaño de cualquier archivo de
+    la cadena.
+    """
+    key = str(Path(path).resolve())
+    if key in _chain:
+        cycle = " -> ".join(_chain + (key,))
+        raise ValueError(f"Herencia circular de templates: {cycle}")
+
+    cached = _TEMPLATE_CACHE.get(key)
+    if cached is not None:
+        mtime, size, deps, resolved = cached
+        try:
+            if (mtime, size) == _stat_key(Path(key)) and all(_stat_key(Path(d)) == s for d, s in deps):
+                return resolved
+        except OSError:
+            pass
+
+    stat = _stat_key(Path(key))
+    data = load_yaml(key) or {}
+    deps: tuple = ()
+    parent_ref = data.get("template") if isinstance(data, Mapping) else None
+    if parent_ref:
+        parent = load_template(parent_ref, _chain + (key,))
+        data = merge_params(parent, data)
+        parent_key = str(Path(parent_ref).resolve())
+        # Dependencias: el padre y todas las suyas
+        parent_deps = _TEMPLATE_CACHE[parent_key][2]
+        deps = ((parent_key, _stat_key(Path(parent_key))),) + parent_deps
+
+    resolved = freeze(data)
+    _TEMPLATE_CACHE[key] = (stat[0], stat[1], deps, resolved)
+    return resolved
+
+
+def clear_template_cache() -> None:
+    """Vacía la memoria de templates (útil en procesos de larga duración)."""
+    _TEMPLATE_CACHE.clear()
+
+
+def load_config(config_path, timings: dict | None = None) -> dict:
+    """
+    Carga un YAML de configuración y lo combina con su template (si tiene).
+
+    Args:
+        config_path: Ruta al YAML de configuración
+        timings: Si se entrega, se completa con los tiempos en segundos de
+            ``yaml`` (config) y ``template`` (cadena de templates)
+
+    Returns:
+        dict: Parámetros combinados (aún sin validar)
+    """
+    t0 = time.perf_counter()
+    cfg = load_yaml(config_path) or {}
+    t1 = time.perf_counter()
+
+    params = cfg
+    if isinstance(cfg, Mapping) and "template" in cfg:
+        tpl = load_template(cfg["template"])
+        params = merge_params(tpl, cfg)
+    t2 = time.perf_counter()
+
+    if timings is not None:
+        timings["yaml"] = t1 - t0
+        timings["template"] = t2 - t1
+    return params
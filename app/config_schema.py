@@ -0,0 +1,409 @@
+# app/config_schema.py
+"""
+Compilador de configuración: valida el YAML ya combinado con su template,
+aplica valores por defecto y devuelve una estructura inmutable.
+
+El resultado (``FrozenDict``) sigue siendo un ``dict`` para que el código de
+los gráficos pueda leerlo con ``.get(...)`` como siempre, pero cualquier
+intento de modificarlo lanza ``TypeError``. Así una misma configuración puede
+compartirse entre etapas, procesos o cachés sin riesgo de que una etapa
+altere lo que ve la siguiente.
+
+La forma compilada se guarda en ``<cache>/config/<hash>.pickle``; el hash
+depende del contenido combinado y de ``SCHEMA_VERSION``.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Iterable, Mapping
+
+from app.cache import cache_dir, cache_enabled, content_hash, read_pickle, write_pickle
+
+logger = logging.getLogger(__name__)
+
+# Incrementar cuando cambie el esquema o la forma de compilar
+SCHEMA_VERSION = "1"
+
+IMAGE_FORMATS = ("png", "svg", "pdf", "jpg", "jpeg", "webp", "avif")
+
+_MISSING = object()
+
+
+class ConfigError(ValueError):
+    """Configuración inválida. ``errors`` contiene un mensaje por ruta."""
+
+    def __init__(self, errors: list[str], source: str | None = None):
+        self.errors = list(errors)
+        self.source = source
+        where = f" en {source}" if source else ""
+        detail = "\n".join(f"  - {e}" for e in self.errors)
+        super().__init__(f"Configuración inválida{where}:\n{detail}")
+
+
+# ---------------------------------------------------------------------------
+# Estructuras inmutables
+# ---------------------------------------------------------------------------
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} es inmutable; usa .copy() para obtener una copia modificable")
+
+
+class FrozenDict(dict):
+    """``dict`` de solo lectura. ``copy()`` devuelve un ``dict`` normal."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenList(list):
+    """``list`` de solo lectura."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def copy(self) -> list:
+        return list(self)
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(obj: Any) -> Any:
+    """Convierte recursivamente dicts y listas en sus versiones inmutables."""
+    if isinstance(obj, Mapping):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return FrozenList(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """Copia profunda modificable de una estructura (congelada o no)."""
+    if isinstance(obj, Mapping):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+# ---------------------------------------------------------------------------
+# Esquema
+# ---------------------------------------------------------------------------
+class Field:
+    """
+    Descripción de una clave de configuración.
+
+    kind: "str", "number", "int", "bool", "str_list", "list", "mapping",
+          "str_or_list" o "str_or_mapping". Todas las claves aceptan ``null``.
+    """
+
+    __slots__ = ("kind", "default", "choices", "min", "max")
+
+    def __init__(self, kind: str, default: Any = _MISSING, choices: Iterable[str] | None = None,
+                 min: float | None = None, max: float | None = None):
+        self.kind = kind
+        self.default = default
+        self.choices = frozenset(choices) if choices else None
+        self.min = min
+        self.max = max
+
+
+_FRACTION = dict(min=0.0, max=1.0)
+
+SCHEMA: dict[str, Field] = {
+    # Salida
+    "title": Field("str_or_mapping"),
+    "subtitle": Field("str_or_mapping"),
+    "outfile": Field("str"),
+    "formats": Field("str_list", default=["png"], choices=IMAGE_FORMATS),
+    "dpi": Field("number", min=1),
+    "width_in": Field("number", min=0.1),
+    "height_in": Field("number", min=0.1),
+    "jpg_quality": Field("int", min=1, max=100),
+    "webp_quality": Field("int", min=1, max=100),
+    "avif_quality": Field("int", min=1, max=100),
+    "scour_svg": Field("bool"),
+    "matrix": Field("mapping"),
+    "matrix_workers": Field("int", min=1),
+    "strings": Field("str_or_mapping"),
+    "editions": Field("mapping"),
+    "editions.languages": Field("str_list"),
+    "editions.combine": Field("bool"),
+    "aspects": Field("list"),
+    "aspects_workers": Field("int", min=1),
+    "output": Field("mapping"),
+    "output.variants": Field("list"),
+    "output.variant_formats": Field("str_list", choices=("png", "jpg", "jpeg", "webp", "avif")),
+    "output.base_dpi": Field("number", min=1),
+    "output.srcset": Field("bool"),
+    "output.manifest": Field("bool"),
+    "output.sizes": Field("str"),
+    "style": Field("str_or_list"),
+    # Orden y transformaciones
+    "percent": Field("bool"),
+    "sort_by_total": Field("bool"),
+    "sort_by_value": Field("bool"),
+    "sort_by_x": Field("bool"),
+    "sort_by_column": Field("str"),
+    "invert_order": Field("bool"),
+    "series_order": Field("str_list"),
+    "legend": Field("bool"),
+    "colors": Field("mapping"),
+    "palette": Field("str_or_list"),
+    "chart": Field("mapping"),
+    "chart.filter_min_value": Field("number", min=0),
+    # Datos
+    "data": Field("mapping"),
+    "data.category_col": Field("str"),
+    "data.value_col": Field("str"),
+    "data.series": Field("str_list"),
+    "data.csv": Field("str"),
+    "data.source_file": Field("str"),
+    "data.file": Field("str"),
+    "data.path": Field("str"),
+    "data.transform_values": Field("bool"),
+    "data.value_divisor": Field("number"),
+    "data_source": Field("mapping"),
+    "data_source.column_mapping": Field("mapping"),
+    "data_source.column_mapping.x": Field("str"),
+    "data_source.column_mapping.series": Field("list"),
+    # Dimensiones y márgenes
+    "autosize": Field("mapping"),
+    "autosize.enabled": Field("bool"),
+    "autosize.height_per_row": Field("number", min=0),
+    "autosize.width_per_col": Field("number", min=0),
+    "autosize.width_per_point": Field("number", min=0),
+    "autosize.min_height": Field("number", min=0),
+    "autosize.max_height": Field("number", min=0),
+    "autosize.min_width": Field("number", min=0),
+    "autosize.max_width": Field("number", min=0),
+    "autosize.aspect_ratio": Field("number", min=0),
+    "autosize.add_height_ratio": Field("number", min=0),
+    "margins": Field("mapping"),
+    "margins.auto_adjust": Field("bool"),
+    "margins.left": Field("number", **_FRACTION),
+    "margins.right": Field("number", **_FRACTION),
+    "margins.top": Field("number", **_FRACTION),
+    "margins.bottom": Field("number", **_FRACTION),
+    "layout": Field("mapping"),
+    "layout.header_height": Field("number", **_FRACTION),
+    "layout.footer_height": Field("number", **_FRACTION),
+    "layout.margin_left": Field("number", **_FRACTION),
+    "layout.margin_right": Field("number", **_FRACTION),
+    # Elementos
+    "flags": Field("mapping"),
+    "flags.enabled": Field("bool"),
+    "flags.column": Field("str"),
+    "flags.code_column": Field("str"),
+    "flags.pattern": Field("str"),
+    "flags.zoom": Field("number", min=0),
+    "legend_config": Field("mapping"),
+    "legend_config.custom_icons": Field("bool"),
+    "legend_config.icons": Field("list"),
+    "footer": Field("mapping"),
+    "branding": Field("mapping"),
+    "decorative_elements": Field("list"),
+    "chrome_cache": Field("bool"),
+    # Animación (app/animation.py)
+    "animation": Field("mapping"),
+    "animation.time_col": Field("str"),
+    "animation.steps": Field("int", min=1),
+    "animation.fps": Field("number", min=1),
+    "animation.hold": Field("int", min=0),
+    "animation.top_n": Field("int", min=1),
+    "animation.dpi": Field("number", min=1),
+    "animation.format": Field("str"),
+    "animation.encoder": Field("str"),
+    "animation.quality": Field("int", min=1, max=100),
+    "animation.outfile": Field("str"),
+}
+
+# Claves obligatorias según el tipo de gráfico (atributo ``config_kind`` de la clase)
+REQUIRED: dict[str, tuple[str, ...]] = {
+    "linechart": ("data_source.column_mapping.x", "data_source.column_mapping.series"),
+}
+
+_TRUE = {"true", "yes", "si", "sí", "on", "1"}
+_FALSE = {"false", "no", "off", "0"}
+
+
+def _coerce(path: str, value: Any, field: Field, errors: list[str]) -> Any:
+    """Valida y convierte un valor; agrega un mensaje a ``errors`` si no es válido."""
+    kind = field.kind
+
+    def bad(expected: str):
+        errors.append(f"{path}: se esperaba {expected}, se recibió {value!r}")
+        return value
+
+    if kind == "str":
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return bad("texto")
+
+    if kind in ("number", "int"):
+        if isinstance(value, bool):
+            return bad("un número")
+        if isinstance(value, str):
+            try:
+                value = float(value.strip())
+            except ValueError:
+                return bad("un número")
+        if not isinstance(value, (int, float)):
+            return bad("un número")
+        if kind == "int":
+            if float(value) != int(value):
+                return bad("un entero")
+            value = int(value)
+        if field.min is not None and value < field.min:
+            errors.append(f"{path}: {value!r} es menor que el mínimo {field.min}")
+        if field.max is not None and value > field.max:
+            errors.append(f"{path}: {value!r} es mayor que el máximo {field.max}")
+        return value
+
+    if kind == "bool":
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+        if isinstance(value, str) and value.strip().lower() in _TRUE | _FALSE:
+            return value.strip().lower() in _TRUE
+        return bad("true/false")
+
+    if kind == "str_list":
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value):
+            return bad("una lista de textos")
+        if field.choices is not None:
+            value = [v.lower() for v in value]
+            unknown = [v for v in value if v not in field.choices]
+            if unknown:
+                errors.append(f"{path}: valores no soportados {unknown}; opciones: {sorted(field.choices)}")
+        return list(value)
+
+    if kind == "str_or_list":
+        if isinstance(value, str) or (isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value)):
+            return value
+        return bad("texto o lista de textos")
+
+    if kind == "str_or_mapping":
+        if isinstance(value, (str, Mapping)):
+            return value
+        return bad("texto o diccionario")
+
+    if kind == "list":
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        return bad("una lista")
+
+    if kind == "mapping":
+        if isinstance(value, Mapping):
+            return value
+        return bad("un diccionario")
+
+    raise ValueError(f"Tipo de campo desconocido en el esquema: {kind}")
+
+
+def _lookup(params: dict, path: str):
+    """Devuelve (contenedor, clave) para una ruta con puntos, o (None, None)."""
+    parts = path.split(".")
+    node = params
+    for part in parts[:-1]:
+        node = node.get(part) if isinstance(node, dict) else None
+        if not isinstance(node, dict):
+            return None, None
+    return node, parts[-1]
+
+
+def validate(raw: Mapping[str, Any], kind: str | None = None) -> dict:
+    """
+    Valida una configuración combinada y devuelve una copia modificable con
+    valores convertidos y defaults aplicados. Lanza ``ConfigError`` con todos
+    los problemas encontrados.
+    """
+    if not isinstance(raw, Mapping):
+        raise ConfigError([f"la raíz debe ser un diccionario, se recibió {type(raw).__name__}"])
+
+    params = thaw(raw)
+    errors: list[str] = []
+
+    # Las rutas se recorren de padre a hijo para validar primero los contenedores
+    for path in sorted(SCHEMA, key=lambda p: p.count(".")):
+        field = SCHEMA[path]
+        node, key = _lookup(params, path)
+        if node is None:
+            continue
+        value = node.get(key, _MISSING)
+        if value is _MISSING or value is None:
+            if field.default is not _MISSING:
+                node[key] = thaw(field.default)
+            continue
+        node[key] = _coerce(path, value, field, errors)
+
+    for path in REQUIRED.get(kind or "", ()):
+        node, key = _lookup(params, path)
+        if node is None or node.get(key) in (None, "", []):
+            errors.append(f"{path}: es obligatorio para gráficos '{kind}'")
+
+    if errors:
+        raise ConfigError(errors)
+    return params
+
+
+def compile_config(raw: Mapping[str, Any], kind: str | None = None, *,
+                   source: str | None = None, use_cache: bool = True) -> FrozenDict:
+    """
+    Compila una configuración: validación + defaults + congelado.
+
+    Params:
+        raw: Configuración ya combinada con su template
+        kind: Tipo de gráfico, para las claves obligatorias (``REQUIRED``)
+        source: Ruta del YAML, solo para los mensajes de error
+        use_cache: Reutilizar la forma compilada guardada en disco
+
+    Returns:
+        FrozenDict: Parámetros inmutables listos para los gráficos
+    """
+    use_cache = use_cache and cache_enabled()
+    cache_file = None
+    if use_cache:
+        key = content_hash(raw, SCHEMA_VERSION, kind or "")
+        cache_file = cache_dir("config") / f"{key}.pickle"
+        cached = read_pickle(cache_file)
+        if isinstance(cached, FrozenDict):
+            return cached
+
+    try:
+        compiled = freeze(validate(raw, kind))
+    except ConfigError as e:
+        raise ConfigError(e.errors, source) from None
+
+    if cache_file is not None:
+        try:
+            write_pickle(cache_file, compiled)
+        except OSError as e:
+            logger.warning("⚠️ No se pudo guardar la configuración compilada en caché: %s", e)
+    return compiled
@@ -0,0 +1,344 @@
+# app/costs.py
+"""
+Modelo de costo de los renders: historia de tiempos en SQLite y predicción
+del tiempo de trabajos nuevos, para ordenar los lotes del más caro al más
+barato.
+
+El costo de un gráfico varía 100 veces entre un ``barv`` de 5 filas y un
+``stackedbarh`` de 200 filas con banderas exportado a seis formatos. Si el
+más lento arranca último, los demás procesos quedan ociosos esperándolo;
+``run_jobs`` empieza por los más caros (LPT, *longest processing time
+first*) para acortar el tiempo total del lote.
+
+La predicción de un trabajo usa, en orden:
+
+1. la mediana de sus últimos tiempos, si ya se renderizó con las mismas
+   características;
+2. una regresión lineal por tipo de gráfico sobre las características
+   (filas, filas con banderas, megapíxeles × formatos raster, formatos
+   vectoriales y filas en formatos vectoriales), si hay historia suficiente;
+3. una estimación fija a partir de las mismas características.
+
+Con la misma historia se estima la memoria de cada trabajo, para el
+presupuesto de memoria de ``batch --memory-budget`` (ver app/pool.py): lo
+que el render agrega al proceso crece con los píxeles del lienzo
+(ancho × alto × dpi²) y con las banderas. La estimación usa el máximo
+observado para la misma configuración o, si no lo hay, la fórmula
+corregida por lo observado en otros gráficos del mismo tipo.
+
+La historia se guarda en ``.cache/condatos/costs/history.sqlite`` (ver
+app/cache.py). Con ``CONDATOS_NO_CACHE=1`` no se guarda nada y solo se usa
+la estimación fija.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from app.cache import cache_dir, cache_enabled, content_hash
+
+logger = logging.getLogger(__name__)
+
+RASTER_FORMATS = {"png", "jpg", "jpeg", "webp", "avif", "tif", "tiff"}
+VECTOR_FORMATS = {"pdf", "svg", "eps"}
+
+# Muestras mínimas por tipo de gráfico para ajustar la regresión
+MIN_SAMPLES = 12
+# Tiempos recientes por configuración para la mediana
+RECENT = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    key TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    formats TEXT NOT NULL,
+    dpi REAL NOT NULL,
+    flags INTEGER NOT NULL,
+    area REAL NOT NULL,
+    ms REAL NOT NULL,
+    ts REAL NOT NULL,
+    rss_mb REAL
+);
+CREATE INDEX IF NOT EXISTS renders_key ON renders (key);
+CREATE INDEX IF NOT EXISTS renders_chart ON renders (chart);
+"""
+
+# Estimación fija de memoria (MB) de un render, sobre el RSS del proceso:
+# figura y fuentes, lienzo RGBA de Agg más las copias al exportar (por
+# megapíxel), cada bandera decodificada y escalada, y los datos por fila
+MEMORY_FIXED_MB = 25.0
+MEMORY_MB_PER_MPIX = 12.0
+MEMORY_MB_PER_FLAG = 0.5
+MEMORY_MB_PER_ROW = 0.02
+# Margen sobre lo observado y muestras mínimas para corregir la fórmula por tipo de gráfico
+MEMORY_MARGIN = 1.2
+MEMORY_MIN_SAMPLES = 3
+
+_profiles: dict[tuple, tuple[int, int]] = {}
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _profile(records: Iterable[Mapping[str, Any]], params: Mapping[str, Any]) -> tuple[int, int]:
+    """
+    Filas que se dibujan y largo de la categoría más larga entre ellas.
+
+    Con ``chart.filter_min_value`` cuenta solo las filas cuyo total de las
+    series de la configuración alcanza ese valor, como ``prepare_data``.
+    """
+    data = params.get("data") or {}
+    category_col = data.get("category_col")
+    series = data.get("series") or params.get("series_order") or []
+    min_total = (params.get("chart") or {}).get("filter_min_value")
+    columns = None
+    rows = longest = 0
+    for record in records:
+        if columns is None:
+            names = {str(k).lower(): k for k in record}
+            columns = [names[str(s).lower()] for s in series if str(s).lower() in names]
+            if category_col not in record:
+                category_col = next(iter(record), None)
+        if min_total and columns and not sum(_number(record.get(c)) for c in columns) >= min_total:
+            continue
+        rows += 1
+        longest = max(longest, len(str(record.get(category_col, ""))))
+    return rows, longest
+
+
+def _data_profile(params: Mapping[str, Any], df=None) -> tuple[int, int]:
+    """
+    Filas de datos que se dibujan y largo de la categoría más larga, sin
+    cargar el CSV con pandas: se recorre una vez y queda en memoria.
+    """
+    if df is not None:
+        return _profile(df.to_dict("records"), params)
+    from app.chart_utils import DATA_PATH_KEYS
+
+    data = params.get("data") or {}
+    path = next((data[k] for k in DATA_PATH_KEYS if data.get(k)), None)
+    if path is None:
+        inline = data.get("inline") or {}
+        if not isinstance(inline, Mapping):
+            return 0, 0
+        if inline.get("rows") is not None:
+            return _profile((r for r in inline["rows"] if isinstance(r, Mapping)), params)
+        columns = {k: v for k, v in inline.items() if isinstance(v, (list, tuple))}
+        return _profile((dict(zip(columns, values)) for values in zip(*columns.values())), params)
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return 0, 0
+    stamp = (str(path), stat.st_mtime_ns, stat.st_size, content_hash(params.get("data")),
+             content_hash(params.get("series_order")), content_hash(params.get("chart")))
+    if stamp not in _profiles and Path(path).is_file():
+        with open(path, newline="", encoding="utf-8", errors="replace") as f:
+            _profiles[stamp] = _profile(csv.DictReader(f), params)
+    return _profiles.get(stamp, (0, 0))
+
+
+def job_features(job) -> dict[str, Any] | None:
+    """
+    Características de costo de un trabajo: filas, formatos, dpi, banderas y
+    área de la figura (pulgadas²). ``None`` si la configuración no compila.
+
+    El área es la que el gráfico va a usar: los que se dimensionan según el
+    contenido (``stackedbarh``) la calculan con ``estimate_size``.
+    """
+    from app.plots.registry import get_chart_class
+
+    try:
+        _, params = job.compiled()
+        chart_class = get_chart_class(job.chart_type)
+    except Exception:
+        return None
+    flags = params.get("flags") or {}
+    rows, label_len = _data_profile(params, job.df)
+    width_in, height_in = chart_class.estimate_size(params, rows, label_len)
+    return {
+        "chart": job.chart_type,
+        "rows": rows,
+        "formats": sorted(str(f).lower() for f in params.get("formats") or ["png"]),
+        "dpi": float(params.get("dpi") or 300),
+        "flags": bool(flags.get("enabled")) if isinstance(flags, Mapping) else False,
+        "area": width_in * height_in,
+    }
+
+
+def _vector(features: Mapping[str, Any]) -> list[float]:
+    """Variables de la regresión (con término constante)."""
+    formats = features["formats"]
+    raster = sum(f in RASTER_FORMATS for f in formats)
+    vector = sum(f in VECTOR_FORMATS for f in formats)
+    rows = float(features["rows"])
+    mpix = features["area"] * features["dpi"] ** 2 / 1e6
+    return [1.0, rows, rows * bool(features["flags"]), mpix * raster, float(vector), rows * vector]
+
+
+# Estimación fija (ms) sin historia, con los mismos términos que la regresión
+_PRIOR = [400.0, 3.0, 8.0, 25.0, 150.0, 2.0]
+
+
+def estimate_memory_mb(features: Mapping[str, Any] | None) -> float:
+    """
+    Memoria (MB) que un render agrega al proceso según sus características,
+    sin historia. El lienzo raster se dibuja una vez por dpi aunque se
+    exporte a varios formatos.
+    """
+    if features is None:
+        return MEMORY_FIXED_MB + MEMORY_MB_PER_MPIX * 12 * 8 * 300 ** 2 / 1e6
+    raster = any(f in RASTER_FORMATS for f in features["formats"])
+    mpix = features["area"] * features["dpi"] ** 2 / 1e6 if raster else features["area"] * 0.01
+    rows = float(features["rows"])
+    return (MEMORY_FIXED_MB + MEMORY_MB_PER_MPIX * mpix
+            + MEMORY_MB_PER_FLAG * rows * bool(features["flags"]) + MEMORY_MB_PER_ROW * rows)
+
+
+def _same(a: Mapping[str, Any], b: Mapping[str, Any]) -> bool:
+    """Indica si dos juegos de características son equivalentes."""
+    return (a["chart"] == b["chart"] and a["rows"] == b["rows"] and a["formats"] == b["formats"]
+            and a["dpi"] == b["dpi"] and bool(a["flags"]) == bool(b["flags"]) and abs(a["area"] - b["area"]) < 1e-6)
+
+
+class CostModel:
+    """
+    Historia de tiempos de render y predicción de costos.
+
+    Params:
+        path: Archivo SQLite (por defecto en la caché; ``None`` sin caché: solo en memoria)
+    """
+
+    def __init__(self, path=None):
+        if path is None and cache_enabled():
+            path = cache_dir("costs") / "history.sqlite"
+        self.path = Path(path) if path is not None else None
+        self.db = sqlite3.connect(str(self.path) if self.path else ":memory:", timeout=30)
+        if self.path:
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+        try:
+            # Historias anteriores a la medición de memoria
+            self.db.execute("ALTER TABLE renders ADD COLUMN rss_mb REAL")
+        except sqlite3.OperationalError:
+            pass
+        self._models: dict[str, list[float] | None] = {}
+        self._memory: dict[str, float | None] = {}
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def record(self, key: str, features: Mapping[str, Any], ms: float, rss_mb: float | None = None) -> None:
+        """
+        Agrega el tiempo de un render exitoso a la historia, con la memoria
+        que agregó al proceso (``rss_mb``) si se midió.
+        """
+        self.db.execute(
+            "INSERT INTO renders (key, chart, rows, formats, dpi, flags, area, ms, ts, rss_mb) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?)",
+            (key, features["chart"], int(features["rows"]), ",".join(features["formats"]), features["dpi"],
+             int(bool(features["flags"])), features["area"], float(ms), time.time(),
+             float(rss_mb) if rss_mb is not None else None))
+        self.db.commit()
+        self._models.pop(features["chart"], None)
+        self._memory.pop(features["chart"], None)
+
+    def _history(self, where: str, args: tuple) -> list[dict[str, Any]]:
+        cursor = self.db.execute(f"SELECT chart, rows, formats, dpi, flags, area, ms, rss_mb FROM renders "
+                                 f"WHERE {where} ORDER BY ts DESC LIMIT 2000", args)
+        return [{"chart": c, "rows": r, "formats": f.split(",") if f else [], "dpi": d, "flags": bool(fl),
+                 "area": a, "ms": ms, "rss_mb": rss} for c, r, f, d, fl, a, ms, rss in cursor]
+
+    def _model(self, chart: str) -> list[float] | None:
+        """Coeficientes de la regresión de un tipo de gráfico (``None`` sin historia suficiente)."""
+        if chart not in self._models:
+            samples = self._history("chart = ?", (chart,))
+            coef = None
+            if len(samples) >= MIN_SAMPLES:
+                import numpy as np
+
+                x = np.array([_vector(s) for s in samples])
+                y = np.array([s["ms"] for s in samples])
+                coef = np.linalg.lstsq(x, y, rcond=None)[0].tolist()
+            self._models[chart] = coef
+        return self._models[chart]
+
+    def predict(self, key: str, features: Mapping[str, Any] | None) -> tuple[float, str]:
+        """
+        Tiempo previsto (ms) de un trabajo y el origen de la predicción
+        (``history``, ``model`` o ``prior``).
+        """
+        if features is None:
+            return _dot(_PRIOR, [1.0, 0, 0, 0, 0, 0]), "prior"
+        recent = [s["ms"] for s in self._history("key = ?", (key,)) if _same(s, features)][:RECENT]
+        if recent:
+            return statistics.median(recent), "history"
+        coef = self._model(features["chart"])
+        if coef is not None:
+            # La regresión puede dar valores absurdos lejos de los datos: se acota con la estimación fija
+            prior = _dot(_PRIOR, _vector(features))
+            return min(max(_dot(coef, _vector(features)), prior / 10), prior * 10), "model"
+        return _dot(_PRIOR, _vector(features)), "prior"
+
+
+    def _memory_ratio(self, chart: str) -> float | None:
+        """Mediana de memoria observada / estimación fija de un tipo de gráfico (``None`` sin historia)."""
+        if chart not in self._memory:
+            ratios = [s["rss_mb"] / estimate_memory_mb(s)
+                      for s in self._history("chart = ? AND rss_mb IS NOT NULL", (chart,))]
+            self._memory[chart] = (min(max(statistics.median(ratios), 0.25), 4.0)
+                                   if len(ratios) >= MEMORY_MIN_SAMPLES else None)
+        return self._memory[chart]
+
+    def predict_memory(self, key: str, features: Mapping[str, Any] | None) -> tuple[float, str]:
+        """
+        Memoria prevista (MB) que un trabajo agrega al proceso y el origen de
+        la predicción (``history``, ``model`` o ``prior``). Con historia se
+        usa el máximo reciente, no la mediana: el presupuesto debe cubrir el
+        peor caso.
+        """
+        if features is None:
+            return estimate_memory_mb(None), "prior"
+        recent = [s["rss_mb"] for s in self._history("key = ? AND rss_mb IS NOT NULL", (key,))
+                  if _same(s, features)][:RECENT]
+        if recent:
+            return max(recent) * MEMORY_MARGIN, "history"
+        ratio = self._memory_ratio(features["chart"])
+        if ratio is not None:
+            return estimate_memory_mb(features) * ratio * MEMORY_MARGIN, "model"
+        return estimate_memory_mb(features), "prior"
+
+
+def _dot(a: Iterable[float], b: Iterable[float]) -> float:
+    return float(sum(x * y for x, y in zip(a, b)))
+
+
+def lpt_makespan(costs: Iterable[float], workers: int) -> float:
+    """Tiempo total de repartir ``costs`` (en orden) entre ``workers`` procesos, cada tarea al primero libre."""
+    import heapq
+
+    loads = [0.0] * max(1, workers)
+    for cost in costs:
+        heapq.heapreplace(loads, loads[0] + cost)
+    return max(loads)
+
+
+def longest_first(jobs: list, predicted: Mapping[str, float]) -> list[int]:
+    """Índices de ``jobs`` ordenados por costo previsto, del mayor al menor (estable)."""
+    return sorted(range(len(jobs)), key=lambda i: -predicted.get(jobs[i].key, 0.0))
@@ -2,13 +2,18 @@
 Implementación de una leyenda personalizada con imágenes para matplotlib.
 """
 from __future__ import annotations
+import logging
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.image import imread
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 
+from app.images import load_image
+
+logger = logging.getLogger(__name__)
+
 class CustomImageLegend:
     """
     Leyenda personalizada que dibuja imágenes directamente sobre la figura.
@@ -18,15 +23,15 @@ class CustomImageLegend:
     el sistema estándar de leyendas.
     """
     
-    def __init__(self, fig: plt.Figure, ax: plt.Axes, config: Dict[str, Any]):
+    def __init__(self, fig: Figure, ax: Axes, config: Dict[str, Any]):
         """
         Inicializa la leyenda personalizada.
         
         Parameters
         ----------
-        fig : plt.Figure
+        fig : Figure
             La figura donde se dibujará la leyenda
-        ax : plt.Axes
+        ax : Axes
             Los ejes de referencia para coordenadas
         config : Dict[str, Any]
             Configuración de la leyenda
@@ -55,8 +60,8 @@ class CustomImageLegend:
             Array de la imagen o None si ocurrió un error
         """
         try:
-            img = imread(image_path)
-            print(f"[DEBUG] Imagen cargada: {image_path} shape={img.shape} dtype={img.dtype}")
+            img = load_image(image_path)
+            logger.debug("Imagen cargada: %s shape=%s dtype=%s", image_path, img.shape, img.dtype)
             
             # Verificar si queremos preservar el canal alfa
             preserve_alpha = self.config.get("preserve_alpha", True)
@@ -64,7 +69,7 @@ class CustomImageLegend:
             if img.ndim == 3 and img.shape[2] == 4:
                 if preserve_alpha:
                     # Usar la imagen completa con transparencia
-                    print(f"[DEBUG] Usando imagen con canal alfa preservado: shape={img.shape}")
+                    logger.debug("Usando imagen con canal alfa preservado: shape=%s", img.shape)
                     return img
                 else:
                     # Preservar solo los canales RGB, pero usar el canal alfa para composición
@@ -74,11 +79,11 @@ class CustomImageLegend:
                     # Aplicar el canal alfa para mezclar con fondo blanco
                     white_bg = np.ones_like(rgb)
                     img_rgb = alpha * rgb + (1 - alpha) * white_bg
-                    print(f"[DEBUG] Imagen convertida a RGB (sin alfa): shape={img_rgb.shape}")
+                    logger.debug("Imagen convertida a RGB (sin alfa): shape=%s", img_rgb.shape)
                     return img_rgb
             return img
         except Exception as e:
-            print(f"❌ Error al cargar imagen {image_path}: {e}")
+            logger.error("❌ Error al cargar imagen %s: %s", image_path, e)
             return None
             
     def draw(self) -> bool:
@@ -91,16 +96,16 @@ class CustomImageLegend:
             True si se dibujó correctamente, False si hubo errores
         """
         if not self.config.get("custom_icons") or not self.config.get("icons"):
-            print("⚠️ No se encontró configuración de íconos para la leyenda personalizada")
+            logger.warning("⚠️ No se encontró configuración de íconos para la leyenda personalizada")
             return False
             
         # Extraer configuración
         icons_config = self.config.get("icons", [])
         if not icons_config:
-            print("⚠️ Lista de íconos vacía")
+            logger.warning("⚠️ Lista de íconos vacía")
             return False
             
-        print(f"🔍 Leyenda personalizada: Dibujando {len(icons_config)} íconos")
+        logger.debug("🔍 Leyenda personalizada: Dibujando %s íconos", len(icons_config))
         
         # Extraer etiquetas y cargar imágenes
         self.icons = []
@@ -121,10 +126,10 @@ class CustomImageLegend:
             circle_scale = icon.get("circle_scale")
             label_fontsize = icon.get("label_fontsize")
             if not image_path:
-                print(f"⚠️ No se especificó ruta de imagen para el ícono: {label}")
+                logger.warning("⚠️ No se especificó ruta de imagen para el ícono: %s", label)
                 continue
             if not Path(image_path).exists():
-                print(f"❌ No se encontró el archivo de imagen: {image_path}")
+                logger.error("❌ No se encontró el archivo de imagen: %s", image_path)
                 continue
             img = self._load_image(image_path)
             if img is None:
@@ -132,19 +137,19 @@ class CustomImageLegend:
             # Buscar color para este ícono: primero por 'tint', luego por label
             color = None
             tint_key = icon.get("tint")
-            print(f"[DEBUG] Resolviendo color para ícono '{label}': tint_key={tint_key!r}, palette={palette}")
+            logger.debug("Resolviendo color para ícono '%s': tint_key=%r, palette=%s", label, tint_key, palette)
             if is_hex_color(tint_key):
                 color = tint_key
             elif tint_key:
                 # Buscar ignorando mayúsculas/minúsculas
                 palette_lc = {str(k).lower(): v for k, v in palette.items()}
                 color = palette_lc.get(str(tint_key).lower())
-                print(f"[DEBUG] Resultado búsqueda en palette_lc: {color}")
+                logger.debug("Resultado búsqueda en palette_lc: %s", color)
             if not color:
                 label_key = icon.get("label", "").strip().lower()
                 palette_lc = {str(k).lower(): v for k, v in palette.items()}
                 color = palette_lc.get(label_key)
-                print(f"[DEBUG] Resultado búsqueda por label en palette_lc: {color}")
+                logger.debug("Resultado búsqueda por label en palette_lc: %s", color)
             icon_dict = {
                 "image": img,
                 "path": image_path,
@@ -159,7 +164,7 @@ class CustomImageLegend:
             self.labels.append(label)
             
         if not self.icons:
-            print("❌ No se pudo cargar ninguna imagen para la leyenda")
+            logger.error("❌ No se pudo cargar ninguna imagen para la leyenda")
             return False
             
         # Crear el axes para la leyenda
@@ -297,7 +302,7 @@ class CustomImageLegend:
             # Texto a la izquierda, ícono a la derecha
             x_label = 0.09
             x_icon = 0.32
-            print(f"[DEBUG] Posición de elemento {i} ({label}): x_label={x_label:.2f}, x_icon={x_icon:.2f}, y={y:.2f}")
+            logger.debug("Posición de elemento %s (%s): x_label=%.2f, x_icon=%.2f, y=%.2f", i, label, x_label, x_icon, y)
             # Permitir tamaño de fuente individual por ícono
             label_fontsize = icon_info.get('label_fontsize', fontsize)
             self.legend_ax.text(
@@ -349,7 +354,7 @@ class CustomImageLegend:
                 circ_ax.axis('off')
             # Mostrar el PNG original sin tintado
             img_to_show = img
-            print(f"[DEBUG] Dibujando imagen en leyenda: {path}, tamaño={img_width:.4f}x{img_height:.4f}, tint={tint}")
+            logger.debug("Dibujando imagen en leyenda: %s, tamaño=%.4fx%.4f, tint=%s", path, img_width, img_height, tint)
             img_ax = self.legend_ax.inset_axes(
                 [x - img_width/2, y - img_height/2, img_width, img_height],
                 transform=self.legend_ax.transAxes
@@ -361,6 +366,6 @@ class CustomImageLegend:
             circ = Circle((width/2, height/2), min(width, height)/2-2, linewidth=7, edgecolor='white', facecolor='none', zorder=2)
             img_ax.add_patch(circ)
             img_ax.axis('off')
-            print(f"✅ Imagen dibujada correctamente en leyenda: {path}")
+            logger.debug("✅ Imagen dibujada correctamente en leyenda: %s", path)
         except Exception as e:
-            print(f"❌ Error al dibujar imagen en leyenda {path}: {e}")
\ No newline at end of file
+            logger.error("❌ Error al dibujar imagen en leyenda %s: %s", path, e)
\ No newline at end of file
@@ -0,0 +1,412 @@
+# app/editions.py
+"""
+Ediciones de un gráfico por idioma y tema a partir de un solo render.
+
+Con ``editions`` en la configuración, el gráfico se dibuja una vez y, para
+cada idioma, solo se reemplazan los textos (título, subtítulo, nombres del
+eje, leyenda, footer) según la tabla ``strings``. Para cada tema solo se
+vuelven a aplicar los colores (fondo, textos, ejes, leyenda, footer). Cada
+edición se exporta y la figura vuelve a su estado original.
+
+.. code-block:: yaml
+
+    strings:                       # o ruta a un YAML con la misma forma
+      en:
+        title: "Junior Pan American Games 2025 medal table"
+        subtitle: "1,050 medals were awarded: 330 gold, 321 silver and 399 bronze."
+        footer.source: "Source: Junior Pan American Games official website."
+        Brasil: Brazil
+        Oro: Gold
+    editions:
+      languages: [en, pt]
+      themes:
+        dark: styles/dark.mplstyle  # o {style: ..., colors: {"#F2F2F2": "#2A2A2A"}}
+      combine: true                 # también cada idioma con cada tema
+
+Los archivos se llaman ``<outfile>-<idioma>``, ``<outfile>-<tema>`` y
+``<outfile>-<idioma>-<tema>``.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import textwrap
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+from matplotlib.colors import to_rgba
+from matplotlib.patches import Patch
+from matplotlib.text import Text
+from matplotlib.ticker import FixedFormatter, FixedLocator
+
+from app.config_loader import load_yaml
+from app.io_utils import save_fig_multi
+from app.log import log_context
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Claves con nombre de la tabla ``strings``: se traducen desde el texto de la configuración
+NAMED_STRINGS: dict[str, Callable[[Mapping[str, Any]], str]] = {
+    "title": lambda p: _text_of(p.get("title")),
+    "subtitle": lambda p: _text_of(p.get("subtitle")),
+    "footer.source": lambda p: str((p.get("footer") or {}).get("source") or ""),
+    "footer.note": lambda p: str((p.get("footer") or {}).get("note") or ""),
+}
+
+# Claves del estilo que se aplican a cada rol de color
+THEME_KEYS = ("figure.facecolor", "axes.facecolor", "axes.edgecolor", "text.color", "xtick.color",
+              "ytick.color", "xtick.labelcolor", "ytick.labelcolor", "grid.color",
+              "legend.facecolor", "legend.edgecolor")
+
+# Textos con menos contraste que esto respecto del fondo (p. ej. blancos sobre barras) no se tocan
+MIN_TEXT_CONTRAST = 0.25
+
+
+def _text_of(value) -> str:
+    return str(value.get("text", "")) if isinstance(value, Mapping) else str(value or "")
+
+
+def _norm(text: str) -> str:
+    """Texto sin saltos de línea ni espacios repetidos (los títulos se ajustan en varias líneas)."""
+    return " ".join(str(text).split())
+
+
+# ---------------------------------------------------------------------------
+# Textos
+# ---------------------------------------------------------------------------
+
+def string_table(params: Mapping[str, Any], language: str) -> dict[str, str]:
+    """
+    Tabla texto original -> traducción para ``language``.
+
+    Raises:
+        ValueError: si ``strings`` no tiene el idioma
+    """
+    strings = params.get("strings") or {}
+    if isinstance(strings, (str, Path)):
+        strings = load_yaml(strings) or {}
+    table = strings.get(language)
+    if not isinstance(table, Mapping):
+        raise ValueError(f"strings: no hay textos para el idioma '{language}'")
+    result = {}
+    for key, value in table.items():
+        named = NAMED_STRINGS.get(key)
+        original = named(params) if named else str(key)
+        if _norm(original):
+            result[_norm(original)] = str(value)
+    return result
+
+
+class Translator:
+    """Traduce textos completos o, si no hay coincidencia, las palabras de la tabla que contienen."""
+
+    def __init__(self, table: Mapping[str, str]):
+        self.table = dict(table)
+        keys = sorted(self.table, key=len, reverse=True)
+        self._pattern = re.compile(
+            "|".join(rf"(?<!\w){re.escape(k)}(?!\w)" for k in keys)) if keys else None
+
+    def __call__(self, text: str) -> str | None:
+        """Traducción de ``text`` (con el mismo ajuste de líneas) o None si no cambia."""
+        normalized = _norm(text)
+        if not normalized:
+            return None
+        out = self.table.get(normalized)
+        if out is None and self._pattern is not None:
+            out = self._pattern.sub(lambda m: self.table[m.group(0)], normalized)
+        if out is None or out == normalized:
+            return None
+        lines = str(text).splitlines()
+        if len(lines) > 1:
+            out = textwrap.fill(out, width=max(len(line) for line in lines))
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Colores
+# ---------------------------------------------------------------------------
+
+def _luminance(rgba) -> float:
+    r, g, b = rgba[:3]
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def _is_grey(rgba, tolerance: float = 0.08) -> bool:
+    return max(rgba[:3]) - min(rgba[:3]) <= tolerance
+
+
+def theme_colors(spec) -> tuple[dict[str, Any], dict[tuple, tuple]]:
+    """
+    Colores por rol (claves de ``THEME_KEYS`` definidas en el estilo) y
+    reemplazos explícitos (``colors``) de un tema.
+    """
+    from matplotlib import rc_params_from_file
+
+    if isinstance(spec, (str, Path)):
+        spec = {"style": spec}
+    roles = {}
+    if spec.get("style"):
+        rc = rc_params_from_file(str(spec["style"]), use_default_template=False)
+        roles = {k: rc[k] for k in THEME_KEYS if k in rc}
+    roles.update({k: v for k, v in (spec.get("roles") or {}).items() if k in THEME_KEYS})
+    explicit = {to_rgba(src): to_rgba(dst) for src, dst in (spec.get("colors") or {}).items()}
+    return roles, explicit
+
+
+class Recolor:
+    """
+    Reasigna grises entre el fondo y el texto del gráfico original a la misma
+    posición entre el fondo y el texto del tema. Los colores saturados (datos)
+    se mantienen salvo reemplazo explícito.
+    """
+
+    def __init__(self, fig, roles: Mapping[str, Any], explicit: Mapping[tuple, tuple]):
+        import matplotlib as mpl
+
+        self.base_bg = to_rgba(fig.get_facecolor())
+        self.base_fg = to_rgba(mpl.rcParams["text.color"])
+        self.bg = to_rgba(roles.get("figure.facecolor", self.base_bg))
+        self.fg = to_rgba(roles.get("text.color", self.base_fg))
+        self.roles = roles
+        self.explicit = dict(explicit)
+
+    def role(self, key: str, fallback: str | None = None):
+        value = self.roles.get(key)
+        if value in (None, "inherit", "auto") and fallback:
+            value = self.roles.get(fallback)
+        return None if value in (None, "inherit", "auto", "none") else to_rgba(value)
+
+    def contrast(self, rgba) -> float:
+        """Posición del color entre el fondo (0) y el texto (1) originales."""
+        span_ = _luminance(self.base_bg) - _luminance(self.base_fg)
+        if abs(span_) < 1e-6:
+            return 0.0
+        return min(1.0, max(0.0, (_luminance(self.base_bg) - _luminance(rgba)) / span_))
+
+    def __call__(self, color, min_contrast: float = 0.0):
+        """Color del tema para ``color`` o None si no cambia."""
+        if color is None or (isinstance(color, str) and color.lower() == "none"):
+            return None
+        rgba = to_rgba(color)
+        if rgba[3] == 0:
+            return None
+        if rgba in self.explicit:
+            return self.explicit[rgba]
+        if not _is_grey(rgba):
+            return None
+        c = self.contrast(rgba)
+        if c < min_contrast:
+            return None
+        # Misma posición entre el fondo y el texto del tema, con el alfa original
+        return (*(b + c * (f - b) for b, f in zip(self.bg[:3], self.fg[:3])), rgba[3])
+
+
+# ---------------------------------------------------------------------------
+# Cambios reversibles sobre la figura
+# ---------------------------------------------------------------------------
+
+class FigureEdits:
+    """Registro de cambios sobre la figura para deshacerlos después de exportar."""
+
+    def __init__(self, fig):
+        self.fig = fig
+        self._undo: list[tuple[Callable[[Any], Any], Any]] = []
+
+    def set(self, getter: Callable[[], Any], setter: Callable[[Any], Any], value) -> None:
+        self._undo.append((setter, getter()))
+        setter(value)
+
+    def restore(self) -> None:
+        for setter, value in reversed(self._undo):
+            setter(value)
+        self._undo.clear()
+
+    def _tick_labels(self) -> set[int]:
+        ids = set()
+        for ax in self.fig.axes:
+            for axis in (ax.xaxis, ax.yaxis):
+                ids.update(id(t) for t in axis.get_ticklabels(which="both"))
+        return ids
+
+    def translate(self, translate: Translator) -> int:
+        """Reemplaza los textos de la figura; devuelve cuántos cambiaron."""
+        changed = 0
+        ticks = self._tick_labels()
+        for text in self.fig.findobj(Text):
+            if id(text) in ticks:
+                continue
+            new = translate(text.get_text())
+            if new is not None:
+                self.set(text.get_text, text.set_text, new)
+                changed += 1
+        # Los nombres del eje salen del formatter en cada dibujo: se fijan con los traducidos
+        for ax in self.fig.axes:
+            for axis in (ax.xaxis, ax.yaxis):
+                labels = [t.get_text() for t in axis.get_majorticklabels()]
+                translated = [translate(label) for label in labels]
+                if not any(translated):
+                    continue
+                labels = [new if new is not None else old for old, new in zip(labels, translated)]
+                self.set(axis.get_major_formatter, axis.set_major_formatter, FixedFormatter(labels))
+                self.set(axis.get_major_locator, axis.set_major_locator, FixedLocator(axis.get_majorticklocs()))
+                changed += sum(t is not None for t in translated)
+        return changed
+
+    def recolor(self, recolor: Recolor) -> int:
+        """Aplica los colores del tema; devuelve cuántos artistas cambiaron."""
+        fig = self.fig
+        changed = 0
+
+        def swap(getter, setter, min_contrast=0.0):
+            nonlocal changed
+            new = recolor(getter(), min_contrast)
+            if new is not None:
+                self.set(getter, setter, new)
+                changed += 1
+
+        self.set(fig.get_facecolor, fig.set_facecolor, recolor.role("figure.facecolor") or recolor.bg)
+        axes_face = recolor.role("axes.facecolor")
+        edge = recolor.role("axes.edgecolor")
+        grid = recolor.role("grid.color")
+        for ax in fig.axes:
+            if axes_face is not None:
+                self.set(ax.patch.get_facecolor, ax.patch.set_facecolor, axes_face)
+            for spine in ax.spines.values():
+                if edge is not None:
+                    self.set(spine.get_edgecolor, spine.set_edgecolor, edge)
+                else:
+                    swap(spine.get_edgecolor, spine.set_edgecolor)
+            for name, axis in (("x", ax.xaxis), ("y", ax.yaxis)):
+                tick_color = recolor.role(f"{name}tick.color")
+                label_color = recolor.role(f"{name}tick.labelcolor", f"{name}tick.color")
+                for tick in axis.get_major_ticks() + axis.get_minor_ticks():
+                    for line in (tick.tick1line, tick.tick2line):
+                        if tick_color is not None:
+                            self.set(line.get_color, line.set_color, tick_color)
+                    if grid is not None:
+                        self.set(tick.gridline.get_color, tick.gridline.set_color, grid)
+                    else:
+                        swap(tick.gridline.get_color, tick.gridline.set_color)
+                # Las etiquetas de ticks nuevas toman el color de tick_params
+                for label in axis.get_ticklabels(which="both"):
+                    if label_color is not None:
+                        self.set(label.get_color, label.set_color, label_color)
+                    else:
+                        swap(label.get_color, label.set_color, MIN_TEXT_CONTRAST)
+            legend = ax.get_legend()
+            if legend is not None:
+                self._recolor_legend(legend, recolor, swap)
+        for legend in fig.legends:
+            self._recolor_legend(legend, recolor, swap)
+
+        ticks = self._tick_labels()
+        for text in fig.findobj(Text):
+            if id(text) not in ticks:
+                swap(text.get_color, text.set_color, MIN_TEXT_CONTRAST)
+        # Parches agregados a la figura (marco del footer, decorativos)
+        figure_patches = [a for a in fig.get_children() if isinstance(a, Patch) and a is not fig.patch]
+        for patch in figure_patches:
+            swap(patch.get_facecolor, patch.set_facecolor)
+            swap(patch.get_edgecolor, patch.set_edgecolor)
+        # Barras y demás parches de datos: solo reemplazos explícitos (``colors``)
+        if recolor.explicit:
+            skip = {id(p) for p in figure_patches} | {id(fig.patch)} | {id(ax.patch) for ax in fig.axes}
+            for patch in fig.findobj(Patch):
+                if id(patch) in skip:
+                    continue
+                for getter, setter in ((patch.get_facecolor, patch.set_facecolor),
+                                       (patch.get_edgecolor, patch.set_edgecolor)):
+                    if to_rgba(getter()) in recolor.explicit:
+                        self.set(getter, setter, recolor.explicit[to_rgba(getter())])
+                        changed += 1
+        return changed
+
+    def _recolor_legend(self, legend, recolor: Recolor, swap) -> None:
+        frame = legend.get_frame()
+        face = recolor.role("legend.facecolor")
+        edge = recolor.role("legend.edgecolor")
+        if face is not None:
+            self.set(frame.get_facecolor, frame.set_facecolor, face)
+        if edge is not None:
+            self.set(frame.get_edgecolor, frame.set_edgecolor, edge)
+
+
+# ---------------------------------------------------------------------------
+# Exportación
+# ---------------------------------------------------------------------------
+
+def edition_specs(params: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """
+    Combinaciones (idioma, tema) a exportar, sin la original.
+
+    Returns:
+        list: Diccionarios con ``name``, ``language`` y ``theme`` (None si no cambia)
+    """
+    editions = params.get("editions") or {}
+    languages = list(editions.get("languages") or [])
+    themes = editions.get("themes") or {}
+    if not isinstance(themes, Mapping):
+        themes = {Path(str(t)).stem: t for t in themes}
+    combine = editions.get("combine", True)
+
+    specs = [{"name": lang, "language": lang, "theme": None} for lang in languages]
+    for theme in themes:
+        specs.append({"name": theme, "language": None, "theme": theme})
+        if combine:
+            specs += [{"name": f"{lang}-{theme}", "language": lang, "theme": theme} for lang in languages]
+    return specs
+
+
+def export_editions(chart) -> list[dict[str, Any]]:
+    """
+    Exporta cada edición de un gráfico ya renderizado (con la figura retenida).
+
+    Returns:
+        list: ``name``, ``outfile`` y cantidad de textos y colores cambiados por edición
+    """
+    from app.chrome import save_with_chrome
+
+    params = chart.params
+    fig = chart.fig
+    editions = params.get("editions") or {}
+    themes = editions.get("themes") or {}
+    if not isinstance(themes, Mapping):
+        themes = {Path(str(t)).stem: t for t in themes}
+    translators: dict[str, Translator] = {}
+    recolors: dict[str, Recolor] = {}
+    outfile = Path(params.get("outfile", "out/figure"))
+
+    results = []
+    edits = FigureEdits(fig)
+    for spec in edition_specs(params):
+        out = outfile.with_name(f"{outfile.name}-{spec['name']}")
+        export_params = {**params, "outfile": str(out)}
+
+        def save(formats, out=out):
+            save_fig_multi(
+                fig, out, formats=formats,
+                jpg_quality=params.get("jpg_quality", 95),
+                webp_quality=params.get("webp_quality", 95),
+                avif_quality=params.get("avif_quality", 80),
+                scour_svg=params.get("scour_svg", True),
+            )
+
+        with log_context(edition=spec["name"]), span(f"edition:{spec['name']}", cat="save"):
+            texts = colors = 0
+            try:
+                if spec["language"]:
+                    if spec["language"] not in translators:
+                        translators[spec["language"]] = Translator(string_table(params, spec["language"]))
+                    texts = edits.translate(translators[spec["language"]])
+                if spec["theme"]:
+                    if spec["theme"] not in recolors:
+                        recolors[spec["theme"]] = Recolor(fig, *theme_colors(themes[spec["theme"]]))
+                    colors = edits.recolor(recolors[spec["theme"]])
+                save_with_chrome(fig, export_params, [], save)
+            finally:
+                edits.restore()
+        logger.info("🌐 Edición '%s': %s textos y %s colores cambiados", spec["name"], texts, colors)
+        results.append({"name": spec["name"], "outfile": str(out), "texts": texts, "colors": colors})
+    chart.editions = results
+    return results
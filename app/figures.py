@@ -0,0 +1,49 @@
+# app/figures.py
+"""
+Ciclo de vida de las figuras.
+
+Los gráficos crean figuras ``matplotlib.figure.Figure`` con un
+``FigureCanvasAgg`` propio, sin pasar por ``pyplot``: no se registran en el
+administrador global de figuras, así que un proceso que renderiza miles de
+gráficos no las acumula. ``release_figure`` vacía la figura (corta los ciclos
+de referencias entre artistas) y, si vino de ``pyplot``, la cierra también.
+"""
+from __future__ import annotations
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def new_figure(figsize=None, dpi=None, **kwargs) -> Figure:
+    """
+    Crea una figura fuera de pyplot, lista para dibujar y guardar.
+
+    Params:
+        figsize: (ancho, alto) en pulgadas
+        dpi: Resolución (por defecto la de rcParams, como ``plt.figure``)
+        **kwargs: Otros argumentos de ``Figure``
+
+    Returns:
+        Figure: Figura con canvas Agg
+    """
+    fig = Figure(figsize=figsize, dpi=dpi, **kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def release_figure(fig) -> None:
+    """Libera una figura: la cierra en pyplot si estaba registrada y la vacía."""
+    if fig is None:
+        return
+    if getattr(fig.canvas, "manager", None) is not None:
+        import matplotlib.pyplot as plt
+
+        plt.close(fig)
+    fig.clear()
+
+
+def open_figure_count() -> int:
+    """Cantidad de figuras registradas en pyplot (debería ser 0 tras cada render)."""
+    from matplotlib._pylab_helpers import Gcf
+
+    return Gcf.get_num_fig_managers()
@@ -0,0 +1,144 @@
+# app/fonts.py
+"""
+Índice persistente de las fuentes del proyecto (carpeta ``fonts/``).
+
+``fontManager.addfont`` abre y parsea cada TTF con FreeType. En lugar de
+hacerlo en cada render, la primera vez se construye un índice con las
+entradas (``FontEntry``) que matplotlib generaría y se guarda en
+``<cache>/fonts/index-<hash>.json``. El hash depende de la versión de
+matplotlib y del contenido de la carpeta (nombre, tamaño y mtime de cada
+archivo), así que agregar o actualizar una fuente genera un índice nuevo.
+
+Las entradas se cargan en ``fontManager.ttflist`` una sola vez por proceso y
+las consultas por nombre usan un diccionario.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+from pathlib import Path
+
+import matplotlib
+import matplotlib.font_manager as fm
+
+from app.cache import cache_dir, cache_enabled, content_hash, write_atomic
+
+logger = logging.getLogger(__name__)
+
+PROJECT_FONTS_DIR = Path(__file__).parent.parent / "fonts"
+INDEX_VERSION = "1"
+
+# Estado por proceso
+_loaded_dirs: dict[str, int] = {}      # carpeta -> cantidad de entradas cargadas
+_name_index: dict[str, list] | None = None
+_name_index_len = -1
+
+
+def _fonts_signature(fonts_dir: Path) -> list:
+    """Nombre, tamaño y mtime de cada fuente de la carpeta."""
+    sig = []
+    for path in sorted(fonts_dir.glob("*.ttf")) + sorted(fonts_dir.glob("*.otf")):
+        st = path.stat()
+        sig.append([path.name, st.st_size, st.st_mtime_ns])
+    return sig
+
+
+def _build_entries(paths: list[Path]) -> list:
+    """Registra las fuentes con addfont y devuelve las entradas agregadas."""
+    manager = fm.fontManager
+    start = len(manager.ttflist)
+    for path in paths:
+        try:
+            manager.addfont(str(path))
+        except Exception as e:
+            logger.warning("⚠️ No se pudo cargar la fuente %s: %s", path.name, e)
+    return manager.ttflist[start:]
+
+
+def _append_entries(entries: list) -> None:
+    """Agrega entradas ya parseadas al fontManager, sin duplicar archivos."""
+    manager = fm.fontManager
+    known = {(e.fname, e.name, e.weight, e.style) for e in manager.ttflist}
+    new = [e for e in entries if (e.fname, e.name, e.weight, e.style) not in known]
+    manager.ttflist.extend(new)
+    # Mismo efecto que addfont: invalidar la caché de findfont
+    cached = getattr(manager, "_findfont_cached", None)
+    if cached is not None and hasattr(cached, "cache_clear"):
+        cached.cache_clear()
+
+
+def ensure_project_fonts(fonts_dir: Path | str | None = None) -> int:
+    """
+    Carga las fuentes del proyecto en matplotlib (una vez por proceso).
+
+    Params:
+        fonts_dir: Carpeta de fuentes (por defecto ``fonts/`` del proyecto)
+
+    Returns:
+        int: Cantidad de entradas de fuente disponibles desde la carpeta
+    """
+    fonts_dir = Path(fonts_dir) if fonts_dir is not None else PROJECT_FONTS_DIR
+    key_dir = str(fonts_dir.resolve())
+    if key_dir in _loaded_dirs:
+        return _loaded_dirs[key_dir]
+    if not fonts_dir.exists():
+        _loaded_dirs[key_dir] = 0
+        return 0
+
+    signature = _fonts_signature(fonts_dir)
+    index_file = None
+    if cache_enabled():
+        key = content_hash({"dir": key_dir, "fonts": signature}, INDEX_VERSION, matplotlib.__version__)
+        index_file = cache_dir("fonts") / f"index-{key[:24]}.json"
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            entries = [fm.FontEntry(**d) for d in raw["entries"]]
+            _append_entries(entries)
+            _loaded_dirs[key_dir] = len(entries)
+            return len(entries)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("⚠️ Índice de fuentes inválido (%s), se reconstruye: %s", index_file.name, e)
+
+    # Índice inexistente: parsear las fuentes una vez y guardarlo
+    paths = [fonts_dir / name for name, _, _ in signature]
+    entries = _build_entries(paths)
+    if index_file is not None:
+        payload = {
+            "matplotlib": matplotlib.__version__,
+            "fonts": signature,
+            "entries": [dataclasses.asdict(e) for e in entries],
+        }
+        try:
+            write_atomic(index_file, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        except OSError as e:
+            logger.warning("⚠️ No se pudo guardar el índice de fuentes: %s", e)
+    _loaded_dirs[key_dir] = len(entries)
+    return len(entries)
+
+
+def project_fonts_loaded(fonts_dir: Path | str | None = None) -> bool:
+    """Indica si la carpeta de fuentes ya se cargó en este proceso."""
+    fonts_dir = Path(fonts_dir) if fonts_dir is not None else PROJECT_FONTS_DIR
+    return str(fonts_dir.resolve()) in _loaded_dirs
+
+
+def font_names() -> dict[str, list]:
+    """Diccionario nombre de familia -> entradas, reconstruido solo si cambió ttflist."""
+    global _name_index, _name_index_len
+    ttflist = fm.fontManager.ttflist
+    if _name_index is None or _name_index_len != len(ttflist):
+        index: dict[str, list] = {}
+        for entry in ttflist:
+            index.setdefault(entry.name, []).append(entry)
+        _name_index = index
+        _name_index_len = len(ttflist)
+    return _name_index
+
+
+def font_available(name: str) -> bool:
+    """Indica si hay una fuente registrada con ese nombre de familia."""
+    return name in font_names()
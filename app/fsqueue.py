@@ -0,0 +1,315 @@
+# app/fsqueue.py
+"""
+Cola de trabajos en un directorio compartido, para repartir renders entre
+máquinas que ven el mismo sistema de archivos (NFS, SMB, un volumen común),
+sin broker.
+
+Estructura del directorio::
+
+    cola/
+      pending/<id>.json     trabajos por hacer (chart, config, key)
+      running/<id>.json     trabajos tomados; su mtime es el latido
+      done/<id>.json        trabajo + resultado (estado, tiempo, archivos)
+      failed/<id>.json      trabajos con error o sin más intentos
+      tmp/                  escrituras atómicas y reclamos
+
+- Un trabajador toma un trabajo renombrando ``pending/<id>.json`` a
+  ``running/<id>.json``. ``rename`` es atómico en el mismo sistema de
+  archivos: si dos trabajadores lo intentan, solo uno lo consigue y el otro
+  sigue con el siguiente.
+- Mientras renderiza, un hilo actualiza el mtime del archivo (latido).
+- Un trabajo en ``running`` sin latido durante ``timeout`` segundos (el
+  trabajador murió o la máquina se cayó) vuelve a ``pending`` con un intento
+  más; tras ``max_attempts`` pasa a ``failed``. Cualquier trabajador hace
+  esa limpieza mientras espera.
+- Al terminar, el trabajador mueve su archivo de ``running`` a ``tmp`` antes
+  de escribir el resultado: si ya no está (se devolvió a la cola por falta de
+  latido), el resultado se descarta y solo cuenta el de quien lo retomó.
+
+Uso::
+
+    python main.py enqueue config/ --queue /mnt/compartido/cola
+    python main.py worker --queue /mnt/compartido/cola        # en cada máquina, cuantos se quiera
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Iterable
+
+from app.batch import RenderJob, failure_result, jobs_from_configs
+
+logger = logging.getLogger(__name__)
+
+STATES = ("pending", "running", "done", "failed", "tmp")
+
+
+def worker_id() -> str:
+    """Identificador del trabajador: ``host:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class _Heartbeat(threading.Thread):
+    """Actualiza el mtime del trabajo tomado hasta que termina o se pierde."""
+
+    def __init__(self, path: Path, interval: float):
+        super().__init__(name=f"heartbeat:{path.stem}", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.lost = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:
+                # Otro trabajador lo devolvió a la cola
+                self.lost.set()
+                return
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class FileQueue:
+    """
+    Cola de trabajos en un directorio.
+
+    Params:
+        root: Directorio de la cola (se crea si no existe)
+        timeout: Segundos sin latido para devolver un trabajo a la cola
+        max_attempts: Veces que se puede tomar un trabajo antes de darlo por fallido
+    """
+
+    def __init__(self, root, timeout: float = 60.0, max_attempts: int = 3):
+        self.root = Path(root)
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        for state in STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+        # Última configuración con matrix expandida por este trabajador
+        self._matrix: dict[str, Any] = {}
+
+    def __repr__(self):
+        return f"FileQueue({str(self.root)!r})"
+
+    def _dir(self, state: str) -> Path:
+        return self.root / state
+
+    def _write(self, path: Path, data: dict[str, Any]) -> None:
+        """Escribe ``data`` en ``path`` de forma atómica (vía ``tmp/``)."""
+        tmp = self._dir("tmp") / f"{path.name}.{uuid.uuid4().hex}"
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def counts(self) -> dict[str, int]:
+        """Cantidad de trabajos en cada estado."""
+        return {state: sum(1 for p in self._dir(state).iterdir() if p.suffix == ".json")
+                for state in STATES if state != "tmp"}
+
+    # =============================
+    # Encolar
+    # =============================
+
+    def put(self, job: RenderJob) -> str:
+        """Encola un trabajo; devuelve su id (ordenado por llegada)."""
+        job_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        self._write(self._dir("pending") / f"{job_id}.json", {
+            "id": job_id,
+            "chart": job.chart_type,
+            "config": job.config.as_posix() if job.config else None,
+            "key": job.key,
+            "name": job.name,
+            "error": job.error,
+            "attempts": 0,
+            "enqueued": time.time(),
+        })
+        return job_id
+
+    def enqueue(self, configs: Iterable, chart_type: str | None = None) -> list[str]:
+        """
+        Encola los YAML de ``configs`` (los que tienen ``matrix``, una
+        combinación por trabajo; ver ``app.batch.jobs_from_configs``).
+        """
+        ids = [self.put(job) for job in jobs_from_configs(configs, chart_type)]
+        logger.info("📥 %s trabajos encolados en %s (%s)", len(ids), self.root,
+                    ", ".join(f"{k}: {v}" for k, v in self.counts().items()))
+        return ids
+
+    # =============================
+    # Tomar, latir, terminar
+    # =============================
+
+    def claim(self) -> tuple[Path, dict[str, Any]] | None:
+        """Toma el trabajo pendiente más antiguo disponible; ``None`` si no hay."""
+        for name in sorted(os.listdir(self._dir("pending"))):
+            if not name.endswith(".json"):
+                continue
+            pending = self._dir("pending") / name
+            running = self._dir("running") / name
+            try:
+                # El mtime es el latido: se renueva antes de moverlo a running
+                os.utime(pending)
+                os.rename(pending, running)
+            except FileNotFoundError:
+                continue  # Otro trabajador lo tomó primero
+            try:
+                return running, json.loads(running.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError) as e:
+                logger.warning("⚠️ Trabajo ilegible %s: %s", name, e)
+                self._discard(running, "failed")
+        return None
+
+    def _discard(self, path: Path, state: str) -> None:
+        """Mueve un archivo ilegible a ``state`` sin tocar su contenido."""
+        try:
+            os.rename(path, self._dir(state) / path.name)
+        except FileNotFoundError:
+            pass
+
+    def complete(self, running: Path, job: dict[str, Any], result: dict[str, Any]) -> bool:
+        """
+        Registra el resultado de un trabajo tomado.
+
+        Returns:
+            bool: ``False`` si el trabajo ya no era de este trabajador (volvió a
+            la cola por falta de latido) y el resultado se descartó
+        """
+        released = self._dir("tmp") / f"{running.name}.{uuid.uuid4().hex}"
+        try:
+            os.rename(running, released)
+        except FileNotFoundError:
+            logger.warning("⚠️ %s volvió a la cola mientras se renderizaba; se descarta este resultado",
+                           job.get("name"))
+            return False
+        state = "done" if result.get("status") == "ok" else "failed"
+        self._write(self._dir(state) / running.name, {**job, "result": result, "finished": time.time()})
+        released.unlink()
+        return True
+
+    def requeue_stale(self) -> int:
+        """
+        Devuelve a la cola los trabajos sin latido por más de ``timeout``
+        segundos (o los pasa a ``failed`` si agotaron los intentos).
+
+        Returns:
+            int: Trabajos devueltos o dados por fallidos
+        """
+        now = time.time()
+        count = 0
+        for path in sorted(self._dir("running").glob("*.json")):
+            try:
+                if now - path.stat().st_mtime <= self.timeout:
+                    continue
+                # Quien logra moverlo se encarga; el resto sigue de largo
+                reclaimed = self._dir("tmp") / f"{path.name}.{uuid.uuid4().hex}"
+                os.rename(path, reclaimed)
+            except FileNotFoundError:
+                continue
+            try:
+                job = json.loads(reclaimed.read_text(encoding="utf-8"))
+            except ValueError:
+                self._discard(reclaimed, "failed")
+                continue
+            job["attempts"] = job.get("attempts", 0) + 1
+            if job["attempts"] >= self.max_attempts:
+                job["result"] = {"status": "error", "error": f"sin latido tras {job['attempts']} intentos"}
+                self._write(self._dir("failed") / path.name, job)
+                logger.error("❌ %s: sin latido tras %s intentos; pasa a failed", job.get("name"), job["attempts"])
+            else:
+                self._write(self._dir("pending") / path.name, job)
+                logger.warning("⚠️ %s: sin latido por más de %.0f s; vuelve a la cola (intento %s)",
+                               job.get("name"), self.timeout, job["attempts"] + 1)
+            reclaimed.unlink()
+            count += 1
+        return count
+
+    # =============================
+    # Trabajar
+    # =============================
+
+    def _job(self, job: dict[str, Any]) -> RenderJob:
+        """``RenderJob`` de un trabajo de la cola."""
+        config = job.get("config")
+        if config and job.get("key") != Path(config).as_posix():
+            # Una combinación de matrix: se expande la configuración (una vez
+            # por trabajador mientras sigan llegando combinaciones del mismo YAML)
+            from app.matrix import matrix_jobs
+
+            stamp = (config, os.stat(config).st_mtime_ns)
+            if self._matrix.get("stamp") != stamp:
+                self._matrix = {"stamp": stamp,
+                                "jobs": {j.key: j for j in matrix_jobs(job["chart"], config)}}
+            if job["key"] not in self._matrix["jobs"]:
+                raise KeyError(f"{job['key']}: la combinación ya no está en {config}")
+            return self._matrix["jobs"][job["key"]]
+        return RenderJob(job["chart"], config, name=job.get("name"), key=job.get("key"), error=job.get("error"))
+
+    def work(self, *, heartbeat: float = 5.0, poll: float = 1.0, follow: bool = False,
+             max_jobs: int | None = None, job_timeout: float | None = None,
+             memory_mb: float | None = None) -> list[dict[str, Any]]:
+        """
+        Toma y renderiza trabajos hasta vaciar la cola.
+
+        Params:
+            heartbeat: Segundos entre latidos (debe ser bastante menor que ``timeout``)
+            poll: Segundos de espera cuando no hay trabajos pendientes
+            follow: Seguir esperando trabajos nuevos en lugar de terminar
+            max_jobs: Terminar tras esta cantidad de trabajos
+            job_timeout: Segundos de reloj por trabajo; con este límite o con
+                ``memory_mb`` cada trabajo corre en un proceso supervisado (ver
+                app/pool.py) y el que se pasa queda en ``failed``
+            memory_mb: RSS máximo por trabajo en MB
+
+        Returns:
+            list: Resultado de cada trabajo renderizado por este trabajador
+        """
+        me = worker_id()
+        results = []
+        t0 = time.perf_counter()
+        logger.info("👷 Trabajador %s en %s", me, self.root)
+        while max_jobs is None or len(results) < max_jobs:
+            claimed = self.claim()
+            if claimed is None:
+                self.requeue_stale()
+                if not follow and not any(self._dir("running").glob("*.json")) \
+                        and not any(self._dir("pending").glob("*.json")):
+                    break
+                # Otros siguen trabajando: si alguno muere, su trabajo vuelve a la cola
+                time.sleep(poll)
+                continue
+
+            running, job = claimed
+            beat = _Heartbeat(running, heartbeat)
+            beat.start()
+            try:
+                render_job = self._job(job)
+                if job_timeout or memory_mb:
+                    from app.pool import SupervisedPool
+
+                    pool = SupervisedPool(1, timeout=job_timeout, memory_mb=memory_mb)
+                    result = pool.map(RenderJob.run, [render_job], on_failure=failure_result)[0]
+                else:
+                    result = render_job.run()
+            except Exception as e:
+                logger.error("❌ Falló %s: %s", job.get("name"), e)
+                result = {"key": job.get("key"), "name": job.get("name"), "status": "error",
+                          "error": f"{type(e).__name__}: {e}"}
+            finally:
+                beat.stop()
+            result.update(worker=me, attempt=job.get("attempts", 0) + 1)
+            if self.complete(running, job, result):
+                results.append(result)
+
+        failed = sum(r["status"] != "ok" for r in results)
+        logger.info("👷 Trabajador %s: %s trabajos en %.1f s · %s ok, %s con error", me, len(results),
+                    time.perf_counter() - t0, len(results) - failed, failed)
+        return results
@@ -2,9 +2,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-import yaml
 from matplotlib.transforms import ScaledTranslation
-from rich import print as rprint
 
 
 # ----------------------------
@@ -71,11 +69,13 @@ def should_show_val(val: float, params: dict, percent_key: str = "percent") -> b
 
 
 def _bar_cfg(params: dict) -> dict:
-    """Asegura que params['bar'] exista y tenga defaults coherentes."""
-    bar = params.setdefault("bar", {})
-    bar.setdefault("bar_width", 0.65)  # horizontal: height; vertical: width
-    bar.setdefault("linewidth", 0.8)
-    bar.setdefault("edgecolor", "white")
+    """Devuelve params['bar'] completado con defaults coherentes (sin modificar params)."""
+    bar = {
+        "bar_width": 0.65,  # horizontal: height; vertical: width
+        "linewidth": 0.8,
+        "edgecolor": "white",
+    }
+    bar.update(params.get("bar") or {})
     return bar
 
 
@@ -94,9 +94,9 @@ def deep_merge(base: dict, override: dict) -> dict:
 
 
 def _load_yaml(p: Path) -> dict:
-    """Carga un YAML en dict (utf-8)."""
-    with open(p, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    """Carga un YAML en dict (utf-8), con el loader en C si está disponible."""
+    from app.config_loader import load_yaml
+    return load_yaml(p)
 
 
 def _merge_params(tpl: dict, cfg: dict) -> dict:
@@ -120,4 +120,6 @@ def _merge_params(tpl: dict, cfg: dict) -> dict:
 # ----------------------------
 def _print_ok(params: dict) -> None:
     exts = ",".join(params.get("formats", ["png", "svg", "pdf"]))
+    from rich import print as rprint
+
     rprint(f"[bold green]OK[/bold green] → {params.get('outfile', 'out/figure')}.{exts}")
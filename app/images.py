@@ -0,0 +1,47 @@
+# app/images.py
+"""
+Imágenes de assets (banderas, íconos, logos) decodificadas una sola vez por
+proceso.
+
+Las mismas imágenes se repiten entre gráficos y variantes: ``load_image``
+retiene el arreglo decodificado, indexado por ruta, fecha de modificación,
+tamaño y argumentos de lectura. Con ``CONDATOS_NO_CACHE=1`` se decodifican
+en cada llamada.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from app.cache import cache_enabled
+from app.profiling import timed_imread
+
+# Imágenes ya decodificadas en este proceso: (ruta, mtime, tamaño, kwargs) -> arreglo
+_IMAGES: dict[tuple, Any] = {}
+_IMAGES_MAX = 512
+
+
+def load_image(path, **kwargs):
+    """
+    Lee una imagen con ``matplotlib.image.imread`` (span ``image_load``).
+
+    Las imágenes de archivos se decodifican una sola vez por proceso. El
+    arreglo devuelto es de solo lectura y se comparte entre llamadas.
+    """
+    key = None
+    if isinstance(path, (str, os.PathLike)) and cache_enabled():
+        try:
+            st = os.stat(path)
+            key = (os.fspath(path), st.st_mtime_ns, st.st_size, tuple(sorted(kwargs.items())))
+        except OSError:
+            key = None
+    if key is not None and key in _IMAGES:
+        return _IMAGES[key]
+
+    img = timed_imread(path, **kwargs)
+    if key is not None:
+        img.flags.writeable = False
+        if len(_IMAGES) >= _IMAGES_MAX:
+            _IMAGES.pop(next(iter(_IMAGES)))
+        _IMAGES[key] = img
+    return img
@@ -1,9 +1,90 @@
 # app/io_utils.py
 from __future__ import annotations
-import subprocess, sys
+import contextvars
+import io
+import logging
+import subprocess
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable
+from typing import BinaryIO, Iterable
 from PIL import Image
+
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Archivos escritos dentro de collect_outputs() (manifiestos de lotes)
+_OUTPUTS: contextvars.ContextVar[list | None] = contextvars.ContextVar("condatos_outputs", default=None)
+
+
+@contextmanager
+def collect_outputs():
+    """
+    Registra los archivos que se escriben dentro del bloque; entrega la lista
+    de rutas. Los bloques anidados también informan al de afuera.
+    """
+    outer = _OUTPUTS.get()
+    outputs: list[Path] = []
+    token = _OUTPUTS.set(outputs)
+    try:
+        yield outputs
+    finally:
+        _OUTPUTS.reset(token)
+        if outer is not None:
+            outer.extend(outputs)
+
+
+def record_output(path) -> None:
+    """Anota un archivo escrito (solo dentro de collect_outputs)."""
+    outputs = _OUTPUTS.get()
+    if outputs is not None:
+        outputs.append(Path(path))
+
+
+class _Capture:
+    """Archivos codificados en memoria en lugar de escribirse en disco (ver capture_files)."""
+
+    def __init__(self, stream: BinaryIO | None = None):
+        self.files: dict[str, bytes] = {}
+        self.stream = stream
+
+    def write(self, out: Path, data: bytes) -> None:
+        if self.stream is not None:
+            self.stream.write(data)
+            self.stream.flush()
+        else:
+            self.files[out.as_posix()] = data
+
+
+# Destino en memoria de save_fig_multi dentro de capture_files() (API de bytes, app/api.py)
+_CAPTURE: contextvars.ContextVar[_Capture | None] = contextvars.ContextVar("condatos_capture", default=None)
+
+
+@contextmanager
+def capture_files(stream: BinaryIO | None = None):
+    """
+    Dentro del bloque, save_fig_multi no escribe en disco: entrega un dict
+    ruta → bytes con lo que habría escrito. Con ``stream``, cada archivo se
+    escribe en ese archivo abierto (p. ej. ``sys.stdout.buffer``) y el dict
+    queda vacío.
+    """
+    capture = _Capture(stream)
+    token = _CAPTURE.set(capture)
+    try:
+        yield capture.files
+    finally:
+        _CAPTURE.reset(token)
+
+
+def _scour(data: bytes) -> bytes:
+    """Minifica un SVG con ``scour`` por tubería; si no está disponible lo deja igual."""
+    try:
+        return subprocess.run(["scour", "--enable-id-stripping", "--enable-comment-stripping",
+                               "--shorten-ids", "--remove-metadata"],
+                              input=data, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+    except Exception:
+        return data
+
 # Registrar HEIF/AVIF en Pillow
 try:
     from pillow_heif import register_heif_opener
@@ -14,47 +95,88 @@ except Exception:
 def ensure_parent(outpath: Path):
     outpath.parent.mkdir(parents=True, exist_ok=True)
 
+def save_image(im: Image.Image, out: Path | BinaryIO, fmt: str, jpg_quality=92, webp_quality=92,
+               avif_quality=55, dpi: float | None = None) -> bool:
+    """
+    Codifica una imagen ya rasterizada (png, jpg, webp o avif) en una ruta o
+    en un archivo abierto.
+
+    Devuelve False si el formato no está disponible (p. ej. AVIF sin plugin).
+    """
+    extra = {"dpi": (dpi, dpi)} if dpi else {}
+    if fmt == "png":
+        im.save(out, format="PNG", **extra)
+    elif fmt in {"jpg", "jpeg"}:
+        im = im.convert("RGB")
+        im.save(out, format="JPEG", quality=jpg_quality, optimize=True, progressive=True, **extra)
+    elif fmt == "webp":
+        im.save(out, format="WEBP", quality=webp_quality, method=6)
+    elif fmt == "avif":
+        try:
+            im.save(out, format="AVIF", quality=avif_quality)
+        except Exception as e:
+            logger.warning("AVIF no soportado (%s); saltando", e)
+            return False
+    else:
+        logger.warning("Formato no soportado: %s", fmt)
+        return False
+    return True
+
+
 def save_fig_multi(fig, base: Path, formats: Iterable[str],
                    jpg_quality=92, webp_quality=92, avif_quality=55,
                    scour_svg=True):
     base = base.with_suffix("")
-    print(f"[DEBUG] save_fig_multi: Formats received: {formats}")
+    capture = _CAPTURE.get()
+    logger.debug("save_fig_multi: Formats received: %s", formats)
     for fmt in formats:
         fmt_lower = fmt.lower()
-        print(f"[DEBUG] save_fig_multi: Processing format: {fmt_lower}")
-        if fmt_lower in {"png","pdf","svg"}:
-            out = base.with_suffix(f".{fmt_lower}")
-            ensure_parent(out)
-            print(f"[save] {out}")
-            # Usar pad_inches=0.02 en lugar de 0.1 para reducir espacio
-            fig.savefig(out, bbox_inches=None, pad_inches=0.02)  # Añadimos bbox_inches y padding
-            if fmt_lower == "svg" and scour_svg:
-                try:
-                    minified = base.with_suffix(".min.svg")
-                    subprocess.run(["scour", "-i", str(out), "-o", str(minified),
-                                    "--enable-id-stripping", "--enable-comment-stripping",
-                                    "--shorten-ids", "--remove-metadata"],
-                                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    minified.replace(out)
-                except Exception:
-                    pass
-        elif fmt_lower in {"jpg","jpeg","webp","avif"}:
-            tmp_png = base.with_suffix(".tmp.png")
-            # Usar pad_inches=0.02 en lugar de 0.1 también aquí
-            fig.savefig(tmp_png, bbox_inches=None, pad_inches=0.02)  # Aquí también
-            im = Image.open(tmp_png)
-            out = base.with_suffix(f".{fmt_lower}")
-            ensure_parent(out)
-            if fmt_lower in {"jpg","jpeg"}:
-                im = im.convert("RGB")
-                im.save(out, format="JPEG", quality=jpg_quality, optimize=True, progressive=True)
-            elif fmt_lower == "webp":
-                im.save(out, format="WEBP", quality=webp_quality, method=6)
-            elif fmt_lower == "avif":
-                try:
-                    im.save(out, format="AVIF", quality=avif_quality)
-                except Exception as e:
-                    print(f"[WARN] AVIF no soportado ({e}); saltando", file=sys.stderr)
-            tmp_png.unlink(missing_ok=True)
-        else:
-            print(f"[WARN] Formato no soportado: {fmt}", file=sys.stderr)
\ No newline at end of file
+        with span(f"savefig:{fmt_lower}", cat="save", path=str(base)):
+            logger.debug("save_fig_multi: Processing format: %s", fmt_lower)
+            if fmt_lower in {"png","pdf","svg"} and capture is not None:
+                # En memoria (capture_files): mismos parámetros que en disco
+                out = base.with_suffix(f".{fmt_lower}")
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=fmt_lower, bbox_inches=None, pad_inches=0.02)
+                data = buffer.getvalue()
+                capture.write(out, _scour(data) if fmt_lower == "svg" and scour_svg else data)
+                logger.debug("[save] %s (en memoria)", out)
+            elif fmt_lower in {"png","pdf","svg"}:
+                out = base.with_suffix(f".{fmt_lower}")
+                ensure_parent(out)
+                logger.info("[save] %s", out)
+                # Usar pad_inches=0.02 en lugar de 0.1 para reducir espacio
+                fig.savefig(out, bbox_inches=None, pad_inches=0.02)  # Añadimos bbox_inches y padding
+                if fmt_lower == "svg" and scour_svg:
+                    try:
+                        minified = base.with_suffix(".min.svg")
+                        subprocess.run(["scour", "-i", str(out), "-o", str(minified),
+                                        "--enable-id-stripping", "--enable-comment-stripping",
+                                        "--shorten-ids", "--remove-metadata"],
+                                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                        minified.replace(out)
+                    except Exception:
+                        pass
+                record_output(out)
+            elif fmt_lower in {"jpg","jpeg","webp","avif"}:
+                # Raster intermedio en memoria (PNG sin compresión: solo se decodifica)
+                raster = io.BytesIO()
+                fig.savefig(raster, format="png", bbox_inches=None, pad_inches=0.02,
+                            pil_kwargs={"compress_level": 0})
+                raster.seek(0)
+                im = Image.open(raster)
+                out = base.with_suffix(f".{fmt_lower}")
+                if capture is not None:
+                    encoded = io.BytesIO()
+                    if save_image(im, encoded, fmt_lower, jpg_quality=jpg_quality,
+                                  webp_quality=webp_quality, avif_quality=avif_quality):
+                        capture.write(out, encoded.getvalue())
+                        logger.debug("[save] %s (en memoria)", out)
+                    continue
+                ensure_parent(out)
+                if save_image(im, out, fmt_lower, jpg_quality=jpg_quality,
+                              webp_quality=webp_quality, avif_quality=avif_quality):
+                    logger.info("[save] %s", out)
+                    record_output(out)
+            else:
+                logger.warning("Formato no soportado: %s", fmt)
\ No newline at end of file
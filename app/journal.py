@@ -0,0 +1,294 @@
+# app/journal.py
+"""
+Diario de lotes: un archivo JSONL al que solo se agregan líneas, para
+retomar un lote que se cortó y para medir el rendimiento de los lotes.
+
+``batch`` agrega una línea por trabajo apenas termina, con la huella de sus
+entradas, el hash de cada archivo escrito y el estado. La línea se escribe
+en cuanto el trabajo termina, así que si el proceso muere en el gráfico
+1.700 de 2.000, el diario ya tiene los 1.699 anteriores. Con ``--resume``
+se saltan los trabajos que ya terminaron bien, si sus entradas no
+cambiaron y sus archivos siguen intactos.
+
+La huella de un trabajo combina:
+
+- los parámetros compilados (YAML, template y valores por defecto; en una
+  ``matrix``, los de la combinación);
+- el tipo de gráfico;
+- el contenido del archivo de datos (``data.csv`` o equivalente).
+
+Las imágenes a las que hace referencia la configuración (banderas, logos,
+íconos) no forman parte de la huella: si cambian, el gráfico se vuelve a
+renderizar sin ``--resume``.
+
+Tipos de línea::
+
+    {"type": "run", "run": "…", "started": …, "jobs": 2000, "resume": true}
+    {"type": "job", "run": "…", "key": "config/a.yml", "config_hash": "…",
+     "status": "ok" | "error" | "skipped", "ms": 812.4,
+     "outputs": [{"path": "out/a.png", "bytes": 181022, "sha256": "…"}]}
+    {"type": "end", "run": "…", "finished": …, "elapsed": 1432.1, "ok": 1990, "error": 3, "skipped": 7}
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import statistics
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from app.cache import content_hash, file_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL = Path("out") / "batch-journal.jsonl"
+
+def read_journal(path) -> Iterator[dict[str, Any]]:
+    """
+    Líneas del diario, en orden. Una línea incompleta (el proceso murió
+    mientras la escribía) se ignora.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning("⚠️ %s:%s: línea incompleta o inválida; se ignora", path, number)
+
+
+def job_fingerprint(job, data_hashes: dict[str, str] | None = None) -> str | None:
+    """
+    Huella de las entradas de un trabajo (parámetros, tipo y datos).
+
+    Params:
+        job: ``app.batch.RenderJob``
+        data_hashes: Caché ruta → hash de archivos de datos (compartida
+            entre trabajos que leen el mismo CSV)
+
+    Returns:
+        str | None: Hash sha256, o ``None`` si la configuración no se puede
+        compilar (el trabajo se ejecuta y falla con su propio error)
+    """
+    from app.chart_utils import DATA_PATH_KEYS
+    from app.config_schema import thaw
+
+    try:
+        _, params = job.compiled()
+    except Exception as e:
+        logger.debug("Sin huella para %s: %s", job.name, e)
+        return None
+    data = params.get("data") or {}
+    data_path = next((data[k] for k in DATA_PATH_KEYS if data.get(k)), None)
+    data_hash = ""
+    if data_path:
+        cache = data_hashes if data_hashes is not None else {}
+        if data_path not in cache:
+            try:
+                # Solo archivos regulares: una tubería o un dispositivo bloquearía la lectura
+                cache[data_path] = file_hash(data_path) if Path(data_path).is_file() else "missing"
+            except OSError:
+                cache[data_path] = "missing"
+        data_hash = cache[data_path]
+    return content_hash(thaw(params), job.chart_type, data_hash)
+
+
+def outputs_intact(outputs: Iterable[dict[str, Any]]) -> bool:
+    """Indica si los archivos registrados siguen existiendo con el mismo contenido."""
+    for output in outputs:
+        path = Path(output["path"])
+        try:
+            if path.stat().st_size != output.get("bytes") or file_hash(path) != output.get("sha256"):
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class Journal:
+    """
+    Diario de un lote (se usa como context manager).
+
+    Params:
+        path: Archivo JSONL (se crea si no existe; solo se agregan líneas)
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL):
+        self.path = Path(path)
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.fingerprints: dict[str, str | None] = {}
+        self._data_hashes: dict[str, str] = {}
+        self._file = None
+        self._counts: Counter = Counter()
+        self._t0 = time.perf_counter()
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+        return False
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """Agrega una línea y la lleva al disco antes de seguir."""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def fingerprint(self, job) -> str | None:
+        """Huella del trabajo (calculada una vez por lote)."""
+        if job.key not in self.fingerprints:
+            self.fingerprints[job.key] = job_fingerprint(job, self._data_hashes)
+        return self.fingerprints[job.key]
+
+    def completed(self) -> dict[str, dict[str, Any]]:
+        """Última línea exitosa (``ok`` o ``skipped``) de cada clave en el diario."""
+        done = {}
+        for record in read_journal(self.path):
+            if record.get("type") != "job":
+                continue
+            if record.get("status") in ("ok", "skipped"):
+                done[record["key"]] = record
+            else:
+                done.pop(record["key"], None)
+        return done
+
+    def start(self, jobs: list, resume: bool = False) -> tuple[list, list[dict[str, Any]]]:
+        """
+        Registra el inicio del lote y, con ``resume``, separa los trabajos ya hechos.
+
+        Returns:
+            tuple: Trabajos a ejecutar y resultados de los que se saltan
+        """
+        todo, skipped = list(jobs), []
+        if resume:
+            done = self.completed()
+            todo = []
+            for job in jobs:
+                record = done.get(job.key)
+                fingerprint = self.fingerprint(job)
+                if (record and fingerprint is not None and record.get("config_hash") == fingerprint
+                        and outputs_intact(record.get("outputs") or [])):
+                    skipped.append({"key": job.key, "name": job.name, "chart": job.chart_type,
+                                    "outfile": record.get("outfile"), "status": "ok", "skipped": True,
+                                    "outputs": record.get("outputs") or [], "ms": record.get("ms") or 0})
+                else:
+                    todo.append(job)
+            logger.info("⏭️ Retomando %s: %s trabajos ya hechos, %s por hacer", self.path, len(skipped), len(todo))
+        self._append({"type": "run", "run": self.run_id, "started": time.time(), "jobs": len(jobs),
+                      "resume": resume, "pid": os.getpid()})
+        for result in skipped:
+            self._append(self._job_record(result, "skipped"))
+            self._counts["skipped"] += 1
+        return todo, skipped
+
+    def _job_record(self, result: dict[str, Any], status: str) -> dict[str, Any]:
+        record = {"type": "job", "run": self.run_id, "ts": time.time(), "key": result["key"],
+                  "name": result.get("name"), "chart": result.get("chart"),
+                  "config_hash": self.fingerprints.get(result["key"]), "status": status,
+                  "ms": round(result.get("ms") or 0, 1), "outfile": result.get("outfile"),
+                  "outputs": result.get("outputs") or []}
+        for key in ("error", "killed", "peak_rss_mb", "job_rss_mb"):
+            if result.get(key):
+                record[key] = result[key]
+        return record
+
+    def record(self, job, result: dict[str, Any]) -> None:
+        """Registra un trabajo terminado (usar como ``on_result`` de ``run_jobs``)."""
+        self.fingerprint(job)
+        status = "ok" if result.get("status") == "ok" else "error"
+        self._append(self._job_record(result, status))
+        self._counts[status] += 1
+
+    def finish(self) -> None:
+        """Registra el final del lote y cierra el diario."""
+        if self._file is None:
+            return
+        elapsed = time.perf_counter() - self._t0
+        self._append({"type": "end", "run": self.run_id, "finished": time.time(), "elapsed": round(elapsed, 2),
+                      "ok": self._counts["ok"], "error": self._counts["error"],
+                      "skipped": self._counts["skipped"]})
+        self._file.close()
+        self._file = None
+
+
+def journal_stats(path) -> dict[str, Any]:
+    """
+    Rendimiento y fallas registrados en un diario.
+
+    Returns:
+        dict: Corridas, trabajos por estado, gráficos por minuto (renderizados
+        sobre el tiempo de reloj de las corridas), tiempos por gráfico
+        (mediana y p95), tasa de fallas, errores más frecuentes y los trabajos
+        que fallan siempre
+    """
+    runs: dict[str, dict[str, Any]] = {}
+    last: dict[str, dict[str, Any]] = {}
+    counts: Counter = Counter()
+    errors: Counter = Counter()
+    times = []
+    for record in read_journal(path):
+        kind, run = record.get("type"), record.get("run")
+        if kind == "run":
+            runs[run] = {"start": record.get("started"), "end": record.get("started")}
+        elif kind == "job":
+            counts[record["status"]] += 1
+            if record["status"] != "skipped":
+                last[record["key"]] = record
+            if record["status"] == "ok":
+                times.append(record.get("ms") or 0)
+            elif record["status"] == "error":
+                errors[record.get("error", "?")] += 1
+            if run in runs:
+                runs[run]["end"] = max(runs[run]["end"] or 0, record.get("ts") or 0)
+        elif kind == "end" and run in runs:
+            runs[run]["end"] = record.get("finished")
+            runs[run]["closed"] = True
+
+    wall = sum(max(0.0, (r["end"] or 0) - (r["start"] or 0)) for r in runs.values())
+    rendered = counts["ok"] + counts["error"]
+    times.sort()
+    return {
+        "runs": len(runs),
+        "interrupted": sum(not r.get("closed") for r in runs.values()),
+        "ok": counts["ok"],
+        "error": counts["error"],
+        "skipped": counts["skipped"],
+        "wall_s": round(wall, 1),
+        "charts_per_min": round(rendered / wall * 60, 1) if wall > 0 else None,
+        "median_ms": round(statistics.median(times), 1) if times else None,
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 1) if times else None,
+        "failure_rate": round(counts["error"] / rendered, 4) if rendered else 0.0,
+        "top_errors": errors.most_common(5),
+        "failing": sorted(key for key, record in last.items() if record["status"] == "error"),
+    }
+
+
+def format_stats(stats: dict[str, Any]) -> list[str]:
+    """Líneas de texto con el resumen de ``journal_stats``."""
+    lines = [
+        f"🧾 {stats['runs']} corrida(s) ({stats['interrupted']} interrumpida(s)), {stats['wall_s']:.1f} s de reloj",
+        f"   Trabajos: {stats['ok']} ok, {stats['error']} con error, {stats['skipped']} saltados (--resume)",
+    ]
+    if stats["charts_per_min"] is not None:
+        lines.append(f"   Rendimiento: {stats['charts_per_min']:.1f} gráficos/min")
+    if stats["median_ms"] is not None:
+        lines.append(f"   Por gráfico: mediana {stats['median_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms")
+    lines.append(f"   Tasa de fallas: {stats['failure_rate']:.1%}")
+    for error, count in stats["top_errors"]:
+        lines.append(f"   ❌ {count}× {error}")
+    if stats["failing"]:
+        lines.append(f"   Fallan en su último intento: {', '.join(stats['failing'][:10])}"
+                     + (f" y {len(stats['failing']) - 10} más" if len(stats["failing"]) > 10 else ""))
+    return lines
@@ -1,11 +1,15 @@
 # app/layout.py
 from __future__ import annotations
 
+import logging
 from pathlib import Path
 from typing import Any, Mapping
 
 from .branding import add_branding
 from .io_utils import save_fig_multi
+from .profiling import span
+
+logger = logging.getLogger(__name__)
 
 
 def _draw_header(fig, params: Mapping[str, Any]):
@@ -81,21 +85,45 @@ def _draw_header(fig, params: Mapping[str, Any]):
         )
 
 
+def frame_geometry(params: Mapping[str, Any]) -> dict:
+    """Proporciones del marco (header, footer y márgenes) según ``params['layout']``."""
+    layout = params.get("layout", {})
+    return {
+        "header_height": float(layout.get("header_height", 0.15)),
+        "footer_height": float(layout.get("footer_height", 0.10)),
+        "margin_left": float(layout.get("margin_left", 0.30)),
+        "margin_right": float(layout.get("margin_right", 0.15)),
+    }
+
+
+def frame_branding(params: Mapping[str, Any]) -> dict:
+    """
+    Configuración de branding completada con la geometría del marco.
+    Devuelve un dict nuevo: ``params`` no se modifica.
+    """
+    geom = frame_geometry(params)
+    branding_cfg = dict(params.get("branding", {}))
+    branding_cfg.update({
+        "height": geom["footer_height"],
+        "margin_left": geom["margin_left"],
+        "margin_right": geom["margin_right"]
+    })
+    return branding_cfg
+
+
 def apply_frame(fig, params: Mapping[str, Any]):
     """Aplica el layout general con posicionamiento absoluto."""
     main_ax = fig.gca()
     
-    # Obtener configuración de layout
-    layout = params.get("layout", {})
-    
     # Definir proporciones
-    header_height = float(layout.get("header_height", 0.15))
-    footer_height = float(layout.get("footer_height", 0.10))
+    geom = frame_geometry(params)
+    header_height = geom["header_height"]
+    footer_height = geom["footer_height"]
     content_height = 1.0 - header_height - footer_height
     
     # Obtener márgenes horizontales
-    margin_left = float(layout.get("margin_left", 0.30))
-    margin_right = float(layout.get("margin_right", 0.15))
+    margin_left = geom["margin_left"]
+    margin_right = geom["margin_right"]
     content_width = 1.0 - margin_left - margin_right
     
     # Dibujar header
@@ -109,15 +137,6 @@ def apply_frame(fig, params: Mapping[str, Any]):
         content_height
     ])
     
-    # Actualizar configuración de branding
-    branding_cfg = params.get("branding", {})
-    branding_cfg.update({
-        "height": footer_height,
-        "margin_left": margin_left,
-        "margin_right": margin_right
-    })
-    params["branding"] = branding_cfg
-    
     # Mantener límites y estado
     xlim, ylim = main_ax.get_xlim(), main_ax.get_ylim()
     visible = main_ax.get_visible()
@@ -127,30 +146,42 @@ def apply_frame(fig, params: Mapping[str, Any]):
     main_ax.set_autoscalex_on(False)
     main_ax.set_autoscaley_on(False)
     
-    fig.canvas.draw()
+    with span("canvas.draw", cat="draw", where="apply_frame"):
+        fig.canvas.draw()
     
     return fig, header_ax, main_ax
 
 
-def finish_and_save(fig, params: Mapping[str, Any]):
-    """Inserta branding estándar y guarda en todos los formatos."""
+def finish_and_save(fig, params: Mapping[str, Any], chrome=()):
+    """
+    Inserta branding estándar y guarda en todos los formatos.
+
+    ``chrome`` son capas pendientes (pares nombre, función(fig)) que se
+    dibujan junto con el branding; ver ``app/chrome.py``.
+    """
+    from .chrome import save_with_chrome
+
     dpi = float(params.get("dpi", 300))
     fig.set_dpi(dpi)
 
-    branding_cfg = params.get("branding", {})
-    add_branding(fig, branding_cfg)
+    # La geometría del marco se deriva de params (no se escribe en ellos)
+    branding_cfg = frame_branding(params)
+    builders = list(chrome) + [("layout.branding", lambda f: add_branding(f, branding_cfg))]
 
     out = Path(params.get("outfile", "out/figure"))
-    formats = params.get("formats", ["png", "svg", "pdf"])
-    print(f"[DEBUG] finish_and_save: Extracted formats from params: {formats}")
-    save_fig_multi(
-        fig,
-        out,
-        formats=formats,
-        jpg_quality=params.get("jpg_quality", 95),
-        webp_quality=params.get("webp_quality", 95), 
-        avif_quality=params.get("avif_quality", 80),
-        scour_svg=params.get("scour_svg", True)
-    )
+    logger.debug("finish_and_save: Extracted formats from params: %s", params.get("formats"))
+
+    def save(formats):
+        save_fig_multi(
+            fig,
+            out,
+            formats=formats,
+            jpg_quality=params.get("jpg_quality", 95),
+            webp_quality=params.get("webp_quality", 95), 
+            avif_quality=params.get("avif_quality", 80),
+            scour_svg=params.get("scour_svg", True)
+        )
+
+    save_with_chrome(fig, params, builders, save)
 
     fig.canvas.draw_idle()
\ No newline at end of file
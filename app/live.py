@@ -0,0 +1,166 @@
+# app/live.py
+"""
+Gráficos "en vivo": se renderizan una vez, quedan en memoria y se vuelven a
+exportar cada vez que cambian los datos.
+
+El primer render es el normal (fuentes, título, cromática, guardado). Cada
+``update`` solo aplica los datos nuevos sobre la figura retenida mediante
+``chart.update_data`` (barras, orden de filas, etiquetas y banderas que
+cambiaron) y vuelve a guardar. Si la forma de los datos cambió (otra
+cantidad de filas o de series) se hace un render completo.
+
+Uso::
+
+    from app.live import LiveChart
+    from app.plots.registry import get_chart_class
+
+    live = LiveChart(get_chart_class("stackedbarh"), "config/medallero.yml")
+    live.update()          # relee el CSV de la configuración
+    live.update(df)        # o recibe el DataFrame desde un hook
+    live.watch()           # re-exporta cada vez que cambia el CSV
+"""
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from app.chart_utils import DATA_PATH_KEYS, load_chart_data
+from app.config_loader import load_config
+from app.config_schema import compile_config
+from app.io_utils import save_fig_multi
+from app.log import ensure_logging, log_context
+from app.profiling import span
+from app.styling import render_context
+
+logger = logging.getLogger(__name__)
+
+def data_path(params) -> Path | None:
+    """Ruta del archivo de datos de la configuración (None si los datos son inline)."""
+    data_config = params.get("data", {})
+    for key in DATA_PATH_KEYS:
+        if key in data_config:
+            return Path(data_config[key])
+    return None
+
+
+class LiveChart:
+    """
+    Gráfico retenido en memoria que se actualiza con datos nuevos.
+
+    Params:
+        chart_class: Clase del gráfico (debe implementar ``update_data`` para
+            actualizarse en el lugar; si no, cada update es un render completo)
+        config_path: Ruta al YAML de configuración
+    """
+
+    def __init__(self, chart_class, config_path):
+        ensure_logging()
+        self.chart_class = chart_class
+        self.config_path = Path(config_path)
+        self.chart_type = getattr(chart_class, "config_kind", None) or chart_class.__name__
+        self.chart = None
+        self.updates = 0
+        with self._context():
+            params = load_config(self.config_path)
+            self.params = compile_config(params, getattr(chart_class, "config_kind", None),
+                                         source=str(self.config_path))
+            self._render(load_chart_data(self.params.get("data", {})))
+
+    def _context(self):
+        return log_context(config=self.config_path.name, chart_type=self.chart_type)
+
+    def _render(self, df):
+        """Render completo; la figura queda retenida para los próximos updates."""
+        if self.chart is not None:
+            self.chart.close()
+        chart = self.chart_class(self.params, df)
+        chart.keep_figure = True
+        with span("render", cat="render", chart=self.chart_class.__name__):
+            chart.render()
+        self.chart = chart
+
+    def update(self, df=None) -> dict[str, Any]:
+        """
+        Aplica datos nuevos y vuelve a exportar.
+
+        Params:
+            df: DataFrame nuevo; si es None se relee la fuente de la configuración
+
+        Returns:
+            dict: Elementos modificados (``bars``, ``labels``, ``flags``), ``full``
+            (True si hubo que renderizar de nuevo) y ``ms`` (tiempo total)
+        """
+        t0 = time.perf_counter()
+        with self._context(), span("live.update", cat="render", chart=self.chart_class.__name__):
+            if df is None:
+                df = load_chart_data(self.params.get("data", {}))
+            # Los artistas nuevos y el guardado usan los estilos del render inicial
+            with render_context(self.params):
+                update_data = getattr(self.chart, "update_data", None)
+                changes = update_data(df) if update_data is not None else None
+                if changes is None:
+                    logger.info("🔁 Cambió la forma de los datos: render completo")
+                    self._render(df)
+                    result = {"full": True}
+                else:
+                    self.export()
+                    result = {**changes, "full": False}
+            result["ms"] = (time.perf_counter() - t0) * 1000
+            self.updates += 1
+            logger.info("⚡ Actualización %s en %.0f ms: %s", self.updates, result["ms"],
+                        {k: v for k, v in result.items() if k != "ms"})
+        return result
+
+    def export(self) -> None:
+        """Guarda la figura retenida en los formatos de la configuración."""
+        params = self.params
+        save_fig_multi(
+            self.chart.fig,
+            Path(params.get("outfile", "out/figure")),
+            formats=params.get("formats", ["png", "svg", "pdf"]),
+            jpg_quality=params.get("jpg_quality", 95),
+            webp_quality=params.get("webp_quality", 95),
+            avif_quality=params.get("avif_quality", 80),
+            scour_svg=params.get("scour_svg", True),
+        )
+
+    def watch(self, interval: float = 2.0, stop: Callable[[], bool] | None = None) -> None:
+        """
+        Re-exporta cada vez que cambia el archivo de datos (consulta su mtime).
+
+        Params:
+            interval: Segundos entre consultas
+            stop: Función que devuelve True para terminar (por defecto, hasta Ctrl+C)
+        """
+        path = data_path(self.params)
+        if path is None:
+            raise ValueError("La configuración no tiene archivo de datos para vigilar (data.csv)")
+        last = path.stat().st_mtime_ns if path.exists() else None
+        logger.info("👀 Vigilando %s cada %.1f s", path, interval)
+        try:
+            while not (stop and stop()):
+                time.sleep(interval)
+                current = path.stat().st_mtime_ns if path.exists() else None
+                if current is None or current == last:
+                    continue
+                last = current
+                try:
+                    self.update()
+                except Exception as e:
+                    logger.error("❌ Error al actualizar %s: %s", self.config_path, e)
+        except KeyboardInterrupt:
+            pass
+
+    def close(self) -> None:
+        """Libera la figura retenida."""
+        if self.chart is not None:
+            self.chart.close()
+            self.chart = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,137 @@
+# app/log.py
+"""
+Logging con niveles para toda la aplicación.
+
+Todos los módulos usan ``logging.getLogger(__name__)`` (jerarquía ``app.*``)
+y mensajes con formato perezoso (``logger.debug("x=%.2f", x)``): si el nivel
+está desactivado, el mensaje nunca se formatea.
+
+- Nivel por defecto ``INFO`` (``CONDATOS_LOG_LEVEL`` o ``--log-level``).
+- ``--quiet`` deja solo advertencias y errores.
+- ``--log-json`` (o ``CONDATOS_LOG_JSON=1``) emite una línea JSON por
+  mensaje, con campos de contexto del render (config y tipo de gráfico).
+- La salida va a stderr, así stdout queda libre para datos.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import sys
+from contextlib import contextmanager
+
+LOGGER_NAME = "app"
+LEVELS = ("debug", "info", "warning", "error")
+
+# Contexto del render en curso (visible en cada registro)
+_context: contextvars.ContextVar[dict] = contextvars.ContextVar("condatos_log_context", default={})
+_handler: logging.Handler | None = None
+
+
+class ContextFilter(logging.Filter):
+    """Agrega a cada registro los campos del contexto de render actual."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        ctx = _context.get()
+        record.context = ctx
+        for key, value in ctx.items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro: ts, level, logger, msg y contexto."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        payload.update(getattr(record, "context", None) or {})
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Solo el mensaje (como los print de siempre); advertencias y errores con su config."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        config = (getattr(record, "context", None) or {}).get("config")
+        if record.levelno >= logging.WARNING and config:
+            text = f"{text} [{config}]"
+        return text
+
+
+def _env_level() -> str:
+    return os.environ.get("CONDATOS_LOG_LEVEL", "info")
+
+
+def _env_json() -> bool:
+    return os.environ.get("CONDATOS_LOG_JSON", "").lower() in ("1", "true", "yes")
+
+
+def setup_logging(level: str | int | None = None, json_format: bool | None = None,
+                  quiet: bool = False, stream=None) -> logging.Logger:
+    """
+    Configura el logger ``app`` (reemplaza la configuración previa).
+
+    Params:
+        level: Nivel (``debug``, ``info``, ``warning``, ``error`` o entero)
+        json_format: Emitir líneas JSON en vez de texto
+        quiet: Equivale a ``level="warning"``
+        stream: Destino (por defecto ``sys.stderr``)
+
+    Returns:
+        logging.Logger: El logger raíz de la aplicación
+    """
+    global _handler
+    if quiet:
+        level = "warning"
+    if level is None:
+        level = _env_level()
+    if json_format is None:
+        json_format = _env_json()
+    if isinstance(level, str):
+        name = level.upper()
+        if name.lower() not in LEVELS:
+            raise ValueError(f"Nivel de log inválido: {level!r} (opciones: {', '.join(LEVELS)})")
+        level = getattr(logging, name)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    if _handler is not None:
+        logger.removeHandler(_handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.addFilter(ContextFilter())
+    handler.setFormatter(JsonFormatter() if json_format else TextFormatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    _handler = handler
+    return logger
+
+
+def ensure_logging() -> None:
+    """Configura el logging con las variables de entorno si nadie lo hizo antes."""
+    logger = logging.getLogger(LOGGER_NAME)
+    if _handler is None and not logger.handlers and not logging.getLogger().handlers:
+        setup_logging()
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Agrega campos de contexto (p. ej. ``config``, ``chart_type``) a los
+    registros emitidos dentro del bloque.
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
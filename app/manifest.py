@@ -0,0 +1,174 @@
+# app/manifest.py
+"""
+Manifiestos de lotes: qué se renderizó, dónde y cuánto tardó.
+
+Cada ejecución de ``batch`` con ``--shard i/N`` (o con ``--manifest``)
+escribe un JSON con el resultado de cada trabajo: clave, estado, tiempo y
+archivos escritos con su tamaño. ``merge_manifests`` une los de todas las
+máquinas en uno solo, ordenado por clave, y avisa si falta un shard o si un
+trabajo aparece dos veces.
+
+El manifiesto unido sirve además como historia de costos: en el próximo lote,
+``load_costs`` entrega el tiempo de cada trabajo y ``app.batch.shard_of``
+reparte por costo en lugar de por hash.
+
+.. code-block:: json
+
+    {
+      "shard": {"index": 2, "count": 3},
+      "created": "2026-10-19T12:00:00+00:00",
+      "host": "render-02",
+      "totals": {"jobs": 4, "ok": 4, "error": 0, "ms": 3120.5, "bytes": 812345},
+      "jobs": [{"key": "config/a.yml", "status": "ok", "ms": 790.1, "outputs": [...]}]
+    }
+"""
+from __future__ import annotations
+
+import json
+import logging
+import socket
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def shard_filename(index: int, count: int) -> str:
+    """Nombre del manifiesto de un shard: ``shard-2-of-3.json``."""
+    return f"shard-{index}-of-{count}.json"
+
+
+def _totals(jobs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Cantidad de trabajos, estados, tiempo y bytes escritos."""
+    ok = sum(job.get("status") == "ok" for job in jobs)
+    return {
+        "jobs": len(jobs),
+        "ok": ok,
+        "error": len(jobs) - ok,
+        "ms": round(sum(job.get("ms") or 0 for job in jobs), 1),
+        "bytes": sum(out.get("bytes", 0) for job in jobs for out in job.get("outputs") or []),
+    }
+
+
+def _entry(result: dict[str, Any]) -> dict[str, Any]:
+    """Entrada de un trabajo (sin datos del proceso que lo ejecutó)."""
+    entry = {k: result[k] for k in ("key", "name", "chart", "outfile", "status", "error", "outputs")
+             if result.get(k) is not None}
+    entry["ms"] = round(result.get("ms") or 0, 1)
+    return entry
+
+
+def write_manifest(results: Iterable[dict[str, Any]], path, shard: tuple[int, int] | None = None) -> Path:
+    """
+    Escribe el manifiesto de un lote (o de un shard).
+
+    Params:
+        results: Resultados de ``app.batch.run_jobs``
+        path: Archivo JSON de salida
+        shard: ``(i, N)`` si el lote es un shard
+
+    Returns:
+        Path: Ruta del manifiesto
+    """
+    jobs = sorted((_entry(r) for r in results), key=lambda job: job["key"])
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "shard": {"index": shard[0], "count": shard[1]} if shard else None,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": socket.gethostname(),
+        "totals": _totals(jobs),
+        "jobs": jobs,
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+    logger.info("🧾 Manifiesto: %s (%s trabajos)", path, len(jobs))
+    return path
+
+
+def read_manifest(path) -> dict[str, Any]:
+    """
+    Lee un manifiesto.
+
+    Raises:
+        ValueError: si el archivo no es un manifiesto de lote
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("jobs"), list):
+        raise ValueError(f"{path}: no es un manifiesto de lote (falta 'jobs')")
+    return manifest
+
+
+def merge_manifests(paths: Iterable, out=None) -> dict[str, Any]:
+    """
+    Une manifiestos de shards en uno solo.
+
+    Avisa (sin fallar) si faltan shards de un mismo ``N`` o si una clave
+    aparece en más de un manifiesto; en ese caso queda la última leída.
+
+    Params:
+        paths: Manifiestos a unir
+        out: Archivo JSON de salida (opcional)
+
+    Returns:
+        dict: Manifiesto unido, con ``shards`` (los que se unieron) y ``missing_shards``
+    """
+    jobs: dict[str, dict[str, Any]] = {}
+    shards, counts, hosts = [], set(), set()
+    for path in map(Path, paths):
+        manifest = read_manifest(path)
+        shard = manifest.get("shard")
+        if shard:
+            shards.append(shard["index"])
+            counts.add(shard["count"])
+        if manifest.get("host"):
+            hosts.add(manifest["host"])
+        for job in manifest["jobs"]:
+            if job["key"] in jobs:
+                logger.warning("⚠️ %s aparece en más de un manifiesto; se usa el de %s", job["key"], path.name)
+            jobs[job["key"]] = job
+
+    if len(counts) > 1:
+        logger.warning("⚠️ Los manifiestos son de repartos distintos (N = %s)", sorted(counts))
+    missing = sorted(set(range(1, max(counts) + 1)) - set(shards)) if counts else []
+    if missing:
+        logger.warning("⚠️ Faltan shards: %s de %s", missing, max(counts))
+
+    merged_jobs = [jobs[key] for key in sorted(jobs)]
+    merged = {
+        "version": MANIFEST_VERSION,
+        "shard": None,
+        "shards": sorted(shards),
+        "missing_shards": missing,
+        "hosts": sorted(hosts),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "totals": _totals(merged_jobs),
+        "jobs": merged_jobs,
+    }
+    if out is not None:
+        out = Path(out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(merged, ensure_ascii=False, indent=2), encoding="utf-8")
+    totals = merged["totals"]
+    logger.info("🧾 Manifiestos unidos: %s trabajos (%s ok, %s con error) de %s archivo(s)%s",
+                totals["jobs"], totals["ok"], totals["error"], len(shards) or len(hosts),
+                f" → {out}" if out is not None else "")
+    return merged
+
+
+def load_costs(path) -> dict[str, float]:
+    """
+    Tiempo (ms) de cada trabajo exitoso de un manifiesto anterior, por clave.
+    Devuelve ``{}`` si el archivo no existe.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return {job["key"]: float(job["ms"]) for job in read_manifest(path)["jobs"]
+            if job.get("status") == "ok" and job.get("ms")}
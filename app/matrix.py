@@ -0,0 +1,159 @@
+# app/matrix.py
+"""
+Configuraciones ``matrix``: un YAML que se expande en muchos renders.
+
+.. code-block:: yaml
+
+    matrix:
+      anio: [2019, 2021, 2023]     # valores fijos
+      deporte: auto                # todos los valores de la columna en los datos
+    outfile: "out/medallero-{anio}-{deporte}"
+    title: "Medallero {anio}: {deporte}"
+
+Se genera un render por cada combinación de valores. En los textos de la
+configuración (``outfile``, ``title``, ``footer.source``, ...) ``{clave}`` se
+reemplaza por el valor de la combinación. Las claves que son columnas de los
+datos además filtran: los datos se cargan una vez y se parten con un solo
+``groupby``; cada gráfico recibe solo sus filas, sin esas columnas.
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import re
+from pathlib import Path
+from typing import Any, Mapping
+
+from app.config_schema import compile_config, thaw
+
+logger = logging.getLogger(__name__)
+
+# Valores que piden todos los de la columna
+AUTO_VALUES = ("auto", "all", "*")
+
+
+def matrix_axes(params: Mapping[str, Any], df) -> dict[str, list]:
+    """
+    Valores de cada clave de ``matrix``.
+
+    Raises:
+        ValueError: si una clave ``auto`` no es columna de los datos o no tiene valores
+    """
+    axes = {}
+    for key, values in (params.get("matrix") or {}).items():
+        if values is None or (isinstance(values, str) and values.lower() in AUTO_VALUES):
+            if key not in df.columns:
+                raise ValueError(f"matrix.{key}: 'auto' necesita una columna '{key}' en los datos")
+            values = sorted(df[key].dropna().unique().tolist())
+        elif not isinstance(values, (list, tuple)):
+            values = [values]
+        if not values:
+            raise ValueError(f"matrix.{key}: no hay valores")
+        axes[str(key)] = list(values)
+    return axes
+
+
+def fill(obj, values: Mapping[str, Any], pattern: re.Pattern):
+    """Reemplaza ``{clave}`` en todos los textos de ``obj`` (no toca otros ``{...}`` como ``{:.0f}``)."""
+    if isinstance(obj, str):
+        return pattern.sub(lambda m: str(values[m.group(1)]), obj)
+    if isinstance(obj, Mapping):
+        return {k: fill(v, values, pattern) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [fill(v, values, pattern) for v in obj]
+    return obj
+
+
+def partitions(df, keys: list[str]) -> dict[tuple, Any]:
+    """
+    Posiciones de las filas de cada combinación de ``keys`` (un solo ``groupby``).
+
+    Las claves se comparan como texto, para que ``2019`` en el YAML coincida
+    con ``2019`` o ``"2019"`` en el CSV.
+    """
+    if not keys:
+        return {}
+    groups = df.groupby(keys if len(keys) > 1 else keys[0], sort=False, dropna=True).indices
+    result = {}
+    for key, rows in groups.items():
+        key = key if isinstance(key, tuple) else (key,)
+        result[tuple(str(k) for k in key)] = rows
+    return result
+
+
+def expand(params: Mapping[str, Any], df, kind: str | None = None, source: str | None = None) -> list[dict[str, Any]]:
+    """
+    Combinaciones de ``matrix`` con sus parámetros compilados y sus datos.
+
+    Returns:
+        list: Diccionarios con ``name``, ``values``, ``params`` y ``df``
+    """
+    axes = matrix_axes(params, df)
+    names = list(axes)
+    pattern = re.compile(r"\{(" + "|".join(re.escape(k) for k in names) + r")\}")
+    data_keys = [k for k in names if k in df.columns]
+    groups = partitions(df, data_keys)
+
+    raw = thaw(params)
+    raw.pop("matrix", None)
+    if not pattern.search(str(raw.get("outfile", ""))):
+        # Sin {clave} en outfile, todos los renders escribirían el mismo archivo
+        outfile = Path(raw.get("outfile", "out/figure"))
+        raw["outfile"] = str(outfile.with_name(outfile.name + "".join(f"-{{{k}}}" for k in names)))
+
+    combos = []
+    for combo in itertools.product(*axes.values()):
+        values = dict(zip(names, combo))
+        name = ",".join(f"{k}={v}" for k, v in values.items())
+        part = df
+        if data_keys:
+            rows = groups.get(tuple(str(values[k]) for k in data_keys))
+            if rows is None:
+                logger.warning("⚠️ matrix: sin datos para %s; se omite", name)
+                continue
+            part = df.take(rows).drop(columns=data_keys).reset_index(drop=True)
+        combos.append({
+            "name": name,
+            "values": values,
+            "params": compile_config(fill(raw, values, pattern), kind, source=source),
+            "df": part,
+        })
+    logger.info("🧮 matrix: %s combinaciones de %s", len(combos), " × ".join(f"{k} ({len(v)})" for k, v in axes.items()))
+    return combos
+
+
+def matrix_jobs(chart_type: str, config, params=None, df=None) -> list:
+    """Un ``RenderJob`` por combinación de la ``matrix`` del YAML ``config``."""
+    from app.batch import RenderJob
+    from app.chart_utils import load_chart_data
+    from app.config_loader import load_config
+    from app.plots.registry import get_chart_class
+
+    kind = getattr(get_chart_class(chart_type), "config_kind", None)
+    if params is None:
+        params = compile_config(load_config(config), kind, source=str(config))
+    if df is None:
+        df = load_chart_data(params.get("data", {}))
+    base = Path(config).name if config else chart_type
+    key = Path(config).as_posix() if config else chart_type
+    return [RenderJob(chart_type, config, params=c["params"], df=c["df"], name=f"{base}[{c['name']}]",
+                      key=f"{key}[{c['name']}]")
+            for c in expand(params, df, kind, source=str(config) if config else None)]
+
+
+def render_matrix(chart_class, params, df, *, source: str | None = None, workers: int | None = None):
+    """
+    Renderiza todas las combinaciones de ``matrix`` (ver ``app.batch.run_jobs``).
+
+    Returns:
+        list: Resultado de cada render
+    """
+    from app.batch import run_jobs
+    from app.plots.registry import CHART_TYPES
+
+    chart_type = next((name for name, entry in CHART_TYPES.items()
+                       if entry["class"] == chart_class.__name__), chart_class.__name__)
+    if workers is None:
+        workers = params.get("matrix_workers")
+    jobs = matrix_jobs(chart_type, source, params=params, df=df)
+    return run_jobs(jobs, workers)
@@ -2,10 +2,13 @@
 from __future__ import annotations
 import typer
 
+from .cli import add_global_options
+from .plots.registry import add_commands
+
 app = typer.Typer(help="Condatos · Figuras estáticas")
+add_global_options(app)
 
-from .plots import stackedbarh as _stackedbarh_mod
-_stackedbarh_mod.add_command(app)
+add_commands(app, ["stackedbarh"])
 
 if __name__ == "__main__":
     app()
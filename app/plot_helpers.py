@@ -1,21 +1,24 @@
 # app/plot_helpers.py
 from __future__ import annotations
+import logging
 from typing import Mapping, Any
 from pathlib import Path
 import hashlib, io
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from matplotlib.axes import Axes
 from PIL import Image
 from .branding import add_branding
 from .io_utils import save_fig_multi
+from .images import load_image
+from .profiling import span
 from matplotlib.legend_handler import HandlerBase
-import matplotlib.pyplot as plt
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 # =============================
 # IO / utilidades de imágenes
 # =============================
@@ -26,6 +29,11 @@ def load_image_cached(path_or_url: str, cache_dir: str | None = None):
     """
     if not path_or_url:
         return None
+    with span("image_load", cat="io", path=path_or_url):
+        return _load_image_cached(path_or_url, cache_dir)
+
+
+def _load_image_cached(path_or_url: str, cache_dir: str | None):
 
     is_url = path_or_url.startswith("http://") or path_or_url.startswith("https://")
     if not is_url:
@@ -165,13 +173,13 @@ def autosize_for_rows(params: dict, n_rows: int):
     return (width_in, height_in)
 
 
-def draw_broken_axis_marks(ax: plt.Axes, x: float, y: float, width: float = 0.03, height: float = 0.015, angle: float = 45, color: str = "#333333") -> None:
+def draw_broken_axis_marks(ax: Axes, x: float, y: float, width: float = 0.03, height: float = 0.015, angle: float = 45, color: str = "#333333") -> None:
     """
     Dibuja marcas de eje roto en una posición específica.
     
     Parameters
     ----------
-    ax : plt.Axes
+    ax : Axes
         El eje donde dibujar las marcas
     x : float
         Posición x del centro de las marcas
@@ -339,7 +347,7 @@ def draw_total_labels(
 # =============================
 
 def add_offset_image(
-    ax: plt.Axes,
+    ax: Axes,
     im_arr: np.ndarray,
     xdata: float,
     ydata: float,
@@ -354,7 +362,7 @@ def add_offset_image(
     
     Parameters
     ----------
-    ax : plt.Axes
+    ax : Axes
         El eje donde añadir la imagen
     im_arr : np.ndarray
         Array de la imagen (RGBA)
@@ -429,7 +437,8 @@ def add_flags_stackedbarh(ax, df, cats, totals, y_positions, flags_cfg: dict, to
 
     # Asegura límites actualizados (por si hace falta leer xlim)
     try:
-        ax.figure.canvas.draw()
+        with span("canvas.draw", cat="draw", where="add_flags"):
+            ax.figure.canvas.draw()
     except Exception:
         pass
 
@@ -444,8 +453,7 @@ def add_flags_stackedbarh(ax, df, cats, totals, y_positions, flags_cfg: dict, to
         im = load_image_cached(path_or_url, cache_dir=cache_dir)
         if im is None:
             if debug:
-                from rich import print as rprint
-                rprint(f"[yellow][flags] no se pudo cargar: {path_or_url}[/yellow]")
+                logger.warning("[flags] no se pudo cargar: %s", path_or_url)
             continue
 
         y = y_positions[i]
@@ -496,8 +504,7 @@ def add_flags_stackedbar(ax, df, cats, tops, x_positions, flags_cfg: dict):
         im = load_image_cached(path_or_url, cache_dir=cache_dir)
         if im is None:
             if debug:
-                from rich import print as rprint
-                rprint(f"[yellow][flags] no se pudo cargar: {path_or_url}[/yellow]")
+                logger.warning("[flags] no se pudo cargar: %s", path_or_url)
             continue
 
         x_i = float(x_positions[i])
@@ -538,7 +545,8 @@ def adjust_yaxis_labels(ax, padding_pts: float = 20, fontsize: float = 9) -> Non
 
     # Calcula y ajusta los márgenes
     fig = ax.figure
-    fig.canvas.draw()
+    with span("canvas.draw", cat="draw", where="adjust_yaxis_labels"):
+        fig.canvas.draw()
     bbox = ax.get_yaxis().get_tightbbox(fig.canvas.get_renderer())
     transform = fig.dpi_scale_trans.inverted()
     margin_left = bbox.width + padding_pts
@@ -664,23 +672,22 @@ class ImageHandler(HandlerBase):
         super().__init__()
     
     def create_artists(self, legend, orig_handle, xdescent, ydescent, width, height, fontsize, trans):
-        from matplotlib.image import imread
         from matplotlib.offsetbox import OffsetImage, AnnotationBbox
         from matplotlib.patches import Rectangle
         import numpy as np
         
         # Cargar la imagen
-        img = imread(self.image_path)
-        print(f"[DEBUG] Imagen cargada: {self.image_path} shape={img.shape} dtype={img.dtype}")
+        img = load_image(self.image_path)
+        logger.debug("Imagen cargada: %s shape=%s dtype=%s", self.image_path, img.shape, img.dtype)
         # Si tiene canal alfa, convertir a RGB ignorando alfa
         if img.ndim == 3 and img.shape[2] == 4:
             alpha = img[..., 3]
             if np.all(alpha == 0):
-                print(f"⚠️ Imagen completamente transparente: {self.image_path}")
+                logger.warning("⚠️ Imagen completamente transparente: %s", self.image_path)
             img = img[..., :3]  # Quitar canal alfa
-            print(f"[DEBUG] Imagen convertida a RGB (sin alfa): shape={img.shape}")
+            logger.debug("Imagen convertida a RGB (sin alfa): shape=%s", img.shape)
         elif np.all(img == 0):
-            print(f"⚠️ Imagen completamente vacía (todo ceros): {self.image_path}")
+            logger.warning("⚠️ Imagen completamente vacía (todo ceros): %s", self.image_path)
 
         # Crear imagen con zoom (prueba con zoom mayor si no se ve)
         imagebox = OffsetImage(img, zoom=max(self.zoom, 0.3))
@@ -730,7 +737,6 @@ class ColorableSVGHandler(HandlerBase):
     
     def create_artists(self, legend, orig_handle, xdescent, ydescent, width, height, fontsize, trans):
         import io
-        import matplotlib.pyplot as plt
         from matplotlib.offsetbox import OffsetImage, AnnotationBbox
         from pathlib import Path
         
@@ -750,10 +756,7 @@ class ColorableSVGHandler(HandlerBase):
         
         # Usar matplotlib para cargar el SVG modificado
         try:
-            # Crear una figura temporal para cargar el SVG
-            temp_fig = plt.figure(figsize=(1, 1), dpi=100)
-            img = plt.imread(svg_buffer, format='svg')
-            plt.close(temp_fig)
+            img = mpimg.imread(svg_buffer, format='svg')
             
             # Crear imagen con zoom
             imagebox = OffsetImage(img, zoom=self.zoom)
@@ -772,7 +775,7 @@ class ColorableSVGHandler(HandlerBase):
             return [ab]
             
         except Exception as e:
-            print(f"⚠️ Error al cargar SVG coloreado: {e}")
+            logger.warning("⚠️ Error al cargar SVG coloreado: %s", e)
             # Fallback: usar un rectángulo del color especificado
             from matplotlib.patches import Rectangle
             rect = Rectangle((xdescent, ydescent), width, height, 
@@ -799,7 +802,6 @@ def add_logo_to_figure(fig, logo_config):
     if not logo_config or not logo_config.get("path"):
         return
         
-    from matplotlib.image import imread
     from matplotlib.offsetbox import OffsetImage, AnnotationBbox
     from pathlib import Path
     
@@ -810,17 +812,17 @@ def add_logo_to_figure(fig, logo_config):
     margin = logo_config.get("margin", 0.02)
     
     if not Path(logo_path).exists():
-        print(f"⚠️ No se encontró el archivo de logo: {logo_path}")
+        logger.warning("⚠️ No se encontró el archivo de logo: %s", logo_path)
         return
         
-    img = imread(logo_path)
+    img = load_image(logo_path)
     imagebox = OffsetImage(img, zoom=zoom)
     
     # Determinar posición
     x, y = 0.9, 0.9  # Valores por defecto
     
-    print(f"📌 Añadiendo logo desde: {logo_path}")
-    print(f"📌 Posición configurada: {position}")
+    logger.debug("📌 Añadiendo logo desde: %s", logo_path)
+    logger.debug("📌 Posición configurada: %s", position)
     
     if position == "above_legend":
         # Buscar la leyenda en todos los ejes, incluyendo legend_ax que podría existir para leyendas personalizadas
@@ -834,7 +836,7 @@ def add_logo_to_figure(fig, logo_config):
                 bbox = legend.get_window_extent().transformed(fig.transFigure.inverted())
                 x = (bbox.x0 + bbox.x1) / 2
                 y = bbox.y1 + margin
-                print(f"📌 Leyenda estándar encontrada, colocando logo en x={x:.2f}, y={y:.2f}")
+                logger.debug("📌 Leyenda estándar encontrada, colocando logo en x=%.2f, y=%.2f", x, y)
                 break
         
         # Si no se encontró una leyenda estándar, buscar un axes específico para leyenda personalizada
@@ -846,30 +848,30 @@ def add_logo_to_figure(fig, logo_config):
                     bbox = ax.get_window_extent().transformed(fig.transFigure.inverted())
                     x = (bbox.x0 + bbox.x1) / 2
                     y = bbox.y1 + margin
-                    print(f"📌 Axes de leyenda personalizada encontrado, colocando logo en x={x:.2f}, y={y:.2f}")
+                    logger.debug("📌 Axes de leyenda personalizada encontrado, colocando logo en x=%.2f, y=%.2f", x, y)
                     break
         
         # Posición fallback si no se encuentra ninguna leyenda
         if not legend_found:
-            print("⚠️ No se encontró leyenda para posicionar el logo encima, usando posición predeterminada")
+            logger.warning("⚠️ No se encontró leyenda para posicionar el logo encima, usando posición predeterminada")
             # Usar una posición razonable en el cuadrante derecho superior
             if logo_config.get("fallback_position") == "top_right":
                 x, y = 0.9, 0.9
-                print(f"📌 Usando posición fallback para logo en esquina superior derecha: x={x}, y={y}")
+                logger.debug("📌 Usando posición fallback para logo en esquina superior derecha: x=%s, y=%s", x, y)
             elif logo_config.get("fallback_position") == "top_center":
                 x, y = 0.5, 0.9
-                print(f"📌 Usando posición fallback para logo en centro superior: x={x}, y={y}")
+                logger.debug("📌 Usando posición fallback para logo en centro superior: x=%s, y=%s", x, y)
                 
     elif position == "top_left":
         x, y = 0.05, 0.95
-        print(f"📌 Logo en esquina superior izquierda: x={x}, y={y}")
+        logger.debug("📌 Logo en esquina superior izquierda: x=%s, y=%s", x, y)
     elif position == "top_right":
         x, y = 0.95, 0.95
-        print(f"📌 Logo en esquina superior derecha: x={x}, y={y}")
+        logger.debug("📌 Logo en esquina superior derecha: x=%s, y=%s", x, y)
     elif position == "custom":
         x = logo_config.get("x", 0.9)
         y = logo_config.get("y", 0.9)
-        print(f"📌 Logo en posición personalizada: x={x}, y={y}")
+        logger.debug("📌 Logo en posición personalizada: x=%s, y=%s", x, y)
     
     # Añadir logo
     ab = AnnotationBbox(
@@ -906,35 +908,35 @@ def create_custom_legend_with_images(ax, fig, legend_config):
     if legend_config.get("custom_icons") and legend_config.get("use_direct_drawing", True):
         try:
             from .custom_legend import CustomImageLegend
-            print("🔍 Leyenda personalizada: Usando implementación directa con CustomImageLegend")
+            logger.debug("🔍 Leyenda personalizada: Usando implementación directa con CustomImageLegend")
             custom_legend = CustomImageLegend(fig, ax, legend_config)
             if custom_legend.draw():
-                print("✅ Leyenda personalizada dibujada correctamente con CustomImageLegend")
+                logger.debug("✅ Leyenda personalizada dibujada correctamente con CustomImageLegend")
                 return None  # No hay leyenda estándar para devolver
             else:
-                print("⚠️ Error al dibujar leyenda personalizada, intentando método alternativo")
+                logger.warning("⚠️ Error al dibujar leyenda personalizada, intentando método alternativo")
         except Exception as e:
-            print(f"❌ Error con CustomImageLegend: {e}. Usando método alternativo.")
+            logger.error("❌ Error con CustomImageLegend: %s. Usando método alternativo.", e)
     
     # Si no se usa la implementación directa o falló, usar el método original
     if not legend_config.get("custom_icons"):
         return None
         
-    print("🔍 Creando leyenda personalizada con imágenes (método original)")
+    logger.debug("🔍 Creando leyenda personalizada con imágenes (método original)")
         
     icons = legend_config.get("icons", [])
     if not icons:
-        print("⚠️ Se solicitó leyenda con íconos pero no se proporcionaron imágenes.")
+        logger.warning("⚠️ Se solicitó leyenda con íconos pero no se proporcionaron imágenes.")
         return None
         
-    print(f"🔍 Encontradas {len(icons)} imágenes para la leyenda personalizada")
+    logger.debug("🔍 Encontradas %s imágenes para la leyenda personalizada", len(icons))
     
     # Crear elementos ficticios para la leyenda
     import matplotlib.patches as mpatches
     handles = [mpatches.Rectangle((0, 0), 1, 1) for _ in range(len(icons))]
     labels = [icon.get("label", f"Item {i+1}") for i, icon in enumerate(icons)]
     
-    print(f"🔍 Etiquetas para la leyenda: {labels}")
+    logger.debug("🔍 Etiquetas para la leyenda: %s", labels)
     
     # Crear diccionario de handlers
     handler_map = {}
@@ -947,26 +949,26 @@ def create_custom_legend_with_images(ax, fig, legend_config):
             zoom = icon.get("zoom", 0.15)
             
             if not Path(svg_path).exists():
-                print(f"⚠️ No se encontró el SVG plantilla: {svg_path}")
+                logger.warning("⚠️ No se encontró el SVG plantilla: %s", svg_path)
                 continue
             
             handler_map[handle] = ColorableSVGHandler(svg_path, color, zoom)
-            print(f"✅ SVG coloreable añadido: {svg_path} con color {color} (zoom={zoom})")
+            logger.debug("✅ SVG coloreable añadido: %s con color %s (zoom=%s)", svg_path, color, zoom)
             
         else:
             # Es una imagen normal
             image_path = icon.get("image")
             if not image_path:
-                print(f"⚠️ No se especificó ruta de imagen para el elemento {i+1}")
+                logger.warning("⚠️ No se especificó ruta de imagen para el elemento %s", i + 1)
                 continue
                 
             if not Path(image_path).exists():
-                print(f"⚠️ No se encontró la imagen para la leyenda: {image_path}")
+                logger.warning("⚠️ No se encontró la imagen para la leyenda: %s", image_path)
                 continue
             
             zoom = icon.get("zoom", 0.15)
             handler_map[handle] = ImageHandler(image_path, zoom)
-            print(f"✅ Imagen añadida correctamente: {image_path} (zoom={zoom})")
+            logger.debug("✅ Imagen añadida correctamente: %s (zoom=%s)", image_path, zoom)
     
     # Extraer parámetros de configuración de la leyenda
     # Lista de parámetros que sabemos que son compatibles con la leyenda de matplotlib
@@ -988,7 +990,7 @@ def create_custom_legend_with_images(ax, fig, legend_config):
     title_fontsize = legend_config.get('title_fontsize')
     title_fontweight = legend_config.get('title_fontweight')
     
-    print(f"🔍 Parámetros filtrados para la leyenda: {legend_params}")
+    logger.debug("🔍 Parámetros filtrados para la leyenda: %s", legend_params)
     
     # Añadir leyenda con handlers personalizados
     legend = ax.legend(handles, labels, handler_map=handler_map, **legend_params)
@@ -1027,7 +1029,7 @@ def add_logo_above_legend(fig, ax, logo_config):
         
     logo_path = logo_config.get("path")
     if not Path(logo_path).exists():
-        print(f"⚠️ No se encontró el archivo de logo: {logo_path}")
+        logger.warning("⚠️ No se encontró el archivo de logo: %s", logo_path)
         return None
     
     zoom = logo_config.get("zoom", 0.15)
@@ -1035,8 +1037,7 @@ def add_logo_above_legend(fig, ax, logo_config):
     margin = logo_config.get("margin", 0.02)  # Margen entre logo y leyenda
     
     # Cargar logo
-    from matplotlib.image import imread
-    img = imread(logo_path)
+    img = load_image(logo_path)
     imagebox = OffsetImage(img, zoom=zoom)
     
     # Determinar posición
@@ -1049,7 +1050,7 @@ def add_logo_above_legend(fig, ax, logo_config):
             x = (bbox.x0 + bbox.x1) / 2
             y = bbox.y1 + margin
         else:
-            print("⚠️ Se solicitó logo sobre leyenda pero no hay leyenda visible.")
+            logger.warning("⚠️ Se solicitó logo sobre leyenda pero no hay leyenda visible.")
             position = "custom"  # Fallback a posición personalizada
     
     if position == "custom":
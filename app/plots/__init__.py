@@ -1,17 +1,15 @@
 # app/plots/__init__.py
 # Permite importar los módulos de graficación directamente desde app.plots
+#
+# Los módulos de cada gráfico NO se importan aquí: los comandos de la CLI se
+# registran desde app/plots/registry.py y cada módulo se carga solo cuando se
+# usa (``app.plots.barv``, ``from app.plots import linechart``, etc.).
+import importlib
 
-# Registramos todos los gráficos disponibles en el paquete
-# Esto permite que se registren los comandos cuando se importan en main.py
+from .registry import CHART_TYPES
 
-# Evitar importación circular cuando se ejecuta directamente como módulo
-import sys
-import os
 
-# Estos imports registran los comandos en la CLI
-# Importación condicional para evitar advertencias cuando se ejecuta directamente
-if not (len(sys.argv) > 0 and sys.argv[0].endswith('__main__.py') and 
-        os.path.basename(sys.argv[0].replace('__main__.py', '')) in ['barv', 'stackedbarh', 'linechart']):
-    import app.plots.barv
-    import app.plots.stackedbarh
-    import app.plots.linechart
+def __getattr__(name):
+    if name in CHART_TYPES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
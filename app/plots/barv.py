@@ -1,26 +1,39 @@
+import logging
 from pathlib import Path
 import typer
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.ticker import FixedFormatter, FixedLocator
 
 from app.plots.base_chart import BaseChart
+from app.chart_data import ChartData
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
 
 class VerticalBarChart(BaseChart):
     """
     Clase para gráficos de barras verticales.
     Hereda de BaseChart e implementa los métodos específicos para este tipo de gráfico.
     """
+    config_kind = "barv"
+
     def setup_dimensions(self):
         """Configura las dimensiones del gráfico basado en el contenido."""
-        autosize = self.params.get("autosize", {})
+        text_length = max(len(str(cat)) for cat in self.cats)
+        # Las dimensiones se guardan en la instancia; los parámetros son inmutables
+        self.width_in, self.height_in = self.estimate_size(self.params, len(self.cats), text_length)
+        
+    @classmethod
+    def estimate_size(cls, params, rows, label_len=0):
+        """Ancho según la cantidad de categorías y alto según la categoría más larga."""
+        autosize = params.get("autosize", {})
         if autosize.get("enabled", False) or True:  # Siempre usar el autoajuste como en stackedbarh
             # Calcular ancho basado en el número de categorías
-            n_cols = len(self.cats)
             width_per_col = float(autosize.get("width_per_col", 0.6))
             
             # Calcular ancho total necesario
-            total_width = n_cols * width_per_col
+            total_width = rows * width_per_col
             
             # Aplicar límites min/max
             width_in = min(
@@ -32,21 +45,16 @@ class VerticalBarChart(BaseChart):
             add_width_ratio = float(autosize.get("add_width_ratio", 0))
             if add_width_ratio > 0:
                 width_in += width_in * add_width_ratio
-                print(f"📏 Añadiendo {add_width_ratio*100:.1f}% de ancho extra para títulos grandes")
+                logger.debug("📏 Añadiendo %.1f%% de ancho extra para títulos grandes", add_width_ratio * 100)
             
             # Altura proporcional al contenido
-            text_length = max(len(str(cat)) for cat in self.cats)
             base_height = float(autosize.get("base_height", 6))
-            height_adjustment = text_length * 0.1
-            height_in = base_height + height_adjustment if autosize.get("adjust_height", False) else float(self.params.get("height_in", 6))
+            height_adjustment = label_len * 0.1
+            height_in = base_height + height_adjustment if autosize.get("adjust_height", False) else float(params.get("height_in", 6))
         else:
-            width_in = float(self.params.get("width_in", 8))
-            height_in = float(self.params.get("height_in", 6))
-
-        self.params.update({
-            "width_in": width_in,
-            "height_in": height_in
-        })
+            width_in = float(params.get("width_in", 8))
+            height_in = float(params.get("height_in", 6))
+        return width_in, height_in
         
     def create_figure(self):
         """Crea la figura con las dimensiones adecuadas y configura los ejes."""
@@ -68,7 +76,7 @@ class VerticalBarChart(BaseChart):
         # Calcular y aplicar los márgenes
         self.ax.set_position([margin_left, margin_bottom, 1.0-margin_left-margin_right, 1.0-margin_bottom-margin_top])
         
-        print(f"ℹ️ Márgenes aplicados: izq={margin_left:.2f}, der={margin_right:.2f}, inf={margin_bottom:.2f}, sup={margin_top:.2f}")
+        logger.debug("ℹ️ Márgenes aplicados: izq=%.2f, der=%.2f, inf=%.2f, sup=%.2f", margin_left, margin_right, margin_bottom, margin_top)
         
         return self.fig
 
@@ -78,14 +86,14 @@ class VerticalBarChart(BaseChart):
         cat_col_from_params = self.params.get("data", {}).get("category_col")
         self.cat_col = cat_col_from_params if cat_col_from_params else self.df.columns[0]
         
-        print(f"🔍 En prepare_data: Usando columna de categorías: '{self.cat_col}'")
+        logger.debug("🔍 En prepare_data: Usando columna de categorías: '%s'", self.cat_col)
         
         # Determinar columna para los valores
         value_col = self.params.get("data", {}).get("value_col")
         
         if value_col and value_col in self.df.columns:
             self.value_col = value_col
-            print(f"🔍 Usando columna de valores: '{self.value_col}'")
+            logger.debug("🔍 Usando columna de valores: '%s'", self.value_col)
         else:
             # Si no se especifica una columna de valores, intentar detectar automáticamente
             numeric_cols = [c for c in self.df.columns if c != self.cat_col and 
@@ -96,49 +104,40 @@ class VerticalBarChart(BaseChart):
             
             # Usar la primera columna numérica disponible
             self.value_col = numeric_cols[0]
-            print(f"🔍 Usando primera columna numérica como valores: '{self.value_col}'")
-        
-        # Preparar datos
-        self.cats = self.df[self.cat_col].astype(str).tolist()
-        values = self.df[self.value_col].astype(float).tolist()
+            logger.debug("🔍 Usando primera columna numérica como valores: '%s'", self.value_col)
+        
+        # Preparar datos (arreglos contiguos, ordenados sin pasar por listas de Python)
+        invert_order = self.params.get("invert_order", False)
+        sort_by_value = self.params.get("sort_by_value", False)
+        self.data = ChartData.from_frame(
+            self.df,
+            self.cat_col,
+            [self.value_col],
+            sort_by=ChartData.BY_TOTAL if sort_by_value else None,
+            ascending=bool(invert_order),
+            sort_kind="stable",
+        )
         
         # Aplicar transformación de valores si está configurada
         transform_values = self.params.get("data", {}).get("transform_values", False)
         if transform_values:
             # Por defecto, convertir de millones a miles de millones
             divisor = float(self.params.get("data", {}).get("value_divisor", 1000))
-            values = [val / divisor for val in values]
-            print(f"🔄 Transformando valores: dividiendo por {divisor}")
+            self.data.scale(divisor)
+            logger.debug("🔄 Transformando valores: dividiendo por %s", divisor)
             
-        self.values = values
+        self.cats = self.data.cats
+        self.values = self.data.values[0]
         
         # Ordenar si se especifica
-        if self.params.get("sort_by_value", False):
-            # Crear pares (categoría, valor) para ordenar
-            cat_val_pairs = list(zip(self.cats, self.values))
-            
-            # Ordenar por valores
-            invert_order = self.params.get("invert_order", False)
+        if sort_by_value:
             if invert_order:
-                # Orden ascendente
-                cat_val_pairs.sort(key=lambda x: x[1])
-                print("🔄 Aplicando orden ASCENDENTE (de menor a mayor)")
+                logger.debug("🔄 Aplicando orden ASCENDENTE (de menor a mayor)")
             else:
-                # Orden descendente (por defecto)
-                cat_val_pairs.sort(key=lambda x: x[1], reverse=True)
-                print("🔄 Aplicando orden DESCENDENTE (de mayor a menor)")
-            
-            # Desempaquetar las listas ordenadas
-            self.cats, self.values = zip(*cat_val_pairs)
-            
-            # Convertir a listas
-            self.cats = list(self.cats)
-            self.values = list(self.values)
+                logger.debug("🔄 Aplicando orden DESCENDENTE (de mayor a menor)")
             
             # Imprimir información de depuración
-            print("📊 Primeras 5 categorías después de ordenar:")
-            for i, (cat, val) in enumerate(zip(self.cats[:5], self.values[:5])):
-                print(f"  - {i+1}: {cat} = {val}")
+            logger.debug("📊 Primeras 5 categorías después de ordenar: %s", list(zip(self.cats[:5], self.values[:5])))
         
     def draw_chart(self):
         """Dibuja las barras verticales."""
@@ -150,11 +149,11 @@ class VerticalBarChart(BaseChart):
         bar_color = bar_config.get("color", "#1F6FEB")  # Color por defecto
         
         # Imprimir la configuración para depuración
-        print("📊 Configuración de barras:")
-        print(f"  - Ancho: {bar_width:.2f}")
-        print(f"  - Color: {bar_color}")
-        print(f"  - Color del borde: {bar_edgecolor}")
-        print(f"  - Grosor del borde: {bar_linewidth:.2f}")
+        logger.debug("📊 Configuración de barras:")
+        logger.debug("  - Ancho: %.2f", bar_width)
+        logger.debug("  - Color: %s", bar_color)
+        logger.debug("  - Color del borde: %s", bar_edgecolor)
+        logger.debug("  - Grosor del borde: %.2f", bar_linewidth)
         
         # Posiciones de las barras
         self.x_positions = np.arange(len(self.cats))
@@ -168,58 +167,39 @@ class VerticalBarChart(BaseChart):
             linewidth=bar_linewidth
         )
             
-        # Añadir etiquetas de valores en las barras
+        # Añadir etiquetas de valores en las barras (se guardan para update_data)
+        self.value_labels = []
         if bool(self.params.get("value_labels", False)):
             # Obtener configuración de etiquetas de valores
-            value_labels_config = (
-                self.params.get("value_labels_config", {}) 
-                if isinstance(self.params.get("value_labels"), bool) 
-                else self.params.get("value_labels", {})
-            )
+            value_labels_config = self._value_labels_config()
             
             # Obtener tamaño de fuente y formato
             font_size = float(value_labels_config.get("font_size", 9))
             font_weight = value_labels_config.get("font_weight", "normal")
             fmt = self.params.get("value_format", "{:.0f}")
             
-            # Si el formato contiene una coma (,), usamos format para números con miles separados
+            # Si el formato contiene una coma (,), se usa con separador de miles
             if fmt.find(",") >= 0:
-                print(f"📊 Usando formato con separador de miles: {fmt}")
-                formatter = lambda x: f"{x:{fmt}}"
-            else:
-                # Formato estándar sin separador de miles
-                formatter = lambda x: fmt.format(x)
+                logger.debug("📊 Usando formato con separador de miles: %s", fmt)
+            formatter = self._value_formatter(fmt)
             
             # Imprimir información de configuración para depuración
-            print("📊 Configuración de etiquetas de valores:")
-            print(f"  - Tamaño de fuente: {font_size}")
-            print(f"  - Peso de fuente: {font_weight}")
-            print(f"  - Formato: {fmt}")
+            logger.debug("📊 Configuración de etiquetas de valores:")
+            logger.debug("  - Tamaño de fuente: %s", font_size)
+            logger.debug("  - Peso de fuente: %s", font_weight)
+            logger.debug("  - Formato: %s", fmt)
             
             # Configurar la posición vertical de las etiquetas
             vertical_alignment = value_labels_config.get("va", "bottom")
-            label_padding = float(value_labels_config.get("padding", 3))
             
             for i, rect in enumerate(self.bars):
                 # Valor de la barra
                 value = self.values[i]
                 
                 # Calcular posición para la etiqueta
-                height = rect.get_height()
-                if vertical_alignment == "bottom":
-                    # Colocar etiqueta dentro de la barra en la parte inferior
-                    y_pos = height / 2
-                    text_color = value_labels_config.get("color_inside", "white")
-                elif vertical_alignment == "inside":
-                    # Colocar etiqueta dentro de la barra
-                    y_pos = height / 2
-                    text_color = value_labels_config.get("color_inside", "white")
-                else:
-                    # Colocar etiqueta encima de la barra
-                    y_pos = height + label_padding
-                    text_color = value_labels_config.get("color", "black")
+                y_pos, text_color = self._value_label_layout(value_labels_config, rect.get_height())
                 
-                self.ax.text(
+                self.value_labels.append(self.ax.text(
                     rect.get_x() + rect.get_width() / 2, 
                     y_pos,
                     formatter(value),
@@ -228,7 +208,191 @@ class VerticalBarChart(BaseChart):
                     color=text_color,
                     fontsize=font_size,
                     fontweight=font_weight
-                )
+                ))
+
+    def _value_labels_config(self):
+        """Configuración de las etiquetas de valores (``value_labels`` o ``value_labels_config``)."""
+        return (
+            self.params.get("value_labels_config", {}) 
+            if isinstance(self.params.get("value_labels"), bool) 
+            else self.params.get("value_labels", {})
+        )
+
+    def _value_label_layout(self, value_labels_config, height):
+        """Posición vertical y color de la etiqueta de valor de una barra de altura ``height``."""
+        vertical_alignment = value_labels_config.get("va", "bottom")
+        if vertical_alignment in ("bottom", "inside"):
+            # Colocar etiqueta dentro de la barra
+            return height / 2, value_labels_config.get("color_inside", "white")
+        # Colocar etiqueta encima de la barra
+        label_padding = float(value_labels_config.get("padding", 3))
+        return height + label_padding, value_labels_config.get("color", "black")
+
+    def _value_formatter(self, value_format):
+        """Función de formato para ``value_format`` (con coma: separador de miles)."""
+        if value_format.find(",") >= 0:
+            return lambda x: f"{x:{value_format}}"
+        # Formato estándar sin separador de miles
+        return lambda x: value_format.format(x)
+
+    def _ylim_top(self):
+        """Límite superior del eje Y: valor máximo más el margen para las etiquetas de país."""
+        country_labels_config = self.params.get("country_labels_config", {})
+        top_margin_factor = float(country_labels_config.get("top_margin", 0.30))
+        return max(self.values) * (1 + top_margin_factor)
+
+    def _country_label_y(self, height, y_max):
+        """Posición vertical del nombre del país y de su valor sobre una barra."""
+        country_labels_config = self.params.get("country_labels_config", {})
+        padding_factor = float(country_labels_config.get("padding_factor", 0.08))
+        value_padding = float(country_labels_config.get("value_padding", 0.02))
+        country_y = height + (y_max * padding_factor)
+        return country_y, country_y - (y_max * value_padding)
+
+    def update_data(self, df):
+        """
+        Actualiza en el lugar un gráfico ya renderizado con datos nuevos.
+
+        Ajusta la altura de las barras y reescribe solo las etiquetas de
+        valor y de país que cambiaron. No repite fuentes, título ni
+        cromática. Usado por ``app.live.LiveChart``.
+
+        Params:
+            df (DataFrame): Datos nuevos (mismas columnas que los originales)
+
+        Returns:
+            dict: Elementos modificados (``bars``, ``labels``, ``flags``), o None si
+            cambió la cantidad de barras y hay que renderizar de nuevo.
+        """
+        if self.fig is None or getattr(self, "bars", None) is None:
+            return None
+        old_cats = list(self.cats)
+        self.df = df
+        self.prepare_data()
+        if len(self.cats) != len(old_cats):
+            return None
+
+        changes = {"bars": 0, "labels": 0, "flags": 0}
+
+        def set_label(label, text, y):
+            if label.get_text() != text or label.get_position()[1] != y:
+                label.set_text(text)
+                label.set_y(y)
+                changes["labels"] += 1
+
+        for rect, value in zip(self.bars, self.values):
+            if rect.get_height() != value:
+                rect.set_height(value)
+                changes["bars"] += 1
+
+        # Etiquetas de valores en las barras
+        value_labels_config = self._value_labels_config()
+        formatter = self._value_formatter(self.params.get("value_format", "{:.0f}"))
+        for label, rect, value in zip(self.value_labels, self.bars, self.values):
+            y_pos, _ = self._value_label_layout(value_labels_config, rect.get_height())
+            set_label(label, formatter(value), y_pos)
+
+        # Límite superior (mismo margen que configure_axes)
+        y_max = self._ylim_top()
+        self.ax.set_ylim(0, y_max)
+
+        # Nombres rotados en el eje X
+        new_cats = list(self.cats)
+        if self.params.get("rotate_xticks") and new_cats != old_cats:
+            self.ax.set_xticklabels(new_cats)
+            changes["labels"] += sum(a != b for a, b in zip(old_cats, new_cats))
+
+        # Nombre del país (y su valor) sobre cada barra
+        value_formatter = self._value_formatter(self.params.get("value_format", "{:.0f}"))
+        for (name_label, value_label), rect, cat, value in zip(self.country_labels, self.bars, self.cats, self.values):
+            country_y, value_y = self._country_label_y(rect.get_height(), y_max)
+            set_label(name_label, cat, country_y)
+            if value_label is not None:
+                set_label(value_label, value_formatter(value), value_y)
+
+        return changes
+
+    # === Animación (app/animation.py) ===
+
+    def frame_values(self, df):
+        """Valores de ``df`` en el orden de dibujo (matriz de 1 x barras; ausentes = 0)."""
+        values = df.set_index(self.cat_col).reindex(self.cats)[self.value_col].fillna(0).to_numpy(dtype=np.float64)
+        if self.params.get("data", {}).get("transform_values", False):
+            values = values / float(self.params.get("data", {}).get("value_divisor", 1000))
+        return values[np.newaxis, :]
+
+    def frame_positions(self, values):
+        """Puesto de cada barra para ``values`` (solo cambia con ``sort_by_value``)."""
+        n_bars = values.shape[1]
+        positions = np.arange(n_bars, dtype=np.float64)
+        if not self.params.get("sort_by_value", False):
+            return positions
+        order = np.argsort(values[0] if self.params.get("invert_order", False) else -values[0], kind="stable")
+        positions[order] = np.arange(n_bars)
+        return positions
+
+    def start_frames(self, top_n=None):
+        """
+        Prepara el gráfico ya renderizado para dibujar cuadros con set_frame.
+
+        Params:
+            top_n (int): Barras visibles (las de mayor valor si se ordena); por defecto todas
+        """
+        n_bars = len(self.cats)
+        if top_n and top_n < n_bars:
+            sorted_ascending = self.params.get("sort_by_value", False) and self.params.get("invert_order", False)
+            first = n_bars - top_n if sorted_ascending else 0
+            self.ax.set_xlim(first - 0.5, first + top_n - 0.5)
+        # Nombres fijos por barra; set_frame solo mueve los ticks (set_xticks ampliaría la vista)
+        if any(label.get_text() for label in self.ax.get_xticklabels()):
+            self.ax.xaxis.set_major_formatter(FixedFormatter(list(self.cats)))
+
+    def set_frame(self, values, positions):
+        """
+        Aplica un cuadro de animación sobre la figura retenida.
+
+        Params:
+            values (ndarray): 1 x barras, en el orden de dibujo (ver frame_values)
+            positions (ndarray): Posición horizontal de cada barra; admite valores
+                intermedios entre dos puestos. Las barras fuera de la vista se ocultan.
+        """
+        low, high = sorted(self.ax.get_xlim())
+        visible = (positions > low - 0.5) & (positions < high + 0.5)
+        self.values = values[0]
+        for rect, x, value in zip(self.bars, positions, self.values):
+            rect.set_x(x - rect.get_width() / 2)
+            rect.set_height(value)
+
+        value_labels_config = self._value_labels_config()
+        formatter = self._value_formatter(self.params.get("value_format", "{:.0f}"))
+        for label, x, value, shown in zip(self.value_labels, positions, self.values, visible):
+            y_pos, _ = self._value_label_layout(value_labels_config, value)
+            label.set_text(formatter(value))
+            label.set_position((x, y_pos))
+            label.set_visible(shown)
+
+        y_max = self._ylim_top() or 1.0
+        self.ax.set_ylim(0, y_max)
+        self.ax.xaxis.set_major_locator(FixedLocator(positions))
+
+        for (name_label, value_label), x, value, shown in zip(self.country_labels, positions, self.values, visible):
+            country_y, value_y = self._country_label_y(value, y_max)
+            name_label.set_position((x, country_y))
+            name_label.set_visible(shown)
+            if value_label is not None:
+                value_label.set_text(formatter(value))
+                value_label.set_position((x, value_y))
+                value_label.set_visible(shown)
+
+    def animated_artists(self):
+        """Artistas que cambian entre cuadros (el resto se dibuja una sola vez)."""
+        artists = list(self.bars.patches) + list(self.value_labels)
+        for name_label, value_label in self.country_labels:
+            artists.append(name_label)
+            if value_label is not None:
+                artists.append(value_label)
+        artists += [self.ax.xaxis, self.ax.yaxis]
+        return artists
 
     def configure_axes(self):
         """Configura los ejes y sus elementos."""
@@ -237,15 +401,9 @@ class VerticalBarChart(BaseChart):
         # No mostrar los nombres de los países en el eje X (se mostrarán arriba de cada barra)
         self.ax.set_xticklabels([])
         
-        # Margen superior con padding (aumentado para dar espacio a las etiquetas de país)
-        max_value = max(self.values)
-        
-        # Calcular el espacio adicional necesario basado en la configuración
-        country_labels_config = self.params.get("country_labels_config", {})
-        top_margin_factor = float(country_labels_config.get("top_margin", 0.30))
-        
-        # Aplicar margen superior
-        self.ax.set_ylim(0, max_value * (1 + top_margin_factor))  # Por defecto 30% de margen arriba
+        # Margen superior con padding (aumentado para dar espacio a las etiquetas de país;
+        # por defecto 30% de margen arriba)
+        self.ax.set_ylim(0, self._ylim_top())
         
         # Configurar etiquetas de ejes
         if self.params.get("xlabel"):
@@ -272,12 +430,13 @@ class VerticalBarChart(BaseChart):
             bottom_space = xtick_config.get("bottom_space", 0.24)  # Valor predeterminado
             self.fig.subplots_adjust(bottom=float(bottom_space))
             
-            print(f"ℹ️ Ajustando espaciado inferior para etiquetas rotadas: {bottom_space:.2f}")
+            logger.debug("ℹ️ Ajustando espaciado inferior para etiquetas rotadas: %.2f", bottom_space)
             
             # Verificar si se necesita ajuste adicional para etiquetas largas
             if xtick_config.get("adjust_for_long_labels", False):
                 # Usar un enfoque más robusto y compatible para etiquetas largas
-                self.fig.canvas.draw()
+                with span("canvas.draw", cat="draw", where="configure_axes"):
+                    self.fig.canvas.draw()
                 
                 # En lugar de tight_layout, ajustamos manualmente los márgenes
                 # Obtener altura de las etiquetas del eje X
@@ -291,7 +450,7 @@ class VerticalBarChart(BaseChart):
                 
                 # Aplicar el ajuste final
                 self.fig.subplots_adjust(bottom=bottom_space_adjusted)
-                print(f"✓ Ajuste adicional aplicado para etiquetas de texto largas (espacio inferior: {bottom_space_adjusted:.2f})")
+                logger.debug("✓ Ajuste adicional aplicado para etiquetas de texto largas (espacio inferior: %.2f)", bottom_space_adjusted)
         
         # Grid opcional
         if self.params.get("grid", False):
@@ -347,7 +506,8 @@ class VerticalBarChart(BaseChart):
         """
         Añade etiquetas de país arriba de cada barra y etiquetas de valor si están configuradas.
         """
-        # Añadir etiquetas de país arriba de cada barra
+        # Añadir etiquetas de país arriba de cada barra (se guardan para update_data)
+        self.country_labels = []
         for i, (bar, cat) in enumerate(zip(self.bars, self.cats)):
             # Obtener altura de la barra
             height = bar.get_height()
@@ -358,13 +518,11 @@ class VerticalBarChart(BaseChart):
             font_weight = country_labels_config.get("font_weight", "normal")
             font_color = country_labels_config.get("color", "#333333")  
             rotation = float(country_labels_config.get("rotation", 0))
-            padding = float(country_labels_config.get("padding", 8))
             
             # Posicionar texto arriba de la barra con padding
             # Calcular posición vertical basada en el valor máximo del eje Y
             y_max = self.ax.get_ylim()[1]
-            padding_factor = float(country_labels_config.get("padding_factor", 0.08))
-            y_position = height + (y_max * padding_factor)
+            y_position, value_y = self._country_label_y(height, y_max)
             
             # Determinar si se deben mostrar valores
             show_values = country_labels_config.get("show_values", False)
@@ -375,7 +533,7 @@ class VerticalBarChart(BaseChart):
             country_y = y_position
             
             # Añadir etiqueta del país
-            self.ax.text(
+            name_label = self.ax.text(
                 country_x,
                 country_y,
                 cat,
@@ -388,28 +546,18 @@ class VerticalBarChart(BaseChart):
             )
             
             # Añadir etiqueta del valor debajo del nombre del país si está habilitado
+            value_label = None
             if show_values:
-                # Formato para el valor
-                value_format = self.params.get("value_format", "{:.0f}")
-                
-                # Si el formato contiene una coma (,), usamos format para números con miles separados
-                if value_format.find(",") >= 0:
-                    formatter = lambda x: f"{x:{value_format}}"
-                else:
-                    # Formato estándar sin separador de miles
-                    formatter = lambda x: value_format.format(x)
+                # Formato para el valor (con coma: separador de miles)
+                formatter = self._value_formatter(self.params.get("value_format", "{:.0f}"))
                 
                 # Configuración para la etiqueta de valor
                 value_font_size = float(country_labels_config.get("value_font_size", font_size * 0.9))
                 value_font_weight = country_labels_config.get("value_font_weight", "normal")
                 value_color = country_labels_config.get("value_color", font_color)
-                value_padding = float(country_labels_config.get("value_padding", 0.02))
-                
-                # Calcular la posición Y para el valor (debajo del país)
-                value_y = country_y - (y_max * value_padding)
                 
                 # Añadir texto del valor debajo del país
-                self.ax.text(
+                value_label = self.ax.text(
                     country_x, 
                     value_y,
                     formatter(value),
@@ -419,6 +567,7 @@ class VerticalBarChart(BaseChart):
                     fontweight=value_font_weight,
                     color=value_color
                 )
+            self.country_labels.append((name_label, value_label))
         
         # Usar método de la clase base si hay etiquetas de totales configuradas
         if self.params.get("total_labels", {}).get("enabled", False):
@@ -443,10 +592,10 @@ class VerticalBarChart(BaseChart):
         left_margin = float(title_spacing.get("left_margin", 0.0))  # Margen izquierdo global
         right_margin = float(title_spacing.get("right_margin", 0.0))  # Margen derecho global
         
-        print("\nℹ️ Configuración de espaciado de títulos:")
-        print(f"  - Espacio superior del título: {title_top_margin:.2f} (desde borde superior)")
-        print(f"  - Espacio entre título y subtítulo: {title_bottom_margin:.2f} + {subtitle_top_margin:.2f}")
-        print(f"  - Márgenes horizontales globales: izquierdo={left_margin:.2f}, derecho={right_margin:.2f}")
+        logger.debug("ℹ️ Configuración de espaciado de títulos:")
+        logger.debug("  - Espacio superior del título: %.2f (desde borde superior)", title_top_margin)
+        logger.debug("  - Espacio entre título y subtítulo: %.2f + %.2f", title_bottom_margin, subtitle_top_margin)
+        logger.debug("  - Márgenes horizontales globales: izquierdo=%.2f, derecho=%.2f", left_margin, right_margin)
         
         # Obtener contenido de título y subtítulo
         title = self.params.get("title", "")
@@ -500,11 +649,11 @@ class VerticalBarChart(BaseChart):
             y_pos = 1.0 - title_top_margin
             
             # Debug para ver los valores calculados
-            print("DEBUG: Márgenes horizontales aplicados al título:")
-            print(f"  - Márgenes globales: izquierdo={left_margin:.2f}, derecho={right_margin:.2f}")
-            print(f"  - Paddings específicos: izquierdo={padding_left:.2f}, derecho={padding_right:.2f}")
-            print(f"  - Posición X calculada: {x_pos:.2f} (alineación='{ha}')")
-            print(f"DEBUG: Posición Y calculada para título = {y_pos:.2f} (basada en top_margin = {title_top_margin:.2f})")
+            logger.debug("Márgenes horizontales aplicados al título:")
+            logger.debug("  - Márgenes globales: izquierdo=%.2f, derecho=%.2f", left_margin, right_margin)
+            logger.debug("  - Paddings específicos: izquierdo=%.2f, derecho=%.2f", padding_left, padding_right)
+            logger.debug("  - Posición X calculada: %.2f (alineación='%s')", x_pos, ha)
+            logger.debug("Posición Y calculada para título = %.2f (basada en top_margin = %.2f)", y_pos, title_top_margin)
             
             # Usar siempre la misma alineación vertical para consistencia
             ha = title_config.get("ha", "center")
@@ -516,21 +665,21 @@ class VerticalBarChart(BaseChart):
             global_fontsize = self.params.get("title_font_size", 18)
             
             # Mostrar los valores para depuración
-            print("DEBUG: Valores de tamaño para el título:")
-            print(f" - Valor explícito guardado: {explicit_fontsize}")
-            print(f" - Valor en title_config.fontsize: {config_fontsize}")
-            print(f" - Valor en params.title_font_size: {global_fontsize}")
+            logger.debug("Valores de tamaño para el título:")
+            logger.debug(" - Valor explícito guardado: %s", explicit_fontsize)
+            logger.debug(" - Valor en title_config.fontsize: %s", config_fontsize)
+            logger.debug(" - Valor en params.title_font_size: %s", global_fontsize)
             
             # Precedencia: Valor explícito > Valor en title_config > Valor global
             if explicit_fontsize is not None:
                 fontsize = float(explicit_fontsize)
-                print(f"Título (modo explícito): Tamaño = {fontsize}")
+                logger.debug("Título (modo explícito): Tamaño = %s", fontsize)
             elif config_fontsize is not None:
                 fontsize = float(config_fontsize)
-                print(f"Título (modo avanzado): Tamaño = {fontsize}, Color = {title_config.get('color', '#333333')}")
+                logger.debug("Título (modo avanzado): Tamaño = %s, Color = %s", fontsize, title_config.get('color', '#333333'))
             else:
                 fontsize = float(global_fontsize)
-                print(f"Título (modo básico): Tamaño = {fontsize}")
+                logger.debug("Título (modo básico): Tamaño = %s", fontsize)
             
             text_props = {
                 "fontsize": fontsize,
@@ -543,12 +692,10 @@ class VerticalBarChart(BaseChart):
             }
             
             # Imprimir propiedades para depuración
-            print("DEBUG: Aplicando propiedades al título:")
-            for key, value in text_props.items():
-                print(f"  - {key}: {value}")
+            logger.debug("Aplicando propiedades al título: %s", text_props)
             
             # Añadir el título al gráfico
-            print(f"\nℹ️ Colocando título en posición: x={x_pos:.2f}, y={y_pos:.2f}, va='{va}', ha='{ha}'")
+            logger.debug("ℹ️ Colocando título en posición: x=%.2f, y=%.2f, va='%s', ha='%s'", x_pos, y_pos, va, ha)
             title_artist = self.ax_header.text(x_pos, y_pos, title, 
                                 ha=ha, va=va,
                                 transform=self.ax_header.transAxes,
@@ -568,10 +715,10 @@ class VerticalBarChart(BaseChart):
                     # El ancho efectivo disponible se reduce por los márgenes y paddings
                     effective_wrap_width = available_width * wrap_width - padding_left - padding_right
                     
-                    print("📝 Aplicando ajuste automático de texto al título:")
-                    print(f"  - Ancho de wrapping base: {wrap_width:.2f}")
-                    print(f"  - Ancho disponible tras márgenes: {available_width:.2f}")
-                    print(f"  - Ancho efectivo para wrapping: {effective_wrap_width:.2f}")
+                    logger.debug("📝 Aplicando ajuste automático de texto al título:")
+                    logger.debug("  - Ancho de wrapping base: %.2f", wrap_width)
+                    logger.debug("  - Ancho disponible tras márgenes: %.2f", available_width)
+                    logger.debug("  - Ancho efectivo para wrapping: %.2f", effective_wrap_width)
                     
                     # Obtener ancho de figura en pulgadas
                     fig_width_inches = self.fig.get_figwidth()
@@ -590,7 +737,7 @@ class VerticalBarChart(BaseChart):
                         # Ajuste más suave para títulos grandes para permitir más texto por línea
                         factor = max(0.7, 28 / fontsize)  # Limitar el factor de reducción a 0.7
                         chars_per_inch = chars_per_inch * factor
-                        print(f"  - Ajustando estimación para fuente grande ({fontsize}pt): factor = {factor:.2f}")
+                        logger.debug("  - Ajustando estimación para fuente grande (%spt): factor = %.2f", fontsize, factor)
                     
                     # Añadir un 10% adicional de caracteres para usar más espacio
                     max_chars = int(wrap_width_inches * chars_per_inch * 1.10)
@@ -604,10 +751,10 @@ class VerticalBarChart(BaseChart):
                     
                     # Contar cuántas líneas resultaron
                     num_lines = len(wrapped_text.split('\n'))
-                    print(f"✅ Texto ajustado: {max_chars} caracteres por línea, {num_lines} línea(s) total")
+                    logger.debug("✅ Texto ajustado: %s caracteres por línea, %s línea(s) total", max_chars, num_lines)
                     
                 except Exception as e:
-                    print(f"⚠️ Error al aplicar wrapping manual al título: {e}")
+                    logger.warning("⚠️ Error al aplicar wrapping manual al título: %s", e)
             
             # Guardar la posición final del título para posicionar el subtítulo si es necesario
             self.title_artist = title_artist
@@ -619,10 +766,10 @@ class VerticalBarChart(BaseChart):
                 # Calcula la posición Y del subtítulo basada en la posición del título
                 title_pos = self.title_artist.get_position()[1]
                 y_pos = title_pos - title_bottom_margin - subtitle_top_margin
-                print(f"ℹ️ Posición del subtítulo calculada a partir del título: {y_pos:.2f}")
+                logger.debug("ℹ️ Posición del subtítulo calculada a partir del título: %.2f", y_pos)
             else:
                 y_pos = 1.0 - title_top_margin - title_bottom_margin - subtitle_top_margin
-                print(f"ℹ️ Posición del subtítulo calculada sin referencia al título: {y_pos:.2f}")
+                logger.debug("ℹ️ Posición del subtítulo calculada sin referencia al título: %.2f", y_pos)
             
             # Configuración de subtítulo
             if not subtitle_config:
@@ -661,10 +808,10 @@ class VerticalBarChart(BaseChart):
                     x_pos = left_margin + (available_width / 2)
                 
                 # Debug para ver los valores calculados
-                print("DEBUG: Márgenes horizontales aplicados al subtítulo:")
-                print(f"  - Márgenes globales: izquierdo={left_margin:.2f}, derecho={right_margin:.2f}")
-                print(f"  - Paddings específicos: izquierdo={padding_left:.2f}, derecho={padding_right:.2f}")
-                print(f"  - Posición X calculada: {x_pos:.2f} (alineación='{ha}')")
+                logger.debug("Márgenes horizontales aplicados al subtítulo:")
+                logger.debug("  - Márgenes globales: izquierdo=%.2f, derecho=%.2f", left_margin, right_margin)
+                logger.debug("  - Paddings específicos: izquierdo=%.2f, derecho=%.2f", padding_left, padding_right)
+                logger.debug("  - Posición X calculada: %.2f (alineación='%s')", x_pos, ha)
                 
                 va = "top"  # Fijar siempre a 'top' para evitar inconsistencias
                 
@@ -674,21 +821,21 @@ class VerticalBarChart(BaseChart):
                 global_fontsize = self.params.get("subtitle_font_size", 13)
                 
                 # Mostrar los valores para depuración
-                print("DEBUG: Valores de tamaño para el subtítulo:")
-                print(f" - Valor explícito guardado: {explicit_fontsize}")
-                print(f" - Valor en subtitle_config.fontsize: {config_fontsize}")
-                print(f" - Valor en params.subtitle_font_size: {global_fontsize}")
+                logger.debug("Valores de tamaño para el subtítulo:")
+                logger.debug(" - Valor explícito guardado: %s", explicit_fontsize)
+                logger.debug(" - Valor en subtitle_config.fontsize: %s", config_fontsize)
+                logger.debug(" - Valor en params.subtitle_font_size: %s", global_fontsize)
                 
                 # Precedencia: Valor explícito > Valor en subtitle_config > Valor global
                 if explicit_fontsize is not None:
                     fontsize = float(explicit_fontsize)
-                    print(f"Subtítulo (modo explícito): Tamaño = {fontsize}")
+                    logger.debug("Subtítulo (modo explícito): Tamaño = %s", fontsize)
                 elif config_fontsize is not None:
                     fontsize = float(config_fontsize)
-                    print(f"Subtítulo (modo avanzado): Tamaño = {fontsize}, Color = {subtitle_config.get('color', '#666666')}")
+                    logger.debug("Subtítulo (modo avanzado): Tamaño = %s, Color = %s", fontsize, subtitle_config.get('color', '#666666'))
                 else:
                     fontsize = float(global_fontsize)
-                    print(f"Subtítulo (modo básico): Tamaño = {fontsize}")
+                    logger.debug("Subtítulo (modo básico): Tamaño = %s", fontsize)
                     
                 color = subtitle_config.get("color", self.params.get("subtitle_color", "#666666"))
                 
@@ -706,9 +853,7 @@ class VerticalBarChart(BaseChart):
                     text_props["bbox"] = subtitle_config.get("bbox")
                 
                 # Imprimir propiedades para depuración
-                print("DEBUG: Aplicando propiedades al subtítulo:")
-                for key, value in text_props.items():
-                    print(f"  - {key}: {value}")
+                logger.debug("Aplicando propiedades al subtítulo: %s", text_props)
                     
                 subtitle_artist = self.ax_header.text(x_pos, y_pos, subtitle, 
                                 ha=ha, va=va,
@@ -729,10 +874,10 @@ class VerticalBarChart(BaseChart):
                         # El ancho efectivo disponible se reduce por los márgenes y paddings
                         effective_wrap_width = available_width * wrap_width - padding_left - padding_right
                         
-                        print("Aplicando ajuste manual de texto al subtítulo:")
-                        print(f"  - Ancho de wrapping base: {wrap_width:.2f}")
-                        print(f"  - Ancho disponible tras márgenes: {available_width:.2f}")
-                        print(f"  - Ancho efectivo para wrapping: {effective_wrap_width:.2f}")
+                        logger.debug("Aplicando ajuste manual de texto al subtítulo:")
+                        logger.debug("  - Ancho de wrapping base: %.2f", wrap_width)
+                        logger.debug("  - Ancho disponible tras márgenes: %.2f", available_width)
+                        logger.debug("  - Ancho efectivo para wrapping: %.2f", effective_wrap_width)
                         
                         # Obtener ancho de figura en pulgadas
                         fig_width_inches = self.fig.get_figwidth()
@@ -753,20 +898,20 @@ class VerticalBarChart(BaseChart):
                         # Actualizar texto con versión envuelta
                         subtitle_artist.set_text(wrapped_text)
                         
-                        print(f"✅ Subtítulo ajustado manualmente: {max_chars} caracteres por línea")
+                        logger.debug("✅ Subtítulo ajustado manualmente: %s caracteres por línea", max_chars)
                         
                     except Exception as e:
-                        print(f"⚠️ Error al aplicar wrapping manual al subtítulo: {e}")
+                        logger.warning("⚠️ Error al aplicar wrapping manual al subtítulo: %s", e)
     
     def add_footer(self):
         """
         Añade un footer con logo y texto en la parte inferior del gráfico.
-        Utiliza la implementación centralizada de branding.py para evitar duplicación.
+        Utiliza la implementación centralizada de components.py para evitar duplicación.
         """
-        from app.branding import add_footer
+        from app.components import add_footer
         
         # Usar la función centralizada para añadir el footer
-        add_footer(self.fig, self.params.get("footer", {}))
+        self.add_chrome("components.footer", lambda fig: add_footer(fig, self.params))
     
     def finalize(self):
         """
@@ -775,12 +920,11 @@ class VerticalBarChart(BaseChart):
         por lo que finish_and_save no debe volver a llamar a add_branding.
         """
         # Usar la función centralizada para guardar en múltiples formatos
+        from app.chrome import save_with_chrome
         from app.io_utils import save_fig_multi
         
         # Guardar en los formatos especificados
         if "outfile" in self.params:
-            formatos = self.params.get("formats", ["png"])
-            
             # Asegurar que outfile es un Path
             if isinstance(self.params["outfile"], str):
                 outfile = Path(self.params["outfile"])
@@ -788,15 +932,20 @@ class VerticalBarChart(BaseChart):
                 outfile = self.params["outfile"]
                 
             # Llamar a la función de guardado multi-formato
-            save_fig_multi(
-                fig=self.fig,
-                base=outfile,
-                formats=formatos,
-                jpg_quality=int(self.params.get("jpg_quality", 92)),
-                webp_quality=int(self.params.get("webp_quality", 92)),
-                avif_quality=int(self.params.get("avif_quality", 55)),
-                scour_svg=self.params.get("scour_svg", True)
-            )
+            def save(formatos):
+                save_fig_multi(
+                    fig=self.fig,
+                    base=outfile,
+                    formats=formatos,
+                    jpg_quality=int(self.params.get("jpg_quality", 92)),
+                    webp_quality=int(self.params.get("webp_quality", 92)),
+                    avif_quality=int(self.params.get("avif_quality", 55)),
+                    scour_svg=self.params.get("scour_svg", True)
+                )
+
+            # El footer pendiente (chrome_cache) se compone al guardar
+            save_with_chrome(self.fig, {**self.params, "formats": self.params.get("formats", ["png"])},
+                             self.chrome, save)
 
 
 def barv(config: Path = typer.Argument(..., help="Ruta a config YAML")):
@@ -1,10 +1,14 @@
-from pathlib import Path
+import copy
+import logging
 import yaml
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import textwrap
-import matplotlib.font_manager as fm
+
+from app.figures import new_figure, release_figure
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
 
 class BaseChart:
     """
@@ -13,6 +17,17 @@ class BaseChart:
     Proporciona métodos comunes que pueden ser heredados por tipos específicos de gráficos.
     Implementa las funcionalidades comunes a todos los gráficos.
     """
+    # Tipo de gráfico para el compilador de configuración (claves obligatorias)
+    config_kind = None
+
+    # render() libera la figura al terminar; poner en True para conservarla
+    keep_figure = False
+
+    # Etapas de render() en orden (cada una se mide con app.profiling.span)
+    RENDER_STAGES = (
+        "prepare_data", "setup_dimensions", "create_figure", "draw_chart", "configure_axes",
+        "add_legend", "add_labels", "add_title", "add_footer", "finalize",
+    )
     
     def __init__(self, params, df):
         """
@@ -26,30 +41,33 @@ class BaseChart:
         self.df = df
         self.fig = None
         self.ax = None
+        self.data = None  # ChartData construido en prepare_data
+        self.cat_col = None
+        # Dimensiones de la figura (setup_dimensions puede recalcularlas)
+        self.width_in = float(params.get("width_in", 12))
+        self.height_in = float(params.get("height_in", 8))
+        # Tamaño propio (el de setup_dimensions) cuando render_stages fuerza otro
+        self.base_size = None
         self.ax_header = None
+        # Capas de cromática pendientes (footer, branding, decorativos); ver add_chrome
+        self.chrome = []
         self.register_custom_fonts()
         
     def register_custom_fonts(self):
-        """Registra fuentes personalizadas para usar en el gráfico."""
-        fonts_dir = Path("fonts")
-        if fonts_dir.exists():
-            # Buscar todas las fuentes Nunito disponibles
-            nunito_fonts = list(fonts_dir.glob("Nunito-*.ttf"))
-            
-            # Registrar todas las fuentes encontradas
-            for font_path in nunito_fonts:
-                try:
-                    fm.fontManager.addfont(str(font_path))
-                    print(f"✅ Fuente registrada: {font_path.name}")
-                except Exception as e:
-                    print(f"❌ Error al registrar fuente {font_path.name}: {e}")
-                    
-            # Verificar si Nunito está disponible después de registrar
-            font_names = [f.name for f in fm.fontManager.ttflist]
-            if any('Nunito' in name for name in font_names):
-                print("✅ Fuente Nunito disponible para usar en los gráficos")
+        """
+        Registra las fuentes del proyecto para usar en el gráfico.
+        Usa el índice persistente de app/fonts.py: solo la primera llamada del
+        proceso toca el fontManager; las siguientes no hacen nada.
+        """
+        from app.fonts import ensure_project_fonts, font_available, project_fonts_loaded
+        
+        first_time = not project_fonts_loaded()
+        count = ensure_project_fonts()
+        if first_time:
+            if font_available("Nunito"):
+                logger.debug("✅ Fuentes del proyecto registradas (%s entradas); Nunito disponible", count)
             else:
-                print("⚠️ Fuente Nunito no se pudo registrar correctamente")
+                logger.warning("⚠️ Fuente Nunito no se pudo registrar correctamente")
                 
     def create_figure(self):
         """
@@ -58,9 +76,8 @@ class BaseChart:
         """
         from app.layout import apply_frame
         
-        width_in = float(self.params.get("width_in", 12))
-        height_in = float(self.params.get("height_in", 8))
-        self.fig = plt.figure(figsize=(width_in, height_in))
+        # Figura fuera de pyplot: no queda registrada en el administrador global
+        self.fig = new_figure(figsize=(self.width_in, self.height_in))
         
         # Usar la función de layout para aplicar el frame
         self.fig, self.ax_header, self.ax = apply_frame(self.fig, self.params)
@@ -78,6 +95,9 @@ class BaseChart:
         Filtra el DataFrame eliminando filas donde la suma de columnas o una columna específica 
         está por debajo de un umbral.
         
+        El filtrado se hace con una máscara booleana sobre arreglos NumPy, sin
+        copiar el DataFrame completo.
+        
         Args:
             df (DataFrame): DataFrame a filtrar
             total_column (str, optional): Nombre de la columna que contiene los totales
@@ -99,63 +119,101 @@ class BaseChart:
         # Si el umbral es 0 o negativo, devolver el DataFrame sin filtrar
         if threshold <= 0:
             return df
-            
-        original_len = len(df)
         
         # Caso 1: Si se proporciona una columna de totales específica
         if total_column and total_column in df.columns:
-            filtered_df = df[df[total_column] >= threshold].copy()
+            sums = df[total_column].to_numpy(dtype=np.float64)
             
         # Caso 2: Calcular la suma de todas las columnas numéricas (excluyendo la columna de categorías)
         else:
-            # Identificar columnas numéricas
-            numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
-            
-            # Excluir la columna de categorías si está especificada
-            if category_column and category_column in numeric_cols:
-                numeric_cols.remove(category_column)
-                
-            # Calcular la suma de todas las columnas numéricas si hay alguna
-            if numeric_cols:
-                filtered_df = df[df[numeric_cols].sum(axis=1) >= threshold].copy()
-            else:
+            numeric_cols = [col for col in df.columns
+                            if col != category_column and pd.api.types.is_numeric_dtype(df[col])]
+            if not numeric_cols:
                 # Si no hay columnas numéricas, devolver el DataFrame original
                 return df
+            sums = np.zeros(len(df), dtype=np.float64)
+            for col in numeric_cols:
+                sums += df[col].to_numpy(dtype=np.float64)
         
-        # Registrar cuántos elementos se filtraron
-        filtered_count = original_len - len(filtered_df)
+        mask = sums >= threshold
+        if mask.all():
+            return df
         
-        if filtered_count > 0:
-            # Identificar qué categorías se filtraron para el log
-            if category_column and category_column in df.columns:
-                filtered_categories = df[~df.index.isin(filtered_df.index)][category_column].tolist()
-                
-                # Limitar el número de categorías mostradas si son muchas
-                if len(filtered_categories) > 10:
-                    filtered_categories_str = ", ".join(filtered_categories[:5]) + f" y {len(filtered_categories) - 5} más"
-                else:
-                    filtered_categories_str = ", ".join(filtered_categories)
-                    
-                print(f"🔍 Filtrado: Se eliminaron {filtered_count} elementos con valores menores que {threshold}.")
-                print(f"   Elementos filtrados: {filtered_categories_str}")
-            else:
-                print(f"🔍 Filtrado: Se eliminaron {filtered_count} elementos con valores menores que {threshold}.")
+        # Registrar qué elementos se filtraron
+        if category_column and category_column in df.columns:
+            dropped = df[category_column].to_numpy()[~mask]
+        else:
+            dropped = None
+        self._log_filtered(int((~mask).sum()), threshold, dropped)
         
-        return filtered_df
+        return df[mask]
+    
+    def report_filtered(self, data, threshold):
+        """
+        Informa las categorías descartadas al construir un ChartData con ``min_total``.
+        
+        Params:
+            data (ChartData): Datos ya filtrados
+            threshold (float): Umbral aplicado
+        """
+        mask = np.ones(len(self.df), dtype=bool)
+        mask[data.order] = False
+        dropped = None
+        if self.cat_col in self.df.columns:
+            dropped = self.df[self.cat_col].to_numpy()[mask]
+        self._log_filtered(int(mask.sum()), threshold, dropped)
+    
+    def _log_filtered(self, filtered_count, threshold, dropped=None):
+        """Mensaje común para los filtrados por umbral."""
+        logger.info("🔍 Filtrado: Se eliminaron %s elementos con valores menores que %s.", filtered_count, threshold)
+        if dropped is not None:
+            names = [str(c) for c in dropped]
+            # Limitar el número de categorías mostradas si son muchas
+            if len(names) > 10:
+                names_str = ", ".join(names[:5]) + f" y {len(names) - 5} más"
+            else:
+                names_str = ", ".join(names)
+            logger.debug("   Elementos filtrados: %s", names_str)
         
     def setup_dimensions(self):
         """
         Configura las dimensiones del gráfico basado en el contenido.
-        Por defecto, usa los valores de width_in y height_in del parámetro.
+        Por defecto, usa los valores de width_in y height_in del parámetro
+        y los deja en ``self.width_in`` / ``self.height_in``.
         """
-        width_in = float(self.params.get("width_in", 12))
-        height_in = float(self.params.get("height_in", 8))
-        
-        self.params.update({
-            "width_in": width_in,
-            "height_in": height_in
-        })
+        # Las dimensiones se guardan en la instancia; los parámetros son inmutables
+        self.width_in, self.height_in = self.estimate_size(self.params, 0)
         
+    @classmethod
+    def estimate_size(cls, params, rows, label_len=0):
+        """
+        Tamaño (ancho, alto) en pulgadas de la figura, sin datos cargados.
+
+        ``setup_dimensions`` lo usa con los datos preparados y app/costs.py
+        con los de la configuración, para estimar tiempo y memoria con el
+        lienzo real. Por defecto, ``width_in`` y ``height_in``; los gráficos
+        que se dimensionan según el contenido lo redefinen.
+
+        Params:
+            params: Configuración compilada
+            rows: Categorías (o puntos) a dibujar
+            label_len: Largo de la etiqueta de categoría más larga
+        """
+        return float(params.get("width_in", 12)), float(params.get("height_in", 8))
+
+    def layout_scale(self):
+        """
+        Factores (x, y) para llevar una fracción de la figura en su tamaño
+        propio a una fracción del tamaño actual, conservando las pulgadas.
+
+        Es (1.0, 1.0) salvo que ``render_stages`` haya forzado otro tamaño
+        (variantes de app/aspects.py): los márgenes en fracción de la figura
+        siguen midiendo lo mismo en pulgadas y el texto sigue cabiendo.
+        """
+        if not self.base_size:
+            return 1.0, 1.0
+        return self.base_size[0] / self.width_in, self.base_size[1] / self.height_in
+
     def draw_chart(self):
         """
         Dibuja el gráfico principal.
@@ -170,6 +228,14 @@ class BaseChart:
         """
         raise NotImplementedError("Las subclases deben implementar configure_axes()")
         
+    def get_legend_config(self):
+        """
+        Configuración de la leyenda usada por add_legend.
+        Las subclases pueden devolver una versión derivada (p. ej. con totales)
+        sin modificar ``self.params``.
+        """
+        return self.params.get("legend_config", {})
+        
     def add_legend(self):
         """
         Añade la leyenda si está habilitada y hay elementos con etiquetas.
@@ -180,16 +246,16 @@ class BaseChart:
         if hasattr(self.ax, 'get_legend_handles_labels'):
             handles, labels = self.ax.get_legend_handles_labels()
             has_labeled_artists = len(handles) > 0 and len(labels) > 0
-            print(f"🔍 Leyenda: Se encontraron {len(handles)} elementos etiquetados")
+            logger.debug("🔍 Leyenda: Se encontraron %s elementos etiquetados", len(handles))
         
         # Obtener configuración
-        legend_config = self.params.get("legend_config", {})
-        print(f"🔍 Leyenda: Configuración: {legend_config}")
+        legend_config = self.get_legend_config()
+        logger.debug("🔍 Leyenda: Configuración: %s", legend_config)
         
         # Comprobar si tenemos una leyenda personalizada con imágenes
         if legend_config.get("custom_icons") and legend_config.get("icons"):
-            print(f"🔍 Leyenda personalizada: Detectada configuración con íconos personalizados")
-            print(f"🔍 Leyenda personalizada: Íconos configurados: {legend_config.get('icons')}")
+            logger.debug("🔍 Leyenda personalizada: Detectada configuración con íconos personalizados")
+            logger.debug("🔍 Leyenda personalizada: Íconos configurados: %s", legend_config.get('icons'))
             
             from ..plot_helpers import create_custom_legend_with_images
             legend = create_custom_legend_with_images(self.ax, self.fig, legend_config)
@@ -197,11 +263,11 @@ class BaseChart:
             # Añadir logo si está configurado
             logo_config = self.params.get("logo")
             if logo_config and logo_config.get("path"):
-                print(f"🔍 Logo: Detectada configuración de logo: {logo_config}")
+                logger.debug("🔍 Logo: Detectada configuración de logo: %s", logo_config)
                 from ..plot_helpers import add_logo_to_figure
                 add_logo_to_figure(self.fig, logo_config)
             else:
-                print(f"⚠️ Logo: No se encontró configuración de logo o ruta")
+                logger.debug("Logo: No se encontró configuración de logo o ruta")
                 
             return
         
@@ -274,7 +340,7 @@ class BaseChart:
                 
         elif bool(self.params.get("legend", True)) and not has_labeled_artists:
             # Si se solicita leyenda pero no hay elementos etiquetados, mostrar un mensaje informativo
-            print("ℹ️ No hay elementos con etiquetas para mostrar en la leyenda.")
+            logger.debug("ℹ️ No hay elementos con etiquetas para mostrar en la leyenda.")
             
     def add_title(self):
         """
@@ -317,7 +383,7 @@ class BaseChart:
         
         # Verificar que existe el eje para el título
         if self.ax_header is None:
-            print("⚠️ No hay un eje definido para el título, no se puede añadir el título")
+            logger.warning("⚠️ No hay un eje definido para el título, no se puede añadir el título")
             return
             
         # Limpiar cualquier contenido previo en el eje del título
@@ -341,7 +407,7 @@ class BaseChart:
                 transform=self.ax_header.transAxes
             )
             
-            print(f"✏️ Título añadido: {title_text}")
+            logger.debug("✏️ Título añadido: %s", title_text)
             
         # Dibujar subtítulo si existe
         if subtitle_text:
@@ -356,10 +422,11 @@ class BaseChart:
                 transform=self.ax_header.transAxes
             )
             
-            print(f"✏️ Subtítulo añadido: {subtitle_text}")
+            logger.debug("✏️ Subtítulo añadido: %s", subtitle_text)
             
         # Actualizar la figura
-        self.fig.canvas.draw()
+        with span("canvas.draw", cat="draw", where="add_title"):
+            self.fig.canvas.draw()
     
     def add_footer(self):
         """
@@ -390,9 +457,9 @@ class BaseChart:
         }
         
         # Añadir el footer
-        add_branding(self.fig, branding_params)
+        self.add_chrome("base.footer", lambda fig: add_branding(fig, branding_params))
         
-        print(f"👟 Footer añadido. Fuente: {source}")
+        logger.debug("👟 Footer añadido. Fuente: %s", source)
     
     def add_labels(self):
         """
@@ -408,11 +475,11 @@ class BaseChart:
             font_color = total_cfg.get("color", "#333333")
             
             # Imprimir información de configuración para depuración
-            print("\n📊 Configuración de etiquetas de totales:")
-            print(f"  - Offset X: {offset}")
-            print(f"  - Tamaño de fuente: {font_size}")
-            print(f"  - Peso de fuente: {font_weight}")
-            print(f"  - Color: {font_color}")
+            logger.debug("📊 Configuración de etiquetas de totales:")
+            logger.debug("  - Offset X: %s", offset)
+            logger.debug("  - Tamaño de fuente: %s", font_size)
+            logger.debug("  - Peso de fuente: %s", font_weight)
+            logger.debug("  - Color: %s", font_color)
             
             # Formato de números para totales
             total_format = total_cfg.get("format", "{:.0f}")
@@ -440,10 +507,10 @@ class BaseChart:
         decorative_elements = self.params.get("decorative_elements", [])
         
         if not decorative_elements:
-            print("ℹ️ No hay elementos decorativos configurados.")
+            logger.debug("ℹ️ No hay elementos decorativos configurados.")
             return
             
-        print(f"🎨 Añadiendo {len(decorative_elements)} elementos decorativos...")
+        logger.debug("🎨 Añadiendo %s elementos decorativos...", len(decorative_elements))
         
         for i, element in enumerate(decorative_elements):
             element_type = element.get("type", "").lower()
@@ -474,7 +541,7 @@ class BaseChart:
                     
                     # Añadir el rectángulo a la figura
                     self.fig.add_artist(rect)
-                    print(f"  ✓ Añadido rectángulo decorativo en ({x:.2f}, {y:.2f}) con color {color}")
+                    logger.debug("  ✓ Añadido rectángulo decorativo en (%.2f, %.2f) con color %s", x, y, color)
                     
                 # Elemento tipo línea (para separadores u otros elementos)
                 elif element_type == "line":
@@ -503,7 +570,7 @@ class BaseChart:
                     
                     # Añadir la línea a la figura
                     self.fig.add_artist(line)
-                    print(f"  ✓ Añadida línea decorativa de ({x1:.2f}, {y1:.2f}) a ({x2:.2f}, {y2:.2f})")
+                    logger.debug("  ✓ Añadida línea decorativa de (%.2f, %.2f) a (%.2f, %.2f)", x1, y1, x2, y2)
                     
                 # Texto decorativo (para etiquetas, notas o watermarks)
                 elif element_type == "text":
@@ -531,36 +598,97 @@ class BaseChart:
                         rotation=rotation,
                         zorder=zorder
                     )
-                    print(f"  ✓ Añadido texto decorativo '{text}' en ({x:.2f}, {y:.2f})")
+                    logger.debug("  ✓ Añadido texto decorativo '%s' en (%.2f, %.2f)", text, x, y)
                     
                 else:
-                    print(f"  ⚠️ Tipo de elemento decorativo no soportado: '{element_type}'")
+                    logger.warning("⚠️ Tipo de elemento decorativo no soportado: '%s'", element_type)
             
             except Exception as e:
-                print(f"  ⚠️ Error al añadir elemento decorativo #{i+1}: {e}")
+                logger.warning("⚠️ Error al añadir elemento decorativo #%s: %s", i + 1, e)
     
+    def add_chrome(self, name, builder):
+        """
+        Dibuja una capa estática (footer, branding, decorativos) con ``builder(fig)``.
+
+        Con ``chrome_cache: true`` la capa se difiere hasta el guardado, donde
+        se compone desde la caché de ``app/chrome.py``; si no, se dibuja ya.
+        """
+        from app.chrome import chrome_enabled, deferred
+
+        if chrome_enabled(self.params):
+            self.chrome.append(deferred(name, builder, self.fig.dpi))
+        else:
+            builder(self.fig)
+
     def finalize(self):
         """Finaliza y guarda el gráfico."""
+        from app.components import add_decorative_elements
         from app.layout import finish_and_save
         
         # Añadir elementos decorativos antes de guardar
-        self.add_decorative_elements()
+        self.add_chrome("base.decorative_elements", lambda fig: add_decorative_elements(fig, self.params))
         
         # Usar la función centralizada para finalizar y guardar el gráfico
-        finish_and_save(self.fig, self.params)
+        finish_and_save(self.fig, self.params, self.chrome)
         
     def render(self):
         """
         Método principal para renderizar el gráfico completo.
         Llama a todos los métodos necesarios en el orden correcto.
         """
-        self.prepare_data()
-        self.setup_dimensions()
-        self.create_figure()
-        self.draw_chart()
-        self.configure_axes()
-        self.add_legend()
-        self.add_labels()
-        self.add_title()
-        self.add_footer()
-        self.finalize()
\ No newline at end of file
+        self.render_stages(self.RENDER_STAGES)
+
+    def render_stages(self, stages, size=None):
+        """
+        Ejecuta ``stages`` en orden y, si la configuración tiene ``editions``,
+        exporta las ediciones por idioma y tema (ver app/editions.py). Todo
+        corre con los estilos de ``style`` (ver ``app.styling.render_context``).
+
+        Params:
+            stages: Nombres de etapas (subconjunto ordenado de RENDER_STAGES)
+            size: (ancho, alto) en pulgadas que reemplaza al de setup_dimensions
+        """
+        from app.styling import render_context
+
+        try:
+            # Estilos del gráfico en un rc_context propio: los rcParams globales no cambian
+            with render_context(self.params):
+                for stage in stages:
+                    with span(stage, chart=type(self).__name__):
+                        getattr(self, stage)()
+                    if stage == "setup_dimensions" and size is not None:
+                        self.base_size = (self.width_in, self.height_in)
+                        self.width_in, self.height_in = size
+                if self.params.get("editions"):
+                    from app.editions import export_editions
+                    with span("editions", cat="save"):
+                        export_editions(self)
+        finally:
+            if not self.keep_figure:
+                self.close()
+    
+    # Atributos que clone() no copia: se comparten o se reinician
+    _CLONE_SHARED = ("params", "df", "fig", "ax", "ax_header", "chrome", "timings")
+
+    def clone(self, params):
+        """
+        Copia del gráfico con los datos ya preparados y otros parámetros.
+
+        Sirve para renderizar el mismo gráfico en otro tamaño sin repetir
+        ``prepare_data`` (ver app/aspects.py): el DataFrame se comparte y el
+        estado derivado (ChartData, leyenda, etc.) se copia.
+        """
+        chart = copy.copy(self)
+        chart.__dict__.update(copy.deepcopy(
+            {k: v for k, v in self.__dict__.items() if k not in self._CLONE_SHARED}))
+        chart.params = params
+        chart.fig = chart.ax = chart.ax_header = None
+        chart.chrome = []
+        return chart
+
+    def close(self):
+        """Libera la figura y sus ejes (se puede llamar más de una vez)."""
+        release_figure(self.fig)
+        self.fig = None
+        self.ax = None
+        self.ax_header = None
\ No newline at end of file
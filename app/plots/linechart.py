@@ -1,17 +1,23 @@
+import logging
 from pathlib import Path
 import typer
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 import sys
 
 from app.plots.base_chart import BaseChart
+from app.chart_data import ChartData
+
+logger = logging.getLogger(__name__)
 
 class LineChart(BaseChart):
     """
     Clase para gráficos de líneas.
     Hereda de BaseChart e implementa los métodos específicos para este tipo de gráfico.
     """
+    config_kind = "linechart"
+
     def prepare_data(self):
         """Prepara los datos para el gráfico."""
         # Obtener la configuración de columnas
@@ -40,32 +46,47 @@ class LineChart(BaseChart):
             if serie.get("column") not in self.df.columns:
                 raise ValueError(f"La columna '{serie.get('column')}' no existe en el DataFrame")
         
-        # Ordenar datos por eje x si es necesario
-        if self.params.get("sort_by_x", True):
-            self.df = self.df.sort_values(by=self.x_col)
+        # Arreglos de x y de las series, ordenados por x si es necesario (sin copiar el DataFrame)
+        self.data = ChartData.from_frame(
+            self.df,
+            self.x_col,
+            [serie.get("column") for serie in self.series_cols],
+            sort_by=self.x_col if self.params.get("sort_by_x", True) else None,
+            ascending=True,
+            sort_kind="stable",
+            label_str=False,
+        )
+        self.x_is_datetime = pd.api.types.is_datetime64_any_dtype(self.df[self.x_col])
         
         # Guardar valores de x como atributo
-        self.x_values = self.df[self.x_col].tolist()
+        self.x_values = self.data.labels
         
         # Información de depuración
-        print(f"📊 Preparando datos para gráfico de líneas:")
-        print(f"  - Columna X: {self.x_col}")
-        print(f"  - Series: {[s.get('name') for s in self.series_cols]}")
-        print(f"  - Total de puntos: {len(self.x_values)}")
+        logger.debug("📊 Preparando datos para gráfico de líneas:")
+        logger.debug("  - Columna X: %s", self.x_col)
+        logger.debug("  - Series: %s", [s.get('name') for s in self.series_cols])
+        logger.debug("  - Total de puntos: %s", len(self.x_values))
 
     def setup_dimensions(self):
         """Configura las dimensiones del gráfico basado en el contenido."""
+        # Las dimensiones se guardan en la instancia; los parámetros son inmutables
+        self.width_in, self.height_in = self.estimate_size(self.params, len(self.x_values))
+        
+        logger.debug('📏 Dimensiones del gráfico: %.2f" × %.2f"', self.width_in, self.height_in)
+
+    @classmethod
+    def estimate_size(cls, params, rows, label_len=0):
+        """Ancho según la cantidad de puntos si ``autosize.enabled``; si no, el de la configuración."""
         # Obtener configuración de dimensionamiento automático
-        autosize = self.params.get("autosize", {})
+        autosize = params.get("autosize", {})
         
         # Si el dimensionamiento automático está habilitado
         if autosize.get("enabled", False):
             # Calcular ancho basado en el número de puntos
-            n_points = len(self.x_values)
             width_per_point = float(autosize.get("width_per_point", 0.2))
             
             # Calcular ancho total necesario
-            total_width = n_points * width_per_point
+            total_width = rows * width_per_point
             
             # Aplicar límites min/max
             width_in = min(
@@ -84,16 +105,9 @@ class LineChart(BaseChart):
             )
         else:
             # Usar dimensiones fijas desde los parámetros
-            width_in = float(self.params.get("width_in", 10))
-            height_in = float(self.params.get("height_in", 6))
-        
-        # Actualizar los parámetros con las dimensiones calculadas
-        self.params.update({
-            "width_in": width_in,
-            "height_in": height_in
-        })
-        
-        print(f"📏 Dimensiones del gráfico: {width_in:.2f}\" × {height_in:.2f}\"")
+            width_in = float(params.get("width_in", 10))
+            height_in = float(params.get("height_in", 6))
+        return width_in, height_in
 
     def draw_chart(self):
         """Dibuja el gráfico de líneas."""
@@ -127,8 +141,8 @@ class LineChart(BaseChart):
             
             # Dibujar la línea
             line, = self.ax.plot(
-                self.df[self.x_col],
-                self.df[col_name],
+                self.x_values,
+                self.data.values[i],
                 label=serie_name,
                 color=color,
                 linewidth=linewidth,
@@ -144,7 +158,7 @@ class LineChart(BaseChart):
             lines.append(line)
             labels.append(serie_name)
             
-            print(f"📈 Dibujada línea: {serie_name} (color: {color})")
+            logger.debug("📈 Dibujada línea: %s (color: %s)", serie_name, color)
             
         # Si están configurados, añadir áreas sombreadas bajo las líneas
         if line_config.get("fill_area", False):
@@ -155,21 +169,21 @@ class LineChart(BaseChart):
                 fill_alpha = line_config.get("fill_alpha", 0.2)
                 
                 self.ax.fill_between(
-                    self.df[self.x_col], 
+                    self.x_values, 
                     0, 
-                    self.df[col_name],
+                    self.data.values[i],
                     color=color,
                     alpha=fill_alpha
                 )
                 
-                print(f"  - Área sombreada añadida para: {serie.get('name')}")
+                logger.debug("  - Área sombreada añadida para: %s", serie.get('name'))
         
         # Añadir anotaciones de región si están configuradas
         annotations = self.params.get("annotations", {})
         regions = annotations.get("regions", [])
         
         if regions:
-            print(f"🔍 Añadiendo {len(regions)} regiones de anotación...")
+            logger.debug("🔍 Añadiendo %s regiones de anotación...", len(regions))
             
             for region in regions:
                 label = region.get("label", "")
@@ -180,31 +194,27 @@ class LineChart(BaseChart):
                 
                 # Validar que existen los valores from y to
                 if from_x is None or to_x is None:
-                    print(f"  ⚠️ Región '{label}' no tiene valores from/to definidos")
+                    logger.warning("⚠️ Región '%s' no tiene valores from/to definidos", label)
                     continue
                 
                 # Intentar convertir from/to al mismo tipo que los valores X
                 # Esto es importante para fechas, números, etc.
                 try:
                     # Si x_values son fechas, convertir from/to a fechas
-                    if pd.api.types.is_datetime64_any_dtype(self.df[self.x_col]):
+                    from_pos = to_pos = None
+                    if self.x_is_datetime:
                         from_x = pd.to_datetime(from_x)
                         to_x = pd.to_datetime(to_x)
                     elif isinstance(from_x, str) and isinstance(to_x, str):
-                        # Para valores de string, convertir a los índices correspondientes
-                        from_idx = self.df[self.df[self.x_col] == from_x].index
-                        to_idx = self.df[self.df[self.x_col] == to_x].index
+                        # Para valores de string, buscar sus posiciones en el eje X
+                        from_idx = np.flatnonzero(self.x_values == from_x)
+                        to_idx = np.flatnonzero(self.x_values == to_x)
                         
                         if len(from_idx) > 0 and len(to_idx) > 0:
-                            # Usar los valores actuales en el eje X
-                            from_x_idx = from_idx[0]
-                            to_x_idx = to_idx[0]
-                            
-                            # Obtener los valores X correspondientes a esos índices
-                            from_x = self.df.iloc[from_x_idx][self.x_col]
-                            to_x = self.df.iloc[to_x_idx][self.x_col]
+                            from_pos = int(from_idx[0])
+                            to_pos = int(to_idx[0])
                         else:
-                            print(f"  ⚠️ No se encontraron valores {from_x} o {to_x} en la columna {self.x_col}")
+                            logger.warning("⚠️ No se encontraron valores %s o %s en la columna %s", from_x, to_x, self.x_col)
                             continue
                     
                     # Añadir la región sombreada
@@ -213,19 +223,11 @@ class LineChart(BaseChart):
                     # Añadir una etiqueta en el centro de la región
                     if label:
                         # Calcular la posición central en X
-                        if pd.api.types.is_datetime64_any_dtype(self.df[self.x_col]):
+                        if self.x_is_datetime:
                             mid_x = pd.Timestamp(from_x) + (pd.Timestamp(to_x) - pd.Timestamp(from_x)) / 2
-                        elif isinstance(from_x, str) and isinstance(to_x, str):
-                            # Para strings, usar el índice de los valores en el eje X
-                            try:
-                                idx_from = self.df[self.df[self.x_col] == from_x].index[0]
-                                idx_to = self.df[self.df[self.x_col] == to_x].index[0]
-                                mid_idx = (idx_from + idx_to) / 2
-                                mid_idx = int(mid_idx) if mid_idx.is_integer() else mid_idx
-                                mid_x = self.df.iloc[int(mid_idx)][self.x_col]
-                            except (IndexError, ValueError):
-                                # Si no se encuentra exactamente, usar un valor intermedio aproximado
-                                mid_x = from_x  # Usar el valor 'from' como fallback
+                        elif from_pos is not None:
+                            # Para strings, usar la posición intermedia en el eje X
+                            mid_x = self.x_values[(from_pos + to_pos) // 2]
                         else:
                             # Para números, calcular el punto medio directamente
                             mid_x = from_x + (to_x - from_x) / 2
@@ -246,9 +248,9 @@ class LineChart(BaseChart):
                             )
                         )
                     
-                    print(f"  ✓ Región añadida: {label} ({from_x} a {to_x})")
+                    logger.debug("  ✓ Región añadida: %s (%s a %s)", label, from_x, to_x)
                 except Exception as e:
-                    print(f"  ⚠️ Error al añadir región '{label}': {e}")
+                    logger.warning("⚠️ Error al añadir región '%s': %s", label, e)
 
         # Configurar grid
         grid_config = self.params.get("grid", True)
@@ -294,19 +296,21 @@ class LineChart(BaseChart):
         yfont_color = yfont_config.get("color", "#333333")
         
         # Formatear las etiquetas del eje X
-        plt.xticks(fontsize=xfont_size, color=xfont_color)
+        self.ax.tick_params(axis="x", labelsize=xfont_size, labelcolor=xfont_color)
         
         # Configurar rotación para fechas
-        if pd.api.types.is_datetime64_any_dtype(self.df[self.x_col]):
+        if self.x_is_datetime:
             # Determinar el formato de fecha según los datos
-            self.ax.xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter("%Y-%m-%d"))
-            plt.xticks(rotation=45, ha="right")
+            self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+            self.ax.tick_params(axis="x", labelrotation=45)
+            for label in self.ax.get_xticklabels():
+                label.set_horizontalalignment("right")
             
             # Ajustar el número de ticks para que no se superpongan
             self.fig.autofmt_xdate()
         
         # Formatear las etiquetas del eje Y
-        plt.yticks(fontsize=yfont_size, color=yfont_color)
+        self.ax.tick_params(axis="y", labelsize=yfont_size, labelcolor=yfont_color)
         
         # Configurar límites de los ejes
         if xaxis_config.get("limit"):
@@ -408,13 +412,12 @@ class LineChart(BaseChart):
             return
             
         # Añadir etiquetas a cada serie
-        for serie in self.series_cols:
-            col_name = serie.get("column")
+        for i, serie in enumerate(self.series_cols):
             color = serie.get("color", color)
             
             # Obtener valores X e Y
-            x_values = self.df[self.x_col].tolist()
-            y_values = self.df[col_name].tolist()
+            x_values = self.x_values.tolist()
+            y_values = self.data.values[i].tolist()
             
             # Determinar qué puntos mostrar
             if only_last:
@@ -463,7 +466,7 @@ def linechart(config_path: Path):
     try:
         render_chart(LineChart, config_path)
     except Exception as e:
-        print(f"❌ Error al generar el gráfico de líneas: {e}")
+        logger.error("❌ Error al generar el gráfico de líneas: %s", e)
         raise
 
 def main():
@@ -481,5 +484,5 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         linechart(Path(sys.argv[1]))
     else:
-        print("❌ Error: Debe proporcionar la ruta al archivo de configuración YAML.")
+        logger.error("❌ Error: Debe proporcionar la ruta al archivo de configuración YAML.")
         sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,92 @@
+# app/plots/registry.py
+"""
+Registro perezoso de tipos de gráfico.
+
+Solo guarda nombres (módulo, clase y función de comando); los módulos de
+gráficos, y con ellos pandas, matplotlib y PIL, se importan recién cuando se
+ejecuta un subcomando. Así ``--help`` y el parseo de argumentos arrancan sin
+cargar nada pesado.
+
+Para agregar un tipo nuevo basta con sumar una entrada a ``CHART_TYPES``.
+"""
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+
+CHART_TYPES: dict[str, dict[str, str]] = {
+    "stackedbarh": {
+        "module": "app.plots.stackedbarh",
+        "class": "StackedHorizontalBarChart",
+        "command": "stackedbarh",
+        "help": "Gráfico de barras horizontales apiladas",
+    },
+    "barv": {
+        "module": "app.plots.barv",
+        "class": "VerticalBarChart",
+        "command": "barv",
+        "help": "Gráfico de barras verticales",
+    },
+    "linechart": {
+        "module": "app.plots.linechart",
+        "class": "LineChart",
+        "command": "linechart",
+        "help": "Gráfico de líneas",
+    },
+}
+
+
+def chart_names() -> list[str]:
+    """Nombres de los tipos de gráfico registrados."""
+    return list(CHART_TYPES)
+
+
+def _entry(name: str) -> dict[str, str]:
+    try:
+        return CHART_TYPES[name]
+    except KeyError:
+        raise KeyError(f"Tipo de gráfico '{name}' no reconocido. Disponibles: {', '.join(CHART_TYPES)}") from None
+
+
+def get_chart_class(name: str):
+    """Importa (solo) el módulo del tipo pedido y devuelve su clase."""
+    entry = _entry(name)
+    module = importlib.import_module(entry["module"])
+    return getattr(module, entry["class"])
+
+
+def get_command(name: str):
+    """Importa el módulo del tipo pedido y devuelve su función de comando."""
+    entry = _entry(name)
+    module = importlib.import_module(entry["module"])
+    return getattr(module, entry["command"])
+
+
+def run_chart(name: str, config: Path):
+    """Ejecuta el comando de un tipo de gráfico con la ruta de configuración."""
+    return get_command(name)(Path(config))
+
+
+def add_commands(app, names=None) -> None:
+    """
+    Registra un subcomando Typer por cada tipo de gráfico sin importar sus módulos.
+
+    Params:
+        app: Aplicación Typer
+        names: Subconjunto de tipos a registrar (por defecto, todos)
+    """
+    for name in names or CHART_TYPES:
+        entry = _entry(name)
+        app.command(name=name, help=entry["help"])(_make_command(name))
+
+
+def _make_command(name: str):
+    """Función de comando que importa el gráfico recién al ejecutarse."""
+    import typer
+
+    def command(config: Path = typer.Argument(..., help="Ruta a config YAML")):
+        run_chart(name, config)
+
+    command.__name__ = name
+    command.__doc__ = CHART_TYPES[name]["help"]
+    return command
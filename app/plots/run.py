@@ -13,11 +13,9 @@ Ejemplo:
 import sys
 from pathlib import Path
 
-AVAILABLE_TYPES = {
-    "stackedbarh": "Gráfico de barras horizontales apiladas",
-    "barv": "Gráfico de barras verticales",
-    "linechart": "Gráfico de líneas",
-}
+from app.plots.registry import CHART_TYPES, run_chart
+
+AVAILABLE_TYPES = {name: entry["help"] for name, entry in CHART_TYPES.items()}
 
 def show_help():
     """Muestra información de ayuda sobre el uso del módulo."""
@@ -46,17 +44,9 @@ def main():
         print(f"Error: El archivo de configuración '{config_path}' no existe.")
         return
     
-    # Importar la función correspondiente según el tipo de gráfico
+    # Importar (solo) el módulo del tipo de gráfico pedido y ejecutarlo
     try:
-        if chart_type == "stackedbarh":
-            from app.plots.stackedbarh import stackedbarh
-            stackedbarh(config_path)
-        elif chart_type == "barv":
-            from app.plots.barv import barv
-            barv(config_path)
-        elif chart_type == "linechart":
-            from app.plots.linechart import linechart
-            linechart(config_path)
+        run_chart(chart_type, config_path)
     except Exception as e:
         print(f"Error al generar el gráfico: {e}")
         raise
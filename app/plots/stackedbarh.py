@@ -1,26 +1,47 @@
+import logging
 from pathlib import Path
 import typer
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib import colormaps
+from matplotlib.text import Text
+from matplotlib.ticker import FixedFormatter, FixedLocator
 
 from app.plots.base_chart import BaseChart
+from app.chart_data import ChartData
+from app.figures import new_figure, release_figure
+from app.images import load_image
+
+logger = logging.getLogger(__name__)
 
 class StackedHorizontalBarChart(BaseChart):
     """
     Clase para gráficos de barras horizontales apiladas.
     Hereda de BaseChart e implementa los métodos específicos para este tipo de gráfico.
     """
+    config_kind = "stackedbarh"
+
+    # Separación horizontal (en unidades de datos) entre el final de la barra y la bandera
+    FLAG_END_OFFSET = 1.0
+    # Separación (en pulgadas) entre título, subtítulo y barras al reacomodar el encabezado
+    HEADER_GAP_IN = 0.25
+
     def setup_dimensions(self):
         """Configura las dimensiones del gráfico basado en el contenido."""
-        autosize = self.params.get("autosize", {})
+        text_length = max(len(str(cat)) for cat in self.cats)
+        # Las dimensiones se guardan en la instancia; los parámetros son inmutables
+        self.width_in, self.height_in = self.estimate_size(self.params, len(self.data), text_length)
+        
+    @classmethod
+    def estimate_size(cls, params, rows, label_len=0):
+        """Alto según la cantidad de filas y ancho según la categoría más larga."""
+        autosize = params.get("autosize", {})
         if autosize.get("enabled", False) or True:  # Siempre usar el autoajuste
             # Calcular altura basada en el número de categorías
-            n_rows = len(self.df)
             height_per_row = float(autosize.get("height_per_row", 0.18))
             
             # Calcular altura total necesaria
-            total_height = n_rows * height_per_row
+            total_height = rows * height_per_row
             
             # Aplicar límites min/max
             height_in = min(
@@ -32,21 +53,16 @@ class StackedHorizontalBarChart(BaseChart):
             add_height_ratio = float(autosize.get("add_height_ratio", 0))
             if add_height_ratio > 0:
                 height_in += height_in * add_height_ratio
-                print(f"📏 Añadiendo {add_height_ratio*100:.1f}% de altura extra para títulos grandes")
+                logger.debug("📏 Añadiendo %.1f%% de altura extra para títulos grandes", add_height_ratio * 100)
             
             # Ancho proporcional al contenido
-            text_length = max(len(str(cat)) for cat in self.cats)
             base_width = 12
-            width_adjustment = text_length * 0.2
+            width_adjustment = label_len * 0.2
             width_in = base_width + width_adjustment
         else:
-            width_in = float(self.params.get("width_in", 12))
-            height_in = float(self.params.get("height_in", 6))
-
-        self.params.update({
-            "width_in": width_in,
-            "height_in": height_in
-        })
+            width_in = float(params.get("width_in", 12))
+            height_in = float(params.get("height_in", 6))
+        return width_in, height_in
         
     def prepare_data(self):
         """Prepara los datos para el gráfico y los ordena."""
@@ -54,95 +70,70 @@ class StackedHorizontalBarChart(BaseChart):
         cat_col_from_params = self.params.get("data", {}).get("category_col")
         self.cat_col = cat_col_from_params if cat_col_from_params else self.df.columns[0]
         
-        print(f"🔍 En prepare_data: Usando columna de categorías: '{self.cat_col}'")
+        logger.debug("🔍 En prepare_data: Usando columna de categorías: '%s'", self.cat_col)
         
         # Determinar columnas para las series
         self.cols = self._get_series_columns()
         
-        # Aplicar filtrado por valor mínimo si está configurado
+        # Filtrado por valor mínimo (se resuelve sobre los totales, sin copiar el DataFrame)
         filter_min_value = self.params.get("chart", {}).get("filter_min_value", None)
-        
+        min_total = None
         if filter_min_value is not None and filter_min_value > 0:
-            print(f"🔍 Aplicando filtro de valor mínimo: {filter_min_value}")
-            # Calcular totales antes de filtrar para mensajes informativos
-            pre_filter_len = len(self.df)
-            
-            # Crear una columna de totales temporalmente para el filtrado
-            temp_df = self.df.copy()
-            temp_df['_temp_total'] = temp_df[self.cols].sum(axis=1)
-            
-            # Filtrar usando el método de la clase base
-            self.df = self.filter_by_threshold(
-                temp_df, 
-                total_column='_temp_total', 
-                threshold=filter_min_value, 
-                category_column=self.cat_col
-            )
-            
-            # Eliminar la columna temporal
-            self.df.drop('_temp_total', axis=1, inplace=True)
-            
-            post_filter_len = len(self.df)
-            if pre_filter_len > post_filter_len:
-                print(f"✅ Filtrado completado: Quedaron {post_filter_len} de {pre_filter_len} elementos.")
-        
-        # Preparar matriz de datos
-        self.M = np.vstack([self.df[c].astype(float).to_numpy() for c in self.cols])
+            logger.debug("🔍 Aplicando filtro de valor mínimo: %s", filter_min_value)
+            min_total = filter_min_value
         
-        # Calcular totales por categoría para ordenamiento (por defecto suma de todas las series)
-        self.totals = self.M.sum(axis=0)
-        # Permitir columna de ordenamiento personalizada
+        # Criterio de ordenamiento: columna personalizada o total de las series
         sort_by_column = self.params.get("sort_by_column")
+        invert_order = self.params.get("invert_order", False)
         if sort_by_column is not None:
-            # Ordenar por la columna especificada
             if sort_by_column not in self.df.columns:
                 raise KeyError(f"La columna para ordenar '{sort_by_column}' no existe en el DataFrame. Columnas disponibles: {list(self.df.columns)}")
-            sort_values = self.df[sort_by_column].astype(float).to_numpy()
-            invert_order = self.params.get("invert_order", False)
-            if invert_order:
-                sorted_indices = np.argsort(sort_values)
-                print(f"🔄 Aplicando orden ASCENDENTE (de menor a mayor) por columna '{sort_by_column}'")
-            else:
-                sorted_indices = np.argsort(-sort_values)
-                print(f"🔄 Aplicando orden DESCENDENTE (de mayor a menor) por columna '{sort_by_column}'")
-            self.M = self.M[:, sorted_indices]
-            self.totals = self.totals[sorted_indices]
-            self.cats = [self.df[self.cat_col].astype(str).tolist()[i] for i in sorted_indices]
-            print("📊 Primeros 5 nombres de países después de ordenar:")
-            for i, cat in enumerate(self.cats[:5]):
-                print(f"  - {i+1}: {cat}")
-            self.df = self.df.iloc[sorted_indices].reset_index(drop=True)
-        # Si no se especifica columna, usar el comportamiento anterior (por total)
+            sort_by = sort_by_column
         elif self.params.get("sort_by_total", True):
-            invert_order = self.params.get("invert_order", False)
-            if invert_order:
-                sorted_indices = np.argsort(self.totals)
-                print("🔄 Aplicando orden ASCENDENTE (de menor a mayor)")
-            else:
-                sorted_indices = np.argsort(-self.totals)
-                print("🔄 Aplicando orden DESCENDENTE (de mayor a menor)")
-            self.M = self.M[:, sorted_indices]
-            self.totals = self.totals[sorted_indices]
-            self.cats = [self.df[self.cat_col].astype(str).tolist()[i] for i in sorted_indices]
-            print("📊 Primeros 5 nombres de países después de ordenar:")
-            for i, cat in enumerate(self.cats[:5]):
-                print(f"  - {i+1}: {cat}")
-            self.df = self.df.iloc[sorted_indices].reset_index(drop=True)
+            sort_by = ChartData.BY_TOTAL
         else:
-            # Sin ordenamiento especial
-            self.cats = self.df[self.cat_col].astype(str).tolist()
+            sort_by = None
+        
+        self.data = ChartData.from_frame(
+            self.df,
+            self.cat_col,
+            self.cols,
+            sort_by=sort_by,
+            ascending=bool(invert_order),
+            min_total=min_total,
+        )
+        
+        if min_total is not None and len(self.data) < len(self.df):
+            self.report_filtered(self.data, min_total)
+            logger.info("✅ Filtrado completado: Quedaron %s de %s elementos.", len(self.data), len(self.df))
+        
+        if sort_by is not None:
+            direction = "ASCENDENTE (de menor a mayor)" if invert_order else "DESCENDENTE (de mayor a menor)"
+            if sort_by == ChartData.BY_TOTAL:
+                logger.debug("🔄 Aplicando orden %s", direction)
+            else:
+                logger.debug("🔄 Aplicando orden %s por columna '%s'", direction, sort_by_column)
         
         # Aplicar porcentaje si está configurado
         if bool(self.params.get("percent", False)):
-            colsum = self.M.sum(axis=0)
-            colsum[colsum == 0] = 1.0
-            self.M = self.M / colsum * 100.0
+            self.data.to_percent()
+        
+        # Vistas usadas por el resto de las etapas
+        self.M = self.data.values
+        self.totals = self.data.totals
+        self.cats = self.data.cats
+        if sort_by is not None:
+            logger.debug("📊 Primeros 5 nombres de países después de ordenar: %s", list(self.cats[:5]))
 
         # === NUEVO: Calcular totales por tipo de medalla para la leyenda ===
+        # Se arma una copia derivada; self.params no se modifica
         legend_cfg = self.params.get("legend_config", {}).copy()
         # SIEMPRE inyectar la paleta de colores global al legend_config (sobrescribe cualquier valor previo)
         legend_cfg["colors"] = self.params.get("colors", {})
-        icons = legend_cfg.get("icons", [])
+        icons = [dict(icon) for icon in legend_cfg.get("icons") or []]
+        if icons:
+            legend_cfg["icons"] = icons
+        self.legend_config = legend_cfg
         # Solo si hay íconos y cada uno tiene un label que coincide con una columna
         if icons and all("label" in icon for icon in icons):
             # Mapear label a columna real (insensible a mayúsculas)
@@ -157,7 +148,9 @@ class StackedHorizontalBarChart(BaseChart):
                         colname = col_map[c]
                         break
                 if colname and colname in self.df.columns:
-                    total = self.df[colname].sum()
+                    # Total sobre las filas que quedaron tras el filtrado
+                    total = self.data.column(self.df, colname).sum()
+                    icon["_column"] = colname
                     icon["_total"] = int(total)
                     if show_totals:
                         icon["_label_with_total"] = f"{icon['label']} ({int(total)})"
@@ -180,7 +173,7 @@ class StackedHorizontalBarChart(BaseChart):
         cols_map = {c.lower(): c for c in self.df.columns}
         
         if series_order:
-            print(f"✅ Usando series definidas en configuración: {series_order}")
+            logger.debug("✅ Usando series definidas en configuración: %s", series_order)
             missing = [s for s in series_order if s.lower() not in cols_map]
             if missing:
                 raise KeyError(f"No encontré estas series en el CSV: {missing}. Columnas vistas: {list(self.df.columns)}")
@@ -192,7 +185,7 @@ class StackedHorizontalBarChart(BaseChart):
         if not cols:
             raise ValueError("No hay columnas numéricas para apilar. Usa overrides.series_order.")
         
-        print(f"✅ Series detectadas automáticamente: {cols}")
+        logger.debug("✅ Series detectadas automáticamente: %s", cols)
         return cols
     
     def create_figure(self):
@@ -210,13 +203,21 @@ class StackedHorizontalBarChart(BaseChart):
         min_left_margin = float(margins_config.get("min_left", 0.1))
         max_left_margin = float(margins_config.get("max_left", 0.25))
         
+        # Los márgenes son fracciones del tamaño propio del gráfico: en otro
+        # tamaño (variantes) los laterales se conservan en pulgadas para que
+        # los nombres quepan. El inferior sigue al footer, que va en fracciones.
+        scale_x, scale_y = self.layout_scale()
+        margin_right *= scale_x
+        min_left_margin *= scale_x
+        max_left_margin *= scale_x
+        
         # Margen izquierdo manual si se especifica
         manual_left_margin = margins_config.get("left", None)
         
         # Manejo especial para el margen izquierdo en barras horizontales
         if auto_adjust and manual_left_margin is None:
             # Crear un eje temporal para calcular el ancho exacto de los textos
-            temp_fig = plt.figure(figsize=(1, 1))
+            temp_fig = new_figure(figsize=(1, 1))
             temp_ax = temp_fig.add_subplot(111)
             
             # Obtener la configuración de fuente para los nombres
@@ -235,29 +236,29 @@ class StackedHorizontalBarChart(BaseChart):
                 max_width = max(max_width, width_inches)
                 t.remove()  # Limpiamos el texto
             
-            plt.close(temp_fig)  # Cerramos la figura temporal
+            release_figure(temp_fig)  # Liberamos la figura temporal
             
             # Convertir pulgadas a fracción de figura
-            width_in = float(self.params.get("width_in", 12))
+            width_in = self.width_in
             left_margin_inches = max_width + margin_text_padding  # Añadimos el padding configurado
             left_margin = left_margin_inches / width_in
             
             # Limitamos el margen para casos extremos
             left_margin = min(max_left_margin, max(min_left_margin, left_margin))
             
-            print(f"Cálculo preciso: Ancho máximo de texto = {max_width:.2f} pulgadas")
-            print(f"Ajuste automático: Margen izquierdo = {left_margin:.2f}")
+            logger.debug("Cálculo preciso: Ancho máximo de texto = %.2f pulgadas", max_width)
+            logger.debug("Ajuste automático: Margen izquierdo = %.2f", left_margin)
         else:
             # Usar el valor manual si se especificó
-            left_margin = float(manual_left_margin) if manual_left_margin is not None else min_left_margin
-            print(f"Usando margen izquierdo manual: {left_margin:.2f}")
+            left_margin = float(manual_left_margin) * scale_x if manual_left_margin is not None else min_left_margin
+            logger.debug("Usando margen izquierdo manual: %.2f", left_margin)
         
         # Calculamos el ancho disponible para el gráfico
         plot_width = 1.0 - left_margin - margin_right
-        print(f"Configuración final: Margen izquierdo = {left_margin:.2f}, Ancho gráfico = {plot_width:.2f}")
+        logger.debug("Configuración final: Margen izquierdo = %.2f, Ancho gráfico = %.2f", left_margin, plot_width)
         
         # Actualizar el eje principal con los márgenes calculados
-        header_height = float(self.params.get("margins", {}).get("top", 0.25))
+        header_height = float(self.params.get("margins", {}).get("top", 0.25)) * scale_y
         self.ax.remove()  # Eliminamos el eje creado por la clase base
         self.ax = self.fig.add_axes([left_margin, margin_bottom, plot_width, 1.0-margin_bottom-header_height])
         
@@ -271,11 +272,11 @@ class StackedHorizontalBarChart(BaseChart):
         bar_gap = float(bar_config.get("gap", 0.0))  # Espacio entre barras como fracción de altura
         
         # Imprimir la configuración para depuración
-        print("📊 Configuración de barras:")
-        print(f"  - Altura: {bar_height:.2f}")
-        print(f"  - Espacio entre barras: {bar_gap:.2f}")
-        print(f"  - Color del borde: {bar_edgecolor}")
-        print(f"  - Grosor del borde: {bar_linewidth:.2f}")
+        logger.debug("📊 Configuración de barras:")
+        logger.debug("  - Altura: %.2f", bar_height)
+        logger.debug("  - Espacio entre barras: %.2f", bar_gap)
+        logger.debug("  - Color del borde: %s", bar_edgecolor)
+        logger.debug("  - Grosor del borde: %.2f", bar_linewidth)
         
         n_categories = len(self.cats)
         
@@ -284,7 +285,7 @@ class StackedHorizontalBarChart(BaseChart):
         if bar_gap > 0:
             # Reducir la altura para dejar espacio
             effective_height = bar_height * (1 - bar_gap)
-            print(f"🔄 Aplicando espacio entre barras: gap={bar_gap:.2f}, altura efectiva={effective_height:.2f}")
+            logger.debug("🔄 Aplicando espacio entre barras: gap=%.2f, altura efectiva=%.2f", bar_gap, effective_height)
         
         # Posiciones de las barras
         self.y_positions = np.arange(n_categories)
@@ -298,11 +299,14 @@ class StackedHorizontalBarChart(BaseChart):
             for i, col in enumerate(self.cols):
                 colors[col] = default_colors[i % len(default_colors)]
         
-        # Dibujar barras
+        # Dibujar barras (los artistas se guardan para update_data)
         self.bottoms = np.zeros(len(self.cats))
+        self.bar_containers = []
+        self.value_labels = {}
+        self.total_labels = []
         for i, (serie, vals) in enumerate(zip(self.cols, self.M)):
-            color = colors.get(serie, plt.cm.tab10.colors[i % 10])
-            self.ax.barh(
+            color = colors.get(serie, colormaps["tab10"].colors[i % 10])
+            container = self.ax.barh(
                 self.y_positions, vals, 
                 height=effective_height,
                 left=self.bottoms, 
@@ -311,22 +315,18 @@ class StackedHorizontalBarChart(BaseChart):
                 edgecolor=bar_edgecolor,
                 linewidth=bar_linewidth
             )
+            self.bar_containers.append(container)
             
             # Añadir etiquetas de valores en las barras
             if bool(self.params.get("value_labels", False)):
-                # Obtener configuración de etiquetas de valores
-                value_labels_config = self.params.get("value_labels_config", {}) if isinstance(self.params.get("value_labels"), bool) else self.params.get("value_labels", {})
-                
                 # Obtener tamaño de fuente y formato
-                font_size = float(value_labels_config.get("font_size", 9))
-                font_weight = value_labels_config.get("font_weight", "normal")
-                fmt = self.params.get("value_format", "{:.0f}")
+                font_size, font_weight, fmt = self._value_label_style()
                 
                 # Imprimir información de configuración para depuración
-                print("📊 Configuración de etiquetas de valores:")
-                print(f"  - Tamaño de fuente: {font_size}")
-                print(f"  - Peso de fuente: {font_weight}")
-                print(f"  - Formato: {fmt}")
+                logger.debug("📊 Configuración de etiquetas de valores:")
+                logger.debug("  - Tamaño de fuente: %s", font_size)
+                logger.debug("  - Peso de fuente: %s", font_weight)
+                logger.debug("  - Formato: %s", fmt)
                 
                 for j, val in enumerate(vals):
                     if val > 0:  # Solo mostrar valores positivos
@@ -337,7 +337,7 @@ class StackedHorizontalBarChart(BaseChart):
                         # Determinar color del texto (contraste)
                         text_color = "white" if val > 5 else "black"
                         
-                        self.ax.text(
+                        self.value_labels[(i, j)] = self.ax.text(
                             x_pos, y_pos, 
                             fmt.format(val),
                             ha='center', va='center',
@@ -359,12 +359,12 @@ class StackedHorizontalBarChart(BaseChart):
             font_color = total_labels_config.get("color", "#333333")
             fmt = total_labels_config.get("value_format", "{:.0f}")
             
-            print("📊 Añadiendo etiquetas de totales al final de las barras:")
-            print(f"  - Offset X: {x_offset}")
-            print(f"  - Tamaño de fuente: {font_size}")
-            print(f"  - Peso de fuente: {font_weight}")
-            print(f"  - Color: {font_color}")
-            print(f"  - Formato: {fmt}")
+            logger.debug("📊 Añadiendo etiquetas de totales al final de las barras:")
+            logger.debug("  - Offset X: %s", x_offset)
+            logger.debug("  - Tamaño de fuente: %s", font_size)
+            logger.debug("  - Peso de fuente: %s", font_weight)
+            logger.debug("  - Color: %s", font_color)
+            logger.debug("  - Formato: %s", fmt)
             
             # Añadir etiquetas con los totales
             for i, (cat, total) in enumerate(zip(self.cats, self.bottoms)):
@@ -373,15 +373,260 @@ class StackedHorizontalBarChart(BaseChart):
                 y_pos = self.y_positions[i]
                 
                 # Añadir etiqueta de total
-                self.ax.text(
+                self.total_labels.append(self.ax.text(
                     x_pos, y_pos,
                     fmt.format(total),
                     ha='left', va='center',
                     color=font_color,
                     fontsize=font_size,
                     fontweight=font_weight
-                )
-                print(f"  ✓ Total para {cat}: {total:.0f}")
+                ))
+                logger.debug("  ✓ Total para %s: %.0f", cat, total)
+
+    def _value_label_style(self):
+        """Tamaño de fuente, peso y formato de las etiquetas de valores."""
+        value_labels_config = self.params.get("value_labels_config", {}) if isinstance(self.params.get("value_labels"), bool) else self.params.get("value_labels", {})
+        font_size = float(value_labels_config.get("font_size", 9))
+        font_weight = value_labels_config.get("font_weight", "normal")
+        fmt = self.params.get("value_format", "{:.0f}")
+        return font_size, font_weight, fmt
+
+    def _set_value_label(self, i, j, val, position):
+        """
+        Crea, actualiza u oculta la etiqueta de valor del segmento (serie ``i``, fila ``j``).
+
+        Returns:
+            bool: True si la etiqueta cambió
+        """
+        label = self.value_labels.get((i, j))
+        if val <= 0 or position is None:
+            if label is not None and label.get_visible():
+                label.set_visible(False)
+                return True
+            return False
+        font_size, font_weight, fmt = self._value_label_style()
+        text = fmt.format(val)
+        color = "white" if val > 5 else "black"
+        if label is None:
+            self.value_labels[(i, j)] = self.ax.text(
+                *position, text, ha='center', va='center',
+                color=color, fontsize=font_size, fontweight=font_weight
+            )
+            return True
+        if label.get_text() != text or label.get_position() != position or not label.get_visible():
+            label.set_text(text)
+            label.set_position(position)
+            label.set_color(color)
+            label.set_visible(True)
+            return True
+        return False
+
+    def _flags_at_end(self):
+        """Indica si las banderas van al final de las barras (necesitan margen extra)."""
+        flags_config = self.params.get("flags", {})
+        return flags_config.get("enabled", False) and flags_config.get("position", "start") == "end"
+
+    def update_data(self, df):
+        """
+        Actualiza en el lugar un gráfico ya renderizado con datos nuevos.
+
+        Reordena las filas y ajusta anchos y desplazamientos de las barras;
+        solo se reescriben las etiquetas, nombres, banderas y totales de
+        leyenda que cambiaron. No repite fuentes, título ni cromática.
+        Usado por ``app.live.LiveChart``.
+
+        Params:
+            df (DataFrame): Datos nuevos (mismas columnas que los originales)
+
+        Returns:
+            dict: Elementos modificados (``bars``, ``labels``, ``flags``), o None si
+            cambió la cantidad de filas o de series y hay que renderizar de nuevo.
+        """
+        if self.fig is None or not getattr(self, "bar_containers", None):
+            return None
+        old_cats = list(self.cats)
+        old_cols = list(self.cols)
+        old_legend = [icon.get("_label_with_total") for icon in self.legend_config.get("icons") or []]
+
+        self.df = df
+        self.prepare_data()
+        if len(self.cats) != len(old_cats) or list(self.cols) != old_cols:
+            return None
+
+        changes = {"bars": 0, "labels": 0, "flags": 0}
+        show_values = bool(self.params.get("value_labels", False))
+
+        # Barras y etiquetas de valores
+        bottoms = np.zeros(len(self.cats))
+        for i, (container, vals) in enumerate(zip(self.bar_containers, self.M)):
+            for j, (rect, val) in enumerate(zip(container.patches, vals)):
+                if rect.get_x() != bottoms[j] or rect.get_width() != val:
+                    rect.set_x(bottoms[j])
+                    rect.set_width(val)
+                    changes["bars"] += 1
+                if show_values and self._set_value_label(i, j, val, (bottoms[j] + val / 2, self.y_positions[j])):
+                    changes["labels"] += 1
+            bottoms += vals
+        self.bottoms = bottoms
+
+        # Totales al final de las barras
+        total_labels_config = self.params.get("total_labels", {})
+        x_offset = float(total_labels_config.get("x_offset", 4))
+        total_fmt = total_labels_config.get("value_format", "{:.0f}")
+        for i, label in enumerate(self.total_labels):
+            text = total_fmt.format(bottoms[i])
+            position = (bottoms[i] + x_offset, self.y_positions[i])
+            if label.get_text() != text or label.get_position() != position:
+                label.set_text(text)
+                label.set_position(position)
+                changes["labels"] += 1
+
+        # Nombres en el eje Y (solo si se muestran y cambió el orden)
+        new_cats = list(self.cats)
+        shown = any(label.get_text() for label in self.ax.get_yticklabels())
+        if new_cats != old_cats and shown:
+            self.ax.set_yticklabels(new_cats)
+            changes["labels"] += sum(a != b for a, b in zip(old_cats, new_cats))
+
+        # Límites del eje X (mismo margen que configure_axes)
+        flags_config = self.params.get("flags", {})
+        flags_at_end = self._flags_at_end()
+        self.ax.set_xlim(0, bottoms.max() * (1.15 if flags_at_end else 1.05))
+
+        # Banderas: se recargan solo las filas cuyo país cambió
+        if flags_config.get("enabled", False):
+            flag_boxes = getattr(self, "flag_boxes", {})
+            for i, (cat, flag_path) in enumerate(zip(self.cats, self._flag_paths())):
+                ab, old_path = flag_boxes.get(i, (None, None))
+                if flag_path != old_path:
+                    if ab is not None:
+                        ab.remove()
+                    flag_boxes.pop(i, None)
+                    ab = self._add_flag(i, cat, flag_path)
+                    if ab is not None:
+                        flag_boxes[i] = (ab, flag_path)
+                    changes["flags"] += 1
+                elif ab is not None and flags_at_end:
+                    ab.xy = (bottoms[i] + self.FLAG_END_OFFSET, self.y_positions[i])
+            self.flag_boxes = flag_boxes
+
+        # Totales de la leyenda ("Oro (123)"): se reemplaza el texto ya dibujado
+        new_legend = [icon.get("_label_with_total") for icon in self.legend_config.get("icons") or []]
+        renamed = {old: new for old, new in zip(old_legend, new_legend) if old and new and old != new}
+        if renamed:
+            for text in self.fig.findobj(Text):
+                if text.get_text() in renamed:
+                    text.set_text(renamed[text.get_text()])
+                    changes["labels"] += 1
+
+        return changes
+
+    # === Animación (app/animation.py) ===
+
+    def frame_values(self, df):
+        """
+        Valores de las series de ``df`` en el orden de dibujo de las filas.
+
+        Las categorías ausentes en ``df`` valen 0. Devuelve una matriz
+        (series x filas) como ``self.M``, con ``percent`` aplicado.
+        """
+        table = df.set_index(self.cat_col).reindex(self.cats)
+        values = table[list(self.cols)].fillna(0).to_numpy(dtype=np.float64).T
+        if bool(self.params.get("percent", False)):
+            colsum = values.sum(axis=0)
+            colsum[colsum == 0] = 1.0
+            values = values / colsum * 100.0
+        return values
+
+    def frame_positions(self, values):
+        """Puesto de cada fila para ``values`` con el mismo criterio que prepare_data."""
+        n_rows = values.shape[1]
+        positions = np.arange(n_rows, dtype=np.float64)
+        if self.params.get("sort_by_column") is not None or not self.params.get("sort_by_total", True):
+            return positions
+        totals = values.sum(axis=0)
+        order = np.argsort(totals if self.params.get("invert_order", False) else -totals, kind="stable")
+        positions[order] = np.arange(n_rows)
+        return positions
+
+    def start_frames(self, top_n=None):
+        """
+        Prepara el gráfico ya renderizado para dibujar cuadros con set_frame.
+
+        Params:
+            top_n (int): Filas visibles (las de mayor total); por defecto todas
+        """
+        n_rows = len(self.cats)
+        if top_n and top_n < n_rows:
+            first = n_rows - top_n if self.params.get("invert_order", False) else 0
+            self.ax.set_ylim(first - 0.5, first + top_n - 0.5)
+        # Nombres fijos por fila; set_frame solo mueve los ticks (set_yticks ampliaría la vista)
+        if any(label.get_text() for label in self.ax.get_yticklabels()):
+            self.ax.yaxis.set_major_formatter(FixedFormatter(list(self.cats)))
+        # Textos de la leyenda con totales ("Oro (123)") y la columna que suman
+        self._frame_legend = []
+        icons = [icon for icon in self.legend_config.get("icons") or []
+                 if icon.get("_column") in self.cols and icon.get("_label_with_total") != icon.get("label")]
+        if icons:
+            texts = {text.get_text(): text for text in self.fig.findobj(Text)}
+            for icon in icons:
+                if icon["_label_with_total"] in texts:
+                    self._frame_legend.append((texts[icon["_label_with_total"]], icon["label"],
+                                               list(self.cols).index(icon["_column"])))
+
+    def set_frame(self, values, positions):
+        """
+        Aplica un cuadro de animación sobre la figura retenida.
+
+        Params:
+            values (ndarray): Series x filas, en el orden de dibujo (ver frame_values)
+            positions (ndarray): Posición vertical de cada fila; admite valores
+                intermedios entre dos puestos. Las filas fuera de la vista se ocultan.
+        """
+        low, high = sorted(self.ax.get_ylim())
+        visible = (positions > low - 0.5) & (positions < high + 0.5)
+        show_values = bool(self.params.get("value_labels", False))
+
+        bottoms = np.zeros(values.shape[1])
+        for i, (container, vals) in enumerate(zip(self.bar_containers, values)):
+            for j, (rect, val) in enumerate(zip(container.patches, vals)):
+                rect.set_y(positions[j] - rect.get_height() / 2)
+                rect.set_x(bottoms[j])
+                rect.set_width(val)
+                if show_values:
+                    position = (bottoms[j] + val / 2, positions[j]) if visible[j] else None
+                    self._set_value_label(i, j, val, position)
+            bottoms += vals
+        self.bottoms = bottoms
+
+        total_labels_config = self.params.get("total_labels", {})
+        x_offset = float(total_labels_config.get("x_offset", 4))
+        total_fmt = total_labels_config.get("value_format", "{:.0f}")
+        for label, total, y, shown in zip(self.total_labels, bottoms, positions, visible):
+            label.set_text(total_fmt.format(total))
+            label.set_position((total + x_offset, y))
+            label.set_visible(shown)
+
+        self.ax.yaxis.set_major_locator(FixedLocator(positions))
+
+        flags_at_end = self._flags_at_end()
+        self.ax.set_xlim(0, max(bottoms.max(), 1) * (1.15 if flags_at_end else 1.05))
+        for i, (ab, _) in getattr(self, "flag_boxes", {}).items():
+            x = bottoms[i] + self.FLAG_END_OFFSET if flags_at_end else ab.xy[0]
+            ab.xy = (x, positions[i])
+            ab.set_visible(bool(visible[i]))
+
+        for text, label, col in self._frame_legend:
+            text.set_text(f"{label} ({int(round(values[col].sum()))})")
+
+    def animated_artists(self):
+        """Artistas que cambian entre cuadros (el resto se dibuja una sola vez)."""
+        artists = [rect for container in self.bar_containers for rect in container.patches]
+        artists += list(self.value_labels.values()) + list(self.total_labels)
+        artists += [ab for ab, _ in getattr(self, "flag_boxes", {}).values()]
+        artists += [text for text, _, _ in getattr(self, "_frame_legend", ())]
+        artists += [self.ax.xaxis, self.ax.yaxis]
+        return artists
 
     def configure_axes(self):
         """Configura los ejes y sus elementos."""
@@ -408,14 +653,14 @@ class StackedHorizontalBarChart(BaseChart):
         # Verificar si se deben ocultar las etiquetas del eje Y
         if not yaxis_config.get("show_labels", True):
             self.ax.set_yticklabels([])
-            print("🙈 Etiquetas del eje Y ocultas por configuración")
+            logger.debug("🙈 Etiquetas del eje Y ocultas por configuración")
         else:
             self.ax.set_yticklabels(self.cats)
         
         # Verificar si se deben ocultar los ticks del eje Y
         if not yaxis_config.get("show_ticks", True):
             self.ax.tick_params(axis='y', which='both', left=False, right=False, labelleft=False)
-            print("🙈 Ticks del eje Y ocultos por configuración")
+            logger.debug("🙈 Ticks del eje Y ocultos por configuración")
             
         # Eliminar spines innecesarios y configurar eje X según configuración
         spines_to_hide = ["top", "right"]
@@ -430,7 +675,7 @@ class StackedHorizontalBarChart(BaseChart):
             # Ocultar las etiquetas del eje X
             self.ax.xaxis.set_ticklabels([])
             spines_to_hide.append("bottom")
-            print("🙈 Eje X oculto completamente por configuración")
+            logger.debug("🙈 Eje X oculto completamente por configuración")
             # Métodos adicionales para asegurarse que todos los elementos del eje X estén ocultos
             self.ax.tick_params(axis='x', which='both', bottom=False, top=False, labelbottom=False)
             # Ocultar la línea del eje X completamente
@@ -452,7 +697,7 @@ class StackedHorizontalBarChart(BaseChart):
             self.ax.grid(axis='x', linestyle='--', alpha=0.3, color='#cccccc')
             self.ax.set_axisbelow(True)  # Grid detrás de las barras
         else:
-            print("📊 Grid horizontal desactivado porque el eje X está oculto")
+            logger.debug("📊 Grid horizontal desactivado porque el eje X está oculto")
                 
     def configure_axes_with_flags(self):
         """Configura los ejes y añade banderas junto a los nombres de países o al final de las barras."""
@@ -469,7 +714,7 @@ class StackedHorizontalBarChart(BaseChart):
         if flag_position == "end" and flags_config.get("enabled", False):
             # Dar más espacio al final para las banderas
             self.ax.set_xlim(0, self.bottoms.max() * 1.15)
-            print("🚩 Banderas configuradas al final de las barras - margen extra añadido.")
+            logger.debug("🚩 Banderas configuradas al final de las barras - margen extra añadido.")
         else:
             self.ax.set_xlim(0, self.bottoms.max() * 1.05)
         
@@ -483,33 +728,28 @@ class StackedHorizontalBarChart(BaseChart):
         if "show_labels" in yaxis_config:
             if not yaxis_config["show_labels"]:
                 self.ax.set_yticklabels([])
-                print("🙈 Etiquetas del eje Y ocultas por configuración de yaxis.show_labels=false")
+                logger.debug("🙈 Etiquetas del eje Y ocultas por configuración de yaxis.show_labels=false")
             else:
                 self.ax.set_yticklabels(self.cats)
-                print("✅ Etiquetas del eje Y mostradas por configuración de yaxis.show_labels=true")
-                # Información de depuración sobre las etiquetas
-                for i, cat in enumerate(self.cats[:5]):
-                    print(f"  - {i+1}: {cat}")
+                logger.debug("✅ Etiquetas del eje Y mostradas por configuración de yaxis.show_labels=true: %s", list(self.cats[:5]))
         else:
             # Si no hay configuración específica de yaxis.show_labels, usar la de flags
             if flags_config.get("show_axis_labels", True):
                 self.ax.set_yticklabels(self.cats)
-                print("🔤 Etiquetas establecidas en el eje Y (por flags.show_axis_labels):")
-                for i, cat in enumerate(self.cats[:5]):
-                    print(f"  - {i+1}: {cat}")
+                logger.debug("🔤 Etiquetas establecidas en el eje Y (por flags.show_axis_labels): %s", list(self.cats[:5]))
             else:
                 self.ax.set_yticklabels([])
-                print("🔤 Etiquetas ocultas por configuración de flags.show_axis_labels=false")
+                logger.debug("🔤 Etiquetas ocultas por configuración de flags.show_axis_labels=false")
         
         # Verificar si debemos ocultar los ticks del eje Y
         if not yaxis_config.get("show_ticks", True):
             # Ocultamos las marcas de tick pero mantenemos las etiquetas si show_labels es true
             if yaxis_config.get("show_labels", True):
                 self.ax.tick_params(axis='y', which='both', left=False, right=False, labelleft=True)
-                print("🙈 Ticks del eje Y ocultos pero etiquetas visibles")
+                logger.debug("🙈 Ticks del eje Y ocultos pero etiquetas visibles")
             else:
                 self.ax.tick_params(axis='y', which='both', left=False, right=False, labelleft=False)
-                print("🙈 Ticks y etiquetas del eje Y ocultos por configuración")
+                logger.debug("🙈 Ticks y etiquetas del eje Y ocultos por configuración")
             
             # También ocultamos el spine izquierdo
             self.ax.spines["left"].set_visible(False)
@@ -519,11 +759,11 @@ class StackedHorizontalBarChart(BaseChart):
         if y_position == "right":
             # Mover etiquetas al lado derecho
             self.ax.tick_params(axis='y', which='both', labelleft=False, labelright=True)
-            print("📊 Etiquetas del eje Y posicionadas a la DERECHA por configuración")
+            logger.debug("📊 Etiquetas del eje Y posicionadas a la DERECHA por configuración")
         else:
             # Mantener etiquetas en el lado izquierdo (predeterminado)
             self.ax.tick_params(axis='y', which='both', labelleft=True, labelright=False)
-            print("📊 Etiquetas del eje Y posicionadas a la IZQUIERDA por configuración")
+            logger.debug("📊 Etiquetas del eje Y posicionadas a la IZQUIERDA por configuración")
         
         # Aplicar estilos de fuente a las etiquetas si están visibles y ajustar posición para dejar espacio a las banderas
         if yaxis_config.get("show_labels", True) and "font" in yaxis_config:
@@ -533,7 +773,7 @@ class StackedHorizontalBarChart(BaseChart):
             
             # Ajustar las etiquetas del eje Y
             self.ax.tick_params(axis='y', which='both', pad=label_padding)
-            print(f"📏 Ajustando posición de etiquetas del eje Y: padding = {label_padding}")
+            logger.debug("📏 Ajustando posición de etiquetas del eje Y: padding = %s", label_padding)
             
             # Aplicar configuración de fuente
             for label in self.ax.get_yticklabels():
@@ -550,109 +790,131 @@ class StackedHorizontalBarChart(BaseChart):
             self.ax.xaxis.set_ticklabels([])
             self.ax.tick_params(axis='x', which='both', bottom=False, top=False, labelbottom=False)
             self.ax.get_xaxis().set_visible(False)
-            print("🙈 Eje X ocultado forzosamente por la configuración xaxis.hide_axis o xaxis.visible=false")
+            logger.debug("🙈 Eje X ocultado forzosamente por la configuración xaxis.hide_axis o xaxis.visible=false")
         
         # Grid sutil (solo si no se oculta el eje X)
         if self.params.get("grid", True) and self.params.get("xaxis", {}).get("show_ticks", True):
             self.ax.grid(axis='x', linestyle='--', alpha=0.3, color='#cccccc')
             self.ax.set_axisbelow(True)
         else:
-            print("📊 Grid horizontal desactivado porque el eje X está oculto")
+            logger.debug("📊 Grid horizontal desactivado porque el eje X está oculto")
         
         # Si no hay banderas habilitadas, terminamos aquí
         if not flags_config.get("enabled", False):
-            print("⚠️ Las banderas están desactivadas en la configuración.")
+            logger.debug("Las banderas están desactivadas en la configuración.")
             return
             
-        # Configuración para banderas
+        # Añadir banderas para cada país (se guardan por fila para update_data)
+        self.flag_boxes = {}
+        for i, (cat, flag_path) in enumerate(zip(self.cats, self._flag_paths())):
+            ab = self._add_flag(i, cat, flag_path)
+            if ab is not None:
+                self.flag_boxes[i] = (ab, flag_path)
+    
+    def _flag_paths(self):
+        """Ruta de la bandera de cada fila, en el orden de dibujo (None si no hay)."""
+        flags_config = self.params.get("flags", {})
         flag_col = flags_config.get("column", "flag_url")
         pattern = flags_config.get("pattern", "")
-        zoom = float(flags_config.get("zoom", 0.08))
         
-        # Añadir banderas para cada país
-        for i, cat in enumerate(self.cats):
-            # Posición y del país
-            y_pos = self.y_positions[i]
-            
+        # Columnas auxiliares alineadas al orden de dibujo
+        code_col = flags_config.get("code_column", "code")
+        flag_values = self.data.column(self.df, flag_col) if flag_col in self.df.columns else None
+        code_values = self.data.column(self.df, code_col) if code_col in self.df.columns else None
+        
+        paths = []
+        for i in range(len(self.cats)):
             # Determinar ruta de bandera
             flag_path = None
             
             # Intentar obtener directamente de la columna flag_url
-            if flag_col in self.df.columns:
-                flag_path = self.df.iloc[i].get(flag_col, None)
-                if flag_path and flag_path.startswith('/'):
+            if flag_values is not None:
+                flag_path = flag_values[i]
+                if not isinstance(flag_path, str):
+                    flag_path = None
+                elif flag_path.startswith('/'):
                     # Convertir path absoluto desde raíz del repo
                     flag_path = str(Path.cwd() / flag_path.lstrip('/'))
             
             # Intentar construir con código si no hay path directo y hay patrón
             if not flag_path and pattern:
-                code_col = flags_config.get("code_column", "code")
-                if code_col in self.df.columns:
-                    code = str(self.df.iloc[i].get(code_col, "")).strip()
+                if code_values is not None:
+                    code = str(code_values[i]).strip()
                     if code:
                         flag_path = pattern.format(code=code.lower(), CODE=code.upper())
+            paths.append(flag_path)
+        return paths
+    
+    def _add_flag(self, i, cat, flag_path):
+        """Dibuja la bandera de la fila ``i``; devuelve el AnnotationBbox o None."""
+        flags_config = self.params.get("flags", {})
+        flag_position = flags_config.get("position", "start")
+        zoom = float(flags_config.get("zoom", 0.08))
+        
+        # Posición y del país
+        y_pos = self.y_positions[i]
+        
+        # Si tenemos una ruta de bandera válida, mostrarla
+        if not (flag_path and Path(flag_path).exists()):
+            return None
+        try:
+            from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+            
+            # Cargar la imagen
+            img = load_image(flag_path)
+            
+            # Crear la caja con la imagen
+            imagebox = OffsetImage(img, zoom=zoom)
+            
+            # Posicionar la bandera según la configuración
+            if flag_position == "end":
+                # Colocar bandera al final de la barra
+                total_value = self.bottoms[i]
+                
+                # Añadir la bandera al final de la barra con un pequeño desplazamiento
+                ab = AnnotationBbox(
+                    imagebox,
+                    (total_value + self.FLAG_END_OFFSET, y_pos),  # Posición x al final de la barra con offset
+                    xycoords='data',  # Usar coordenadas de datos
+                    box_alignment=(0, 0.5),  # Alinear a la izquierda y centrado verticalmente
+                    pad=0.02,
+                    frameon=False
+                )
+                logger.debug("Bandera para %s colocada al final de la barra en posición x=%.1f", cat, total_value)
+            else:
+                # Colocar bandera en un punto fijo entre las etiquetas y las barras
+                from matplotlib import transforms
+                # Combinar transformación de figura para X y datos para Y
+                trans = transforms.blended_transform_factory(
+                    self.fig.transFigure,  # Para coordenadas X en sistema de figura
+                    self.ax.transData      # Para coordenadas Y en sistema de datos
+                )
+                
+                # Obtener los límites del eje en coordenadas de figura
+                ax_pos = self.ax.get_position()
+                
+                # Calcular posición ideal para las banderas
+                # Posicionar las banderas justo antes del inicio de las barras (ax_pos.x0)
+                # usando el offset configurado (o un valor predeterminado)
+                offset_factor = float(flags_config.get("offset", 0.05))
+                flag_x = ax_pos.x0 - offset_factor  # Posición ajustada con el offset
+                
+                ab = AnnotationBbox(
+                    imagebox,
+                    (flag_x, y_pos),    # Posición x fija en coordenadas de figura
+                    xycoords=trans,      # Transformación combinada
+                    box_alignment=(0.5, 0.5),  # Centrado horizontal y vertical
+                    pad=0,              # Sin padding adicional
+                    frameon=False
+                )
+                logger.debug("Bandera para %s colocada entre el nombre y las barras", cat)
             
-            # Si tenemos una ruta de bandera válida, mostrarla
-            if flag_path and Path(flag_path).exists():
-                try:
-                    from matplotlib.image import imread
-                    from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-                    
-                    # Cargar la imagen
-                    img = imread(flag_path)
-                    
-                    # Crear la caja con la imagen
-                    imagebox = OffsetImage(img, zoom=zoom)
-                    
-                    # Posicionar la bandera según la configuración
-                    if flag_position == "end":
-                        # Colocar bandera al final de la barra
-                        total_value = self.bottoms[i]
-                        
-                        # Añadir la bandera al final de la barra con un pequeño desplazamiento
-                        offset = 1.0  # Offset horizontal para separar la bandera de la barra
-                        
-                        ab = AnnotationBbox(
-                            imagebox,
-                            (total_value + offset, y_pos),  # Posición x al final de la barra con offset
-                            xycoords='data',  # Usar coordenadas de datos
-                            box_alignment=(0, 0.5),  # Alinear a la izquierda y centrado verticalmente
-                            pad=0.02,
-                            frameon=False
-                        )
-                        print(f"Bandera para {cat} colocada al final de la barra en posición x={total_value:.1f}")
-                    else:
-                        # Colocar bandera en un punto fijo entre las etiquetas y las barras
-                        from matplotlib import transforms
-                        # Combinar transformación de figura para X y datos para Y
-                        trans = transforms.blended_transform_factory(
-                            self.fig.transFigure,  # Para coordenadas X en sistema de figura
-                            self.ax.transData      # Para coordenadas Y en sistema de datos
-                        )
-                        
-                        # Obtener los límites del eje en coordenadas de figura
-                        ax_pos = self.ax.get_position()
-                        
-                        # Calcular posición ideal para las banderas
-                        # Posicionar las banderas justo antes del inicio de las barras (ax_pos.x0)
-                        # usando el offset configurado (o un valor predeterminado)
-                        offset_factor = float(flags_config.get("offset", 0.05))
-                        flag_x = ax_pos.x0 - offset_factor  # Posición ajustada con el offset
-                        
-                        ab = AnnotationBbox(
-                            imagebox,
-                            (flag_x, y_pos),    # Posición x fija en coordenadas de figura
-                            xycoords=trans,      # Transformación combinada
-                            box_alignment=(0.5, 0.5),  # Centrado horizontal y vertical
-                            pad=0,              # Sin padding adicional
-                            frameon=False
-                        )
-                        print(f"Bandera para {cat} colocada entre el nombre y las barras")
-                    
-                    self.ax.add_artist(ab)
-                    
-                except Exception as e:
-                    print(f"Error al añadir bandera para {cat}: {e}")
+            self.ax.add_artist(ab)
+            return ab
+            
+        except Exception as e:
+            logger.warning("Error al añadir bandera para %s: %s", cat, e)
+            return None
     
     def debug_flag_paths(self):
         """Muestra información de depuración sobre las rutas de las banderas."""
@@ -669,13 +931,9 @@ class StackedHorizontalBarChart(BaseChart):
             current_dir=Path.cwd()
         )
     
-    def add_legend(self):
-        """Añade la leyenda si está habilitada."""
-        # Asegurar que la paleta de colores esté presente en legend_config antes de pasarla a la base
-        legend_cfg = self.params.get("legend_config", {}).copy()
-        legend_cfg["colors"] = self.params.get("colors", {})
-        self.params["legend_config"] = legend_cfg
-        super().add_legend()
+    def get_legend_config(self):
+        """Leyenda con la paleta global y los totales calculados en prepare_data."""
+        return self.legend_config
     def add_labels(self):
         """Añade etiquetas de totales."""
         # No llamamos a super().add_labels() porque los totales ya se añaden en el método draw_chart
@@ -702,11 +960,11 @@ class StackedHorizontalBarChart(BaseChart):
         left_margin = float(title_spacing.get("left_margin", 0.0))  # Margen izquierdo global
         right_margin = float(title_spacing.get("right_margin", 0.0))  # Margen derecho global
         
-        print("\nℹ️ Configuración de espaciado de títulos:")
-        print(f"  - Espacio superior del título: {title_top_margin:.2f} (desde borde superior)")
-        print(f"  - Espacio entre título y subtítulo: {title_bottom_margin:.2f} + {subtitle_top_margin:.2f} = {title_bottom_margin + subtitle_top_margin:.2f}")
-        print(f"  - Espacio debajo del subtítulo: {subtitle_bottom_margin:.2f}")
-        print(f"  - Márgenes horizontales globales: izquierdo={left_margin:.2f}, derecho={right_margin:.2f}")
+        logger.debug("ℹ️ Configuración de espaciado de títulos:")
+        logger.debug("  - Espacio superior del título: %.2f (desde borde superior)", title_top_margin)
+        logger.debug("  - Espacio entre título y subtítulo: %.2f + %.2f = %.2f", title_bottom_margin, subtitle_top_margin, title_bottom_margin + subtitle_top_margin)
+        logger.debug("  - Espacio debajo del subtítulo: %.2f", subtitle_bottom_margin)
+        logger.debug("  - Márgenes horizontales globales: izquierdo=%.2f, derecho=%.2f", left_margin, right_margin)
         
         # Obtener contenido de título y subtítulo
         title = self.params.get("title", "")
@@ -758,10 +1016,10 @@ class StackedHorizontalBarChart(BaseChart):
                 x_pos = float(title_config.get("x", 0.01))  # Usar valor especificado o un valor mínimo
                 if "y" in title_config:
                     y_pos = float(title_config["y"])
-                    print(f"🖼️ Usando transformación de figura completa para el título con y explícito: y={y_pos}")
+                    logger.debug("🖼️ Usando transformación de figura completa para el título con y explícito: y=%s", y_pos)
                 else:
                     y_pos = 0.98  # Cerca del tope de la figura
-                    print("🖼️ Usando transformación de figura completa para el título (y por defecto)")
+                    logger.debug("🖼️ Usando transformación de figura completa para el título (y por defecto)")
             else:
                 # Comportamiento normal usando márgenes del eje de título
                 # Calcular ancho disponible después de aplicar márgenes globales
@@ -776,17 +1034,17 @@ class StackedHorizontalBarChart(BaseChart):
                 # Permitir y explícito si está en title_config, si no usar margen superior
                 if "y" in title_config:
                     y_pos = float(title_config["y"])
-                    print(f"📌 Usando posición Y explícita para título: y={y_pos}")
+                    logger.debug("📌 Usando posición Y explícita para título: y=%s", y_pos)
                 else:
                     y_pos = 1.0 - title_top_margin
-                    print(f"📌 Usando posición Y por margen superior para título: y={y_pos}")
+                    logger.debug("📌 Usando posición Y por margen superior para título: y=%s", y_pos)
             
             # Debug para ver los valores calculados
-            print("DEBUG: Márgenes horizontales aplicados al título:")
-            print(f"  - Márgenes globales: izquierdo={left_margin:.2f}, derecho={right_margin:.2f}")
-            print(f"  - Paddings específicos: izquierdo={padding_left:.2f}, derecho={padding_right:.2f}")
-            print(f"  - Posición X calculada: {x_pos:.2f} (alineación='{ha}')")
-            print(f"DEBUG: Posición Y calculada para título = {y_pos:.2f} (basada en top_margin = {title_top_margin:.2f})")
+            logger.debug("Márgenes horizontales aplicados al título:")
+            logger.debug("  - Márgenes globales: izquierdo=%.2f, derecho=%.2f", left_margin, right_margin)
+            logger.debug("  - Paddings específicos: izquierdo=%.2f, derecho=%.2f", padding_left, padding_right)
+            logger.debug("  - Posición X calculada: %.2f (alineación='%s')", x_pos, ha)
+            logger.debug("Posición Y calculada para título = %.2f (basada en top_margin = %.2f)", y_pos, title_top_margin)
             
             # Usar siempre la misma alineación vertical para consistencia
             ha = title_config.get("ha", "center")
@@ -796,7 +1054,7 @@ class StackedHorizontalBarChart(BaseChart):
             transform = None
             if title_config.get("transform", "") == "figure":
                 transform = self.fig.transFigure  # Usar coordenadas de la figura completa
-                print("🎯 Usando transformación de figura completa para el título")
+                logger.debug("🎯 Usando transformación de figura completa para el título")
             
             # Propiedades avanzadas del texto - asegurándonos de obtener el fontsize correcto
             # y convertirlo explícitamente a float para evitar problemas de tipo
@@ -805,21 +1063,21 @@ class StackedHorizontalBarChart(BaseChart):
             global_fontsize = self.params.get("title_font_size", 18)
             
             # Mostrar los valores para depuración
-            print("DEBUG: Valores de tamaño para el título:")
-            print(f" - Valor explícito guardado: {explicit_fontsize}")
-            print(f" - Valor en title_config.fontsize: {config_fontsize}")
-            print(f" - Valor en params.title_font_size: {global_fontsize}")
+            logger.debug("Valores de tamaño para el título:")
+            logger.debug(" - Valor explícito guardado: %s", explicit_fontsize)
+            logger.debug(" - Valor en title_config.fontsize: %s", config_fontsize)
+            logger.debug(" - Valor en params.title_font_size: %s", global_fontsize)
             
             # Precedencia: Valor explícito > Valor en title_config > Valor global
             if explicit_fontsize is not None:
                 fontsize = float(explicit_fontsize)
-                print(f"Título (modo explícito): Tamaño = {fontsize}")
+                logger.debug("Título (modo explícito): Tamaño = %s", fontsize)
             elif config_fontsize is not None:
                 fontsize = float(config_fontsize)
-                print(f"Título (modo avanzado): Tamaño = {fontsize}, Color = {title_config.get('color', '#333333')}")
+                logger.debug("Título (modo avanzado): Tamaño = %s, Color = %s", fontsize, title_config.get('color', '#333333'))
             else:
                 fontsize = float(global_fontsize)
-                print(f"Título (modo básico): Tamaño = {fontsize}")
+                logger.debug("Título (modo básico): Tamaño = %s", fontsize)
             
             text_props = {
                 "fontsize": fontsize,
@@ -841,19 +1099,17 @@ class StackedHorizontalBarChart(BaseChart):
             # text_props["bbox"] = bbox_props
             
             # Imprimir propiedades para depuración
-            print("DEBUG: Aplicando propiedades al título:")
-            for key, value in text_props.items():
-                print(f"  - {key}: {value}")
+            logger.debug("Aplicando propiedades al título: %s", text_props)
             
             # Añadir el título al gráfico
-            print(f"\nℹ️ Colocando título en posición: x={x_pos:.2f}, y={y_pos:.2f}, va='{va}', ha='{ha}'")
+            logger.debug("ℹ️ Colocando título en posición: x=%.2f, y=%.2f, va='%s', ha='%s'", x_pos, y_pos, va, ha)
             if transform:
                 # Usar la transformación personalizada (coordenadas de figura)
                 title_artist = self.fig.text(x_pos, y_pos, title,
                                 ha=ha, va=va,
                                 transform=transform,
                                 **text_props)
-                print(f"✨ Título añadido directamente a la figura en posición absoluta: x={x_pos:.2f}, y={y_pos:.2f}")
+                logger.debug("✨ Título añadido directamente a la figura en posición absoluta: x=%.2f, y=%.2f", x_pos, y_pos)
             else:
                 # Usar la transformación del eje de título (comportamiento normal)
                 title_artist = self.ax_header.text(x_pos, y_pos, title, 
@@ -874,10 +1130,10 @@ class StackedHorizontalBarChart(BaseChart):
                     # El ancho efectivo disponible se reduce por los márgenes y paddings
                     effective_wrap_width = available_width * wrap_width - padding_left - padding_right
                     
-                    print("📝 Aplicando ajuste automático de texto al título:")
-                    print(f"  - Ancho de wrapping base: {wrap_width:.2f}")
-                    print(f"  - Ancho disponible tras márgenes: {available_width:.2f}")
-                    print(f"  - Ancho efectivo para wrapping: {effective_wrap_width:.2f}")
+                    logger.debug("📝 Aplicando ajuste automático de texto al título:")
+                    logger.debug("  - Ancho de wrapping base: %.2f", wrap_width)
+                    logger.debug("  - Ancho disponible tras márgenes: %.2f", available_width)
+                    logger.debug("  - Ancho efectivo para wrapping: %.2f", effective_wrap_width)
                     
                     # Obtener ancho de figura en pulgadas
                     fig_width_inches = self.fig.get_figwidth()
@@ -898,7 +1154,7 @@ class StackedHorizontalBarChart(BaseChart):
                         # Ajuste más suave para títulos grandes para permitir más texto por línea
                         factor = max(0.7, 28 / fontsize)  # Limitar el factor de reducción a 0.7
                         chars_per_inch = chars_per_inch * factor
-                        print(f"  - Ajustando estimación para fuente grande ({fontsize}pt): factor = {factor:.2f}")
+                        logger.debug("  - Ajustando estimación para fuente grande (%spt): factor = %.2f", fontsize, factor)
                     
                     # Añadir un 10% adicional de caracteres para usar más espacio
                     max_chars = int(wrap_width_inches * chars_per_inch * 1.10)
@@ -912,10 +1168,10 @@ class StackedHorizontalBarChart(BaseChart):
                     
                     # Contar cuántas líneas resultaron
                     num_lines = len(wrapped_text.split('\n'))
-                    print(f"✅ Texto ajustado: {max_chars} caracteres por línea, {num_lines} línea(s) total")
+                    logger.debug("✅ Texto ajustado: %s caracteres por línea, %s línea(s) total", max_chars, num_lines)
                     
                 except Exception as e:
-                    print(f"⚠️ Error al aplicar wrapping manual al título: {e}")
+                    logger.warning("⚠️ Error al aplicar wrapping manual al título: %s", e)
             
             # Guardar la posición final del título para posicionar el subtítulo si es necesario
             self.title_artist = title_artist
@@ -930,10 +1186,10 @@ class StackedHorizontalBarChart(BaseChart):
                 # La posición dependerá de la alineación vertical del título
                 title_pos = self.title_artist.get_position()[1]
                 y_pos = title_pos - title_bottom_margin - subtitle_top_margin
-                print(f"ℹ️ Posición del subtítulo calculada a partir del título: {y_pos:.2f} (título en {title_pos:.2f})")
+                logger.debug("ℹ️ Posición del subtítulo calculada a partir del título: %.2f (título en %.2f)", y_pos, title_pos)
             else:
                 y_pos = 1.0 - title_top_margin - title_bottom_margin - subtitle_top_margin
-                print(f"ℹ️ Posición del subtítulo calculada sin referencia al título: {y_pos:.2f}")
+                logger.debug("ℹ️ Posición del subtítulo calculada sin referencia al título: %.2f", y_pos)
                 
             ha = self.params.get("subtitle_horizontal_alignment", "center")
             va = self.params.get("subtitle_vertical_alignment", "top")  # Alineado hacia arriba
@@ -962,7 +1218,7 @@ class StackedHorizontalBarChart(BaseChart):
                 # Verificar si hay una posición Y explícita en la configuración
                 if "y" in subtitle_config:
                     y_pos = float(subtitle_config.get("y"))
-                    print(f"📌 Usando posición Y explícita para subtítulo: {y_pos}")
+                    logger.debug("📌 Usando posición Y explícita para subtítulo: %s", y_pos)
                 # Calcular posición Y basada en el título y considerando espacio completo de la figura
                 elif hasattr(self, 'title_artist') and self.title_artist:
                     # Si el título usa transformación de figura, colocar muy cerca del título
@@ -983,7 +1239,7 @@ class StackedHorizontalBarChart(BaseChart):
                         y_pos = 0.85  # Más espacio para títulos de 3+ líneas
                 else:
                     y_pos = 0.92  # Posición estándar si no hay título
-                print("🖼️ Usando transformación de figura completa para el subtítulo")
+                logger.debug("🖼️ Usando transformación de figura completa para el subtítulo")
             else:
                 # Comportamiento normal usando márgenes del eje de título
                 # Ajustar la posición X según los márgenes izquierdo y derecho
@@ -1023,27 +1279,27 @@ class StackedHorizontalBarChart(BaseChart):
                     # Ajustar 0.03 adicional por cada línea después de la primera
                     line_adjustment = max(0, (num_lines - 1) * 0.03)
                     subtitle_y_pos -= line_adjustment
-                    print(f"DEBUG: Ajuste adicional por {num_lines} líneas en el título: -{line_adjustment:.2f}")
+                    logger.debug("Ajuste adicional por %s líneas en el título: -%.2f", num_lines, line_adjustment)
                 
-                print(f"DEBUG: Cálculo de posición del subtítulo: {title_pos} - {title_bottom_margin} - {subtitle_top_margin} = {subtitle_y_pos}")
+                logger.debug("Cálculo de posición del subtítulo: %s - %s - %s = %s", title_pos, title_bottom_margin, subtitle_top_margin, subtitle_y_pos)
                 y_pos = subtitle_y_pos
-                print(f"ℹ️ Posición del subtítulo calculada a partir del título: {y_pos:.2f}")
+                logger.debug("ℹ️ Posición del subtítulo calculada a partir del título: %.2f", y_pos)
             else:
                 # Si no hay título, usar posición estándar con márgenes
                 y_pos = 1.0 - title_top_margin - title_bottom_margin - subtitle_top_margin
-                print(f"ℹ️ Posición del subtítulo calculada sin referencia al título: {y_pos:.2f}")
+                logger.debug("ℹ️ Posición del subtítulo calculada sin referencia al título: %.2f", y_pos)
             
             # Debug para ver los valores calculados
-            print("DEBUG: Márgenes horizontales aplicados al subtítulo:")
-            print(f"  - Márgenes globales: izquierdo={left_margin:.2f}, derecho={right_margin:.2f}")
-            print(f"  - Paddings específicos: izquierdo={padding_left:.2f}, derecho={padding_right:.2f}")
-            print(f"  - Posición X calculada: {x_pos:.2f} (alineación='{ha}')")
+            logger.debug("Márgenes horizontales aplicados al subtítulo:")
+            logger.debug("  - Márgenes globales: izquierdo=%.2f, derecho=%.2f", left_margin, right_margin)
+            logger.debug("  - Paddings específicos: izquierdo=%.2f, derecho=%.2f", padding_left, padding_right)
+            logger.debug("  - Posición X calculada: %.2f (alineación='%s')", x_pos, ha)
             
             # Si hay posición Y explícita, mostrarla
             if use_figure_transform_subtitle and "y" in subtitle_config:
                 # Usar la posición Y definida en el YAML
                 y_pos = float(subtitle_config.get("y"))  # Usar el valor del YAML
-                print(f"� FORZANDO posición Y explícita para el subtítulo: {y_pos:.2f}")
+                logger.debug("� FORZANDO posición Y explícita para el subtítulo: %.2f", y_pos)
             
             va = "top"  # Fijar siempre a 'top' para evitar inconsistencias
             
@@ -1054,21 +1310,21 @@ class StackedHorizontalBarChart(BaseChart):
             global_fontsize = self.params.get("subtitle_font_size", 13)
             
             # Mostrar los valores para depuración
-            print("DEBUG: Valores de tamaño para el subtítulo:")
-            print(f" - Valor explícito guardado: {explicit_fontsize}")
-            print(f" - Valor en subtitle_config.fontsize: {config_fontsize}")
-            print(f" - Valor en params.subtitle_font_size: {global_fontsize}")
+            logger.debug("Valores de tamaño para el subtítulo:")
+            logger.debug(" - Valor explícito guardado: %s", explicit_fontsize)
+            logger.debug(" - Valor en subtitle_config.fontsize: %s", config_fontsize)
+            logger.debug(" - Valor en params.subtitle_font_size: %s", global_fontsize)
             
             # Precedencia: Valor explícito > Valor en subtitle_config > Valor global
             if explicit_fontsize is not None:
                 fontsize = float(explicit_fontsize)
-                print(f"Subtítulo (modo explícito): Tamaño = {fontsize}")
+                logger.debug("Subtítulo (modo explícito): Tamaño = %s", fontsize)
             elif config_fontsize is not None:
                 fontsize = float(config_fontsize)
-                print(f"Subtítulo (modo avanzado): Tamaño = {fontsize}, Color = {subtitle_config.get('color', '#666666')}")
+                logger.debug("Subtítulo (modo avanzado): Tamaño = %s, Color = %s", fontsize, subtitle_config.get('color', '#666666'))
             else:
                 fontsize = float(global_fontsize)
-                print(f"Subtítulo (modo básico): Tamaño = {fontsize}")
+                logger.debug("Subtítulo (modo básico): Tamaño = %s", fontsize)
                 
             color = subtitle_config.get("color", self.params.get("subtitle_color", "#666666"))
             
@@ -1086,9 +1342,7 @@ class StackedHorizontalBarChart(BaseChart):
                 text_props["bbox"] = subtitle_config.get("bbox")
             
             # Imprimir propiedades para depuración
-            print("DEBUG: Aplicando propiedades al subtítulo:")
-            for key, value in text_props.items():
-                print(f"  - {key}: {value}")
+            logger.debug("Aplicando propiedades al subtítulo: %s", text_props)
                 
             transform_subtitle = None
             if subtitle_config.get("transform", "") == "figure":
@@ -1102,15 +1356,15 @@ class StackedHorizontalBarChart(BaseChart):
                     y_pos = float(explicit_y)  # Usar el valor del YAML
                 else:
                     # Si no hay valor en el YAML, mantener el valor calculado previamente
-                    print(f"ℹ️ Manteniendo posición Y calculada para el subtítulo: {y_pos:.2f}")
-                print(f"� FORZANDO posición Y explícita para el subtítulo: {y_pos:.2f}")
+                    logger.debug("ℹ️ Manteniendo posición Y calculada para el subtítulo: %.2f", y_pos)
+                logger.debug("� FORZANDO posición Y explícita para el subtítulo: %.2f", y_pos)
                 
                 # Usar la transformación personalizada (coordenadas de figura)
                 subtitle_artist = self.fig.text(x_pos, y_pos, subtitle,
                             ha=ha, va=va,
                             transform=transform_subtitle,
                             **text_props)
-                print(f"✨ Subtítulo añadido directamente a la figura en posición absoluta: x={x_pos:.2f}, y={y_pos:.2f}")
+                logger.debug("✨ Subtítulo añadido directamente a la figura en posición absoluta: x=%.2f, y=%.2f", x_pos, y_pos)
             else:
                 # Usar la transformación del eje de título (comportamiento normal)
                 subtitle_artist = self.ax_header.text(x_pos, y_pos, subtitle, 
@@ -1131,10 +1385,10 @@ class StackedHorizontalBarChart(BaseChart):
                     # El ancho efectivo disponible se reduce por los márgenes y paddings
                     effective_wrap_width = available_width * wrap_width - padding_left - padding_right
                     
-                    print("Aplicando ajuste manual de texto al subtítulo:")
-                    print(f"  - Ancho de wrapping base: {wrap_width:.2f}")
-                    print(f"  - Ancho disponible tras márgenes: {available_width:.2f}")
-                    print(f"  - Ancho efectivo para wrapping: {effective_wrap_width:.2f}")
+                    logger.debug("Aplicando ajuste manual de texto al subtítulo:")
+                    logger.debug("  - Ancho de wrapping base: %.2f", wrap_width)
+                    logger.debug("  - Ancho disponible tras márgenes: %.2f", available_width)
+                    logger.debug("  - Ancho efectivo para wrapping: %.2f", effective_wrap_width)
                     
                     # Obtener ancho de figura en pulgadas
                     fig_width_inches = self.fig.get_figwidth()
@@ -1158,10 +1412,51 @@ class StackedHorizontalBarChart(BaseChart):
                     # Actualizar texto con versión envuelta
                     subtitle_artist.set_text(wrapped_text)
                     
-                    print(f"✅ Subtítulo ajustado manualmente: {max_chars} caracteres por línea")
+                    logger.debug("✅ Subtítulo ajustado manualmente: %s caracteres por línea", max_chars)
                     
                 except Exception as e:
-                    print(f"⚠️ Error al aplicar wrapping manual al subtítulo: {e}")
+                    logger.warning("⚠️ Error al aplicar wrapping manual al subtítulo: %s", e)
+            
+            self.subtitle_artist = subtitle_artist
+        
+        self._fit_header()
+    
+    def _fit_header(self):
+        """
+        Reacomoda el encabezado cuando el gráfico se dibuja en otro tamaño
+        (variantes de app/aspects.py).
+        
+        El título y el subtítulo conservan su distancia al borde superior en
+        pulgadas. Como el texto se vuelve a partir según el ancho nuevo, el
+        subtítulo baja hasta quedar debajo del título y las barras empiezan
+        debajo del subtítulo.
+        """
+        scale_x, scale_y = self.layout_scale()
+        if (scale_x, scale_y) == (1.0, 1.0):
+            return
+        
+        renderer = self.fig.canvas.get_renderer()
+        to_figure = self.fig.transFigure.inverted()
+        gap = self.HEADER_GAP_IN / self.height_in
+        header_bottom = None  # Borde inferior del texto ya ubicado (fracción de la figura)
+        for artist in (getattr(self, "title_artist", None), getattr(self, "subtitle_artist", None)):
+            if artist is None or artist.figure is not self.fig or not artist.get_text():
+                continue
+            if artist.get_transform() is self.fig.transFigure:
+                y_pos = 1.0 - (1.0 - artist.get_position()[1]) * scale_y
+                if header_bottom is not None:
+                    y_pos = min(y_pos, header_bottom - gap)
+                artist.set_y(y_pos)
+            box = artist.get_window_extent(renderer).transformed(to_figure)
+            header_bottom = box.y0 if header_bottom is None else min(header_bottom, box.y0)
+        
+        if header_bottom is None:
+            return
+        pos = self.ax.get_position()
+        top = header_bottom - gap
+        if top < pos.y1:
+            self.ax.set_position([pos.x0, pos.y0, pos.width, max(top - pos.y0, 0.05)])
+            logger.debug("📐 Encabezado reacomodado: las barras empiezan en y=%.2f", top)
     
     def add_footer(self):
         """
@@ -1169,7 +1464,7 @@ class StackedHorizontalBarChart(BaseChart):
         Soporta múltiples opciones de personalización para posición, estilo y contenido.
         """
         from app.components import add_footer
-        add_footer(self.fig, self.params)
+        self.add_chrome("components.footer", lambda fig: add_footer(fig, self.params))
     
     def add_decorative_elements(self):
         """
@@ -1188,10 +1483,10 @@ class StackedHorizontalBarChart(BaseChart):
         
         # Usar la función centralizada para finalizar y guardar el gráfico
         from app.components import finalize
-        finalize(self.fig, self.params)
+        finalize(self.fig, self.params, self.chrome)
         
         # Debug the formats configuration
-        print(f"[DEBUG] StackedHorizontalBarChart.finalize: usando componentes centralizados")
+        logger.debug("StackedHorizontalBarChart.finalize: usando componentes centralizados")
 
 # Las funciones _load_yaml y _merge_params se han trasladado a app/io_utils.py
 
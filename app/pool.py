@@ -0,0 +1,390 @@
+# app/pool.py
+"""
+Procesos supervisados: cada tarea corre en un proceso hijo con límite de
+tiempo y de memoria. El que se pasa se mata y se reemplaza, y la tarea
+queda registrada como fallida sin detener a las demás.
+
+Un gráfico patológico (un autosize altísimo a ``dpi: 300`` sobre una tabla
+enorme, una bandera remota que nunca responde) puede colgarse o crecer a
+varios GB. Con ``SupervisedPool`` ese gráfico falla con
+``Timeout: ...`` o ``MemoryLimit: ...`` y el lote sigue.
+
+- **Tiempo**: el proceso principal controla el tiempo de reloj de cada
+  tarea y mata al hijo (``SIGKILL``) si supera ``timeout``.
+- **Memoria**: el proceso principal mide el RSS de cada hijo
+  (``/proc/<pid>/status``) y lo mata si supera ``memory_mb``. Además, cada
+  hijo fija ``RLIMIT_AS`` (con ``resource``, sin cgroups) en su memoria
+  virtual inicial más el doble del límite. Así, una reserva enorme falla
+  con ``MemoryError`` antes de que el sistema empiece a usar swap, aunque
+  ocurra entre dos mediciones.
+- **Presupuesto de memoria**: con ``budget_mb``, una tarea solo arranca
+  si su memoria estimada (``memory_of``, lo que la tarea agrega al proceso)
+  más la de las que están corriendo cabe en el presupuesto. Si no cabe, se prueba con la siguiente. Una
+  tarea que sola supera el presupuesto corre cuando no hay otras. Cada
+  hijo mide el pico real de cada tarea (``VmHWM``, reiniciado antes de
+  cada una) para afinar las estimaciones siguientes (ver app/costs.py).
+- **Caídas**: si un hijo muere (segfault, ``os._exit``, el OOM killer), la
+  tarea se registra con el código de salida y el hijo se reemplaza.
+
+Los hijos se crean con ``fork`` y heredan las tareas (y los datos ya
+cargados) sin copiarlos; por la tubería solo viajan índices y resultados.
+Donde no hay ``fork`` (Windows), las tareas corren en el proceso principal
+sin límites.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import wait
+from typing import Any, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Estado heredado por los hijos (fork): función y tareas del pool en curso
+_TASKS: dict[str, Any] = {}
+
+
+def rss_mb(pid: int) -> float | None:
+    """RSS actual de un proceso en MB (``None`` fuera de Linux o si ya terminó)."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_mb() -> float | None:
+    """Memoria disponible del sistema en MB (``MemAvailable``; ``None`` fuera de Linux)."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def parse_memory_budget(value: str) -> float:
+    """
+    Presupuesto de memoria en MB: un número o ``auto`` (80 % de la memoria
+    disponible del sistema).
+    """
+    if str(value).strip().lower() == "auto":
+        available = available_mb()
+        if available is None:
+            raise ValueError("no se puede leer la memoria disponible; indicar el presupuesto en MB")
+        return 0.8 * available
+    try:
+        budget = float(value)
+    except ValueError:
+        raise ValueError(f"presupuesto inválido {value!r}: se espera MB o 'auto'") from None
+    if budget <= 0:
+        raise ValueError(f"presupuesto inválido {value!r}: debe ser mayor que 0")
+    return budget
+
+
+def _self_status_kb(field: str) -> int | None:
+    """Campo de ``/proc/self/status`` en kB (``VmSize``, ``VmHWM``, ...)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _vm_size_bytes() -> int | None:
+    """Memoria virtual actual de este proceso en bytes."""
+    size = _self_status_kb("VmSize")
+    return size * 1024 if size is not None else None
+
+
+def _reset_peak() -> None:
+    """Reinicia el pico de RSS (``VmHWM``) de este proceso (Linux 4.0+)."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_mb(start_mb: float | None = None) -> tuple[float, float] | None:
+    """
+    Pico de RSS de este proceso desde el último ``_reset_peak`` y su aumento
+    sobre ``start_mb`` (RSS al empezar la tarea), en MB.
+    """
+    peak = _self_status_kb("VmHWM")
+    if peak is None:
+        return None
+    peak /= 1024
+    return peak, max(0.0, peak - start_mb) if start_mb is not None else peak
+
+
+def _limit_address_space(memory_mb: float) -> None:
+    """Fija ``RLIMIT_AS`` del proceso actual: memoria virtual inicial + 2 × ``memory_mb``."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    base = _vm_size_bytes()
+    if base is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = base + int(2 * memory_mb * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError) as e:
+        logger.debug("No se pudo fijar RLIMIT_AS: %s", e)
+
+
+def _worker_main(conn, memory_mb: float | None) -> None:
+    """Bucle de un hijo: recibe índices, ejecuta la tarea y devuelve el resultado."""
+    # Ctrl+C lo maneja el proceso principal, que cierra a los hijos
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_mb:
+        _limit_address_space(memory_mb)
+    fn, tasks = _TASKS["fn"], _TASKS["tasks"]
+    while True:
+        try:
+            index = conn.recv()
+        except EOFError:
+            return
+        if index is None:
+            return
+        _reset_peak()
+        start = _self_status_kb("VmRSS")
+        start = start / 1024 if start is not None else None
+        try:
+            value = fn(tasks[index])
+            conn.send(("ok", index, value, _peak_mb(start)))
+        except MemoryError:
+            # El proceso puede quedar en mal estado: avisa y termina para ser reemplazado
+            conn.send(("memory", index, f"MemoryError (RLIMIT_AS, ~{2 * memory_mb:.0f} MB de margen)"
+                       if memory_mb else "MemoryError", _peak_mb(start)))
+            return
+        except Exception as e:
+            conn.send(("error", index, f"{type(e).__name__}: {e}", _peak_mb(start)))
+
+
+class _Worker:
+    """Un hijo del pool y la tarea que está ejecutando."""
+
+    def __init__(self, context, memory_mb: float | None):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, memory_mb), daemon=True)
+        self.process.start()
+        child.close()
+        self.index: int | None = None
+        self.started = 0.0
+        self.peak_mb = 0.0
+        self.reserved_mb = 0.0
+
+    def assign(self, index: int, reserved_mb: float = 0.0) -> None:
+        self.index = index
+        self.started = time.monotonic()
+        self.peak_mb = 0.0
+        self.reserved_mb = reserved_mb
+        self.conn.send(index)
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def fork_context():
+    """Contexto ``fork`` si la plataforma lo permite (``None`` si no)."""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork")
+
+
+class SupervisedPool:
+    """
+    Pool de procesos con límite de tiempo y memoria por tarea.
+
+    Params:
+        workers: Procesos en paralelo
+        timeout: Segundos de reloj por tarea (``None``: sin límite)
+        memory_mb: RSS máximo por proceso en MB (``None``: sin límite)
+        budget_mb: Suma máxima de la memoria estimada de las tareas en curso, en MB
+            (``None``: sin control)
+        poll: Segundos entre controles de tiempo y memoria
+    """
+
+    def __init__(self, workers: int = 1, timeout: float | None = None, memory_mb: float | None = None,
+                 budget_mb: float | None = None, poll: float = 0.2):
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.budget_mb = budget_mb
+        self.poll = poll
+        self.context = fork_context()
+        self.killed = {"timeout": 0, "memory": 0, "crash": 0}
+        # Control de admisión: mayor memoria reservada a la vez y veces que una tarea esperó
+        self.admission = {"max_reserved_mb": 0.0, "waits": 0, "oversized": 0}
+
+    def _admit(self, pending: list[int], estimates: list[float], reserved: float, busy: bool) -> int | None:
+        """Posición en ``pending`` de la primera tarea que cabe en el presupuesto (o ``None``)."""
+        if not self.budget_mb:
+            return 0
+        for position, index in enumerate(pending):
+            if reserved + estimates[index] <= self.budget_mb:
+                return position
+        if not busy:
+            # Ni sola cabe: corre sin otras tareas al lado
+            self.admission["oversized"] += 1
+            logger.warning("⚠️ Tarea %s: %.0f MB estimados superan el presupuesto de %.0f MB; corre sola",
+                           pending[0], estimates[pending[0]], self.budget_mb)
+            return 0
+        return None
+
+    def map(self, fn: Callable[[Any], Any], tasks: Sequence,
+            on_failure: Callable[[Any, str, str], Any] | None = None,
+            on_result: Callable[[int, Any], None] | None = None,
+            memory_of: Callable[[Any], float] | None = None) -> list:
+        """
+        Ejecuta ``fn(task)`` para cada tarea.
+
+        Params:
+            fn: Función a ejecutar en los hijos
+            tasks: Tareas (se heredan por fork; no necesitan ser serializables)
+            on_failure: ``(tarea, motivo, mensaje) -> resultado`` para las tareas
+                que se mataron o fallaron; ``motivo`` es ``timeout``, ``memory``,
+                ``crash`` o ``error``. Por defecto ``{"status": "error", ...}``
+            on_result: Función llamada con el índice y el resultado de cada tarea apenas termina
+            memory_of: Memoria estimada (MB) de una tarea, para el presupuesto ``budget_mb``
+
+        Returns:
+            list: Resultados en el orden de ``tasks``
+        """
+        if on_failure is None:
+            def on_failure(task, reason, message):
+                logger.error("❌ %s", message)
+                return {"status": "error", "error": message, **({"killed": reason} if reason != "error" else {})}
+        results: list = [None] * len(tasks)
+        if not tasks:
+            return results
+
+        if self.context is None:
+            if self.timeout or self.memory_mb:
+                logger.warning("⚠️ Sin fork no hay límites de tiempo ni memoria; las tareas corren en este proceso")
+            for i, task in enumerate(tasks):
+                try:
+                    results[i] = fn(task)
+                except Exception as e:
+                    results[i] = on_failure(task, "error", f"{type(e).__name__}: {e}")
+                if on_result is not None:
+                    on_result(i, results[i])
+            return results
+
+        def finish(worker: _Worker, value, measured: tuple[float, float] | None = None) -> None:
+            index = worker.index
+            peak = max(worker.peak_mb, measured[0] if measured else 0.0)
+            if isinstance(value, dict) and peak:
+                value.setdefault("peak_rss_mb", round(peak, 1))
+            if isinstance(value, dict) and measured:
+                # Lo que la tarea agregó sobre el RSS del proceso al empezar
+                value.setdefault("job_rss_mb", round(measured[1], 1))
+            if isinstance(value, dict) and self.budget_mb:
+                value.setdefault("estimated_mb", round(estimates[index], 1))
+            results[index] = value
+            worker.index = None
+            worker.reserved_mb = 0.0
+            if on_result is not None:
+                on_result(index, value)
+
+        def fail(worker: _Worker, reason: str, message: str, measured: tuple[float, float] | None = None) -> None:
+            if reason in self.killed:
+                self.killed[reason] += 1
+            finish(worker, on_failure(tasks[worker.index], reason, message), measured)
+
+        estimates = [float(memory_of(task)) for task in tasks] if self.budget_mb and memory_of else [0.0] * len(tasks)
+        _TASKS.update(fn=fn, tasks=tasks)
+        pending = list(range(len(tasks)))
+        pool: list[_Worker] = []
+        blocked = False
+        try:
+            pool = [_Worker(self.context, self.memory_mb) for _ in range(min(self.workers, len(tasks)))]
+            while True:
+                for worker in pool:
+                    if worker.index is None and pending:
+                        reserved = sum(w.reserved_mb for w in pool)
+                        position = self._admit(pending, estimates, reserved, any(w.index is not None for w in pool))
+                        if position is None:
+                            self.admission["waits"] += not blocked
+                            blocked = True
+                            break
+                        blocked = False
+                        index = pending.pop(position)
+                        worker.assign(index, estimates[index])
+                        self.admission["max_reserved_mb"] = max(self.admission["max_reserved_mb"],
+                                                                reserved + estimates[index])
+                busy = [w for w in pool if w.index is not None]
+                if not busy:
+                    break
+
+                ready = wait([w.conn for w in busy] + [w.process.sentinel for w in busy], timeout=self.poll)
+                now = time.monotonic()
+                for i, worker in enumerate(pool):
+                    if worker.index is None:
+                        continue
+                    replace = False
+                    if worker.conn in ready or worker.process.sentinel in ready:
+                        try:
+                            status, _, value, peak = worker.conn.recv()
+                        except (EOFError, OSError):
+                            # Murió sin responder (segfault, OOM killer, os._exit)
+                            worker.process.join()
+                            fail(worker, "crash", f"Crash: el proceso terminó con código {worker.process.exitcode}")
+                            replace = True
+                        else:
+                            if status == "ok":
+                                finish(worker, value, peak)
+                            else:
+                                fail(worker, status, value, peak)
+                                replace = status == "memory"
+                    elif self.timeout and now - worker.started > self.timeout:
+                        fail(worker, "timeout", f"Timeout: más de {self.timeout:g} s")
+                        replace = True
+                    else:
+                        rss = rss_mb(worker.process.pid)
+                        if rss is not None:
+                            worker.peak_mb = max(worker.peak_mb, rss)
+                            if self.memory_mb and rss > self.memory_mb:
+                                fail(worker, "memory", f"MemoryLimit: {rss:.0f} MB de RSS (máximo {self.memory_mb:g} MB)")
+                                replace = True
+                    if replace:
+                        logger.warning("♻️ Proceso %s reemplazado", worker.process.pid)
+                        worker.kill()
+                        pool[i] = _Worker(self.context, self.memory_mb)
+        finally:
+            for worker in pool:
+                if worker.index is None:
+                    worker.stop()
+                else:
+                    worker.kill()
+            _TASKS.clear()
+        return results
@@ -0,0 +1,267 @@
+# app/profiling.py
+"""
+Instrumentación de tiempos por etapa y perfiles para flamegraphs.
+
+- ``span(nombre, **args)`` mide tiempo de pared y de CPU de un bloque. Sin
+  un ``Tracer`` activo devuelve un contexto vacío reutilizable, así que el
+  costo en producción es una lectura de ``ContextVar``.
+- ``Tracer`` acumula los spans y los exporta como JSON (spans + resumen por
+  nombre) o en formato *trace event* de Chrome (``chrome://tracing``,
+  Perfetto o speedscope).
+- ``collapsed_stacks`` convierte un ``cProfile.Profile`` en pilas colapsadas
+  (``a;b;c 123``) para ``flamegraph.pl``, speedscope o inferno.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from app.cache import write_atomic
+
+TRACE_FORMATS = ("chrome", "json")
+
+_active: contextvars.ContextVar["Tracer | None"] = contextvars.ContextVar("condatos_tracer", default=None)
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """Colección de spans (tiempo de pared y de CPU) de uno o más renders."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: list[dict] = []
+        self._depth = threading.local()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", **args):
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall1, cpu1 = time.perf_counter(), time.thread_time()
+            self._depth.value = depth
+            self.spans.append({
+                "name": name,
+                "cat": cat,
+                "start_ms": (wall0 - self.origin) * 1000,
+                "wall_ms": (wall1 - wall0) * 1000,
+                "cpu_ms": (cpu1 - cpu0) * 1000,
+                "depth": depth,
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    @contextmanager
+    def activate(self):
+        """Hace que ``span()`` registre en este tracer dentro del bloque."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Totales por nombre de span: cantidad, pared y CPU (ms)."""
+        out: dict[str, dict[str, float]] = {}
+        for s in self.spans:
+            agg = out.setdefault(s["name"], {"count": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+            agg["count"] += 1
+            agg["wall_ms"] += s["wall_ms"]
+            agg["cpu_ms"] += s["cpu_ms"]
+        return out
+
+    def to_json(self) -> dict:
+        spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        return {"pid": os.getpid(), "spans": spans, "summary": self.summary()}
+
+    def to_chrome(self) -> dict:
+        """Eventos completos (``ph: "X"``) con microsegundos, como espera Chrome."""
+        pid = os.getpid()
+        events = []
+        for s in sorted(self.spans, key=lambda s: s["start_ms"]):
+            events.append({
+                "name": s["name"],
+                "cat": s["cat"],
+                "ph": "X",
+                "ts": round(s["start_ms"] * 1000, 3),
+                "dur": round(s["wall_ms"] * 1000, 3),
+                "pid": pid,
+                "tid": s["tid"],
+                "args": {"cpu_ms": round(s["cpu_ms"], 3), **{k: str(v) for k, v in s["args"].items()}},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path, fmt: str = "chrome") -> Path:
+        """Guarda la traza en ``path`` (``fmt``: ``chrome`` o ``json``)."""
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"Formato de traza no soportado: {fmt!r} (opciones: {', '.join(TRACE_FORMATS)})")
+        payload = self.to_chrome() if fmt == "chrome" else self.to_json()
+        path = Path(path)
+        write_atomic(path, json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+        return path
+
+
+def current_tracer() -> Tracer | None:
+    """Tracer activo en el contexto actual (o None)."""
+    return _active.get()
+
+
+def span(name: str, cat: str = "stage", **args):
+    """Mide un bloque en el tracer activo; sin tracer no hace nada."""
+    tracer = _active.get()
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, cat, **args)
+
+
+# =============================
+# cProfile -> pilas colapsadas
+# =============================
+
+def _label(func) -> str:
+    filename, lineno, name = func
+    if filename == "~":  # funciones built-in
+        return name.strip("<>")
+    module = filename.strip("<>") if filename.startswith("<") else Path(filename).stem
+    return f"{module}:{name}:{lineno}"
+
+
+def collapsed_stacks(profile, max_nodes: int = 20000, min_us: int = 50) -> list[str]:
+    """
+    Convierte un ``cProfile.Profile`` en líneas ``pila;colapsada microsegundos``.
+
+    cProfile solo guarda pares llamador→llamado, así que la pila completa se
+    reconstruye repartiendo el tiempo de cada función entre sus llamadores en
+    proporción a lo que cada uno consumió (la aproximación habitual de
+    flameprof/gprof2dot). Las recursiones se cortan en la primera repetición.
+
+    El grafo de llamadas de matplotlib tiene demasiados caminos para
+    recorrerlos todos: se expanden primero las ramas más costosas, hasta
+    ``max_nodes``, y las ramas de menos de ``min_us`` se imputan a su marco
+    padre; así el total del flamegraph no cambia.
+    """
+    import heapq
+    import pstats
+
+    stats = pstats.Stats(profile).stats
+    callees: dict = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    totals: dict[str, float] = {}
+
+    labels: dict = {}
+
+    def add(stack, seconds):
+        if seconds > 0:
+            key = ";".join(labels.get(f) or labels.setdefault(f, _label(f)) for f in stack)
+            totals[key] = totals.get(key, 0.0) + seconds * 1e6
+
+    # (-tiempo acumulado de la rama, desempate, pila, peso)
+    heap = []
+    for func, v in stats.items():
+        if not v[4]:
+            heap.append((-v[3], len(heap), (func,), 1.0))
+    heapq.heapify(heap)
+    counter = len(heap)
+
+    expanded = 0
+    while heap:
+        neg_ct, _, stack, weight = heapq.heappop(heap)
+        func = stack[-1]
+        tt, ct = stats[func][2], stats[func][3]
+        if expanded >= max_nodes:
+            add(stack, -neg_ct)
+            continue
+        expanded += 1
+        children = []
+        for child in callees.get(func, ()):
+            if child in stack:
+                continue
+            child_ct = stats[child][3]
+            via = stats[child][4].get(func)
+            if not via or child_ct <= 0:
+                continue
+            # Fracción del tiempo del hijo atribuible a esta rama
+            children.append((child, child_ct, weight * min(1.0, via[3] / child_ct)))
+        # Con recursión, los acumulados de los hijos pueden superar al del
+        # padre: se escalan para que la rama nunca sume más que el padre
+        budget = max(ct * weight - tt * weight, 0.0)
+        child_total = sum(c_ct * w for _, c_ct, w in children)
+        scale = min(1.0, budget / child_total) if child_total > 0 else 0.0
+        pushed = 0.0
+        for child, child_ct, w in children:
+            w *= scale
+            if child_ct * w * 1e6 < min_us:
+                continue
+            heapq.heappush(heap, (-child_ct * w, counter, stack + (child,), w))
+            counter += 1
+            pushed += child_ct * w
+        # Tiempo propio; lo que no cubren los hijos expandidos (ramas
+        # mínimas, recursión cortada) queda en este marco
+        add(stack, ct * weight - pushed)
+
+    return [f"{k} {int(v)}" for k, v in sorted(totals.items()) if int(v) > 0]
+
+
+def save_collapsed(profile, path) -> Path:
+    """Guarda las pilas colapsadas de un perfil en ``path``."""
+    path = Path(path)
+    write_atomic(path, ("\n".join(collapsed_stacks(profile)) + "\n").encode("utf-8"))
+    return path
+
+
+# =============================
+# Sesión de la CLI
+# =============================
+
+@contextmanager
+def profiling_session(trace: str | Path | None = None, trace_format: str = "chrome",
+                      profile: str | Path | None = None):
+    """
+    Activa un tracer y/o cProfile durante el bloque y guarda los resultados al salir.
+
+    Params:
+        trace: Ruta del archivo de traza (None = sin traza)
+        trace_format: ``chrome`` o ``json``
+        profile: Ruta del archivo de pilas colapsadas (None = sin cProfile)
+    """
+    import logging
+
+    logger = logging.getLogger(__name__)
+    if trace_format not in TRACE_FORMATS:
+        raise ValueError(f"Formato de traza no soportado: {trace_format!r} (opciones: {', '.join(TRACE_FORMATS)})")
+
+    tracer = Tracer() if trace else None
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    with (tracer.activate() if tracer else nullcontext()):
+        if profiler:
+            profiler.enable()
+        try:
+            yield tracer
+        finally:
+            if profiler:
+                profiler.disable()
+                logger.info("🔥 Perfil (pilas colapsadas): %s", save_collapsed(profiler, profile))
+            if tracer:
+                logger.info("🧭 Traza (%s): %s", trace_format, tracer.save(trace, trace_format))
+
+
+def timed_imread(path, **kwargs):
+    """``matplotlib.image.imread`` medido como span ``image_load`` (sin caché; ver ``app.images.load_image``)."""
+    from matplotlib.image import imread
+
+    with span("image_load", cat="io", path=str(path)):
+        return imread(path, **kwargs)
@@ -1,61 +1,121 @@
+"""
+Estilos ``.mplstyle`` y fuentes.
+
+Los gráficos no tocan los ``rcParams`` globales: ``render_context`` abre un
+``rc_context`` con la pila de estilos de la configuración (``style``) durante
+cada render, bajo ``RENDER_LOCK``. ``rc_context`` cambia y restaura el
+diccionario global, así que dos renders simultáneos en hilos distintos se
+pisarían los estilos; con el candado, cada render ve solo los suyos y los
+``rcParams`` quedan como estaban al terminar. ``apply_style`` sigue
+aplicando los estilos globalmente, para scripts y notebooks.
+"""
 from __future__ import annotations
-from typing import Sequence
+from contextlib import contextmanager
+from typing import Any, Mapping, Sequence
+import threading
 import warnings
 import os
 import matplotlib as mpl
-import matplotlib.font_manager as fm
 from pathlib import Path
 
+# Directorio de estilos del proyecto: ``style: condatos`` es styles/condatos.mplstyle
+STYLES_DIR = Path(__file__).resolve().parent.parent / "styles"
+
+# Un render a la vez por proceso entre los que usan rcParams (ver render_context)
+RENDER_LOCK = threading.RLock()
+
+
+def _reset_lock_after_fork() -> None:
+    # Un hijo creado mientras otro hilo renderizaba heredaría el candado tomado
+    global RENDER_LOCK
+    RENDER_LOCK = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+# (ruta, mtime_ns) o nombre -> parámetros del estilo
+_STYLE_CACHE: dict[Any, dict[str, Any]] = {}
+
 def register_fonts():
-    """Registra las fuentes del proyecto en matplotlib."""
-    fonts_dir = Path(__file__).parent.parent / 'fonts'
-    if fonts_dir.exists():
-        for font_file in fonts_dir.glob('*.ttf'):
-            try:
-                fm.fontManager.addfont(str(font_file))
-            except Exception as e:
-                warnings.warn(f"No se pudo cargar la fuente {font_file.name}: {e}")
+    """Registra las fuentes del proyecto en matplotlib (índice persistente, una vez por proceso)."""
+    from app.fonts import ensure_project_fonts
+    ensure_project_fonts()
 
 def verify_font_availability(font_name: str = "Nunito") -> bool:
     """Verifica si una fuente está disponible en el sistema."""
-    fonts = [f.name for f in fm.fontManager.ttflist]
-    available = font_name in fonts
+    from app.fonts import font_available
+    available = font_available(font_name)
     if not available:
         warnings.warn(f"La fuente {font_name} no está disponible. Se usará la fuente de respaldo.")
     return available
 
-def _apply_one_style(style_path: str) -> None:
-    """Aplica un estilo .mplstyle o un estilo de librería.
-    Primero intenta matplotlib.style.use(); si falla, carga el archivo con rc_params_from_file().
-    Nunca interrumpe la ejecución: emite un warning y continúa.
+def _style_names(style_path: str | Sequence[str] | None) -> list[str]:
+    """Estilos de ``style``: una ruta, una lista o rutas separadas por comas."""
+    if not style_path:
+        return []
+    if isinstance(style_path, str):
+        return [s.strip() for s in style_path.split(",") if s.strip()]
+    return [str(s) for s in style_path if s]
+
+
+def _style_params(style: str) -> dict[str, Any]:
+    """
+    Parámetros de un estilo (ruta a ``.mplstyle``, nombre en ``styles/`` o
+    estilo de matplotlib), sin aplicarlo. Se memorizan por ruta y mtime.
+    Un estilo que no existe emite un warning y no aporta nada.
+    """
+    from matplotlib import rc_params_from_file
+    from matplotlib import style as mstyle
+
+    blacklist = getattr(mstyle, "STYLE_BLACKLIST", None) or getattr(
+        getattr(mstyle, "core", None), "STYLE_BLACKLIST", set())
+    path = Path(style)
+    if not path.exists() and (STYLES_DIR / f"{style}.mplstyle").exists():
+        path = STYLES_DIR / f"{style}.mplstyle"
+    if path.exists():
+        key = (str(path.resolve()), path.stat().st_mtime_ns)
+        if key not in _STYLE_CACHE:
+            try:
+                rc = rc_params_from_file(str(path), use_default_template=False)
+            except Exception as e:
+                warnings.warn(f"[Condatos] No se pudo aplicar estilo '{style}': {e}. Se continúa.", RuntimeWarning)
+                rc = {}
+            _STYLE_CACHE[key] = {k: v for k, v in dict(rc).items() if k not in blacklist}
+        return _STYLE_CACHE[key]
+    if style == "default":
+        return {k: v for k, v in mpl.rcParamsDefault.items() if k not in blacklist}
+    if style in mstyle.library:
+        return {k: v for k, v in dict(mstyle.library[style]).items() if k not in blacklist}
+    warnings.warn(f"[Condatos] Estilo no encontrado: {style}. Se continúa sin aplicarlo.", RuntimeWarning)
+    return {}
+
+
+def style_rc(style_path: str | Sequence[str] | None, width_in: float | None = None,
+             height_in: float | None = None) -> dict[str, Any]:
     """
-    try:
-        import matplotlib.style as mstyle  # disponible en Matplotlib 3.10+
-    except Exception:
-        mstyle = None
-
-    # Normaliza rutas relativas (por legibilidad en warnings)
-    style_disp = style_path
-    if os.path.exists(style_path):
-        style_disp = os.path.relpath(style_path)
-
-    try:
-        if mstyle is not None:
-            mstyle.use(style_path)
-            return
-    except Exception as e:
-        # cae al fallback de archivo explícito
-        pass
-
-    # Fallback: cargar parámetros desde archivo .mplstyle (si existe)
-    try:
-        from matplotlib import rc_params_from_file
-        params = rc_params_from_file(style_path, use_default_template=False)
-        mpl.rcParams.update(params)
-    except FileNotFoundError:
-        warnings.warn(f"[Condatos] Estilo no encontrado: {style_disp}. Se continúa sin aplicarlo.", RuntimeWarning)
-    except Exception as e:
-        warnings.warn(f"[Condatos] No se pudo aplicar estilo '{style_disp}': {e}. Se continúa.", RuntimeWarning)
+    ``rcParams`` de una pila de estilos (el último gana) y, si vienen, de
+    ``figure.figsize``, sin tocar los globales.
+    """
+    rc: dict[str, Any] = {}
+    for style in _style_names(style_path):
+        rc.update(_style_params(style))
+    if width_in and height_in:
+        rc["figure.figsize"] = (width_in, height_in)
+    return rc
+
+
+@contextmanager
+def render_context(params: Mapping[str, Any]):
+    """
+    Bloque de render con los estilos de la configuración (``style``) en un
+    ``rc_context`` propio, bajo ``RENDER_LOCK``. Se puede anidar en el mismo
+    hilo (p. ej. ediciones o variantes dentro de un render).
+    """
+    rc = style_rc(params.get("style"))
+    with RENDER_LOCK, mpl.rc_context(rc):
+        yield
+
 
 def apply_style(style_path: str | Sequence[str] | None,
                 width_in: float | None,
@@ -69,23 +129,12 @@ def apply_style(style_path: str | Sequence[str] | None,
       - Sequence[str]  (lista o tupla de rutas o nombres de estilo)
 
     width_in / height_in (en pulgadas) ajustan el tamaño por defecto de la figura.
+
+    Cambia los ``rcParams`` globales: sirve para scripts y notebooks. Los
+    gráficos usan ``render_context``, que no los cambia.
     """
     # Registrar y verificar fuentes primero
     register_fonts()
     verify_font_availability("Nunito")
 
-    # 1) Aplica estilos
-    if style_path:
-        if isinstance(style_path, str):
-            # Permite "a,b,c" separado por comas
-            styles = [s.strip() for s in style_path.split(",")] if ("," in style_path) else [style_path]
-        else:
-            styles = list(style_path)
-
-        for s in styles:
-            if s:  # evita strings vacíos
-                _apply_one_style(s)
-
-    # 2) Fija tamaño por plantilla (si viene)
-    if width_in and height_in:
-        mpl.rcParams["figure.figsize"] = (width_in, height_in)
\ No newline at end of file
+    mpl.rcParams.update(style_rc(style_path, width_in, height_in))
\ No newline at end of file
@@ -0,0 +1,216 @@
+# app/variants.py
+"""
+Variantes raster de un mismo gráfico (1x, 2x, 3x, miniaturas) a partir de un
+solo render.
+
+Con ``output.variants`` en la configuración, la figura se rasteriza una sola
+vez al mayor DPI pedido y las demás resoluciones se obtienen reduciendo ese
+buffer con LANCZOS. Cada variante se codifica con ``save_image`` (el mismo
+codificador que ``save_fig_multi``) en los formatos de
+``output.variant_formats``.
+
+.. code-block:: yaml
+
+    output:
+      base_dpi: 100            # tamaño "1x" (píxeles CSS = pulgadas x base_dpi)
+      variants: [1x, 2x, 3x, {name: thumb, width: 320}]
+      variant_formats: [webp, png]
+      srcset: true             # <outfile>.srcset.html
+      manifest: true           # <outfile>.variants.json
+
+Cada variante es ``"Nx"`` o un diccionario con ``name`` y uno de ``scale``
+(múltiplo de 1x), ``dpi`` o ``width`` (píxeles, alto proporcional). El
+archivo se llama ``<outfile>@<name>.<formato>``.
+"""
+from __future__ import annotations
+
+import html
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Mapping
+
+from PIL import Image
+
+from app.io_utils import ensure_parent, record_output, save_image
+from app.profiling import span
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMATS = ("png", "jpg", "jpeg", "webp", "avif")
+
+MIME_TYPES = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg",
+              "webp": "image/webp", "avif": "image/avif"}
+
+_SCALE = re.compile(r"^(\d+(?:\.\d+)?)x$")
+
+
+def has_variants(params: Mapping[str, Any]) -> bool:
+    """Indica si la configuración pide variantes."""
+    return bool((params.get("output") or {}).get("variants"))
+
+
+def variant_specs(fig, params: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """
+    Normaliza ``output.variants`` a diccionarios con ``name`` y ``dpi``.
+
+    Raises:
+        ValueError: si una variante no se puede interpretar
+    """
+    output = params.get("output") or {}
+    base_dpi = float(output.get("base_dpi", 100))
+    width_in = float(fig.get_size_inches()[0])
+    specs = []
+    for item in output.get("variants") or []:
+        if isinstance(item, str):
+            match = _SCALE.match(item.strip().lower())
+            if not match:
+                raise ValueError(f"output.variants: '{item}' no es una escala válida (ej. '2x')")
+            item = {"name": item.strip().lower(), "scale": float(match.group(1))}
+        if not isinstance(item, Mapping) or not item.get("name"):
+            raise ValueError(f"output.variants: cada variante necesita 'name' ({item!r})")
+        if "width" in item:
+            dpi = float(item["width"]) / width_in
+        elif "dpi" in item:
+            dpi = float(item["dpi"])
+        elif "scale" in item:
+            dpi = float(item["scale"]) * base_dpi
+        else:
+            raise ValueError(f"output.variants: '{item['name']}' necesita scale, dpi o width")
+        if dpi <= 0:
+            raise ValueError(f"output.variants: '{item['name']}' tiene un tamaño no positivo")
+        specs.append({"name": str(item["name"]), "dpi": dpi})
+    return specs
+
+
+def variants_dpi(fig, params: Mapping[str, Any]) -> float:
+    """DPI del único render: el mayor de las variantes pedidas."""
+    return max(spec["dpi"] for spec in variant_specs(fig, params))
+
+
+def _variant_formats(params: Mapping[str, Any]) -> list[str]:
+    """Formatos de las variantes: ``output.variant_formats`` o los raster de ``formats``."""
+    output = params.get("output") or {}
+    formats = output.get("variant_formats")
+    if not formats:
+        formats = [f for f in params.get("formats", ["png"]) if f.lower() in VARIANT_FORMATS] or ["png"]
+    formats = [f.lower() for f in formats]
+    unknown = [f for f in formats if f not in VARIANT_FORMATS]
+    if unknown:
+        raise ValueError(f"output.variant_formats: {unknown} no son formatos raster; opciones: {list(VARIANT_FORMATS)}")
+    return formats
+
+
+def rasterize(fig, dpi: float) -> Image.Image:
+    """Rasteriza la figura a ``dpi`` en memoria (mismo resultado que savefig en PNG)."""
+    import io
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="rgba", dpi=dpi, bbox_inches=None, pad_inches=0.02)
+    width, height = (int(v * dpi) for v in fig.get_size_inches())
+    data = buffer.getvalue()
+    if len(data) != 4 * width * height:
+        # Redondeo distinto en el backend: el ancho manda
+        height = len(data) // (4 * width)
+    return Image.frombuffer("RGBA", (width, height), data, "raw", "RGBA", 0, 1)
+
+
+def save_variants(fig, params: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """
+    Rasteriza una vez, reduce a cada variante y la guarda en sus formatos.
+
+    La figura debe tener ya la cromática (artistas o capas compuestas al DPI
+    de ``variants_dpi``).
+
+    Returns:
+        list: Entradas del manifiesto (una por variante y formato)
+    """
+    specs = variant_specs(fig, params)
+    if not specs:
+        return []
+    formats = _variant_formats(params)
+    output = params.get("output") or {}
+    base = Path(params.get("outfile", "out/figure")).with_suffix("")
+    top_dpi = max(spec["dpi"] for spec in specs)
+
+    with span("variants.rasterize", cat="save", dpi=round(top_dpi)):
+        master = rasterize(fig, top_dpi)
+    logger.debug("🖼️ Render único para variantes: %sx%s px a %.0f DPI", master.width, master.height, top_dpi)
+    if master.getchannel("A").getextrema() == (255, 255):
+        # Fondo opaco: reducir en RGB es ~40% más rápido que en RGBA
+        master = master.convert("RGB")
+
+    entries = []
+    image = master
+    for spec in sorted(specs, key=lambda s: s["dpi"], reverse=True):
+        factor = spec["dpi"] / top_dpi
+        size = (max(1, round(master.width * factor)), max(1, round(master.height * factor)))
+        # En cascada: cada variante se reduce desde la anterior (más chica que el original)
+        if size != image.size:
+            with span(f"variants.resize:{spec['name']}", cat="save"):
+                image = image.resize(size, Image.Resampling.LANCZOS)
+        for fmt in formats:
+            out = base.with_name(f"{base.name}@{spec['name']}.{fmt}")
+            ensure_parent(out)
+            with span(f"variants.save:{fmt}", cat="save", path=str(out)):
+                saved = save_image(image, out, fmt,
+                                   jpg_quality=int(params.get("jpg_quality", 92)),
+                                   webp_quality=int(params.get("webp_quality", 92)),
+                                   avif_quality=int(params.get("avif_quality", 55)),
+                                   dpi=round(spec["dpi"]))
+            if not saved:
+                continue
+            logger.info("[save] %s (%sx%s)", out, *size)
+            record_output(out)
+            entries.append({"name": spec["name"], "format": fmt, "file": out.name,
+                            "width": size[0], "height": size[1], "dpi": round(spec["dpi"], 2),
+                            "bytes": out.stat().st_size})
+
+    if output.get("manifest", False):
+        manifest_path = base.with_name(f"{base.name}.variants.json")
+        manifest_path.write_text(json.dumps({"base": base.name, "variants": entries}, indent=2, ensure_ascii=False),
+                                 encoding="utf-8")
+        logger.info("[save] %s", manifest_path)
+        record_output(manifest_path)
+    if output.get("srcset", False):
+        srcset_path = base.with_name(f"{base.name}.srcset.html")
+        srcset_path.write_text(srcset_html(entries, params, output), encoding="utf-8")
+        logger.info("[save] %s", srcset_path)
+        record_output(srcset_path)
+    return entries
+
+
+def srcset_html(entries: list[dict[str, Any]], params: Mapping[str, Any], output: Mapping[str, Any]) -> str:
+    """
+    Fragmento ``<picture>`` con un ``srcset`` por formato (descriptores de ancho).
+
+    El último formato de ``variant_formats`` va en el ``<img>`` de respaldo;
+    los anteriores, en ``<source>`` por orden de preferencia.
+    """
+    by_format: dict[str, list[dict[str, Any]]] = {}
+    for entry in entries:
+        by_format.setdefault(entry["format"], []).append(entry)
+    if not by_format:
+        return ""
+
+    def srcset(items):
+        return ", ".join(f"{e['file']} {e['width']}w" for e in sorted(items, key=lambda e: e["width"]))
+
+    title = params.get("title", "")
+    alt = title.get("text", "") if isinstance(title, Mapping) else str(title or "")
+    sizes = output.get("sizes", "100vw")
+    formats = list(by_format)
+    fallback = by_format[formats[-1]]
+    # Tamaño intrínseco: la variante 1x si existe, si no la más grande
+    reference = next((e for e in fallback if e["name"] == "1x"), max(fallback, key=lambda e: e["width"]))
+
+    lines = ["<picture>"]
+    for fmt in formats[:-1]:
+        lines.append(f'  <source type="{MIME_TYPES[fmt]}" srcset="{html.escape(srcset(by_format[fmt]))}" '
+                     f'sizes="{html.escape(sizes)}">')
+    lines.append(f'  <img src="{html.escape(reference["file"])}" srcset="{html.escape(srcset(fallback))}" '
+                 f'sizes="{html.escape(sizes)}" width="{reference["width"]}" height="{reference["height"]}" '
+                 f'alt="{html.escape(alt)}" loading="lazy" decoding="async">')
+    lines.append("</picture>")
+    return "\n".join(lines) + "\n"
@@ -7,23 +7,194 @@ de gráficos utilizando configuraciones basadas en archivos YAML.
 
 Uso:
   python main.py stackedbarh config/archivo.yml  # Gráfico de barras horizontales apiladas
+  python main.py barv config/archivo.yml         # Gráfico de barras verticales
   python main.py linechart config/archivo.yml    # Gráfico de líneas
+  python main.py --quiet stackedbarh config/archivo.yml     # Solo advertencias y errores
+  python main.py --log-level debug --log-json barv config/archivo.yml
+  python main.py live stackedbarh config/archivo.yml  # Re-exportar al cambiar el CSV
+  python main.py animate stackedbarh config/archivo.yml --format webp  # Animación (bar chart race)
+  python main.py batch config/ --workers 4          # Muchos gráficos en paralelo (y configs con matrix)
+  python main.py batch config/ --resume            # Retomar un lote cortado (ver journal)
+  python main.py batch config/ --shard 1/3          # Una parte del lote (ver merge-manifests)
+  python main.py enqueue config/ --queue /mnt/cola  # Cola en un directorio compartido...
+  python main.py worker --queue /mnt/cola           # ...que vacían trabajadores en cualquier máquina
+
+Los módulos de cada gráfico se importan solo al ejecutar su subcomando
+(ver app/plots/registry.py), por lo que `--help` arranca sin pandas ni matplotlib.
 """
 
+from pathlib import Path
+
 import typer
 
-# Importamos las funciones de los diferentes tipos de gráficos
-from app.plots.stackedbarh import stackedbarh
-from app.plots.barv import barv
-from app.plots.linechart import linechart
+from app.cli import add_global_options
+from app.plots.registry import add_commands
 
 # Crear la aplicación Typer
 app = typer.Typer(help="Condatos Figures - Generador de gráficos con estilos preestablecidos")
 
-# Registrar los comandos
-app.command()(barv)
-app.command()(stackedbarh)
-app.command()(linechart)
+# Opciones globales: logging (--quiet, --log-level, --log-json) y perfiles (--trace, --profile)
+add_global_options(app)
+
+# Registrar los comandos (perezosos) desde el registro de tipos de gráfico
+add_commands(app)
+
+
+@app.command()
+def live(
+    chart: str = typer.Argument(..., help="Tipo de gráfico (stackedbarh, barv, ...)"),
+    config: Path = typer.Argument(..., help="Ruta a config YAML"),
+    interval: float = typer.Option(2.0, "--interval", help="Segundos entre revisiones del archivo de datos"),
+):
+    """Renderiza una vez y vuelve a exportar cada vez que cambia el archivo de datos."""
+    from app.live import LiveChart
+    from app.plots.registry import get_chart_class
+
+    with LiveChart(get_chart_class(chart), config) as live_chart:
+        live_chart.watch(interval=interval)
+
+
+@app.command()
+def animate(
+    chart: str = typer.Argument(..., help="Tipo de gráfico (stackedbarh o barv)"),
+    config: Path = typer.Argument(..., help="Ruta a config YAML (con sección animation)"),
+    format: str = typer.Option(None, "--format", help="gif, webp o mp4 (por defecto animation.format)"),
+    fps: float = typer.Option(None, "--fps", help="Cuadros por segundo"),
+    steps: int = typer.Option(None, "--steps", help="Cuadros entre dos fotos consecutivas"),
+    top_n: int = typer.Option(None, "--top-n", help="Filas visibles"),
+    out: Path = typer.Option(None, "--out", help="Archivo de salida (por defecto outfile con la extensión del formato)"),
+):
+    """Anima el gráfico entre las fotos de animation.time_col (bar chart race)."""
+    from app.animation import render_animation
+    from app.plots.registry import get_chart_class
+
+    render_animation(get_chart_class(chart), config, format=format, fps=fps, steps=steps,
+                     top_n=top_n, outfile=str(out) if out else None)
+
+
+@app.command()
+def batch(
+    configs: list[Path] = typer.Argument(..., help="YAML o directorios con YAML"),
+    chart: str = typer.Option(None, "--chart", help="Tipo de gráfico (por defecto chart.type de cada YAML)"),
+    workers: int = typer.Option(None, "--workers", "-j", help="Procesos en paralelo (por defecto, los CPUs)"),
+    shard: str = typer.Option(None, "--shard", help="Solo la parte i de N del lote (ej. 2/4), para repartir entre máquinas"),
+    manifest: Path = typer.Option(None, "--manifest", help="Directorio del manifiesto (por defecto out/manifests con --shard)"),
+    costs: Path = typer.Option(None, "--costs", help="Manifiesto anterior con los tiempos de cada trabajo (por defecto <manifest>/manifest.json)"),
+    journal: Path = typer.Option(Path("out/batch-journal.jsonl"), "--journal", help="Diario del lote (JSONL, solo se agregan líneas)"),
+    no_journal: bool = typer.Option(False, "--no-journal", help="No escribir el diario"),
+    resume: bool = typer.Option(False, "--resume", help="Saltar los trabajos ya hechos según el diario (si no cambiaron)"),
+    job_timeout: float = typer.Option(None, "--job-timeout", help="Segundos por gráfico; el proceso que se pasa se mata y se reemplaza"),
+    max_memory: float = typer.Option(None, "--max-memory", help="MB de RSS por proceso; el que se pasa se mata y se reemplaza"),
+    memory_budget: str = typer.Option(None, "--memory-budget", help="MB para todo el lote (o auto: 80 % de la memoria disponible); los gráficos esperan hasta que su memoria estimada quepa"),
+    no_cost_model: bool = typer.Option(False, "--no-cost-model", help="No ordenar por costo previsto ni guardar la historia de tiempos"),
+):
+    """Renderiza muchos gráficos en paralelo (los YAML con matrix se expanden)."""
+    from contextlib import nullcontext
+
+    from app.batch import jobs_from_configs, parse_shard, run_jobs, shard_jobs
+    from app.costs import CostModel
+    from app.journal import Journal
+    from app.manifest import load_costs, shard_filename, write_manifest
+    from app.pool import parse_memory_budget
+
+    try:
+        index, count = parse_shard(shard) if shard else (None, None)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--shard")
+    try:
+        budget = parse_memory_budget(memory_budget) if memory_budget else None
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--memory-budget")
+    if manifest is None and shard:
+        manifest = Path("out/manifests")
+
+    jobs = jobs_from_configs(configs, chart)
+    if shard:
+        history = load_costs(costs if costs is not None else manifest / "manifest.json")
+        jobs = shard_jobs(jobs, index, count, history)
+    if resume and no_journal:
+        raise typer.BadParameter("--resume necesita el diario", param_hint="--no-journal")
+    with (nullcontext() if no_journal else Journal(journal)) as diary, \
+            (nullcontext() if no_cost_model else CostModel()) as cost_model:
+        skipped = []
+        if diary is not None:
+            jobs, skipped = diary.start(jobs, resume=resume)
+        results = skipped + run_jobs(jobs, workers, on_result=diary.record if diary is not None else None,
+                                     timeout=job_timeout, memory_mb=max_memory, costs=cost_model,
+                                     memory_budget_mb=budget)
+    if manifest is not None:
+        write_manifest(results, manifest / (shard_filename(index, count) if shard else "batch.json"),
+                       (index, count) if shard else None)
+    if any(r["status"] != "ok" for r in results):
+        raise typer.Exit(1)
+
+
+@app.command("merge-manifests")
+def merge_manifests(
+    manifests: list[Path] = typer.Argument(..., help="Manifiestos de los shards (o el directorio que los contiene)"),
+    out: Path = typer.Option(None, "--out", help="Manifiesto unido (por defecto manifest.json junto a los shards)"),
+):
+    """Une los manifiestos de los shards de un lote en uno solo."""
+    from app.manifest import merge_manifests as merge
+
+    paths = []
+    for path in manifests:
+        if not path.exists():
+            raise typer.BadParameter(f"No existe {path}", param_hint="MANIFESTS")
+        paths += sorted(path.glob("shard-*-of-*.json")) if path.is_dir() else [path]
+    if not paths:
+        raise typer.BadParameter("No se encontraron manifiestos", param_hint="MANIFESTS")
+    merged = merge(paths, out if out is not None else paths[0].parent / "manifest.json")
+    if merged["missing_shards"] or merged["totals"]["error"]:
+        raise typer.Exit(1)
+
+
+@app.command("journal")
+def journal_report(
+    journal: Path = typer.Argument(Path("out/batch-journal.jsonl"), help="Diario de lotes (JSONL)"),
+):
+    """Rendimiento y fallas registrados en el diario de lotes."""
+    from app.journal import format_stats, journal_stats
+
+    if not journal.exists():
+        raise typer.BadParameter(f"No existe {journal}", param_hint="JOURNAL")
+    for line in format_stats(journal_stats(journal)):
+        typer.echo(line)
+
+
+@app.command()
+def enqueue(
+    configs: list[Path] = typer.Argument(..., help="YAML o directorios con YAML"),
+    queue: Path = typer.Option(..., "--queue", help="Directorio de la cola (compartido entre máquinas)"),
+    chart: str = typer.Option(None, "--chart", help="Tipo de gráfico (por defecto chart.type de cada YAML)"),
+):
+    """Agrega gráficos a una cola en un directorio (ver worker)."""
+    from app.fsqueue import FileQueue
+
+    FileQueue(queue).enqueue(configs, chart)
+
+
+@app.command()
+def worker(
+    queue: Path = typer.Option(..., "--queue", help="Directorio de la cola"),
+    timeout: float = typer.Option(60.0, "--timeout", help="Segundos sin latido para devolver un trabajo a la cola"),
+    heartbeat: float = typer.Option(5.0, "--heartbeat", help="Segundos entre latidos"),
+    attempts: int = typer.Option(3, "--attempts", help="Intentos por trabajo antes de darlo por fallido"),
+    follow: bool = typer.Option(False, "--follow", help="Seguir esperando trabajos cuando la cola se vacía"),
+    max_jobs: int = typer.Option(None, "--max-jobs", help="Terminar tras esta cantidad de trabajos"),
+    job_timeout: float = typer.Option(None, "--job-timeout", help="Segundos por gráfico; el proceso que se pasa se mata"),
+    max_memory: float = typer.Option(None, "--max-memory", help="MB de RSS por gráfico; el proceso que se pasa se mata"),
+):
+    """Toma y renderiza trabajos de una cola en un directorio hasta vaciarla."""
+    from app.fsqueue import FileQueue
+
+    if heartbeat >= timeout:
+        raise typer.BadParameter("debe ser menor que --timeout", param_hint="--heartbeat")
+    results = FileQueue(queue, timeout=timeout, max_attempts=attempts).work(
+        heartbeat=heartbeat, follow=follow, max_jobs=max_jobs, job_timeout=job_timeout, memory_mb=max_memory)
+    if any(r["status"] != "ok" for r in results):
+        raise typer.Exit(1)
+
 
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    app()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmark de render con datos sintéticos para todos los tipos de gráfico.
+
+Genera tablas tipo medallero (N categorías, con y sin banderas) y series de
+líneas (N puntos), las renderiza con ``StackedHorizontalBarChart``,
+``VerticalBarChart`` y ``LineChart`` en cada formato de salida y registra:
+
+- tiempo de render (mediana de ``--repeat`` renders, tras los imports),
+- pico de memoria (``ru_maxrss``) del proceso,
+- tamaño en bytes del archivo generado.
+
+Cada caso corre en un subproceso propio para que el pico de memoria sea el
+del caso y no el acumulado. Los resultados se comparan con una línea base
+guardada; el script falla si algún caso es más lento (o usa más memoria)
+que la base por encima del umbral.
+
+Uso:
+    python scripts/bench_render.py                       # perfil quick
+    python scripts/bench_render.py --profile full        # matriz completa
+    python scripts/bench_render.py --save-baseline       # guardar línea base
+    python scripts/bench_render.py --only stackedbarh --threshold 0.15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+PROFILES = {
+    "quick": {
+        "categories": [10, 100],
+        "points": [1_000, 10_000],
+        "formats": ["png", "svg"],
+    },
+    "full": {
+        "categories": [10, 100, 1_000, 10_000],
+        "points": [1_000, 10_000, 100_000, 1_000_000],
+        "formats": ["png", "svg", "pdf", "jpg", "webp"],
+    },
+}
+
+TEMPLATES = {
+    "stackedbarh": "templates/stackedbar-horizontal-template.yml",
+    "barv": "templates/bar-vertical-condatos.yml",
+    "linechart": "templates/linechart-condatos.yml",
+}
+
+
+def default_baseline(profile):
+    return root_dir / "scripts" / f"bench_render_baseline-{profile}.json"
+
+
+# =============================
+# Casos y datos sintéticos
+# =============================
+
+def build_cases(profile, only=None):
+    """Matriz de casos del perfil (tipo × tamaño × banderas × formato)."""
+    spec = PROFILES[profile]
+    cases = []
+    for fmt in spec["formats"]:
+        for n in spec["categories"]:
+            for flags in (False, True):
+                cases.append({"chart": "stackedbarh", "size": n, "flags": flags, "format": fmt})
+            cases.append({"chart": "barv", "size": n, "flags": False, "format": fmt})
+        for n in spec["points"]:
+            cases.append({"chart": "linechart", "size": n, "flags": False, "format": fmt})
+    if only:
+        cases = [c for c in cases if c["chart"] in only]
+    for c in cases:
+        suffix = "-flags" if c["flags"] else ""
+        c["id"] = f"{c['chart']}-n{c['size']}{suffix}-{c['format']}"
+    return cases
+
+
+def write_medal_csv(path, n, seed=42):
+    """Medallero sintético: país, código (con bandera existente) y medallas."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    codes = sorted(p.stem for p in (root_dir / "assets" / "flags").glob("*.png")) or ["XXX"]
+    oro = rng.integers(0, 80, n)
+    plata = rng.integers(0, 80, n)
+    bronce = rng.integers(0, 80, n)
+    df = pd.DataFrame({
+        "rank": np.arange(1, n + 1),
+        "code": [codes[i % len(codes)] for i in range(n)],
+        "pais": [f"País {i:05d}" for i in range(n)],
+        "oro": oro,
+        "plata": plata,
+        "bronce": bronce,
+        "total": oro + plata + bronce,
+    })
+    df.to_csv(path, index=False)
+
+
+def write_line_csv(path, n, seed=42):
+    """Dos series (paseo aleatorio) sobre un eje x entero de n puntos."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "x": np.arange(n),
+        "serie_a": rng.normal(0, 1, n).cumsum(),
+        "serie_b": rng.normal(0, 1, n).cumsum(),
+    })
+    df.to_csv(path, index=False)
+
+
+def write_config(workdir, case):
+    """Escribe el YAML del caso (template del repo + datos sintéticos)."""
+    import yaml
+
+    data_dir = workdir / "data"
+    data_dir.mkdir(exist_ok=True)
+    chart, n = case["chart"], case["size"]
+    cfg = {
+        "template": TEMPLATES[chart],
+        "outfile": str(workdir / "out" / case["id"]),
+        "formats": [case["format"]],
+        "title": f"Benchmark {chart} ({n})",
+        "footer": {"source": "Datos sintéticos"},
+    }
+    if chart in ("stackedbarh", "barv"):
+        csv = data_dir / f"medals-{n}.csv"
+        if not csv.exists():
+            write_medal_csv(csv, n)
+        cfg["data"] = {"csv": str(csv), "category_col": "pais"}
+        if chart == "stackedbarh":
+            cfg["series_order"] = ["oro", "plata", "bronce"]
+            cfg["flags"] = {
+                "enabled": case["flags"],
+                "position": "start",
+                "pattern": "assets/flags/{CODE}.png",
+                "code_column": "code",
+            }
+        else:
+            cfg["data"]["value_col"] = "total"
+    else:
+        csv = data_dir / f"line-{n}.csv"
+        if not csv.exists():
+            write_line_csv(csv, n)
+        cfg["data"] = {"csv": str(csv)}
+        cfg["data_source"] = {"column_mapping": {"x": "x", "series": [
+            {"name": "Serie A", "column": "serie_a"},
+            {"name": "Serie B", "column": "serie_b"},
+        ]}}
+        # Marcadores solo en series cortas, como se usaría en la práctica
+        cfg["linechart"] = {"marker": {"enabled": n <= 1_000}}
+        cfg["value_labels"] = {"show": True, "only_last": True}
+        cfg["annotations"] = {"regions": []}
+
+    path = workdir / "configs" / f"{case['id']}.yml"
+    path.parent.mkdir(exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(cfg, f, allow_unicode=True, sort_keys=False)
+    return path
+
+
+# =============================
+# Ejecución de un caso (subproceso)
+# =============================
+
+def run_case(case, config_path, repeat):
+    """Renderiza un caso ``repeat`` veces y devuelve sus métricas."""
+    import resource
+
+    from app.chart_utils import render_chart
+    from app.log import setup_logging
+    from app.plots.registry import get_chart_class
+
+    setup_logging(level="warning")
+    chart_class = get_chart_class(case["chart"])
+
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        render_chart(chart_class, config_path)
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    out = Path(str(Path(config_path).parent.parent / "out" / case["id"]) + f".{case['format']}")
+    return {
+        "id": case["id"],
+        "time_ms": statistics.median(samples),
+        "first_ms": samples[0],
+        # En Linux ru_maxrss está en KiB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "bytes": out.stat().st_size if out.exists() else 0,
+    }
+
+
+def spawn_case(case, config_path, repeat, timeout):
+    """Corre un caso en un subproceso y devuelve su resultado (o el error)."""
+    cmd = [sys.executable, __file__, "--run-case", json.dumps(case),
+           "--config", str(config_path), "--repeat", str(repeat)]
+    try:
+        proc = subprocess.run(cmd, cwd=root_dir, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"id": case["id"], "error": f"timeout ({timeout}s)"}
+    if proc.returncode != 0:
+        return {"id": case["id"], "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "falló"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# =============================
+# Comparación con la línea base
+# =============================
+
+def compare(results, baseline, threshold, rss_threshold, min_delta_ms):
+    """Devuelve (regresiones, avisos) de los casos presentes en ambas corridas."""
+    regressions, warnings = [], []
+    base = {r["id"]: r for r in baseline.get("results", [])}
+    for r in results:
+        b = base.get(r["id"])
+        if not b or "error" in r or "error" in b:
+            continue
+        dt = r["time_ms"] - b["time_ms"]
+        if r["time_ms"] > b["time_ms"] * (1 + threshold) and dt > min_delta_ms:
+            regressions.append(f"{r['id']}: {b['time_ms']:.0f} → {r['time_ms']:.0f} ms (+{dt / b['time_ms']:.0%})")
+        if r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + rss_threshold):
+            regressions.append(f"{r['id']}: RSS {b['peak_rss_mb']:.0f} → {r['peak_rss_mb']:.0f} MB")
+        if b["bytes"] and abs(r["bytes"] - b["bytes"]) / b["bytes"] > 0.10:
+            warnings.append(f"{r['id']}: tamaño {b['bytes']} → {r['bytes']} bytes")
+    return regressions, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick", help="Matriz de casos")
+    parser.add_argument("--only", nargs="*", help="Limitar a estos tipos de gráfico")
+    parser.add_argument("--repeat", type=int, default=3, help="Renders por caso (se informa la mediana)")
+    parser.add_argument("--timeout", type=int, default=900, help="Segundos máximos por caso")
+    parser.add_argument("--baseline", type=Path, help="Archivo de línea base (por defecto según el perfil)")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regresión de tiempo tolerada (0.25 = 25%%)")
+    parser.add_argument("--rss-threshold", type=float, default=0.25, help="Regresión de memoria tolerada")
+    parser.add_argument("--min-delta-ms", type=float, default=25.0, help="Ignorar diferencias menores (ruido)")
+    parser.add_argument("--json", type=Path, help="Guardar los resultados en este archivo")
+    # Uso interno: ejecutar un caso en el subproceso
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    if opts.run_case:
+        print(json.dumps(run_case(json.loads(opts.run_case), opts.config, opts.repeat)))
+        return 0
+
+    cases = build_cases(opts.profile, opts.only)
+    print(f"\n🏁 Benchmark de render · perfil {opts.profile} · {len(cases)} casos · {opts.repeat} renders por caso")
+    print(f"{'caso':<42} {'tiempo':>10} {'1er render':>11} {'RSS pico':>10} {'bytes':>11}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="condatos-bench-") as tmp:
+        workdir = Path(tmp)
+        (workdir / "out").mkdir()
+        for case in cases:
+            config_path = write_config(workdir, case)
+            r = spawn_case(case, config_path, opts.repeat, opts.timeout)
+            r.update({k: case[k] for k in ("chart", "size", "flags", "format")})
+            results.append(r)
+            if "error" in r:
+                print(f"{case['id']:<42} ❌ {r['error']}")
+            else:
+                print(f"{case['id']:<42} {r['time_ms']:>8.0f} ms {r['first_ms']:>8.0f} ms "
+                      f"{r['peak_rss_mb']:>7.0f} MB {r['bytes']:>11,}")
+
+    payload = {
+        "profile": opts.profile,
+        "python": sys.version.split()[0],
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+    }
+    if opts.json:
+        opts.json.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    failed = [r for r in results if "error" in r]
+    baseline_path = opts.baseline or default_baseline(opts.profile)
+    if opts.save_baseline:
+        baseline_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Línea base guardada en {baseline_path}")
+        return 1 if failed else 0
+
+    if not baseline_path.exists():
+        print(f"\nℹ️ No hay línea base ({baseline_path}); créala con --save-baseline")
+        return 1 if failed else 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions, warnings = compare(results, baseline, opts.threshold, opts.rss_threshold, opts.min_delta_ms)
+    for w in warnings:
+        print(f"⚠️ {w}")
+    if regressions or failed:
+        print(f"\n❌ Regresiones respecto de {baseline_path.name} (umbral {opts.threshold:.0%}):")
+        for r in regressions:
+            print(f"  - {r}")
+        for r in failed:
+            print(f"  - {r['id']}: {r['error']}")
+        return 1
+
+    print(f"\n🎉 Sin regresiones respecto de {baseline_path.name} (umbral {opts.threshold:.0%})\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
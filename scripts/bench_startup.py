@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque de la CLI basado en ``python -X importtime``.
+
+Mide cuánto tarda en importarse todo lo necesario para ``main.py --help`` y
+para cada subcomando (solo su módulo de gráfico), y falla si:
+
+- el tiempo de importación de ``--help`` supera el presupuesto (``--budget-ms``),
+- ``--help`` importa alguna librería pesada (pandas, matplotlib, PIL, ...),
+- un subcomando importa módulos de otros tipos de gráfico.
+
+Uso:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --budget-ms 300 --runs 7
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from app.plots.registry import CHART_TYPES
+
+# Librerías que no deben cargarse para mostrar la ayuda
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "PIL", "seaborn", "scipy")
+
+
+def importtime(args):
+    """
+    Ejecuta Python con ``-X importtime`` y devuelve (total_us, módulos).
+
+    total_us es la suma del tiempo acumulado de los imports de primer nivel.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=root_dir, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falló {' '.join(args)}:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # Los imports de primer nivel no tienen sangría extra
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us, modules
+
+
+def measure(args, runs):
+    """Mediana del tiempo de importación (ms) y el conjunto de módulos."""
+    samples = []
+    modules = set()
+    for _ in range(runs):
+        total_us, modules = importtime(args)
+        samples.append(total_us / 1000)
+    return statistics.median(samples), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=400.0,
+                        help="Presupuesto de importación para main.py --help (ms)")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones por medición")
+    opts = parser.parse_args()
+
+    failures = []
+
+    print("\n⏱️ Arranque de la CLI (python -X importtime)")
+    help_ms, help_modules = measure(["main.py", "--help"], opts.runs)
+    status = "✅" if help_ms <= opts.budget_ms else "❌"
+    print(f"{status} main.py --help: {help_ms:.1f} ms (presupuesto {opts.budget_ms:.0f} ms)")
+    if help_ms > opts.budget_ms:
+        failures.append(f"--help tardó {help_ms:.1f} ms > {opts.budget_ms:.0f} ms")
+
+    heavy = sorted(m for m in help_modules if m.split(".")[0] in HEAVY_MODULES and "." not in m)
+    if heavy:
+        print(f"❌ --help importa librerías pesadas: {heavy}")
+        failures.append(f"--help importa {heavy}")
+    else:
+        print("✅ --help no importa librerías pesadas")
+
+    # Cada subcomando debe importar solo su propio módulo de gráfico
+    chart_modules = {entry["module"] for entry in CHART_TYPES.values()}
+    for name, entry in CHART_TYPES.items():
+        code = f"from app.plots.registry import get_chart_class; get_chart_class({name!r})"
+        ms, modules = measure(["-c", code], 1)
+        extra = sorted((chart_modules - {entry["module"]}) & modules)
+        status = "✅" if not extra else "❌"
+        print(f"{status} {name}: {ms:.0f} ms de imports" + (f" (importa también {extra})" if extra else ""))
+        if extra:
+            failures.append(f"{name} importa {extra}")
+
+    if failures:
+        print("\n❌ Benchmark de arranque fallido:")
+        for f in failures:
+            print(f"  - {f}")
+        return 1
+
+    print("\n🎉 Arranque dentro del presupuesto\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
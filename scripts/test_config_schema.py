@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Prueba de la compilación de configuraciones (``app.config_schema``) y de la
+caché que la respalda (``app.cache.content_hash``).
+
+- Un YAML válido puede mezclar claves numéricas y de texto en un mismo
+  mapeo (``bar.colors: {2019: red, oro: gold}``, columnas por año): debe
+  compilar, también desde la caché en disco, sin perder las claves.
+- El hash no depende del orden de inserción y distingue ``2019`` de
+  ``"2019"``.
+
+Uso:
+    python scripts/test_config_schema.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+
+def main():
+    from app.cache import content_hash
+    from app.config_schema import compile_config
+
+    ok = True
+    raw = {
+        "data": {"csv": "data/medallas-juegos-panamericanos-junior-2025.csv", "category_col": "pais"},
+        "bar": {"colors": {2019: "red", "oro": "gold", 2020: "blue"}},
+        "strings": {1: "uno", "dos": "dos"},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="condatos-schema-") as tmp:
+        os.environ["CONDATOS_CACHE_DIR"] = tmp
+        try:
+            first = compile_config(raw, "barv")
+            second = compile_config(raw, "barv")  # desde la caché en disco
+        except Exception as e:
+            print(f"❌ No compiló una configuración con claves mixtas: {type(e).__name__}: {e}")
+            return 1
+        finally:
+            os.environ.pop("CONDATOS_CACHE_DIR", None)
+
+    for name, params in (("compilada", first), ("desde la caché", second)):
+        colors = dict(params["bar"]["colors"])
+        if colors != {2019: "red", "oro": "gold", 2020: "blue"}:
+            print(f"❌ Configuración {name}: bar.colors cambió: {colors}")
+            ok = False
+
+    reordered = {"strings": {"dos": "dos", 1: "uno"}, "bar": {"colors": {2020: "blue", "oro": "gold", 2019: "red"}},
+                 "data": raw["data"]}
+    if content_hash(raw) != content_hash(reordered):
+        print("❌ El hash depende del orden de las claves")
+        ok = False
+    if content_hash({2019: "red"}) == content_hash({"2019": "red"}):
+        print("❌ El hash no distingue la clave 2019 de '2019'")
+        ok = False
+
+    if ok:
+        print("✅ Claves numéricas y de texto mezcladas: compila (también desde la caché) y el hash es estable")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Prueba de fugas: renderiza muchos gráficos en un solo proceso (como un lote
+largo) y verifica que la memoria y la cantidad de figuras vivas no crecen.
+
+- Alterna ``stackedbarh`` (con banderas), ``barv`` y ``linechart`` con datos
+  sintéticos pequeños (los mismos generadores de ``bench_render.py``).
+- Tras el calentamiento (cachés de fuentes, banderas y configuraciones
+  llenas) mide el RSS actual (``/proc/self/status``) cada ``--sample-every``
+  renders (siempre tras el mismo tipo de gráfico), después de ``gc.collect()``; falla si la mediana del último
+  décimo de muestras supera a la del primero en más de ``--max-growth-mb``.
+- Falla si quedan figuras registradas en pyplot o instancias de ``Figure``
+  vivas tras ``gc.collect()``.
+
+Uso:
+    python scripts/test_figure_leak.py                  # 1.000 renders
+    python scripts/test_figure_leak.py --count 200 --max-growth-mb 30
+"""
+
+import argparse
+import gc
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from bench_render import write_config  # noqa: E402  (mismo directorio)
+
+CHARTS = ["stackedbarh", "barv", "linechart"]
+
+
+def current_rss_mb():
+    """RSS actual del proceso en MB (no el pico)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Fuera de Linux: pico de RSS (solo puede crecer, la prueba es más estricta)
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def live_figures():
+    """Instancias de ``Figure`` alcanzables tras una recolección completa."""
+    from matplotlib.figure import Figure
+
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de fugas de memoria en renders repetidos")
+    parser.add_argument("--count", type=int, default=1000, help="Renders totales (por defecto 1000)")
+    parser.add_argument("--warmup", type=int, default=100, help="Renders antes de empezar a medir")
+    parser.add_argument("--sample-every", type=int, default=15,
+                        help="Renders entre muestras de RSS (se redondea a múltiplo de la cantidad de gráficos)")
+    parser.add_argument("--max-growth-mb", type=float, default=40.0,
+                        help="Crecimiento máximo de RSS tras el calentamiento (MB)")
+    args = parser.parse_args()
+
+    from app.chart_utils import render_chart
+    from app.figures import open_figure_count
+    from app.log import setup_logging
+    from app.plots.registry import get_chart_class
+
+    setup_logging(level="warning")
+
+    with tempfile.TemporaryDirectory(prefix="condatos-leak-") as tmp:
+        workdir = Path(tmp)
+        jobs = []
+        for chart in CHARTS:
+            case = {"chart": chart, "size": 10, "flags": chart == "stackedbarh",
+                    "format": "png", "id": f"{chart}-leak"}
+            jobs.append((get_chart_class(chart), write_config(workdir, case)))
+
+        # El RSS depende del último tipo de gráfico renderizado: se mide siempre
+        # en el mismo punto de la rotación
+        step = -(-max(1, args.sample_every) // len(jobs)) * len(jobs)
+
+        print(f"🔁 Renderizando {args.count} gráficos ({', '.join(CHARTS)})...")
+        t0 = time.perf_counter()
+        samples = []
+        for i in range(args.count):
+            chart_class, config_path = jobs[i % len(jobs)]
+            render_chart(chart_class, config_path)
+            done = i + 1
+            if done >= args.warmup and (done - args.warmup) % step == 0:
+                gc.collect()
+                samples.append(current_rss_mb())
+            if done % 250 == 0:
+                print(f"   {done:5d} renders — RSS {current_rss_mb():.1f} MB")
+        elapsed = time.perf_counter() - t0
+
+    if len(samples) < 2:
+        print(f"❌ Muy pocas muestras de RSS: aumentar --count (mínimo {args.warmup + step})")
+        return 1
+    window = max(1, len(samples) // 10)
+    first = statistics.median(samples[:window])
+    last = statistics.median(samples[-window:])
+    growth = last - first
+    managed = open_figure_count()
+    alive = live_figures()
+
+    print(f"\n📊 {args.count} renders en {elapsed:.1f} s ({len(samples)} muestras de RSS)")
+    print(f"   RSS tras el calentamiento: {first:.1f} MB — al final: {last:.1f} MB "
+          f"(crecimiento {growth:+.1f} MB, máximo {args.max_growth_mb:.0f} MB)")
+    print(f"   Figuras en pyplot: {managed} — instancias de Figure vivas: {alive}")
+
+    ok = True
+    if managed:
+        print(f"❌ Quedaron {managed} figuras registradas en pyplot")
+        ok = False
+    if alive:
+        print(f"❌ Quedaron {alive} figuras vivas tras gc.collect()")
+        ok = False
+    if growth > args.max_growth_mb:
+        print(f"❌ El RSS creció {growth:.1f} MB (máximo {args.max_growth_mb:.0f} MB)")
+        ok = False
+
+    if ok:
+        print("✅ Memoria y cantidad de figuras estables")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
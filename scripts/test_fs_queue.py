@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Prueba de la cola en un directorio (app/fsqueue.py) con varios trabajadores.
+
+- Escribe ``--jobs`` configuraciones pequeñas (los mismos generadores de
+  ``bench_render.py``) y las encola con ``main.py enqueue``.
+- Simula un trabajador que murió: toma un trabajo y deja su latido viejo.
+- Lanza ``--workers`` procesos ``main.py worker`` sobre la misma cola y
+  espera a que la vacíen.
+- Verifica que cada trabajo terminó exactamente una vez, que no quedan
+  pendientes ni en curso, que existen todas las imágenes, que el trabajo
+  abandonado volvió a la cola y que el trabajo se repartió entre procesos.
+
+Uso:
+    python scripts/test_fs_queue.py                  # 10 trabajadores, 30 trabajos
+    python scripts/test_fs_queue.py --workers 4 --jobs 12
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from bench_render import write_config  # noqa: E402  (mismo directorio)
+
+CHARTS = ["barv", "stackedbarh", "linechart"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de la cola en un directorio con varios trabajadores")
+    parser.add_argument("--workers", type=int, default=10, help="Procesos trabajadores (por defecto 10)")
+    parser.add_argument("--jobs", type=int, default=30, help="Trabajos a encolar (por defecto 30)")
+    parser.add_argument("--timeout", type=float, default=20.0, help="Segundos sin latido para devolver un trabajo")
+    parser.add_argument("--max-seconds", type=float, default=900.0, help="Tiempo máximo de la prueba")
+    args = parser.parse_args()
+
+    from app.fsqueue import FileQueue
+
+    with tempfile.TemporaryDirectory(prefix="condatos-queue-") as tmp:
+        workdir = Path(tmp)
+        configs = []
+        for i in range(args.jobs):
+            chart = CHARTS[i % len(CHARTS)]
+            case = {"chart": chart, "size": 8, "flags": False, "format": "png", "id": f"{chart}-q{i:03d}"}
+            configs.append(write_config(workdir, case))
+        queue_dir = workdir / "cola"
+
+        print(f"📥 Encolando {len(configs)} trabajos...")
+        for chart in CHARTS:
+            subprocess.run([sys.executable, "main.py", "--quiet", "enqueue",
+                            *[str(c) for c in configs if c.stem.startswith(f"{chart}-")],
+                            "--queue", str(queue_dir), "--chart", chart], cwd=root_dir, check=True)
+
+        # Un trabajador que "murió": tomó un trabajo y su latido quedó viejo
+        queue = FileQueue(queue_dir, timeout=args.timeout)
+        running, abandoned = queue.claim()
+        old = time.time() - 10 * args.timeout
+        os.utime(running, (old, old))
+
+        print(f"👷 Lanzando {args.workers} trabajadores...")
+        t0 = time.perf_counter()
+        cmd = [sys.executable, "main.py", "--quiet", "worker", "--queue", str(queue_dir),
+               "--timeout", str(args.timeout), "--heartbeat", "1", "--attempts", "3"]
+        procs = [subprocess.Popen(cmd, cwd=root_dir) for _ in range(args.workers)]
+        codes = []
+        for proc in procs:
+            try:
+                codes.append(proc.wait(timeout=max(1.0, args.max_seconds - (time.perf_counter() - t0))))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                codes.append("timeout")
+        elapsed = time.perf_counter() - t0
+
+        counts = queue.counts()
+        done = [json.loads(p.read_text(encoding="utf-8")) for p in sorted((queue_dir / "done").glob("*.json"))]
+        keys = Counter(job["key"] for job in done)
+        workers = Counter(job["result"]["worker"] for job in done)
+        missing = [c for c in configs if not Path(str(workdir / "out" / c.stem) + ".png").exists()]
+        requeued = next((job for job in done if job["id"] == abandoned["id"]), None)
+
+    print(f"\n📊 {len(done)} trabajos en {elapsed:.1f} s con {args.workers} trabajadores")
+    print(f"   Estados: {counts}")
+    print(f"   Trabajos por proceso: {sorted(workers.values(), reverse=True)}")
+
+    ok = True
+    if any(code != 0 for code in codes):
+        print(f"❌ Trabajadores con código distinto de 0: {codes}")
+        ok = False
+    if counts["pending"] or counts["running"] or counts["failed"]:
+        print(f"❌ Quedaron trabajos sin terminar: {counts}")
+        ok = False
+    if len(keys) != len(configs) or any(n != 1 for n in keys.values()):
+        print(f"❌ Cada trabajo debía terminar una vez: {len(keys)} de {len(configs)}, "
+              f"repetidos {[k for k, n in keys.items() if n > 1]}")
+        ok = False
+    if missing:
+        print(f"❌ Faltan {len(missing)} imágenes (ej. {missing[0].stem})")
+        ok = False
+    if requeued is None or requeued["attempts"] != 1:
+        print("❌ El trabajo abandonado no volvió a la cola")
+        ok = False
+    if len(workers) < min(2, args.workers):
+        print(f"❌ Todo el trabajo lo hizo un solo proceso: {dict(workers)}")
+        ok = False
+
+    if ok:
+        print("✅ La cola se vació: cada trabajo una vez, con el abandonado retomado")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Prueba de estrés: gráficos con estilos distintos renderizados en paralelo
+en hilos de un mismo proceso (ver ``app.styling.render_context``).
+
+- Escribe configuraciones pequeñas (los mismos generadores de
+  ``bench_render.py``) de barv, stackedbarh y linechart, cada una con un
+  estilo distinto (``styles/*.mplstyle``) o sin estilo.
+- Las renderiza en serie, en memoria (``app.api.render``), como referencia.
+- Las vuelve a renderizar ``--repeat`` veces, mezcladas, con ``--threads``
+  hilos a la vez.
+- Verifica que cada PNG es idéntico byte a byte al de la referencia, que
+  los ``rcParams`` globales quedaron como estaban y que no quedaron figuras
+  abiertas en pyplot.
+
+Uso:
+    python scripts/test_thread_render.py                  # 8 hilos, 3 repeticiones
+    python scripts/test_thread_render.py --threads 16 --repeat 5
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+# Añadir el directorio raíz del proyecto al path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from bench_render import write_config  # noqa: E402  (mismo directorio)
+
+CHARTS = ["barv", "stackedbarh", "linechart"]
+STYLES = [None, "styles/condatos.mplstyle", "styles/dark.mplstyle", "styles/minimal.mplstyle",
+          "styles/vibrant.mplstyle"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renders con estilos distintos en hilos paralelos")
+    parser.add_argument("--threads", type=int, default=8, help="Hilos en paralelo (por defecto 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Veces que se renderiza cada configuración")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del orden de los renders")
+    args = parser.parse_args()
+
+    import matplotlib as mpl
+
+    from app.api import render
+    from app.figures import open_figure_count
+    from app.log import setup_logging
+
+    setup_logging(level="WARNING")
+    before = dict(mpl.rcParams)
+
+    with tempfile.TemporaryDirectory(prefix="condatos-threads-") as tmp:
+        workdir = Path(tmp)
+        cases = []
+        for chart in CHARTS:
+            for i, style in enumerate(STYLES):
+                case = {"chart": chart, "size": 8, "flags": False, "format": "png", "id": f"{chart}-s{i}"}
+                config = yaml.safe_load(write_config(workdir, case).read_text(encoding="utf-8"))
+                if style:
+                    config["style"] = str(root_dir / style)
+                cases.append((case["id"], chart, config))
+
+        print(f"🧵 {len(cases)} configuraciones ({len(CHARTS)} tipos × {len(STYLES)} estilos)")
+        t0 = time.perf_counter()
+        reference = {name: render(config, chart=chart)["png"] for name, chart, config in cases}
+        serial = time.perf_counter() - t0
+        print(f"   En serie: {serial:.1f} s")
+
+        jobs = [case for case in cases for _ in range(args.repeat)]
+        random.Random(args.seed).shuffle(jobs)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            outputs = list(pool.map(lambda job: (job[0], render(job[2], chart=job[1])["png"]), jobs))
+        threaded = time.perf_counter() - t0
+        print(f"   En {args.threads} hilos: {len(jobs)} renders en {threaded:.1f} s")
+
+    mismatched = sorted({name for name, png in outputs if png != reference[name]})
+    changed = sorted(k for k, v in mpl.rcParams.items() if k in before and before[k] != v)
+    distinct = len(set(reference.values()))
+
+    ok = True
+    if mismatched:
+        print(f"❌ {len(mismatched)} configuraciones difieren de la referencia en serie: {', '.join(mismatched)}")
+        ok = False
+    if distinct < len(CHARTS) * 2:
+        print(f"❌ Los estilos no cambiaron la salida: solo {distinct} imágenes distintas")
+        ok = False
+    if changed:
+        print(f"❌ Quedaron rcParams globales modificados: {', '.join(changed[:10])}")
+        ok = False
+    if open_figure_count():
+        print(f"❌ Quedaron {open_figure_count()} figuras abiertas en pyplot")
+        ok = False
+
+    if ok:
+        print(f"✅ {len(outputs)} renders en hilos idénticos a los de la serie ({distinct} imágenes distintas), "
+              "rcParams globales intactos")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())